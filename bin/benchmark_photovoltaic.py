@@ -0,0 +1,187 @@
+"""
+Micro-benchmark of the PV physics of a single building: Compare the previous scalar implementations, evaluated hour by
+hour (sensor by sensor) with ``np.vectorize`` as :py:func:`cea.technologies.solar.photovoltaic.calc_pv_generation` and
+:py:func:`cea.utilities.solar_equations.optimal_angle_and_tilt` used to, with the current functions evaluated on whole
+arrays.
+
+The building is synthetic: ``--groups`` panel groups with random radiation and ``--sensors`` sensor points. Run with::
+
+    python bin/benchmark_photovoltaic.py --groups 20 --sensors 5000
+"""
+
+import argparse
+import timeit
+from math import acos, asin, cos, degrees, exp, radians, sin, tan
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.technologies.solar import constants, photovoltaic
+from cea.utilities import solar_equations
+
+PANEL_PROPERTIES_PV = {'PV_noct': 45.0, 'PV_a0': 0.935823, 'PV_a1': 0.054289, 'PV_a2': -0.008677, 'PV_a3': 0.000527,
+                       'PV_a4': -0.000011, 'PV_th': 0.002, 'PV_n': 0.16, 'PV_Bref': 0.0035, 'misc_losses': 0.1}
+
+
+def create_building(number_of_groups, number_of_sensors, seed=42):
+    rng = np.random.RandomState(seed)
+    hours = np.arange(HOURS_IN_YEAR)
+    solar = {'g': np.radians(23.45 * np.sin(2 * np.pi * (284 + hours / 24) / 365)),
+             'ha': np.radians((hours % 24 - 12) * 15.0),
+             'Sz': np.radians(rng.uniform(0.0, 120.0, HOURS_IN_YEAR)),
+             'T_ext_C': rng.uniform(-5.0, 30.0, HOURS_IN_YEAR)}
+    groups = []
+    for _ in range(number_of_groups):
+        I_sol = rng.uniform(0.0, 900.0, HOURS_IN_YEAR)
+        I_diffuse = I_sol * rng.uniform(0.0, 1.0, HOURS_IN_YEAR)
+        groups.append({'I_sol': I_sol, 'I_diffuse': I_diffuse, 'I_direct': I_sol - I_diffuse,
+                       'tilt': np.radians(rng.uniform(5.0, 90.0)), 'azimuth': np.radians(rng.uniform(0.0, 360.0)),
+                       'area_m2': rng.uniform(10.0, 100.0)})
+    normals = rng.normal(size=(3, number_of_sensors))
+    normals /= np.linalg.norm(normals, axis=0)
+    sensors = pd.DataFrame({'Xdir': normals[0], 'Ydir': normals[1], 'Zdir': np.abs(normals[2]),
+                            'total_rad_Whm2': rng.uniform(1.0, 1000000.0, number_of_sensors)})
+    return solar, groups, sensors
+
+
+# the previous implementations (evaluated with np.vectorize)
+
+def calc_angle_of_incidence_scalar(g, lat, ha, tilt, teta_z):
+    n_E = sin(tilt) * sin(teta_z)
+    n_N = sin(tilt) * cos(teta_z)
+    n_Z = cos(tilt)
+    s_E = -cos(g) * sin(ha)
+    s_N = sin(g) * cos(lat) - cos(g) * sin(lat) * cos(ha)
+    s_Z = cos(g) * cos(lat) * cos(ha) + sin(g) * sin(lat)
+    return acos(n_E * s_E + n_N * s_N + n_Z * s_Z)
+
+
+def calc_absorbed_radiation_PV_scalar(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
+    n, Pg, K = constants.n, constants.Pg, constants.K
+    a0, a1, a2, a3, a4 = [panel_properties_PV['PV_a%i' % i] for i in range(5)]
+    L = panel_properties_PV['PV_th']
+    lim1, lim2, lim3 = radians(0), radians(90), radians(89.999)
+    if teta < lim1:
+        teta = min(lim3, abs(teta))
+    if teta >= lim2:
+        teta = lim3
+    if Sz < lim1:
+        Sz = min(lim3, abs(Sz))
+    if Sz >= lim2:
+        Sz = lim3
+    Rb = cos(teta) / cos(Sz) if Sz <= radians(85) else 0
+    m = 1 / cos(Sz)
+    M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4
+    Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
+    kteta = []
+    for angle in [teta, tetaed, tetaeg]:
+        teta_r = asin(sin(angle) / n)
+        part1 = teta_r + angle
+        part2 = teta_r - angle
+        Ta = exp((-K * L) / cos(teta_r)) * (
+                1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
+        kteta.append(Ta / Ta_n)
+    absorbed_radiation_Wperm2 = M * Ta_n * (kteta[0] * I_direct * Rb + kteta[1] * I_diffuse * (1 + cos(tilt)) / 2 +
+                                            kteta[2] * I_sol * Pg * (1 - cos(tilt)) / 2)
+    return max(absorbed_radiation_Wperm2, 0.0)
+
+
+def calc_surface_azimuth_scalar(xdir, ydir, B):
+    teta_z = degrees(asin(xdir / sin(radians(B))))
+    if ydir < 0:
+        return 180 + teta_z
+    return 360 + teta_z if xdir < 0 else teta_z
+
+
+def calc_categoriesroof_scalar(teta_z, B, GB, Max_Isol):
+    CATteta_z = 6
+    for category, lower, upper in [(1, -122.5, -67), (3, -67, -22.5), (5, -22.5, 22.5), (4, 22.5, 67)]:
+        if lower < teta_z <= upper:
+            CATteta_z = category
+    if CATteta_z == 6 and 67 <= teta_z <= 122.5:
+        CATteta_z = 2
+    B = degrees(B)
+    CATB = 0
+    for category, lower, upper in [(1, 0, 5), (2, 5, 15), (3, 15, 25), (4, 25, 40), (5, 40, 60), (6, 60, np.inf)]:
+        if lower < B <= upper:
+            CATB = category
+    GB_percent = GB / Max_Isol
+    CATGB = 0
+    for category in range(1, 11):
+        if (category - 1) / 10 < GB_percent <= category / 10:
+            CATGB = category
+    return CATteta_z, CATB, CATGB
+
+
+PREVIOUS = {'calc_angle_of_incidence': np.vectorize(calc_angle_of_incidence_scalar),
+            'calc_absorbed_radiation_PV': np.vectorize(calc_absorbed_radiation_PV_scalar),
+            'calc_cell_temperature': np.vectorize(photovoltaic.calc_cell_temperature),
+            'calc_PV_power': np.vectorize(photovoltaic.calc_PV_power),
+            'arccos': np.vectorize(acos),
+            'degrees': np.vectorize(degrees),
+            'calc_surface_azimuth': np.vectorize(calc_surface_azimuth_scalar),
+            'calc_categoriesroof': np.vectorize(calc_categoriesroof_scalar)}
+
+CURRENT = {'calc_angle_of_incidence': solar_equations.calc_angle_of_incidence,
+           'calc_absorbed_radiation_PV': photovoltaic.calc_absorbed_radiation_PV,
+           'calc_cell_temperature': photovoltaic.calc_cell_temperature,
+           'calc_PV_power': photovoltaic.calc_PV_power,
+           'arccos': np.arccos,
+           'degrees': np.degrees,
+           'calc_surface_azimuth': solar_equations.calc_surface_azimuth,
+           'calc_categoriesroof': solar_equations.calc_categoriesroof}
+
+
+def calc_pv_generation(solar, groups, functions):
+    """The PV physics of :py:func:`cea.technologies.solar.photovoltaic.calc_pv_generation`"""
+    lat = np.radians(47.4)
+    el_output_PV_kW = np.zeros(HOURS_IN_YEAR)
+    for group in groups:
+        teta = functions['calc_angle_of_incidence'](solar['g'], lat, solar['ha'], group['tilt'], group['azimuth'])
+        teta_ed, teta_eg = photovoltaic.calc_diffuseground_comp(group['tilt'])
+        absorbed_radiation_Wperm2 = functions['calc_absorbed_radiation_PV'](
+            group['I_sol'], group['I_direct'], group['I_diffuse'], group['tilt'], solar['Sz'], teta, teta_ed, teta_eg,
+            PANEL_PROPERTIES_PV)
+        T_cell_C = functions['calc_cell_temperature'](absorbed_radiation_Wperm2, solar['T_ext_C'], PANEL_PROPERTIES_PV)
+        el_output_PV_kW += functions['calc_PV_power'](absorbed_radiation_Wperm2, T_cell_C, PANEL_PROPERTIES_PV['PV_n'],
+                                                      group['area_m2'], PANEL_PROPERTIES_PV['PV_Bref'],
+                                                      PANEL_PROPERTIES_PV['misc_losses'])
+    return el_output_PV_kW
+
+
+def categorize_sensors(sensors, functions):
+    """The sensor categorization of :py:func:`cea.utilities.solar_equations.optimal_angle_and_tilt`"""
+    tilt_deg = functions['degrees'](functions['arccos'](sensors['Zdir'].values))
+    B_deg = np.where(tilt_deg >= 5, tilt_deg, 30.0)
+    surface_azimuth_deg = functions['calc_surface_azimuth'](sensors['Xdir'].values, sensors['Ydir'].values, B_deg)
+    return functions['calc_categoriesroof'](surface_azimuth_deg, B_deg, sensors['total_rad_Whm2'].values,
+                                            sensors['total_rad_Whm2'].max())
+
+
+def main(number_of_groups, number_of_sensors, repeat):
+    solar, groups, sensors = create_building(number_of_groups, number_of_sensors)
+    np.testing.assert_allclose(calc_pv_generation(solar, groups, PREVIOUS), calc_pv_generation(solar, groups, CURRENT),
+                               rtol=1e-9)
+    for expected, result in zip(categorize_sensors(sensors, PREVIOUS), categorize_sensors(sensors, CURRENT)):
+        np.testing.assert_array_equal(expected, result)
+
+    print('PV physics of a building with {groups} panel groups and {sensors} sensor points'.format(
+        groups=number_of_groups, sensors=number_of_sensors))
+    print('{benchmark:<22} {previous:>14} {current:>14} {speedup:>10}'.format(
+        benchmark='', previous='previous [s]', current='arrays [s]', speedup='speedup'))
+    for benchmark, function, data in [('calc_pv_generation', calc_pv_generation, (solar, groups)),
+                                      ('optimal_angle_and_tilt', categorize_sensors, (sensors,))]:
+        previous_s = min(timeit.repeat(lambda: function(*data, PREVIOUS), number=1, repeat=repeat))
+        current_s = min(timeit.repeat(lambda: function(*data, CURRENT), number=1, repeat=repeat))
+        print('{benchmark:<22} {previous:>14.4f} {current:>14.4f} {speedup:>9.1f}x'.format(
+            benchmark=benchmark, previous=previous_s, current=current_s, speedup=previous_s / current_s))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--groups', type=int, default=20, help='number of panel groups of the building')
+    parser.add_argument('--sensors', type=int, default=5000, help='number of sensor points of the building')
+    parser.add_argument('--repeat', type=int, default=3, help='number of repetitions (the fastest is reported)')
+    args = parser.parse_args()
+    main(args.groups, args.sensors, args.repeat)
@@ -8,6 +8,7 @@ import datetime
 def register_scripts():
     import cea.config
     import cea.scripts
+    import cea.utilities.parallel
     import importlib
 
     def script_wrapper(cea_script):
@@ -34,6 +35,7 @@ def register_scripts():
                 raise cea.MissingInputDataException()
             t0 = datetime.datetime.now()
             # run the script
+            cea.utilities.parallel.set_worker_output(config.get('general:worker-output'))
             script_module.main(config)
 
             # print success message
@@ -2,13 +2,21 @@
 Classes of building properties
 """
 
+import glob
+import hashlib
+import importlib
+import os
+import pickle
+
 import numpy as np
 import pandas as pd
 from geopandas import GeoDataFrame as Gdf
 from datetime import datetime
 from collections import namedtuple
+from itertools import repeat
 from cea.demand import constants
-import cea.config
+import cea
+import cea.utilities.parallel
 from cea.utilities.dbf import dbf_to_dataframe
 from cea.technologies import blinds
 from typing import List
@@ -30,6 +38,18 @@ H_IS = constants.H_IS
 B_F = constants.B_F
 LAMBDA_AT = constants.LAMBDA_AT
 
+# the number of cached building properties to keep per scenario (see ``BuildingProperties.get_cache_path``)
+MAX_CACHED_BUILDING_PROPERTIES = 5
+
+# the modules the building properties are calculated with (besides this one): a change to their code results in a new
+# cache file, as does a new version of the CEA (see ``BuildingProperties.get_cache_path``)
+CACHED_CODE_MODULES = ['cea.demand.constants', 'cea.demand.control_heating_cooling_systems',
+                       'cea.technologies.blinds', 'cea.utilities.dbf']
+
+# the columns of the Daysim radiation results used for the solar gains
+RADIATION_COLUMNS = ['walls_east_kW', 'walls_west_kW', 'walls_north_kW', 'walls_south_kW', 'roofs_top_kW',
+                     'windows_east_kW', 'windows_west_kW', 'windows_north_kW', 'windows_south_kW']
+
 
 class BuildingProperties(object):
     """
@@ -39,7 +59,7 @@ class BuildingProperties(object):
     G. Happle   BuildingPropsThermalLoads   27.05.2016
     """
 
-    def __init__(self, locator, building_names=None):
+    def __init__(self, locator, building_names=None, heatgain=0.0, processes=1, use_cache=False):
         """
         Read building properties from input shape files and construct a new BuildingProperties object.
 
@@ -48,6 +68,13 @@ class BuildingProperties(object):
 
         :param List[str] building_names: list of buildings to read properties
 
+        :param float heatgain: coefficient to reduce the sensible solar gain on all roofs (``config.bigmacc.heatgain``)
+
+        :param int processes: number of processes to use for reading the radiation results
+
+        :param bool use_cache: reuse the building properties calculated by a previous run with the same input files
+            (see :py:meth:`get_cache_path`)
+
         :returns: BuildingProperties
         :rtype: BuildingProperties
         """
@@ -56,6 +83,16 @@ class BuildingProperties(object):
             building_names = locator.get_zone_building_names()
 
         self.building_names = building_names
+
+        cache_path = self.get_cache_path(locator, building_names, heatgain) if use_cache else None
+        if cache_path and os.path.exists(cache_path):
+            print("read building properties from cache")
+            with open(cache_path, 'rb') as f:
+                self.__dict__.update(pickle.load(f))
+            # mark the cache as recently used
+            os.utime(cache_path)
+            return
+
         print("read input files")
         prop_geometry = Gdf.from_file(locator.get_zone_geometry())
         prop_geometry['footprint'] = prop_geometry.area
@@ -86,7 +123,8 @@ class BuildingProperties(object):
                                                 prop_geometry, prop_HVAC_result)
 
         # get solar properties
-        solar = get_prop_solar(locator, building_names, prop_rc_model, prop_envelope).set_index('Name')
+        solar = get_prop_solar(locator, building_names, prop_rc_model, prop_envelope, heatgain,
+                               processes).set_index('Name')
 
         # df_windows = geometry_reader.create_windows(surface_properties, prop_envelope)
         # TODO: to check if the Win_op and height of window is necessary.
@@ -105,6 +143,65 @@ class BuildingProperties(object):
         self._solar = solar
         self._prop_RC_model = prop_rc_model
 
+        if cache_path:
+            self.write_cache(cache_path)
+
+    @staticmethod
+    def get_cache_path(locator, building_names, heatgain):
+        """
+        Return the path to the cached building properties. The name of the file is a hash of the contents of all input
+        files the building properties are calculated from, the code that calculates them (this module and
+        ``CACHED_CODE_MODULES``), the version of the CEA, the building names and the heat gain coefficient - any change
+        to these results in a new cache file.
+
+        :param locator: an InputLocator for locating the input files
+        :type locator: cea.inputlocator.InputLocator
+        :param List[str] building_names: list of buildings to read properties
+        :param float heatgain: coefficient to reduce the sensible solar gain on all roofs
+        :rtype: str
+        """
+        zone_geometry = os.path.splitext(locator.get_zone_geometry())[0]
+        input_files = sorted(glob.glob(zone_geometry + '.*'))
+        input_files.extend([locator.get_building_air_conditioning(),
+                            locator.get_building_typology(),
+                            locator.get_building_architecture(),
+                            locator.get_building_comfort(),
+                            locator.get_building_internal(),
+                            locator.get_building_supply(),
+                            locator.get_database_supply_assemblies(),
+                            locator.get_database_air_conditioning_systems(),
+                            locator.get_database_envelope_systems(),
+                            os.path.abspath(__file__)])
+        input_files.extend(importlib.import_module(module).__file__ for module in CACHED_CODE_MODULES)
+        input_files.extend(locator.get_radiation_building(building_name) for building_name in building_names)
+
+        key = hashlib.sha1()
+        key.update(repr((cea.__version__, list(building_names), float(heatgain))).encode('utf-8'))
+        for input_file in input_files:
+            key.update(input_file.encode('utf-8'))
+            with open(input_file, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    key.update(block)
+        return os.path.join(locator.get_building_properties_cache_folder(), key.hexdigest() + '.pickle')
+
+    def write_cache(self, cache_path):
+        """
+        Write the building properties to the cache and remove the least recently used cache files, keeping
+        ``MAX_CACHED_BUILDING_PROPERTIES`` files.
+
+        :param str cache_path: the path to the cache file (see :py:meth:`get_cache_path`)
+        """
+        # write to a temporary file first, so concurrent runs never read a partially written cache
+        temporary_path = '{cache_path}.{pid}.tmp'.format(cache_path=cache_path, pid=os.getpid())
+        with open(temporary_path, 'wb') as f:
+            pickle.dump(self.__dict__, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, cache_path)
+
+        cache_files = sorted(glob.glob(os.path.join(os.path.dirname(cache_path), '*.pickle')),
+                             key=os.path.getmtime, reverse=True)
+        for cache_file in cache_files[MAX_CACHED_BUILDING_PROPERTIES:]:
+            os.remove(cache_file)
+
     def calc_bounding_box_geom(self, geometry_shapefile):
         import shapefile
         sf = shapefile.Reader(geometry_shapefile)
@@ -910,95 +1007,103 @@ def get_envelope_properties(locator, prop_architecture):
     return envelope_prop
 
 
-def get_prop_solar(locator, building_names, prop_rc_model, prop_envelope):
+def get_prop_solar(locator, building_names, prop_rc_model, prop_envelope, heatgain=0.0, processes=1):
     """
     Gets the sensible solar gains from calc_Isol_daysim and stores in a dataframe containing building 'Name' and
     I_sol (incident solar gains).
 
+    The radiation results of each building are read once (optionally in parallel) and the sensible solar gains of all
+    buildings are then calculated together.
+
     :param locator: an InputLocator for locating the input files
     :param building_names: List of buildings
     :param prop_rc_model: RC model properties of a building by name.
     :param prop_envelope: dataframe containing the building envelope properties.
+    :param float heatgain: coefficient to reduce the sensible gain on all roofs (e.g. due to solar panels), see
+        ``config.bigmacc.heatgain``
+    :param int processes: number of processes to use for reading the radiation results
     :return: dataframe containing the sensible solar gains for each building by name called result.
     :rtype: Dataframe
     """
+    building_names = list(building_names)
+    read_radiation = cea.utilities.parallel.vectorize(read_radiation_building, processes)
+    radiation = read_radiation(building_names, repeat(locator, len(building_names)))
+    I_sol = calc_Isol_daysim(building_names, radiation, prop_envelope, prop_rc_model, RSE, heatgain)
 
-    thermal_resistance_surface = RSE
-
-    # create result data frame
-    list_Isol = []
-
-    # for every building
-    for building_name in building_names:
-        I_sol = calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, thermal_resistance_surface)
-        list_Isol.append(I_sol)
-
-    result = pd.DataFrame({'Name': list(building_names), 'I_sol': list_Isol})
+    result = pd.DataFrame({'Name': building_names, 'I_sol': list(I_sol)})
 
     return result
 
 
-def calc_Isol_daysim(building_name, locator, prop_envelope, prop_rc_model, thermal_resistance_surface):
+def read_radiation_building(building_name, locator):
     """
-    Reads Daysim geometry and radiation results and calculates the sensible solar heat loads based on the surface area
-    and building envelope properties.
+    Reads the Daysim radiation results of a building and sums them up per surface type.
 
     :param building_name: Name of the building (e.g. B154862)
     :param locator: an InputLocator for locating the input files
+    :return: solar radiation incident on all walls, roofs and windows [kW]
+    :rtype: np.array
+    """
+    radiation_data = pd.read_csv(locator.get_radiation_building(building_name), usecols=RADIATION_COLUMNS)
+    walls = (radiation_data['walls_east_kW'] +
+             radiation_data['walls_west_kW'] +
+             radiation_data['walls_north_kW'] +
+             radiation_data['walls_south_kW']).values
+    roofs = radiation_data['roofs_top_kW'].values
+    windows = (radiation_data['windows_east_kW'] +
+               radiation_data['windows_west_kW'] +
+               radiation_data['windows_north_kW'] +
+               radiation_data['windows_south_kW']).values
+    return np.array([walls, roofs, windows])
+
+
+def calc_Isol_daysim(building_names, radiation, prop_envelope, prop_rc_model, thermal_resistance_surface, heatgain):
+    """
+    Calculates the sensible solar heat loads based on the Daysim radiation results, the surface area and building
+    envelope properties for a set of buildings at once.
+
+    :param building_names: Names of the buildings (e.g. [B154862, B154863])
+    :param radiation: solar radiation incident on all walls, roofs and windows of each building [kW], see
+        :py:func:`read_radiation_building`
     :param prop_envelope: contains the building envelope properties.
     :param prop_rc_model: RC model properties of a building by name.
     :param thermal_resistance_surface: Thermal resistance of building element.
+    :param float heatgain: coefficient to reduce the sensible gain on all roofs.
 
-    :return: I_sol: numpy array containing the sensible solar heat loads for roof, walls and windows.
+    :return: I_sol: numpy array (buildings x hours) containing the sensible solar heat loads for roof, walls and
+        windows.
     :rtype: np.array
 
     """
+    radiation = np.asarray(radiation) * 1000  # in W
+    envelope = prop_envelope.loc[building_names]
+    rc_model = prop_rc_model.loc[building_names]
 
-    # read daysim radiation
-    radiation_data = pd.read_csv(locator.get_radiation_building(building_name))
-
-    # sum wall
-    # solar incident on all walls [W]
-    I_sol_wall = (radiation_data['walls_east_kW'] +
-                  radiation_data['walls_west_kW'] +
-                  radiation_data['walls_north_kW'] +
-                  radiation_data['walls_south_kW']).values * 1000  # in W
+    def per_building(values):
+        return values.values.reshape(-1, 1)
 
     # sensible gain on all walls [W]
-    I_sol_wall = I_sol_wall * \
-                 prop_envelope.loc[building_name, 'a_wall'] * \
+    I_sol_wall = radiation[:, 0] * \
+                 per_building(envelope['a_wall']) * \
                  thermal_resistance_surface * \
-                 prop_rc_model.loc[building_name, 'U_wall'] * \
-                 prop_rc_model.loc[building_name, 'empty_envelope_ratio']
-
-    # sum roof
-    # solar incident on all roofs [W]
-    I_sol_roof = radiation_data['roofs_top_kW'].values * 1000  # in W
+                 per_building(rc_model['U_wall']) * \
+                 per_building(rc_model['empty_envelope_ratio'])
 
     # sensible gain on all roofs [W]
-    I_sol_roof = I_sol_roof * \
-                 prop_envelope.loc[building_name, 'a_roof'] * \
+    I_sol_roof = radiation[:, 1] * \
+                 per_building(envelope['a_roof']) * \
                  thermal_resistance_surface * \
-                 prop_rc_model.loc[building_name, 'U_roof']
-
-    config = cea.config.Configuration()
-    I_sol_roof = I_sol_roof * (1 - config.bigmacc.heatgain)
-
-
-    # sum window, considering shading
-    I_sol_win = (radiation_data['windows_east_kW'] +
-                 radiation_data['windows_west_kW'] +
-                 radiation_data['windows_north_kW'] +
-                 radiation_data['windows_south_kW']).values * 1000  # in W
-
-    Fsh_win = np.vectorize(blinds.calc_blinds_activation)(I_sol_win,
-                                                          prop_envelope.loc[building_name, 'G_win'],
-                                                          prop_envelope.loc[building_name, 'rf_sh'])
+                 per_building(rc_model['U_roof'])
+    I_sol_roof = I_sol_roof * (1 - heatgain)
 
+    # sensible gain on all windows [W], considering shading
+    I_sol_win = radiation[:, 2]
+    Fsh_win = blinds.calc_blinds_activation(I_sol_win, per_building(envelope['G_win']),
+                                            per_building(envelope['rf_sh']))
     I_sol_win = I_sol_win * \
                 Fsh_win * \
-                (1 - prop_envelope.loc[building_name, 'F_F']) * \
-                prop_rc_model.loc[building_name, 'empty_envelope_ratio']
+                (1 - per_building(envelope['F_F'])) * \
+                per_building(rc_model['empty_envelope_ratio'])
 
     # sum
     I_sol = I_sol_wall + I_sol_roof + I_sol_win
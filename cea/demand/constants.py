@@ -3,6 +3,7 @@
 This file contains the constants used in the building energy demand calculations
 """
 
+import os
 
 
 __author__ = "Gabriel Happle"
@@ -17,6 +18,11 @@ __status__ = "Production"
 
 # all values are refactored from legacy Globalvars unless stated otherwise
 
+# NUMERICS
+# use the numba compiled kernels of the R-C-Model and the storage tank (compiled at first use and cached on disk).
+# Set the environment variable CEA_DISABLE_JIT to fall back to the pure python functions, e.g. for debugging.
+USE_JIT_KERNEL = not os.environ.get('CEA_DISABLE_JIT')
+
 # DEFAULT BUILDING GEOMETRY
 H_F = 3.0  # average height per floor in m
 D = 20.0  # in mm the diameter of the pipe to calculate losses
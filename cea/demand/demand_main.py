@@ -6,7 +6,6 @@ Analytical energy demand model algorithm
 import os
 import time
 import warnings
-from itertools import repeat
 
 import cea.config
 import cea.inputlocator
@@ -14,6 +13,7 @@ import cea.utilities.parallel
 from cea.demand import demand_writers
 from cea import MissingInputDataException
 from cea.demand import thermal_loads
+from cea.demand import thermal_loads_batched
 from cea.demand.building_properties import BuildingProperties
 from cea.utilities import epwreader
 from cea.utilities.date import get_date_range_hours_from_year
@@ -30,7 +30,7 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def demand_calculation(locator, config):
+def demand_calculation(locator, config, read_time_series=False):
     """
     Algorithm to calculate the hourly demand of energy services in buildings
     using the integrated model of [Fonseca2015]_.
@@ -55,8 +55,13 @@ def demand_calculation(locator, config):
         calculations by making use of multiple cores.
     :type multiprocessing: bool
 
-    :returns: None
-    :rtype: NoneType
+    :param read_time_series: Set this to ``True`` to read the results file of each building back in and return them
+        (slow for large numbers of buildings).
+    :type read_time_series: bool
+
+    :returns: the yearly totals of all buildings (``Total_demand.csv``) and, if ``read_time_series``, the results of
+        each building
+    :rtype: (pandas.DataFrame, list[pandas.DataFrame])
 
     .. [Fonseca2015] Fonseca, Jimeno A., and Arno Schlueter. “Integrated Model for Characterization of
         Spatiotemporal Building Energy Consumption Patterns in Neighborhoods and City Districts.”
@@ -76,6 +81,9 @@ def demand_calculation(locator, config):
     massflows_output = config.demand.massflows_output
     temperatures_output = config.demand.temperatures_output
     debug = config.debug
+    engine = config.demand.engine
+    batch_size = max(config.demand.batch_size, 1)
+    demand_writers.check_output_format(config.demand.output_format)
     weather_path = locator.get_weather_file()
     weather_data = epwreader.epw_reader(weather_path)[['year', 'drybulb_C', 'wetbulb_C',
                                                        'relhum_percent', 'windspd_ms', 'skytemp_C']]
@@ -87,7 +95,8 @@ def demand_calculation(locator, config):
     print('Running demand calculation for the following buildings=%s' % building_names)
 
     # CALCULATE OBJECT WITH PROPERTIES OF ALL BUILDINGS
-    building_properties = BuildingProperties(locator, building_names)
+    building_properties = BuildingProperties(locator, building_names, config.bigmacc.heatgain,
+                                             config.get_number_of_processes(), config.demand.use_cache)
 
     # add a message i2065 of warning. This needs a more elegant solution
     def calc_buildings_less_100m2(building_properties):
@@ -106,37 +115,86 @@ def demand_calculation(locator, config):
         print('Warning! The following list of buildings have less than 100 m2 of gross floor area, CEA might fail: %s' % list_buildings_less_100m2)
 
     # DEMAND CALCULATION
-    n = len(building_names)
-    calc_thermal_loads = cea.utilities.parallel.vectorize(thermal_loads.calc_thermal_loads,
-                                                          config.get_number_of_processes(), on_complete=print_progress)
-
-    calc_thermal_loads(
-        building_names,
-        [building_properties[b] for b in building_names],
-        repeat(weather_data, n),
-        repeat(date_range, n),
-        repeat(locator, n),
-        repeat(use_dynamic_infiltration, n),
-        repeat(resolution_output, n),
-        repeat(loads_output, n),
-        repeat(massflows_output, n),
-        repeat(temperatures_output, n),
-        repeat(config, n),
-        repeat(debug, n))
+    # the inputs that are the same for all buildings are sent to each worker process only once, the tasks only carry
+    # the building names
+    shared = {'building_properties': building_properties,
+              'weather_data': weather_data,
+              'date_range': date_range,
+              'locator': locator,
+              'use_dynamic_infiltration_calculation': use_dynamic_infiltration,
+              'resolution_outputs': resolution_output,
+              'loads_output': loads_output,
+              'massflows_output': massflows_output,
+              'temperatures_output': temperatures_output,
+              'config': config,
+              'debug': debug}
+    # the buildings are simulated largest first (or by the time they took in the previous run), so that no large
+    # building is left running on its own at the end
+    gross_floor_area = building_properties._prop_RC_model['GFA_m2']
+    timings_path = os.path.join(locator.get_cache_folder(), 'demand-timings.json')
+    if engine == 'batched':
+        # split the buildings into chunks that are simulated together
+        batches = [building_names[i:i + batch_size] for i in range(0, len(building_names), batch_size)]
+        batch_gross_floor_area = [gross_floor_area[batch].sum() for batch in batches]
+        calc_thermal_loads = cea.utilities.parallel.vectorize(calc_thermal_loads_batch,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=print_batch_progress,
+                                                              shared=shared,
+                                                              costs=batch_gross_floor_area,
+                                                              timings_path=timings_path)
+        batch_yearly_totals = calc_thermal_loads(batches)
+        yearly_totals = [totals for batch_totals in batch_yearly_totals for totals in batch_totals]
+    else:
+        calc_thermal_loads = cea.utilities.parallel.vectorize(calc_thermal_loads_building,
+                                                              config.get_number_of_processes(),
+                                                              on_complete=print_progress,
+                                                              shared=shared,
+                                                              costs=gross_floor_area[building_names].values,
+                                                              timings_path=timings_path)
+        yearly_totals = calc_thermal_loads(building_names)
 
     # WRITE TOTAL YEARLY VALUES
     writer_totals = demand_writers.YearlyDemandWriter(loads_output, massflows_output, temperatures_output)
-    totals, time_series = writer_totals.write_to_csv(building_names, locator)
+    totals, time_series = writer_totals.write_to_csv(yearly_totals, locator, read_time_series)
     time_elapsed = time.perf_counter() - t0
     print('done - time elapsed: %d.2 seconds' % time_elapsed)
 
     return totals, time_series
 
 
+def calc_thermal_loads_building(building_name, building_properties, **kwargs):
+    """
+    Calculate the thermal loads of a single building, looking up its properties in ``building_properties``. This
+    allows the workers to receive the :py:class:`BuildingProperties` only once (see
+    :py:func:`cea.utilities.parallel.vectorize`) instead of a ``BuildingPropertiesRow`` per building.
+
+    :param str building_name: The name of the building to simulate
+    :param BuildingProperties building_properties: The properties of all buildings
+    :param kwargs: The remaining arguments of :py:func:`cea.demand.thermal_loads.calc_thermal_loads`
+    """
+    return thermal_loads.calc_thermal_loads(building_name, building_properties[building_name], **kwargs)
+
+
+def calc_thermal_loads_batch(building_names, building_properties, **kwargs):
+    """
+    Calculate the thermal loads of a batch of buildings, see :py:func:`calc_thermal_loads_building`.
+
+    :param list[str] building_names: The names of the buildings to simulate together
+    :param BuildingProperties building_properties: The properties of all buildings
+    :param kwargs: The remaining arguments of :py:func:`cea.demand.thermal_loads_batched.calc_thermal_loads_batched`
+    """
+    bprs = [building_properties[building_name] for building_name in building_names]
+    return thermal_loads_batched.calc_thermal_loads_batched(building_names, bprs, **kwargs)
+
+
 def print_progress(i, n, args, _):
     print("Building No. {i} completed out of {n}: {building}".format(i=i + 1, n=n, building=args[0]))
 
 
+def print_batch_progress(i, n, args, _):
+    print("Batch No. {i} completed out of {n}: {buildings}".format(i=i + 1, n=n, buildings=", ".join(args[0])))
+
+
 def main(config):
 
     assert os.path.exists(config.scenario), 'Scenario not found: %s' % config.scenario
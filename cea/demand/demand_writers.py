@@ -8,11 +8,18 @@ the `MonthlyDemandWriter`.
 
 
 
+import os
+
 import numpy as np
 import pandas as pd
 
+from cea.schemas import BINARY_FORMATS
+
 FLOAT_FORMAT = '%.3f'
 
+# formats of the demand results files (see the demand:output-format parameter)
+OUTPUT_FORMATS = ['csv'] + BINARY_FORMATS
+
 
 class DemandWriter(object):
     """
@@ -20,9 +27,11 @@ class DemandWriter(object):
     Subclasses are expected to:
     - set the `vars_to_print` field in the constructor (FIXME: describe the `vars_to_print` structure.
     - implement the `write_to_csv` method
+
+    The demand results files are written in the `output_format` (one of `OUTPUT_FORMATS`).
     """
 
-    def __init__(self, loads, massflows, temperatures):
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
 
         from cea.demand.thermal_loads import TSD_KEYS_ENERGY_BALANCE_DASHBOARD, TSD_KEYS_SOLAR
 
@@ -30,6 +39,7 @@ class DemandWriter(object):
         self.load_plotting_vars = TSD_KEYS_ENERGY_BALANCE_DASHBOARD + TSD_KEYS_SOLAR
         self.mass_flow_vars = massflows
         self.temperature_vars = temperatures
+        self.output_format = output_format
 
         self.OTHER_VARS = ['Name', 'Af_m2', 'Aroof_m2', 'GFA_m2', 'Aocc_m2', 'people0']
 
@@ -47,16 +57,26 @@ class DemandWriter(object):
             key='dataset')
 
     def results_to_csv(self, tsd, bpr, locator, date, building_name):
+        """
+        Write the results of a building and return its totals for the year (see :py:meth:`calc_yearly_totals`), these
+        are collected by the demand script and written with the :py:class:`YearlyDemandWriter`.
+        """
         # save hourly data
         columns, hourly_data = self.calc_hourly_dataframe(building_name, date, tsd)
         self.write_to_csv(building_name, columns, hourly_data, locator)
 
-        # save total for the year
+        # total for the year
+        return self.calc_yearly_totals(bpr, building_name, tsd)
+
+    def calc_yearly_totals(self, bpr, building_name, tsd):
+        """
+        Totals for the year of a building, i.e. its row in ``Total_demand.csv``.
+
+        :return: a dict mapping the columns of ``Total_demand.csv`` (in order) to the values of the building
+        :rtype: dict
+        """
         columns, data = self.calc_yearly_dataframe(bpr, building_name, tsd)
-        # save to disc
-        pd.DataFrame(data, index=[0]).to_csv(
-            locator.get_temporary_file('%(building_name)sT.csv' % locals()),
-            index=False, columns=columns, float_format='%.3f', na_rep='nan')
+        return dict((column, data[column]) for column in columns)
 
     def calc_yearly_dataframe(self, bpr, building_name, tsd):
         # if printing total values is necessary
@@ -102,12 +122,20 @@ class DemandWriter(object):
 class HourlyDemandWriter(DemandWriter):
     """Write out the hourly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(HourlyDemandWriter, self).__init__(loads, massflows, temperatures)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        super(HourlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
 
     def write_to_csv(self, building_name, columns, hourly_data, locator):
-        hourly_data.to_csv(locator.get_demand_results_file(building_name, 'csv'), columns=columns,
-                           float_format=FLOAT_FORMAT, na_rep='nan')
+        if self.output_format == 'csv':
+            hourly_data.to_csv(locator.get_demand_results_file(building_name, 'csv'), columns=columns,
+                               float_format=FLOAT_FORMAT, na_rep='nan')
+        else:
+            # the dates are stored as text, as in the csv files, so the readers get the same DATE from all formats
+            hourly_data = hourly_data[columns].reset_index()
+            hourly_data['DATE'] = hourly_data['DATE'].astype(str)
+            write_binary(hourly_data, locator.get_demand_results_file(building_name, self.output_format),
+                         self.output_format)
+        remove_other_formats(locator.get_demand_results_file(building_name), self.output_format)
 
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # fixing columns with strings
@@ -118,16 +146,21 @@ class HourlyDemandWriter(DemandWriter):
 class MonthlyDemandWriter(DemandWriter):
     """Write out the monthly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(MonthlyDemandWriter, self).__init__(loads, massflows, temperatures)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        super(MonthlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
         self.MONTHS = ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september',
                        'october', 'november', 'december']
 
     def write_to_csv(self, building_name, columns, hourly_data, locator):
         # get monthly totals and rename to MWhyr
         monthly_data_new = self.calc_monthly_dataframe(building_name, hourly_data)
-        monthly_data_new.to_csv(locator.get_demand_results_file(building_name, 'csv'), index=False,
-                                float_format=FLOAT_FORMAT, na_rep='nan')
+        if self.output_format == 'csv':
+            monthly_data_new.to_csv(locator.get_demand_results_file(building_name, 'csv'), index=False,
+                                    float_format=FLOAT_FORMAT, na_rep='nan')
+        else:
+            write_binary(monthly_data_new.reset_index(drop=True),
+                         locator.get_demand_results_file(building_name, self.output_format), self.output_format)
+        remove_other_formats(locator.get_demand_results_file(building_name), self.output_format)
 
     def write_to_hdf5(self, building_name, columns, hourly_data, locator):
         # get monthly totals and rename to MWhyr
@@ -156,24 +189,33 @@ class MonthlyDemandWriter(DemandWriter):
 class YearlyDemandWriter(DemandWriter):
     """Write out the hourly demand results"""
 
-    def __init__(self, loads, massflows, temperatures):
-        super(YearlyDemandWriter, self).__init__(loads, massflows, temperatures)
-
-    def write_to_csv(self, list_buildings, locator):
-        """read in the temporary results files and append them to the Totals.csv file."""
-        df = None
-        for name in list_buildings:
-            temporary_file = locator.get_temporary_file('%(name)sT.csv' % locals())
-            if df is None:
-                df = pd.read_csv(temporary_file)
-            else:
-                df = df.append(pd.read_csv(temporary_file), ignore_index=True)
+    def __init__(self, loads, massflows, temperatures, output_format='csv'):
+        super(YearlyDemandWriter, self).__init__(loads, massflows, temperatures, output_format)
+
+    def write_to_csv(self, yearly_totals, locator, read_time_series=False):
+        """
+        Write the totals for the year of all buildings to the Total_demand.csv file.
+
+        :param yearly_totals: the totals for the year of each building, as returned by
+            :py:meth:`DemandWriter.results_to_csv`
+        :type yearly_totals: list[dict]
+        :param locator: the locator to use
+        :param bool read_time_series: read the results files of each building and return them as well - this is slow
+            for large numbers of buildings and is only done if requested.
+        :return: the totals (as written to Total_demand.csv) and the list of results of each building (or None if
+            ``read_time_series`` is False)
+        :rtype: (pd.DataFrame, list[pd.DataFrame])
+        """
+        # without any buildings, Total_demand.csv only has the Name column
+        columns = list(yearly_totals[0].keys()) if yearly_totals else ['Name']
+        df = pd.DataFrame(yearly_totals, columns=columns)
         df.to_csv(locator.get_total_demand('csv'), index=False, float_format='%.3f', na_rep='nan')
 
+        if not read_time_series:
+            return df, None
+
         """read saved data of monthly values and return as totals"""
-        monthly_data_buildings = [pd.read_csv(locator.get_demand_results_file(building_name, 'csv')) for building_name
-                                  in
-                                  list_buildings]
+        monthly_data_buildings = [locator.get_demand_results_file.read(building_name) for building_name in df.Name]
         return df, monthly_data_buildings
 
     def write_to_hdf5(self, list_buildings, locator):
@@ -192,3 +234,55 @@ class YearlyDemandWriter(DemandWriter):
                                   for building_name in
                                   list_buildings]
         return df, monthly_data_buildings
+
+
+def check_output_format(output_format):
+    """
+    Make sure the results can be written in the `output_format` before a script starts: the binary formats need the
+    pyarrow package.
+
+    :param str output_format: one of `OUTPUT_FORMATS`
+    :raises ValueError: if the format is unknown or pyarrow is not installed for a binary format
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError('Unknown output format: {output_format}, choose one of {formats}'.format(
+            output_format=output_format, formats=', '.join(OUTPUT_FORMATS)))
+    if output_format in BINARY_FORMATS:
+        try:
+            import pyarrow
+        except ImportError:
+            raise ValueError('The {output_format} output format needs the pyarrow package. Install pyarrow or set the '
+                             'output-format parameter to csv.'.format(output_format=output_format))
+
+
+def write_binary(df, path, output_format):
+    """
+    Write a results Dataframe (without index) to a compressed binary file, e.g. the demand results or the hourly results
+    of a thermal network. The columns keep their types (e.g. float64), so no precision is lost and no parsing is needed
+    when reading the file back.
+
+    :param pd.DataFrame df: the results
+    :param str path: the path to the file (see e.g. ``InputLocator.get_demand_results_file``)
+    :param str output_format: one of ``cea.schemas.BINARY_FORMATS``
+    """
+    if output_format == 'parquet':
+        df.to_parquet(path, index=False, compression='zstd')
+    elif output_format == 'feather':
+        df.to_feather(path, compression='zstd')
+    else:
+        raise ValueError('Unknown binary output format: {}'.format(output_format))
+
+
+def remove_other_formats(path, output_format):
+    """
+    Remove a results file (e.g. the demand results of a building) in the formats other than `output_format` (e.g. from
+    a previous run with a different demand:output-format), so readers don't pick up outdated results.
+
+    :param str path: the path to the results file, in any of the ``OUTPUT_FORMATS``
+    :param str output_format: the format of the results file written
+    """
+    for other_format in OUTPUT_FORMATS:
+        if other_format != output_format:
+            other_path = os.path.splitext(path)[0] + '.' + other_format
+            if os.path.exists(other_path):
+                os.remove(other_path)
@@ -841,6 +841,10 @@ def calc_rc_heating_demand(bpr, tsd, t):
        :return: phi_h_act, rc_model_temperatures
        """
 
+    if constants.USE_JIT_KERNEL:
+        # compiled version of the procedure below
+        return rc_model_SIA.calc_rc_demand(bpr, tsd, t, heating=True)
+
     # following the procedure in 2.3.2 in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011
     #  / Korrigenda C2 zum Mekblatt SIA 2044:2011
 
@@ -919,6 +923,10 @@ def calc_rc_cooling_demand(bpr, tsd, t):
        :return: phi_c_act, rc_model_temperatures
        """
 
+    if constants.USE_JIT_KERNEL:
+        # compiled version of the procedure below
+        return rc_model_SIA.calc_rc_demand(bpr, tsd, t, heating=False)
+
     # following the procedure in 2.3.2 in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011
     #  / Korrigenda C2 zum Mekblatt SIA 2044:2011
 
@@ -5,6 +5,9 @@
 
 
 import numpy as np
+from numba import jit
+from numba.extending import register_jitable
+
 from cea.demand import constants
 
 __author__ = "Gabriel Happle"
@@ -42,6 +45,7 @@ f_r_a = 0.2  # (-) section 2.1.4 in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2
 # 2.1.3
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+@register_jitable
 def calc_h_mc(a_m):
     """
     :param a_m: see ``bpr.rc_model['Am']``
@@ -58,6 +62,7 @@ def calc_h_mc(a_m):
     return h_mc
 
 
+@register_jitable
 def calc_h_ac(a_t):
     """
     :param a_t: equivalent to ``bpr.rc_model['Atot']``
@@ -73,6 +78,7 @@ def calc_h_ac(a_t):
     return h_ac
 
 
+@register_jitable
 def calc_h_op_m(Htr_op):
 
     # work around # TODO: to be addressed in issue #443
@@ -88,6 +94,7 @@ def calc_h_op_m(Htr_op):
     return h_op_m
 
 
+@register_jitable
 def calc_h_em(h_op_m, h_mc):
 
     # (10) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -109,6 +116,7 @@ def calc_h_j_em():
     return None
 
 
+@register_jitable
 def calc_h_ec(Htr_w):
 
     # (12) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -122,6 +130,7 @@ def calc_h_ec(Htr_w):
     return h_ec
 
 
+@register_jitable
 def calc_h_ea(m_ve_mech, m_ve_window, m_ve_inf_simple):
     cp = 1.005 / 3.6  # (Wh/kg/K)
     # TODO: check units of air flow
@@ -143,6 +152,7 @@ def calc_h_ea(m_ve_mech, m_ve_window, m_ve_inf_simple):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@register_jitable
 def calc_phi_a(phi_hc_cv, phi_i_l, phi_i_a, phi_i_p, I_sol):
 
     # (14) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -167,6 +177,7 @@ def calc_phi_a(phi_hc_cv, phi_i_l, phi_i_a, phi_i_p, I_sol):
     return phi_a
 
 
+@register_jitable
 def calc_phi_c(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_ic, f_sc):
 
     # (15) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -195,12 +206,14 @@ def calc_phi_c(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_ic, f_sc):
     return phi_c
 
 
+@register_jitable
 def calc_phi_i_p(Qs): # _Wp, people):
     # # internal gains from people
     # phi_i_p = people * Qs_Wp
     return Qs # phi_i_p
 
 
+@register_jitable
 def calc_phi_i_a(Eaf, Epro):
     # internal gains from appliances, factor of 0.9 taken from old method calc_Qgain_sen()
     # TODO make function and dynamic, check factor
@@ -208,6 +221,7 @@ def calc_phi_i_a(Eaf, Epro):
     return phi_i_a
 
 
+@register_jitable
 def calc_phi_i_l(Elf):
     # internal gains from lighting, factor of 0.9 taken from old method calc_Qgain_sen()
     # TODO make function and dynamic, check factor
@@ -215,6 +229,7 @@ def calc_phi_i_l(Elf):
     return phi_i_l
 
 
+@register_jitable
 def calc_phi_m(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_im, f_sm):
 
     # (16) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -242,6 +257,7 @@ def calc_phi_m(phi_hc_r, phi_i_l, phi_i_a, phi_i_p, I_sol, f_im, f_sm):
     return phi_m
 
 
+@register_jitable
 def calc_f_ic(a_t, a_m, h_ec):
     """
 
@@ -261,6 +277,7 @@ def calc_f_ic(a_t, a_m, h_ec):
     return f_ic
 
 
+@register_jitable
 def calc_f_sc(a_t, a_m, a_w, h_ec):
     """
 
@@ -283,6 +300,7 @@ def calc_f_sc(a_t, a_m, a_w, h_ec):
     return f_sc
 
 
+@register_jitable
 def calc_f_im(a_t, a_m):
     """
 
@@ -299,6 +317,7 @@ def calc_f_im(a_t, a_m):
     return f_im
 
 
+@register_jitable
 def calc_f_sm(a_t, a_m, a_w):
     """
     :param a_t: bpr.rc_model['Atot']
@@ -319,6 +338,7 @@ def calc_f_sm(a_t, a_m, a_w):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@register_jitable
 def calc_theta_ea(m_ve_mech, m_ve_window, m_ve_inf_simple, theta_ve_mech, T_ext):
 
     # get values
@@ -337,6 +357,7 @@ def calc_theta_ea(m_ve_mech, m_ve_window, m_ve_inf_simple, theta_ve_mech, T_ext)
     return theta_ea
 
 
+@register_jitable
 def calc_theta_ec(T_ext):
 
     # WORKAROUND
@@ -354,6 +375,7 @@ def calc_theta_ec(T_ext):
     return theta_ec
 
 
+@register_jitable
 def calc_theta_em(T_ext):
 
     # WORKAROUND
@@ -410,6 +432,7 @@ def calc_theta_e_star():
 # 2.1.6
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
+@register_jitable
 def calc_theta_m_t(phi_m_tot, theta_m_t_1, h_em, h_3, c_m):
     # (25) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_m_t = (theta_m_t_1 * (c_m - 0.5 * (h_3 + h_em)) + phi_m_tot) / (c_m + 0.5 * (h_3 + h_em))
@@ -417,6 +440,7 @@ def calc_theta_m_t(phi_m_tot, theta_m_t_1, h_em, h_3, c_m):
     return theta_m_t
 
 
+@register_jitable
 def calc_h_1(h_ea, h_ac):
 
     # get values
@@ -430,6 +454,7 @@ def calc_h_1(h_ea, h_ac):
     return h_1
 
 
+@register_jitable
 def calc_h_2(h_1, h_ec):
     # (27) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
 
@@ -438,24 +463,28 @@ def calc_h_2(h_1, h_ec):
     return h_2
 
 
+@register_jitable
 def calc_h_3(h_2, h_mc):
     # (28) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     h_3 = 1.0 / (1.0 / h_2 + 1.0 / h_mc)
     return h_3
 
 
+@register_jitable
 def calc_phi_m_tot(phi_m, phi_a, phi_c, theta_ea, theta_em, theta_ec, h_1, h_2, h_3, h_ec, h_ea, h_em):
     # (29) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     phi_m_tot = phi_m + h_em * theta_em + (h_3 * (phi_c + h_ec * theta_ec + h_1 * (phi_a / h_ea + theta_ea))) / h_2
     return phi_m_tot
 
 
+@register_jitable
 def calc_theta_m(theta_m_t, theta_m_t_1):
     # (30) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_m = (theta_m_t + theta_m_t_1) / 2
     return theta_m
 
 
+@register_jitable
 def calc_theta_c(phi_a, phi_c, theta_ea, theta_ec, theta_m, h_1, h_mc, h_ec, h_ea):
 
     # get values
@@ -470,12 +499,14 @@ def calc_theta_c(phi_a, phi_c, theta_ea, theta_ec, theta_m, h_1, h_mc, h_ec, h_e
     return theta_c
 
 
+@register_jitable
 def calc_T_int(phi_a, theta_ea, theta_c, h_ac, h_ea):
     # (32) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     T_int = (h_ac * theta_c + h_ea * theta_ea + phi_a) / (h_ac + h_ea)
     return T_int
 
 
+@register_jitable
 def calc_theta_o(T_int, theta_c):
     # (33) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
     theta_o = T_int * 0.31 + theta_c * 0.69
@@ -486,6 +517,7 @@ def calc_theta_o(T_int, theta_c):
 # ++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 
 
+@register_jitable
 def calc_phi_hc_cv(phi_hc, f_hc_cv):
 
     # (58) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -494,6 +526,7 @@ def calc_phi_hc_cv(phi_hc, f_hc_cv):
     return phi_hc_cv
 
 
+@register_jitable
 def calc_phi_hc_r(phi_hc, f_hc_cv):
 
     # (59) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
@@ -584,6 +617,36 @@ def calc_rc_model_temperatures_no_heating_cooling(bpr, tsd, t):
 
 def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, bpr, tsd, t):
     # calculate node temperatures of RC model
+    Ea, El, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m, m_ve_inf, m_ve_mech, m_ve_window, theta_m_t_1, \
+        theta_ve_mech = get_rc_model_inputs(bpr, tsd, t)
+
+    if constants.USE_JIT_KERNEL:
+        calc_temperatures = _calc_rc_model_temperatures_jit
+    else:
+        calc_temperatures = _calc_rc_model_temperatures
+    rc_model_temperatures = calc_temperatures(Ea, El, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m,
+                                              m_ve_inf, m_ve_mech, m_ve_window, phi_hc_cv, phi_hc_r, theta_m_t_1,
+                                              theta_ve_mech)
+    check_rc_model_temperatures(rc_model_temperatures, bpr, t)
+
+    return rc_model_temperatures_to_dict(rc_model_temperatures)
+
+
+def get_rc_model_inputs(bpr, tsd, t):
+    """
+    Collect the inputs of the R-C-Model for time step ``t`` from ``bpr`` and ``tsd`` (the arguments of
+    :py:func:`_calc_rc_model_temperatures` except the heating / cooling power).
+
+    :param bpr: Building Properties
+    :type bpr: BuildingPropertiesRow
+    :param tsd: Time series data of building
+    :type tsd: dict
+    :param t: time step / hour of the year
+    :type t: int
+    :return: Ea, El, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m, m_ve_inf, m_ve_mech, m_ve_window,
+        theta_m_t_1, theta_ve_mech
+    :rtype: tuple
+    """
     theta_m_t_1 = tsd['theta_m'][t - 1]
     if np.isnan(theta_m_t_1):
         theta_m_t_1 = tsd['T_ext'][t - 1]
@@ -609,13 +672,17 @@ def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, bpr, tsd, t):
     a_w = bpr.rc_model['Awin_ag']
     c_m = bpr.rc_model['Cm'] / 3600  # (Wh/K) SIA 2044 unit is Wh/K, ISO unit is J/K
 
-    T_int, theta_c, theta_m, theta_o, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em, h_op_m \
-        = _calc_rc_model_temperatures(Ea, El, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m, m_ve_inf,
-                                                                     m_ve_mech, m_ve_window, phi_hc_cv,
-                                                                     phi_hc_r, theta_m_t_1, theta_ve_mech)
+    return (Ea, El, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m, m_ve_inf, m_ve_mech, m_ve_window,
+            theta_m_t_1, theta_ve_mech)
+
 
-    if T_WARNING_LOW > T_int or T_WARNING_LOW > theta_c or T_WARNING_LOW > theta_m \
-            or T_int > T_WARNING_HIGH or theta_c > T_WARNING_HIGH or theta_m > T_WARNING_HIGH:
+def check_rc_model_temperatures(rc_model_temperatures, bpr, t):
+    """
+    Raise an exception if the node temperatures of the R-C-Model (as returned by
+    :py:func:`_calc_rc_model_temperatures`) are out of the range ``T_WARNING_LOW`` to ``T_WARNING_HIGH``.
+    """
+    T_int, theta_c, theta_m = rc_model_temperatures[:3]
+    if _is_out_of_bounds(T_int, theta_c, theta_m):
         raise Exception("Temperature in RC-Model of building {} out of bounds! First occured at timestep = {}."
                         " The results were Tint = {}, theta_c = {}, theta_m = {},"
                         " Check building geometry and internal loads! Building might be too small in size or"
@@ -623,12 +690,23 @@ def calc_rc_model_temperatures(phi_hc_cv, phi_hc_r, bpr, tsd, t):
                         " for RC-model temperatures are between {} and {}.".format(bpr.name, t, T_int, theta_c,  theta_m, bpr.architecture.Hs_ag,
                                                                                    T_WARNING_LOW, T_WARNING_HIGH))
 
+
+def rc_model_temperatures_to_dict(rc_model_temperatures):
+    """Convert the tuple returned by :py:func:`_calc_rc_model_temperatures` to the dict used in the hourly loop"""
+    T_int, theta_c, theta_m, theta_o, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em, h_op_m = rc_model_temperatures
     rc_model_temp = {'theta_m': theta_m, 'theta_c': theta_c, 'T_int': T_int, 'theta_o': theta_o, 'theta_ea': theta_ea,
                      'theta_ec': theta_ec, 'theta_em': theta_em, 'h_ea': h_ea, 'h_ec': h_ec, 'h_em': h_em,
                      'h_op_m': h_op_m}
     return rc_model_temp
 
 
+@register_jitable
+def _is_out_of_bounds(T_int, theta_c, theta_m):
+    return (T_WARNING_LOW > T_int or T_WARNING_LOW > theta_c or T_WARNING_LOW > theta_m
+            or T_int > T_WARNING_HIGH or theta_c > T_WARNING_HIGH or theta_m > T_WARNING_HIGH)
+
+
+@register_jitable
 def _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m,
                                 m_ve_inf_simple, m_ve_mech, m_ve_window, phi_hc_cv, phi_hc_r, theta_m_t_1,
                                 theta_ve_mech):
@@ -664,6 +742,135 @@ def _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext,
     return T_int, theta_c, theta_m, theta_o, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em, h_op_m
 
 
+# status codes of :py:func:`_calc_rc_demand`
+RC_DEMAND_OK = 0
+RC_DEMAND_OUT_OF_BOUNDS = 1
+RC_DEMAND_UNEXPECTED_STATUS = 2
+
+
+@register_jitable
+def _calc_rc_demand(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t, a_w, c_m, m_ve_inf_simple, m_ve_mech,
+                    m_ve_window, theta_m_t_1, theta_ve_mech, t_int_set, phi_hc_10, phi_hc_max, f_hc_cv, heating):
+    """
+    Compiled counterpart of :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_rc_heating_demand`
+    and :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_rc_cooling_demand` (STEP 1 - 4 in
+    2.3.2 in SIA 2044), see :py:func:`calc_rc_demand`.
+
+    :return: status (one of ``RC_DEMAND_*``), heating / cooling power, R-C-Model temperatures (as returned by
+        :py:func:`_calc_rc_model_temperatures`, if the status is ``RC_DEMAND_OUT_OF_BOUNDS`` these are the temperatures
+        that are out of bounds)
+    """
+    temp_tolerance = 0.001  # temperature tolerance of temperature sensor (°C), see `has_sensible_heating_demand`
+
+    # STEP 1
+    # ******
+    # calculate temperatures with 0 heating power
+    rc_model_temperatures_0 = _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t,
+                                                          a_w, c_m, m_ve_inf_simple, m_ve_mech, m_ve_window, 0.0, 0.0,
+                                                          theta_m_t_1, theta_ve_mech)
+    t_int_0 = rc_model_temperatures_0[0]
+    if _is_out_of_bounds(t_int_0, rc_model_temperatures_0[1], rc_model_temperatures_0[2]):
+        return RC_DEMAND_OUT_OF_BOUNDS, 0.0, rc_model_temperatures_0
+
+    # CHECK FOR DEMAND (no set point = system off, the comparisons with NaN are False)
+    if heating:
+        has_demand = t_int_0 < t_int_set - temp_tolerance
+    else:
+        has_demand = t_int_0 > t_int_set + temp_tolerance
+    if not has_demand:
+        return RC_DEMAND_OK, 0.0, rc_model_temperatures_0
+
+    # STEP 2
+    # ******
+    # calculate temperatures with 10 W/m2 heating / cooling power
+    rc_model_temperatures_10 = _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t,
+                                                           a_w, c_m, m_ve_inf_simple, m_ve_mech, m_ve_window,
+                                                           calc_phi_hc_cv(phi_hc_10, f_hc_cv),
+                                                           calc_phi_hc_r(phi_hc_10, f_hc_cv), theta_m_t_1,
+                                                           theta_ve_mech)
+    t_int_10 = rc_model_temperatures_10[0]
+    if _is_out_of_bounds(t_int_10, rc_model_temperatures_10[1], rc_model_temperatures_10[2]):
+        return RC_DEMAND_OUT_OF_BOUNDS, 0.0, rc_model_temperatures_10
+
+    # interpolate heating power
+    # (64) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
+    phi_hc_ul = phi_hc_10 * (t_int_set - t_int_0) / (t_int_10 - t_int_0)
+
+    # STEP 3
+    # ******
+    # check if available power is sufficient
+    if heating and 0.0 < phi_hc_ul <= phi_hc_max:
+        phi_hc_act = phi_hc_ul
+    elif heating and 0.0 < phi_hc_ul > phi_hc_max:
+        phi_hc_act = phi_hc_max
+    elif not heating and 0.0 > phi_hc_ul >= phi_hc_max:
+        phi_hc_act = phi_hc_ul
+    elif not heating and 0.0 > phi_hc_ul < phi_hc_max:
+        phi_hc_act = phi_hc_max
+    else:
+        return RC_DEMAND_UNEXPECTED_STATUS, 0.0, rc_model_temperatures_10
+
+    # STEP 4
+    # ******
+    rc_model_temperatures = _calc_rc_model_temperatures(Eaf, Elf, Epro, Htr_op, Htr_w, I_sol, Qs, T_ext, a_m, a_t,
+                                                        a_w, c_m, m_ve_inf_simple, m_ve_mech, m_ve_window,
+                                                        calc_phi_hc_cv(phi_hc_act, f_hc_cv),
+                                                        calc_phi_hc_r(phi_hc_act, f_hc_cv), theta_m_t_1, theta_ve_mech)
+    if _is_out_of_bounds(rc_model_temperatures[0], rc_model_temperatures[1], rc_model_temperatures[2]):
+        return RC_DEMAND_OUT_OF_BOUNDS, 0.0, rc_model_temperatures
+
+    return RC_DEMAND_OK, phi_hc_act, rc_model_temperatures
+
+
+# numba compiled versions of the functions above, compiled at first use and cached on disk (see
+# ``cea.demand.constants.USE_JIT_KERNEL``). The numpy error model returns inf / nan on division by zero, as the python
+# functions do with the numpy floats of ``tsd``.
+_calc_rc_model_temperatures_jit = jit(nopython=True, cache=True, error_model='numpy')(_calc_rc_model_temperatures)
+_calc_rc_demand_jit = jit(nopython=True, cache=True, error_model='numpy')(_calc_rc_demand)
+
+
+def calc_rc_demand(bpr, tsd, t, heating):
+    """
+    Crank-Nicholson Procedure to calculate the sensible heating / cooling demand of the R-C-Model following the
+    procedure in 2.3.2 in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
+
+    This is the compiled version of
+    :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_rc_heating_demand` and
+    :py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_rc_cooling_demand` with the same results.
+
+    :param bpr: Building Properties
+    :type bpr: BuildingPropertiesRow
+    :param tsd: Time series data of building
+    :type tsd: dict
+    :param t: time step / hour of the year
+    :type t: int
+    :param heating: True for the heating demand, False for the cooling demand
+    :type heating: bool
+    :return: phi_hc_act, rc_model_temperatures
+    :rtype: (float, dict)
+    """
+    rc_model_inputs = get_rc_model_inputs(bpr, tsd, t)
+    if heating:
+        t_int_set = tsd['ta_hs_set'][t]
+        phi_hc_max = bpr.hvac['Qhsmax_Wm2'] * bpr.rc_model['Af']
+        f_hc_cv = lookup_f_hc_cv_heating(bpr)
+    else:
+        t_int_set = tsd['ta_cs_set'][t]
+        phi_hc_max = -bpr.hvac['Qcsmax_Wm2'] * bpr.rc_model['Af']
+        f_hc_cv = lookup_f_hc_cv_cooling(bpr)
+    phi_hc_10 = 10.0 * bpr.rc_model['Af']
+
+    status, phi_hc_act, rc_model_temperatures = _calc_rc_demand_jit(*rc_model_inputs, t_int_set, phi_hc_10,
+                                                                    phi_hc_max, f_hc_cv, heating)
+    if status == RC_DEMAND_OUT_OF_BOUNDS:
+        check_rc_model_temperatures(rc_model_temperatures, bpr, t)
+    elif status == RC_DEMAND_UNEXPECTED_STATUS:
+        raise Exception("Unexpected status in '{}'".format(
+            'calc_rc_heating_demand' if heating else 'calc_rc_cooling_demand'))
+
+    return phi_hc_act, rc_model_temperatures_to_dict(rc_model_temperatures)
+
+
 def calc_rc_model_temperatures_heating(phi_hc, bpr, tsd, t):
     """
     This function executes the equations of SIA 2044 R-C-Building-Model to calculate the node temperatures for a given
@@ -871,14 +1078,3 @@ def lookup_f_hc_cv_cooling(bpr):
     f_hc_cv = bpr.hvac['convection_cs']
 
     return f_hc_cv
-
-
-# use the optimized (numba_cc) versions of the functions in this module if available
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from .rc_model_sia_cc import (calc_phi_m, calc_phi_c, calc_theta_c, calc_phi_m_tot, calc_phi_a, calc_theta_m,
-                                 calc_h_ea, calc_theta_m_t, calc_theta_ea, calc_h_em, calc_h_3)
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from rc_model_sia_cc.pyd, falling back to pure python functions')
-    pass
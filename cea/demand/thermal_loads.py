@@ -67,12 +67,43 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     :param locator:
     :param use_dynamic_infiltration_calculation:
 
-    :returns: This function does not return anything
-    :rtype: NoneType
+    :returns: the totals for the year of the building (see ``DemandWriter.calc_yearly_totals``)
+    :rtype: dict
 
 """
     schedules, tsd = initialize_inputs(bpr, weather_data, locator)
 
+    tsd = calc_loads_before_space_conditioning(bpr, tsd, schedules, date_range, building_name, config, locator)
+
+    if has_conditioned_area(bpr):
+        tsd = calc_Qhs_Qcs(bpr, tsd,
+                           use_dynamic_infiltration_calculation)  # end-use demand latent and sensible + ventilation
+
+    tsd = calc_loads_after_space_conditioning(bpr, tsd, schedules)
+
+    # WRITE SOLAR RESULTS
+    return write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                         resolution_outputs, temperatures_output, tsd, debug, config.demand.output_format)
+
+
+def has_conditioned_area(bpr):
+    """
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: BuildingPropertiesRow
+    :return: True, if the building has an air-conditioned area (and thus needs the hourly RC-model loop)
+    :rtype: bool
+    """
+    return not np.isclose(bpr.rc_model['Af'], 0.0)
+
+
+def calc_loads_before_space_conditioning(bpr, tsd, schedules, date_range, building_name, config, locator):
+    """
+    Calculate all loads that need to be known before the hourly space conditioning loop (``calc_Qhs_Qcs``) can be
+    run: electricity, refrigeration, process and data center loads as well as latent gains and set points.
+
+    :return: the updated time step data
+    :rtype: dict
+    """
     # CALCULATE ELECTRICITY LOADS
     tsd = electrical_loads.calc_Eal_Epro(tsd, schedules)
 
@@ -101,8 +132,8 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
         tsd['mcpcdata_sys'] = tsd['Tcdata_sys_re'] = tsd['Tcdata_sys_sup'] = np.zeros(HOURS_IN_YEAR)
         tsd['Edata'] = tsd['E_cdata'] = np.zeros(HOURS_IN_YEAR)
 
-    # CALCULATE SPACE CONDITIONING DEMANDS
-    if np.isclose(bpr.rc_model['Af'], 0.0):  # if building does not have conditioned area
+    # PREPARE SPACE CONDITIONING DEMANDS
+    if not has_conditioned_area(bpr):  # if building does not have conditioned area
         tsd['T_int'] = tsd['T_ext']
         tsd['x_int'] = np.vectorize(convert_rh_to_moisture_content)(tsd['rh_ext'], tsd['T_int'])
         tsd['E_cs'] = tsd['E_hs'] = np.zeros(HOURS_IN_YEAR)
@@ -112,8 +143,19 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
         tsd = latent_loads.calc_Qgain_lat(tsd, schedules)
         tsd = calc_set_points(bpr, date_range, tsd, building_name, config, locator,
                               schedules)  # calculate the setpoints for every hour
-        tsd = calc_Qhs_Qcs(bpr, tsd,
-                           use_dynamic_infiltration_calculation)  # end-use demand latent and sensible + ventilation
+    return tsd
+
+
+def calc_loads_after_space_conditioning(bpr, tsd, schedules):
+    """
+    Calculate all loads that depend on the results of the hourly space conditioning loop (``calc_Qhs_Qcs``): system
+    losses, final energy of space conditioning, hot water and the aggregated heating, cooling and electricity loads.
+
+    :return: the updated time step data
+    :rtype: dict
+    """
+    # CALCULATE SPACE CONDITIONING DEMANDS
+    if has_conditioned_area(bpr):
         tsd = sensible_loads.calc_Qhs_Qcs_loss(bpr, tsd)  # losses
         tsd = sensible_loads.calc_Qhs_sys_Qcs_sys(tsd)  # system (incl. losses)
         tsd = sensible_loads.calc_temperatures_emission_systems(bpr, tsd)  # calculate temperatures
@@ -151,12 +193,7 @@ def calc_thermal_loads(building_name, bpr, weather_data, date_range, locator,
     tsd = electrical_loads.calc_Eaux(tsd)  # auxiliary totals
     tsd = electrical_loads.calc_E_sys(tsd)  # system (incl. losses)
     tsd = electrical_loads.calc_Ef(bpr, tsd)  # final (incl. self. generated)
-
-    # WRITE SOLAR RESULTS
-    write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug)
-
-    return
+    return tsd
 
 
 def calc_QH_sys_QC_sys(tsd):
@@ -167,11 +204,11 @@ def calc_QH_sys_QC_sys(tsd):
 
 
 def write_results(bpr, building_name, date, loads_output, locator, massflows_output,
-                  resolution_outputs, temperatures_output, tsd, debug):
+                  resolution_outputs, temperatures_output, tsd, debug, output_format='csv'):
     if resolution_outputs == 'hourly':
-        writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output)
+        writer = demand_writers.HourlyDemandWriter(loads_output, massflows_output, temperatures_output, output_format)
     elif resolution_outputs == 'monthly':
-        writer = demand_writers.MonthlyDemandWriter(loads_output, massflows_output, temperatures_output)
+        writer = demand_writers.MonthlyDemandWriter(loads_output, massflows_output, temperatures_output, output_format)
     else:
         raise Exception('error')
 
@@ -181,8 +218,9 @@ def write_results(bpr, building_name, date, loads_output, locator, massflows_out
         print('Writing detailed demand results of {} to .xls file.'.format(building_name))
         reporting.quick_visualization_tsd(tsd, locator.get_demand_results_folder(), building_name)
         reporting.full_report_to_xls(tsd, locator.get_demand_results_folder(), building_name)
+        return writer.calc_yearly_totals(bpr, building_name, tsd)
     else:
-        writer.results_to_csv(tsd, bpr, locator, date, building_name)
+        return writer.results_to_csv(tsd, bpr, locator, date, building_name)
 
 
 def calc_Qcs_sys(bpr, tsd):
@@ -0,0 +1,603 @@
+# -*- coding: utf-8 -*-
+"""
+Batched demand engine: the hourly space conditioning loop of :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs` for a
+chunk of buildings at once.
+
+Instead of stepping through ``get_hours(bpr)`` one building at a time, all buildings of a chunk are advanced together
+hour by hour. The state of the chunk is held in ``(n_buildings x HOURS_IN_YEAR)`` arrays and the SIA 2044 RC-model
+equations (:py:mod:`cea.demand.rc_model_SIA`) are solved for the whole chunk in each step.
+
+The batched engine reproduces the per-building procedure of
+:py:func:`cea.demand.hourly_procedure_heating_cooling_system_load.calc_heating_cooling_loads` for buildings with
+sensible (radiative) emission systems, i.e. radiators, floor heating, ceiling and floor cooling or no system at all.
+Buildings with air-based systems (central AC, mini-split, 3for2) and runs with the dynamic infiltration calculation are
+simulated with the per-building procedure as part of the same chunk.
+"""
+
+import warnings
+
+import numpy as np
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import constants, control_heating_cooling_systems, latent_loads, rc_model_SIA, sensible_loads
+from cea.demand import thermal_loads, ventilation_air_flows_simple
+from cea.demand.space_emission_systems import calc_delta_theta_int_inc_cooling, calc_delta_theta_int_inc_heating, \
+    get_delta_theta_e_sol
+
+__author__ = "Jimeno A. Fonseca"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Jimeno A. Fonseca", "Daren Thomas", "Gabriel Happle"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# heating and cooling systems handled by the batched engine (the rest falls back to the per-building procedure)
+BATCHED_HEATING_SYSTEMS = ['NONE', 'RADIATOR', 'FLOOR_HEATING']
+BATCHED_COOLING_SYSTEMS = ['NONE', 'CEILING_COOLING', 'FLOOR_COOLING']
+
+# time step data read and written by the hourly loop, stacked to (n_buildings x HOURS_IN_YEAR) arrays
+BATCHED_TSD_KEYS = ['T_int', 'theta_m', 'theta_c', 'theta_o', 'theta_ve_mech', 'x_int', 'x_ve_inf', 'x_ve_mech',
+                    'g_hu_ld', 'g_dhu_ld', 'I_sol', 'I_rad', 'I_sol_and_I_rad', 'm_ve_mech', 'm_ve_window',
+                    'Qhs_sen_rc', 'Qhs_sen_shu', 'Qhs_sen_ahu', 'Qhs_sen_aru', 'Qhs_lat_ahu', 'Qhs_lat_aru',
+                    'Qhs_sen_sys', 'Qhs_lat_sys', 'Qhs_em_ls', 'Ehs_lat_aux',
+                    'Qcs_sen_rc', 'Qcs_sen_scu', 'Qcs_sen_ahu', 'Qcs_sen_aru', 'Qcs_lat_ahu', 'Qcs_lat_aru',
+                    'Qcs_sen_sys', 'Qcs_lat_sys', 'Qcs_em_ls',
+                    'ma_sup_hs_ahu', 'ta_sup_hs_ahu', 'ta_re_hs_ahu', 'ma_sup_hs_aru', 'ta_sup_hs_aru', 'ta_re_hs_aru',
+                    'ma_sup_cs_ahu', 'ta_sup_cs_ahu', 'ta_re_cs_ahu', 'ma_sup_cs_aru', 'ta_sup_cs_aru', 'ta_re_cs_aru',
+                    'Q_gain_sen_light', 'Q_gain_sen_app', 'Q_gain_sen_pro', 'Q_gain_sen_data', 'Q_gain_sen_peop',
+                    'Q_gain_sen_wall', 'Q_gain_sen_base', 'Q_gain_sen_roof', 'Q_gain_sen_wind', 'Q_gain_sen_vent']
+BATCHED_TSD_INPUT_KEYS = ['ta_hs_set', 'ta_cs_set', 'm_ve_required', 'm_ve_inf', 'El', 'Ea', 'Epro', 'Qs', 'w_int',
+                          'Qcdata_sys', 'Qcre_sys']
+BATCHED_TSD_STATUS_KEYS = ['sys_status_ahu', 'sys_status_aru', 'sys_status_sen']
+
+# element-wise, so that results are identical to the per-building procedure (numpy's vectorized ``power`` may differ
+# from the scalar one in the last digit, which is enough to flip the control decisions of the hourly loop)
+_calc_hr = np.vectorize(sensible_loads.calc_hr, otypes=[float])
+
+# the tolerance of the RC-model set point check (see ``rc_model_SIA.has_sensible_heating_demand``)
+TEMP_TOLERANCE = 0.001
+
+
+def calc_thermal_loads_batched(building_names, bprs, weather_data, date_range, locator,
+                               use_dynamic_infiltration_calculation, resolution_outputs, loads_output,
+                               massflows_output, temperatures_output, config, debug):
+    """
+    Calculate thermal loads of a chunk of buildings - this is the batched counterpart of
+    :py:func:`cea.demand.thermal_loads.calc_thermal_loads` and has the same side effects for each building in the
+    chunk.
+
+    :param building_names: names of the buildings in the chunk
+    :type building_names: list[str]
+    :param bprs: building properties of the buildings in the chunk (same order as ``building_names``)
+    :type bprs: list[BuildingPropertiesRow]
+
+    The rest of the parameters are the same as for :py:func:`cea.demand.thermal_loads.calc_thermal_loads`.
+
+    :returns: the totals for the year of each building in the chunk (see ``DemandWriter.calc_yearly_totals``)
+    :rtype: list[dict]
+    """
+    tsds = []
+    schedules = []
+    for building_name, bpr in zip(building_names, bprs):
+        building_schedules, tsd = thermal_loads.initialize_inputs(bpr, weather_data, locator)
+        tsd = thermal_loads.calc_loads_before_space_conditioning(bpr, tsd, building_schedules, date_range,
+                                                                 building_name, config, locator)
+        schedules.append(building_schedules)
+        tsds.append(tsd)
+
+    batch = []
+    for bpr, tsd in zip(bprs, tsds):
+        if not thermal_loads.has_conditioned_area(bpr):
+            continue
+        if can_be_batched(bpr, use_dynamic_infiltration_calculation):
+            batch.append((bpr, tsd))
+        else:
+            thermal_loads.calc_Qhs_Qcs(bpr, tsd, use_dynamic_infiltration_calculation)
+
+    if batch:
+        calc_Qhs_Qcs_batched([bpr for bpr, _ in batch], [tsd for _, tsd in batch])
+
+    yearly_totals = []
+    for building_name, bpr, tsd, building_schedules in zip(building_names, bprs, tsds, schedules):
+        tsd = thermal_loads.calc_loads_after_space_conditioning(bpr, tsd, building_schedules)
+        yearly_totals.append(
+            thermal_loads.write_results(bpr, building_name, date_range, loads_output, locator, massflows_output,
+                                        resolution_outputs, temperatures_output, tsd, debug,
+                                        config.demand.output_format))
+    return yearly_totals
+
+
+def can_be_batched(bpr, use_dynamic_infiltration_calculation):
+    """
+    :param bpr: a collection of building properties for the building used for thermal loads calculation
+    :type bpr: BuildingPropertiesRow
+    :param bool use_dynamic_infiltration_calculation: the dynamic infiltration calculation is only available per building
+    :return: True, if the hourly loop of this building can be calculated by :py:func:`calc_Qhs_Qcs_batched`
+    :rtype: bool
+    """
+    return (not use_dynamic_infiltration_calculation
+            and bpr.hvac['class_hs'] in BATCHED_HEATING_SYSTEMS
+            and bpr.hvac['class_cs'] in BATCHED_COOLING_SYSTEMS)
+
+
+def calc_Qhs_Qcs_batched(bprs, tsds):
+    """
+    Batched version of :py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs` (without dynamic infiltration). Each ``tsd``
+    in ``tsds`` is updated in place with the same values the per-building procedure would produce.
+
+    :param bprs: building properties of buildings that pass :py:func:`can_be_batched`
+    :type bprs: list[BuildingPropertiesRow]
+    :param tsds: time step data of the buildings (same order as ``bprs``)
+    :type tsds: list[dict]
+    :return: the updated list of time step data
+    :rtype: list[dict]
+    """
+    for bpr, tsd in zip(bprs, tsds):
+        ventilation_air_flows_simple.calc_m_ve_required(tsd)
+        ventilation_air_flows_simple.calc_m_ve_leakage_simple(bpr, tsd)
+
+    props = BatchedBuildingProperties(bprs, tsds)
+    data = {key: np.vstack([np.asarray(tsd[key], dtype=float) for tsd in tsds])
+            for key in BATCHED_TSD_KEYS + BATCHED_TSD_INPUT_KEYS}
+    status = {key: np.vstack([np.asarray(tsd[key]) for tsd in tsds]) for key in BATCHED_TSD_STATUS_KEYS}
+
+    # weather data is the same for all buildings in the chunk
+    weather = {'T_ext': np.asarray(tsds[0]['T_ext'], dtype=float),
+               'T_sky': np.asarray(tsds[0]['T_sky'], dtype=float),
+               'rh_ext': np.asarray(tsds[0]['rh_ext'], dtype=float)}
+    weather['x_ext'] = np.vectorize(latent_loads.convert_rh_to_moisture_content)(weather['rh_ext'], weather['T_ext'])
+    data['T_ext'] = weather['T_ext']
+
+    # `detailed_thermal_balance_to_tsd` overwrites the whole entry with a scalar (the value of the last time step)
+    q_loss_sen_ref = np.full(len(bprs), np.nan)
+    has_thermal_balance = np.zeros(len(bprs), dtype=bool)
+
+    hours = np.array([list(thermal_loads.get_hours(bpr)) for bpr in bprs])
+    for t in hours.T:
+        idx = _calc_timestep(t, props, data, status, weather)
+        q_loss_sen_ref[idx] = -data['Qcre_sys'][idx, t[idx]]
+        has_thermal_balance[idx] = True
+
+    for i, tsd in enumerate(tsds):
+        for key in BATCHED_TSD_KEYS:
+            tsd[key] = data[key][i]
+        for key in BATCHED_TSD_STATUS_KEYS:
+            tsd[key][:] = status[key][i]
+        if has_thermal_balance[i]:
+            tsd['Q_loss_sen_ref'] = q_loss_sen_ref[i]
+    return tsds
+
+
+class BatchedBuildingProperties(object):
+    """The properties of a chunk of buildings needed in the hourly loop, as arrays of length ``n_buildings``"""
+
+    def __init__(self, bprs, tsds):
+        def rc_model(key):
+            return np.array([bpr.rc_model[key] for bpr in bprs], dtype=float)
+
+        def hvac(key):
+            return np.array([bpr.hvac[key] for bpr in bprs])
+
+        def architecture(attribute):
+            return np.array([getattr(bpr.architecture, attribute) for bpr in bprs], dtype=float)
+
+        self.names = [bpr.name for bpr in bprs]
+        self.solar = np.vstack([np.asarray(bpr.solar.I_sol, dtype=float) for bpr in bprs])
+
+        # rc-model
+        self.Af = rc_model('Af')
+        self.Aef = rc_model('Aef')
+        self.Atot = rc_model('Atot')
+        self.Am = rc_model('Am')
+        self.Awin_ag = rc_model('Awin_ag')
+        self.Awall_ag = rc_model('Awall_ag')
+        self.Aroof = rc_model('Aroof')
+        self.Aop_bg = rc_model('Aop_bg')
+        self.Htr_op = rc_model('Htr_op')
+        self.Htr_w = rc_model('Htr_w')
+        self.Cm = rc_model('Cm')
+        self.U_win = rc_model('U_win')
+        self.U_wall = rc_model('U_wall')
+        self.U_roof = rc_model('U_roof')
+        self.U_base = rc_model('U_base')
+
+        # envelope
+        self.e_win = architecture('e_win')
+        self.e_roof = architecture('e_roof')
+        self.e_wall = architecture('e_wall')
+        self.Hs_ag = architecture('Hs_ag')
+
+        # ventilation
+        self.mech_vent = hvac('MECH_VENT').astype(bool)
+        self.win_vent = hvac('WIN_VENT').astype(bool)
+        self.heat_rec = hvac('HEAT_REC').astype(bool)
+        self.night_flushing = hvac('NIGHT_FLSH').astype(bool)
+        self.economizer = hvac('ECONOMIZER').astype(bool)
+        self.m_ve_required_max = np.array([tsd['m_ve_required'].max() for tsd in tsds], dtype=float)
+        self.RH_max_pc = np.array([bpr.comfort['RH_max_pc'] for bpr in bprs], dtype=float)
+        self.Tcs_set_C = np.array([bpr.comfort['Tcs_set_C'] for bpr in bprs], dtype=float)
+
+        # heating and cooling systems
+        self.has_heating_system = np.array([control_heating_cooling_systems.has_heating_system(bpr.hvac['class_hs'])
+                                            for bpr in bprs])
+        self.has_cooling_system = np.array([control_heating_cooling_systems.has_cooling_system(bpr.hvac['class_cs'])
+                                            for bpr in bprs])
+        self.heating_season = np.vstack([calc_season_mask(bpr.hvac['has-heating-season'], bpr.hvac['heat_starts'],
+                                                          bpr.hvac['heat_ends']) for bpr in bprs])
+        self.cooling_season = np.vstack([calc_season_mask(bpr.hvac['has-cooling-season'], bpr.hvac['cool_starts'],
+                                                          bpr.hvac['cool_ends']) for bpr in bprs])
+        self.convection_hs = hvac('convection_hs').astype(float)
+        self.convection_cs = hvac('convection_cs').astype(float)
+        self.Qhs_max = hvac('Qhsmax_Wm2').astype(float) * self.Af
+        self.Qcs_max = -hvac('Qcsmax_Wm2').astype(float) * self.Af
+        self.Tc_sup_air_max = np.array([np.max([bpr.hvac['Tc_sup_air_ahu_C'], bpr.hvac['Tc_sup_air_aru_C']])
+                                        for bpr in bprs], dtype=float)
+
+        # emission systems
+        self.delta_theta_int_inc_heating = np.array([calc_delta_theta_int_inc_heating(bpr) for bpr in bprs],
+                                                    dtype=float)
+        self.delta_theta_int_inc_cooling = np.array([calc_delta_theta_int_inc_cooling(bpr) for bpr in bprs],
+                                                    dtype=float)
+        self.delta_theta_e_sol = np.array([get_delta_theta_e_sol(bpr) for bpr in bprs], dtype=float)
+
+
+def calc_season_mask(has_season, season_starts, season_ends):
+    """
+    Vectorized version of :py:func:`cea.demand.control_heating_cooling_systems.is_heating_season` (and
+    ``is_cooling_season``) for all hours of the year.
+
+    :param bool has_season: ``bpr.hvac['has-heating-season']`` or ``bpr.hvac['has-cooling-season']``
+    :param str season_starts: start of the season in 'DD|MM' format
+    :param str season_ends: end of the season in 'DD|MM' format
+    :return: boolean array of length HOURS_IN_YEAR, True for each hour in the season
+    :rtype: np.ndarray
+    """
+    hours = np.arange(HOURS_IN_YEAR)
+    if not has_season:
+        return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
+    start = control_heating_cooling_systems.convert_date_to_hour(season_starts)
+    end = control_heating_cooling_systems.convert_date_to_hour(season_ends) + 23  # end at the last hour of the day
+    if start < end:
+        return (start <= hours) & (hours <= end)
+    elif start > end:
+        return (start <= hours) | (hours <= end)
+    return np.zeros(HOURS_IN_YEAR, dtype=bool)
+
+
+def _calc_timestep(t, props, data, status, weather):
+    """
+    Advance all buildings of the chunk by one step of the hourly loop. ``t`` is the hour of the year for each building
+    (buildings start simulating at different hours, see :py:func:`cea.demand.thermal_loads.get_hours`)
+
+    :return: the rows for which the detailed thermal balance was calculated
+    """
+    rows = np.arange(len(t))
+    t_prev = t - 1  # same as the per-building loop: t=0 refers to the last hour of the year
+
+    t_ext = weather['T_ext'][t]
+    t_ext_prev = weather['T_ext'][t_prev]
+    t_int_prev = data['T_int'][rows, t_prev]
+
+    # heat flows in [W] (see `sensible_loads.calc_Qgain_sen`)
+    theta_c_prev = data['theta_c'][rows, t_prev]
+    temp_s_prev = np.where(np.isnan(theta_c_prev), t_ext_prev, theta_c_prev)
+    theta_ss = 0.5 * (weather['T_sky'][t] + temp_s_prev)
+    delta_theta_er = t_ext - weather['T_sky'][t]
+    i_rad_win = sensible_loads.RSE * props.U_win * _calc_hr(props.e_win, theta_ss) * props.Awin_ag \
+        * delta_theta_er
+    i_rad_roof = sensible_loads.RSE * props.U_roof * _calc_hr(props.e_roof, theta_ss) * props.Aroof \
+        * delta_theta_er
+    i_rad_wall = sensible_loads.RSE * props.U_wall * _calc_hr(props.e_wall, theta_ss) * props.Awall_ag \
+        * delta_theta_er
+    i_rad = 0.5 * i_rad_wall + 0.5 * i_rad_win + 1 * i_rad_roof
+    i_sol_gross = props.solar[rows, t]
+    data['I_sol_and_I_rad'][rows, t] = i_sol_gross - i_rad
+    data['I_rad'][rows, t] = i_rad
+    data['I_sol'][rows, t] = i_sol_gross
+
+    # ventilation air flows [kg/s] (see `ventilation_air_flows_simple` and `control_ventilation_systems`)
+    heating_season = props.heating_season[rows, t]
+    cooling_season = props.cooling_season[rows, t]
+    m_ve_required = data['m_ve_required'][rows, t]
+    m_ve_inf = data['m_ve_inf'][rows, t]
+    hour_of_day = t % 24
+    is_night_time = ~((7 < hour_of_day) & (hour_of_day < 21))
+    night_flushing = (props.night_flushing & is_night_time
+                      & (t_int_prev > constants.TEMPERATURE_ZONE_CONTROL_NIGHT_FLUSHING)
+                      & (t_int_prev > t_ext + constants.DELTA_T_NIGHT_FLUSHING)
+                      & (weather['rh_ext'][t] < props.RH_max_pc))
+    mech_vent_active = props.mech_vent & ((m_ve_required > 0) | night_flushing)
+    economizer = props.economizer & (t_int_prev > props.Tcs_set_C) & (props.Tcs_set_C >= t_ext)
+    m_ve_demand = np.maximum(m_ve_required - m_ve_inf, 0.0)
+
+    data['m_ve_mech'][rows, t] = np.select(
+        [mech_vent_active & ~night_flushing & ~economizer, props.mech_vent & night_flushing,
+         props.mech_vent & economizer, ~mech_vent_active],
+        [m_ve_demand, props.m_ve_required_max, props.m_ve_required_max, 0.0], np.nan)
+
+    win_vent_active = props.win_vent & ~mech_vent_active
+    data['m_ve_window'][rows, t] = np.select(
+        [win_vent_active & ~night_flushing, win_vent_active & night_flushing],
+        [m_ve_demand, props.m_ve_required_max], 0.0)
+
+    # ventilation air temperature and humidity
+    heat_recovery_heating = mech_vent_active & props.heat_rec & heating_season
+    heat_recovery = ((heat_recovery_heating & ~(night_flushing | economizer))
+                     | (~heat_recovery_heating & mech_vent_active & props.heat_rec & cooling_season
+                        & (t_int_prev < t_ext)))
+    data['theta_ve_mech'][rows, t] = np.where(heat_recovery,
+                                              t_ext + ventilation_air_flows_simple.ETA_REC * (t_int_prev - t_ext),
+                                              t_ext)
+    data['x_ve_inf'][rows, t] = weather['x_ext'][t]
+    data['x_ve_mech'][rows, t] = weather['x_ext'][t]
+
+    # heating / cooling demand of building (see `calc_heating_cooling_loads`)
+    heating_case = heating_season & ~cooling_season
+    cooling_case = cooling_season & ~heating_season
+    other_case = ~(heating_case | cooling_case)
+    ta_hs_set = data['ta_hs_set'][rows, t]
+    ta_cs_set = data['ta_cs_set'][rows, t]
+    heating_on = heating_case & props.has_heating_system & ~np.isnan(ta_hs_set)
+    cooling_on = (cooling_case & props.has_cooling_system & ~np.isnan(ta_cs_set)
+                  & ~(t_int_prev <= props.Tc_sup_air_max))
+    no_loads = ~(heating_on | cooling_on)
+
+    for hour in t[other_case]:
+        warnings.warn('Timestep %s not in heating season nor cooling season' % hour)
+
+    # STEP 1: RC-model temperatures with zero heating / cooling power - this is needed for every building
+    zeros = np.zeros(len(t))
+    rc_temperatures = _calc_rc_model_temperatures(props, data, rows, t, zeros, zeros)
+    t_int_0 = rc_temperatures['T_int']
+
+    # STEP 2-4: heating / cooling power needed to reach the set point
+    q_sen_rc = np.zeros(len(t))
+    heating_demand = np.flatnonzero(heating_on & (t_int_0 < ta_hs_set - TEMP_TOLERANCE))
+    if len(heating_demand):
+        q_sen_rc[heating_demand] = _calc_rc_demand(props, data, heating_demand, t, t_int_0, ta_hs_set,
+                                                   props.convection_hs, props.Qhs_max, rc_temperatures, heating=True)
+    cooling_demand = np.flatnonzero(cooling_on & (t_int_0 > ta_cs_set + TEMP_TOLERANCE))
+    if len(cooling_demand):
+        q_sen_rc[cooling_demand] = _calc_rc_demand(props, data, cooling_demand, t, t_int_0, ta_cs_set,
+                                                   props.convection_cs, props.Qcs_max, rc_temperatures, heating=False)
+
+    # a radiative system (or no system) does not act on humidity
+    data['g_hu_ld'][rows, t] = 0.0
+    data['g_dhu_ld'][rows, t] = 0.0
+    _calc_moisture_content_in_zone_local(props, data, rows, t)
+
+    # write temperatures to rc-model
+    data['T_int'][rows, t] = rc_temperatures['T_int']
+    data['theta_m'][rows, t] = rc_temperatures['theta_m']
+    data['theta_c'][rows, t] = rc_temperatures['theta_c']
+    data['theta_o'][rows, t] = rc_temperatures['theta_o']
+
+    # no loads (see `calc_rc_no_loads`)
+    idx = np.flatnonzero(no_loads)
+    _update_no_cooling(data, idx, t[idx])
+    _update_no_heating(data, idx, t[idx])
+    for key in BATCHED_TSD_STATUS_KEYS:
+        status[key][idx, t[idx]] = 'system off'
+
+    # radiator / floor heating (see `calc_heat_loads_radiator`)
+    idx = np.flatnonzero(heating_on)
+    if len(idx):
+        ti = t[idx]
+        q = q_sen_rc[idx]
+        data['Qhs_sen_rc'][idx, ti] = q
+        data['Qhs_sen_shu'][idx, ti] = q
+        data['Qhs_sen_ahu'][idx, ti] = 0.0
+        data['Qhs_sen_aru'][idx, ti] = 0.0
+        data['Qhs_sen_sys'][idx, ti] = q
+        data['Qhs_lat_sys'][idx, ti] = 0.0
+        data['ma_sup_hs_ahu'][idx, ti] = 0.0
+        data['ta_sup_hs_ahu'][idx, ti] = np.nan
+        data['ta_re_hs_ahu'][idx, ti] = np.nan
+        data['ma_sup_hs_aru'][idx, ti] = 0.0
+        data['ta_sup_hs_aru'][idx, ti] = np.nan
+        data['ta_re_hs_aru'][idx, ti] = np.nan
+        data['Qhs_em_ls'][idx, ti] = _calc_q_em_ls(
+            q, props.delta_theta_int_inc_heating[idx], data['T_int'][idx, ti] + props.delta_theta_int_inc_heating[idx],
+            t_ext[idx], props.Qhs_max[idx])
+        data['Ehs_lat_aux'][idx, ti] = 0.0
+        status['sys_status_ahu'][idx, ti] = 'no system'
+        status['sys_status_aru'][idx, ti] = 'no system'
+        status['sys_status_sen'][idx, ti] = np.where(q > 0.0, 'On', 'Off')
+
+    # ceiling / floor cooling (see `calc_cool_loads_radiator`)
+    idx = np.flatnonzero(cooling_on)
+    if len(idx):
+        ti = t[idx]
+        q = q_sen_rc[idx]
+        data['Qcs_sen_rc'][idx, ti] = q
+        data['Qcs_sen_scu'][idx, ti] = q
+        data['Qcs_sen_ahu'][idx, ti] = 0.0
+        data['Qcs_sen_aru'][idx, ti] = 0.0
+        data['Qcs_sen_sys'][idx, ti] = q
+        data['Qcs_lat_ahu'][idx, ti] = 0.0
+        data['Qcs_lat_aru'][idx, ti] = 0.0
+        data['Qcs_lat_sys'][idx, ti] = 0.0
+        data['ma_sup_cs_ahu'][idx, ti] = 0.0
+        data['ta_sup_cs_ahu'][idx, ti] = np.nan
+        data['ta_re_cs_ahu'][idx, ti] = np.nan
+        data['ma_sup_cs_aru'][idx, ti] = 0.0
+        data['ta_sup_cs_aru'][idx, ti] = np.nan
+        data['ta_re_cs_aru'][idx, ti] = np.nan
+        data['Qcs_em_ls'][idx, ti] = _calc_q_em_ls(
+            q, props.delta_theta_int_inc_cooling[idx], data['T_int'][idx, ti] + props.delta_theta_int_inc_cooling[idx],
+            t_ext[idx] + props.delta_theta_e_sol[idx], props.Qcs_max[idx])
+        status['sys_status_ahu'][idx, ti] = 'no system'
+        status['sys_status_aru'][idx, ti] = 'no system'
+        status['sys_status_sen'][idx, ti] = np.where(q < 0.0, 'On', 'Off')
+
+    # update tsd for the season that is not active
+    idx = np.flatnonzero(heating_case)
+    _update_no_cooling(data, idx, t[idx])
+    idx = np.flatnonzero(cooling_case)
+    _update_no_heating(data, idx, t[idx])
+
+    # for dashboard
+    idx = np.flatnonzero(heating_case | cooling_case)
+    if len(idx):
+        _detailed_thermal_balance(props, data, idx, t[idx], rc_temperatures)
+    return idx
+
+
+def _calc_rc_model_temperatures(props, data, idx, t, phi_hc_cv, phi_hc_r):
+    """Vectorized version of :py:func:`cea.demand.rc_model_SIA.calc_rc_model_temperatures` for the rows ``idx``"""
+    t_prev = t - 1
+    theta_m_t_1 = data['theta_m'][idx, t_prev]
+    theta_m_t_1 = np.where(np.isnan(theta_m_t_1), data['T_ext'][t_prev], theta_m_t_1)
+
+    share_af = np.minimum(props.Af[idx] / props.Aef[idx], 1.0)  # account for a proportion of internal gains
+    El = data['El'][idx, t] * share_af
+    Ea = data['Ea'][idx, t] * share_af
+    Epro = data['Epro'][idx, t]
+    # account for a proportion of solar gains. This is very simplified for now.
+    I_sol = data['I_sol_and_I_rad'][idx, t] * np.sqrt(props.Hs_ag[idx])
+    T_ext = data['T_ext'][t]
+    c_m = props.Cm[idx] / 3600  # (Wh/K) SIA 2044 unit is Wh/K, ISO unit is J/K
+
+    T_int, theta_c, theta_m, theta_o, theta_ea, theta_ec, theta_em, h_ea, h_ec, h_em, h_op_m \
+        = rc_model_SIA._calc_rc_model_temperatures(Ea, El, Epro, props.Htr_op[idx], props.Htr_w[idx], I_sol,
+                                                   data['Qs'][idx, t], T_ext, props.Am[idx], props.Atot[idx],
+                                                   props.Awin_ag[idx], c_m, data['m_ve_inf'][idx, t],
+                                                   data['m_ve_mech'][idx, t], data['m_ve_window'][idx, t],
+                                                   phi_hc_cv, phi_hc_r, theta_m_t_1, data['theta_ve_mech'][idx, t])
+
+    out_of_bounds = ((rc_model_SIA.T_WARNING_LOW > T_int) | (rc_model_SIA.T_WARNING_LOW > theta_c)
+                     | (rc_model_SIA.T_WARNING_LOW > theta_m) | (T_int > rc_model_SIA.T_WARNING_HIGH)
+                     | (theta_c > rc_model_SIA.T_WARNING_HIGH) | (theta_m > rc_model_SIA.T_WARNING_HIGH))
+    if out_of_bounds.any():
+        i = np.flatnonzero(out_of_bounds)[0]
+        raise Exception("Temperature in RC-Model of building {} out of bounds! First occured at timestep = {}."
+                        " The results were Tint = {}, theta_c = {}, theta_m = {},"
+                        " Check building geometry and internal loads! Building might be too small in size or"
+                        " architecture parameter Hs_ag = {} might be too small for this geometry. Current bounds of"
+                        " range for RC-model temperatures are between {} and {}.".format(
+                            props.names[idx[i]], t[i], T_int[i], theta_c[i], theta_m[i], props.Hs_ag[idx[i]],
+                            rc_model_SIA.T_WARNING_LOW, rc_model_SIA.T_WARNING_HIGH))
+
+    return {'theta_m': theta_m, 'theta_c': theta_c, 'T_int': T_int, 'theta_o': theta_o, 'theta_ea': theta_ea,
+            'theta_ec': theta_ec, 'theta_em': theta_em, 'h_ea': h_ea, 'h_ec': h_ec, 'h_em': h_em, 'h_op_m': h_op_m}
+
+
+def _calc_rc_demand(props, data, idx, t, t_int_0, t_int_set, f_hc_cv, phi_max, rc_temperatures, heating):
+    """
+    Vectorized version of STEP 2-4 in :py:func:`calc_rc_heating_demand` and :py:func:`calc_rc_cooling_demand` for the
+    rows ``idx`` that have a sensible demand. ``rc_temperatures`` is updated in place for these rows.
+
+    :return: the heating (positive) or cooling (negative) power of the rows ``idx``
+    """
+    ti = t[idx]
+    f_hc_cv = f_hc_cv[idx]
+    t_int_0 = t_int_0[idx]
+    t_int_set = t_int_set[idx]
+    phi_max = phi_max[idx]
+
+    # STEP 2: calculate temperatures with 10 W/m2 heating / cooling power
+    phi_hc_10 = 10.0 * props.Af[idx]
+    rc_temperatures_10 = _calc_rc_model_temperatures(props, data, idx, ti, rc_model_SIA.calc_phi_hc_cv(phi_hc_10, f_hc_cv),
+                                                     rc_model_SIA.calc_phi_hc_r(phi_hc_10, f_hc_cv))
+    t_int_10 = rc_temperatures_10['T_int']
+
+    # interpolate heating power
+    # (64) in SIA 2044 / Korrigenda C1 zum Merkblatt SIA 2044:2011 / Korrigenda C2 zum Mekblatt SIA 2044:2011
+    phi_hc_ul = phi_hc_10 * (t_int_set - t_int_0) / (t_int_10 - t_int_0)
+
+    # STEP 3: check if available power is sufficient
+    if heating:
+        if not (phi_hc_ul > 0.0).all():
+            raise Exception("Unexpected status in 'calc_rc_heating_demand'")
+        phi_hc_act = np.where(phi_hc_ul <= phi_max, phi_hc_ul, phi_max)
+    else:
+        if not (phi_hc_ul < 0.0).all():
+            raise Exception("Unexpected status in 'calc_rc_cooling_demand'")
+        phi_hc_act = np.where(phi_hc_ul >= phi_max, phi_hc_ul, phi_max)
+
+    # STEP 4
+    rc_temperatures_act = _calc_rc_model_temperatures(props, data, idx, ti,
+                                                      rc_model_SIA.calc_phi_hc_cv(phi_hc_act, f_hc_cv),
+                                                      rc_model_SIA.calc_phi_hc_r(phi_hc_act, f_hc_cv))
+    for key, value in rc_temperatures_act.items():
+        rc_temperatures[key][idx] = value
+    return phi_hc_act
+
+
+def _calc_moisture_content_in_zone_local(props, data, idx, t):
+    """Vectorized version of :py:func:`cea.demand.latent_loads.calc_moisture_content_in_zone_local`"""
+    vol_int_a_ztc = props.Af[idx] * latent_loads.FLOOR_HEIGHT
+    m_ve_mech = data['m_ve_mech'][idx, t]
+    m_ve_inf = data['m_ve_inf'][idx, t] + data['m_ve_window'][idx, t]
+    air_capacity = (latent_loads.RHO_A * vol_int_a_ztc) / latent_loads.DELTA_T
+
+    x_int_a_t = (m_ve_mech * data['x_ve_mech'][idx, t] + m_ve_inf * data['x_ve_inf'][idx, t] +
+                 data['g_hu_ld'][idx, t] + data['g_dhu_ld'][idx, t] + data['w_int'][idx, t] +
+                 air_capacity * data['x_int'][idx, t - 1]) / ((m_ve_mech + m_ve_inf) + air_capacity)
+
+    if (x_int_a_t < 0).any():
+        raise Exception("Bug in moisture balance in zone. Negative moisture content detected.")
+
+    data['x_int'][idx, t] = x_int_a_t
+
+
+def _calc_q_em_ls(q_em_out, delta_theta_int_inc, theta_int_inc, theta_e_comb, q_em_max):
+    """Vectorized version of :py:func:`cea.demand.space_emission_systems.calc_q_em_ls`"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q_em_ls = q_em_out * (delta_theta_int_inc / (theta_int_inc - theta_e_comb))
+
+    # cap emission losses at absolute capacity
+    q_em_ls = np.where(np.abs(q_em_ls + q_em_out) > np.abs(q_em_max), q_em_max - q_em_out, q_em_ls)
+    # prevent form negative emission losses
+    q_em_ls = np.where(np.sign(q_em_ls) == np.sign(q_em_out), q_em_ls, 0.0)
+    # prevent division by zero
+    return np.where(np.abs(theta_int_inc - theta_e_comb) < 1e-6, 0.0, q_em_ls)
+
+
+def _update_no_heating(data, idx, t):
+    """Vectorized version of :py:func:`update_tsd_no_heating`"""
+    for key in ['Qhs_sen_rc', 'Qhs_sen_shu', 'Qhs_sen_aru', 'Qhs_sen_ahu', 'Qhs_lat_aru', 'Qhs_lat_ahu', 'Qhs_sen_sys',
+                'Qhs_lat_sys', 'Qhs_em_ls', 'Ehs_lat_aux', 'ma_sup_hs_ahu', 'ma_sup_hs_aru']:
+        data[key][idx, t] = 0.0
+    for key in ['ta_sup_hs_ahu', 'ta_re_hs_ahu', 'ta_sup_hs_aru', 'ta_re_hs_aru']:
+        data[key][idx, t] = np.nan
+
+
+def _update_no_cooling(data, idx, t):
+    """Vectorized version of :py:func:`update_tsd_no_cooling`"""
+    for key in ['Qcs_sen_rc', 'Qcs_sen_scu', 'Qcs_sen_aru', 'Qcs_sen_ahu', 'Qcs_lat_aru', 'Qcs_lat_ahu', 'Qcs_sen_sys',
+                'Qcs_lat_sys', 'Qcs_em_ls', 'ma_sup_cs_ahu', 'ma_sup_cs_aru']:
+        data[key][idx, t] = 0.0
+    for key in ['ta_sup_cs_ahu', 'ta_re_cs_ahu', 'ta_sup_cs_aru', 'ta_re_cs_aru']:
+        data[key][idx, t] = np.nan
+
+
+def _detailed_thermal_balance(props, data, idx, t, rc_temperatures):
+    """Vectorized version of :py:func:`detailed_thermal_balance_to_tsd` for the rows ``idx``"""
+    data['Q_gain_sen_light'][idx, t] = rc_model_SIA.calc_phi_i_l(data['El'][idx, t])
+    data['Q_gain_sen_app'][idx, t] = (rc_model_SIA.calc_phi_i_a(data['Ea'][idx, t], data['Epro'][idx, t])
+                                      - 0.9 * data['Epro'][idx, t]) / 0.9
+    data['Q_gain_sen_pro'][idx, t] = data['Epro'][idx, t]
+    data['Q_gain_sen_data'][idx, t] = data['Qcdata_sys'][idx, t]
+    data['Q_gain_sen_peop'][idx, t] = rc_model_SIA.calc_phi_i_p(data['Qs'][idx, t])
+
+    h_em = rc_temperatures['h_em'][idx]
+    h_op_m = rc_temperatures['h_op_m'][idx]
+    theta_m = rc_temperatures['theta_m'][idx]
+    theta_em = rc_temperatures['theta_em'][idx]
+
+    # backwards calculate individual heat transfer coefficient
+    h_wall_em = h_em * props.Awall_ag[idx] * props.U_wall[idx] / h_op_m
+    h_base_em = h_em * props.Aop_bg[idx] * constants.B_F * props.U_base[idx] / h_op_m
+    h_roof_em = h_em * props.Aroof[idx] * props.U_roof[idx] / h_op_m
+
+    data['Q_gain_sen_wall'][idx, t] = h_wall_em * (theta_em - theta_m)
+    data['Q_gain_sen_base'][idx, t] = h_base_em * (theta_em - theta_m)
+    data['Q_gain_sen_roof'][idx, t] = h_roof_em * (theta_em - theta_m)
+    data['Q_gain_sen_wind'][idx, t] = rc_temperatures['h_ec'][idx] * (rc_temperatures['theta_ec'][idx]
+                                                                      - rc_temperatures['theta_c'][idx])
+    data['Q_gain_sen_vent'][idx, t] = rc_temperatures['h_ea'][idx] * (rc_temperatures['theta_ea'][idx]
+                                                                      - rc_temperatures['T_int'][idx])
@@ -270,6 +270,12 @@ class InputLocator(object):
         """
         return self._ensure_folder(self.get_optimization_results_folder(), "network")
 
+    def get_optimization_typical_days(self):
+        """scenario/outputs/data/optimization/network/typical_days.csv
+        The typical day calculated for each day of the year by the thermal networks and the cooling dispatch of the
+        optimization"""
+        return os.path.join(self.get_optimization_network_results_folder(), 'typical_days.csv')
+
     def get_optimization_network_layout_folder(self):
         """scenario/outputs/data/optimization/network/layout
         Network layout files
@@ -314,6 +320,11 @@ class InputLocator(object):
         return os.path.join(self.get_optimization_master_results_folder(),
                             'CheckPoint_' + str(generation)+".json")
 
+    def get_optimization_evaluation_cache(self):
+        """scenario/outputs/data/optimization/master/evaluation_cache.json
+        Objectives of the individuals evaluated by the optimization"""
+        return os.path.join(self.get_optimization_master_results_folder(), 'evaluation_cache.json')
+
     def get_optimization_substations_folder(self):
         """scenario/outputs/data/optimization/substations
         Substation results for decentralized buildings"""
@@ -737,6 +748,15 @@ class InputLocator(object):
         return os.path.join(folder, file_name)
 
 
+    def get_thermal_network_typical_days_file(self, network_type, network_name):
+        """scenario/outputs/data/thermal-network/DH__typical_days.csv
+        The typical day calculated for each day of the year by the thermal network"""
+        if not network_name:
+            file_name = network_type + "_" + "_typical_days.csv"
+        else:
+            file_name = network_type + "_" + network_name + "_typical_days.csv"
+        return os.path.join(self.get_thermal_network_folder(), file_name)
+
     def get_network_thermal_loss_edges_file(self, network_type, network_name, representative_week=False):
         """scenario/outputs/data/optimization/network/layout/DH_qloss_System_kw.csv"""
         if representative_week == True:
@@ -878,8 +898,12 @@ class InputLocator(object):
         return os.path.join(self.get_solar_radiation_folder(), '%s_radiation.csv' % building)
 
     def get_radiation_building_sensors(self, building):
-        """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.json"""
-        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.json' % building)
+        """scenario/outputs/data/solar-radiation/${building}_insolation_Whm2.npy"""
+        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_Whm2.npy' % building)
+
+    def get_radiation_building_sensors_index(self, building):
+        """scenario/outputs/data/solar-radiation/${building}_insolation_sensors.csv"""
+        return os.path.join(self.get_solar_radiation_folder(), '%s_insolation_sensors.csv' % building)
 
     def get_radiation_metadata(self, building):
         """scenario/outputs/data/solar-radiation/{building}_geometrgy.csv"""
@@ -1014,6 +1038,18 @@ class InputLocator(object):
         return os.path.join(self.get_plots_folder(category), '%(building)s.html' % locals())
 
     # OTHER
+    def get_cache_folder(self):
+        """scenario/outputs/data/.cache"""
+        return self._ensure_folder(self.scenario, 'outputs', 'data', '.cache')
+
+    def get_building_properties_cache_folder(self):
+        """scenario/outputs/data/.cache/building-properties"""
+        return self._ensure_folder(self.get_cache_folder(), 'building-properties')
+
+    def get_sun_position_cache_folder(self):
+        """scenario/outputs/data/.cache/sun-position"""
+        return self._ensure_folder(self.get_cache_folder(), 'sun-position')
+
     def get_temporary_folder(self):
         """Temporary folder as returned by `tempfile`."""
         return tempfile.gettempdir()
@@ -13,6 +13,7 @@ import importlib
 import datetime
 import cea.config
 import cea.scripts
+import cea.utilities.parallel
 import cea
 from typing import List
 
@@ -68,6 +69,7 @@ def main(config=None):
         sys.exit(cea.MissingInputDataException.rc)
 
     script_module = importlib.import_module(cea_script.module)
+    cea.utilities.parallel.set_worker_output(config.get('general:worker-output'))
     try:
         script_module.main(config)
         print("Execution time: %.2fs" % (datetime.datetime.now() - t0).total_seconds())
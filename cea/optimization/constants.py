@@ -51,6 +51,9 @@ DC_TECHNOLOGIES_SHARING_SPACE = []
 DH_ACRONYM = "DH"
 DC_ACRONYM = "DC"
 
+# Number of thermal network summaries (by barcode) kept in memory by each process (see slave_inputs.SlaveInputs)
+NETWORK_SUMMARIES_CACHE_SIZE = 32
+
 # Losses and margins
 DC_NETWORK_LOSS = 0.05  # Cooling ntw losses (10% --> 0.1)
 DH_NETWORK_LOSS = 0.12  # Heating ntw losses
@@ -7,6 +7,8 @@ Network optimization
 
 import pandas as pd
 
+from cea.schemas import read_dataframe
+
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Sreepathi Bhargava Krishna", "Tim Vollrath", "Thuy-An Nguyen", "Jimeno A. Fonseca"]
@@ -30,23 +32,24 @@ class NetworkOptimizationFeatures(object):
 
         for network_name in self.network_names:
             if district_heating_network:
-                self.E_pump_DHN_W = pd.read_csv(locator.get_network_energy_pumping_requirements_file("DH", network_name))[
-                    'pressure_loss_total_kW'].values * 1000
+                self.E_pump_DHN_W = read_dataframe(locator.get_network_energy_pumping_requirements_file.existing_path(
+                    "DH", network_name))['pressure_loss_total_kW'].values * 1000
                 self.mass_flow_rate_DHN = self.mass_flow_rate_plant(locator, network_name, "DH")
-                self.thermallosses_DHN = pd.read_csv(locator.get_network_total_thermal_loss_file("DH", network_name))[
-                    'thermal_loss_total_kW'].values
+                self.thermallosses_DHN = read_dataframe(locator.get_network_total_thermal_loss_file.existing_path(
+                    "DH", network_name))['thermal_loss_total_kW'].values
                 self.pipesCosts_DHN_USD = self.pipe_costs(locator, network_name, "DH")
 
             if district_cooling_network:
-                self.E_pump_DCN_W = pd.read_csv(locator.get_network_energy_pumping_requirements_file("DC", network_name))[
-                    'pressure_loss_total_kW'].values * 1000
+                self.E_pump_DCN_W = read_dataframe(locator.get_network_energy_pumping_requirements_file.existing_path(
+                    "DC", network_name))['pressure_loss_total_kW'].values * 1000
                 self.mass_flow_rate_DCN = self.mass_flow_rate_plant(locator, network_name, "DC")
-                self.thermallosses_DCN = pd.read_csv(locator.get_network_total_thermal_loss_file("DC", network_name))[
-                    'thermal_loss_total_kW'].values
+                self.thermallosses_DCN = read_dataframe(locator.get_network_total_thermal_loss_file.existing_path(
+                    "DC", network_name))['thermal_loss_total_kW'].values
                 self.pipesCosts_DCN_USD = self.pipe_costs(locator, network_name, "DC")
 
     def mass_flow_rate_plant(self, locator, network_name, network_type):
-        mass_flow_df = pd.read_csv((locator.get_thermal_network_layout_massflow_nodes_file(network_type, network_name)))
+        mass_flow_df = read_dataframe(
+            locator.get_thermal_network_layout_massflow_nodes_file.existing_path(network_type, network_name))
         mass_flow_nodes_df = pd.read_csv((locator.get_thermal_network_node_types_csv_file(network_type, network_name)))
         # identify the node with the plant
         node_id = mass_flow_nodes_df.loc[mass_flow_nodes_df['Type'] == "PLANT", 'Name'].item()
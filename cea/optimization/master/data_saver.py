@@ -3,8 +3,23 @@
 
 
 
+import collections
+import os
+
 import pandas as pd
 
+# the performance of an individual, by part: the locator methods of the file saved for the individual (see save_results)
+# and of the file of the generation (see GenerationPerformanceWriter)
+PERFORMANCE_FILES = collections.OrderedDict([
+    ('building_scale', ('get_optimization_slave_building_scale_performance',
+                        'get_optimization_generation_building_scale_performance')),
+    ('district_scale', ('get_optimization_slave_district_scale_performance',
+                        'get_optimization_generation_district_scale_performance')),
+    ('totals', ('get_optimization_slave_total_performance',
+                'get_optimization_generation_total_performance')),
+])
+
+
 def save_results(locator,
                  date_array,
                  individual_number,
@@ -57,22 +72,15 @@ def save_results(locator,
 
     # SAVE PERFORMANCE RELATED FILES
     # export all including performance heating and performance cooling since we changed them
-    performance_building_scale_dict = dict(buildings_building_scale_costs, **buildings_building_scale_emissions)
-    pd.DataFrame(performance_building_scale_dict, index=[0]).to_csv(
-        locator.get_optimization_slave_building_scale_performance(individual_number,
-                                                                generation_number),
-        index=False, float_format='%.3f')
-
-    performance_district_scale_dict = dict(buildings_district_scale_costs, **buildings_district_scale_emissions)
-    pd.DataFrame(performance_district_scale_dict, index=[0]).to_csv(
-        locator.get_optimization_slave_district_scale_performance(individual_number,
-                                                             generation_number),
-        index=False, float_format='%.3f')
-
-    pd.DataFrame(performance_totals_dict, index=[0]).to_csv(
-        locator.get_optimization_slave_total_performance(individual_number,
-                                                         generation_number),
-        index=False, float_format='%.3f')
+    performance = get_performance(buildings_district_scale_costs,
+                                  buildings_district_scale_emissions,
+                                  buildings_building_scale_costs,
+                                  buildings_building_scale_emissions,
+                                  performance_totals_dict)
+    for part, (individual_locator_method, _) in PERFORMANCE_FILES.items():
+        pd.DataFrame(performance[part], index=[0]).to_csv(
+            getattr(locator, individual_locator_method)(individual_number, generation_number),
+            index=False, float_format='%.3f')
 
     # add date and plot
     electricity_dispatch['DATE'] = date_array
@@ -96,4 +104,69 @@ def save_results(locator,
 
     pd.DataFrame(heating_dispatch).to_csv(locator.get_optimization_slave_heating_activation_pattern(individual_number,
                                                                                                     generation_number),
-                                          index=False, float_format='%.3f')
\ No newline at end of file
+                                          index=False, float_format='%.3f')
+
+
+def get_performance(buildings_district_scale_costs,
+                    buildings_district_scale_emissions,
+                    buildings_building_scale_costs,
+                    buildings_building_scale_emissions,
+                    performance_totals_dict):
+    """
+    The performance of an individual, as saved by :py:func:`save_results`: a dict with the building scale and district
+    scale costs and emissions and the totals (see ``PERFORMANCE_FILES``).
+    """
+    return {'building_scale': dict(buildings_building_scale_costs, **buildings_building_scale_emissions),
+            'district_scale': dict(buildings_district_scale_costs, **buildings_district_scale_emissions),
+            'totals': dict(performance_totals_dict)}
+
+
+def read_performance(locator, individual_number, generation_number):
+    """
+    The performance of an individual (see :py:func:`get_performance`) from the files saved by :py:func:`save_results`
+    """
+    return {part: pd.read_csv(getattr(locator, individual_locator_method)(individual_number,
+                                                                          generation_number)).iloc[0].to_dict()
+            for part, (individual_locator_method, _) in PERFORMANCE_FILES.items()}
+
+
+class GenerationPerformanceWriter(object):
+    """
+    Writes the performance of the individuals evaluated in a generation to the files of the generation. The performance
+    of each individual is appended to the files as soon as it is evaluated (in any order), :py:meth:`close` sorts the
+    files by individual from the rows kept in memory - the files of the individuals are not read again.
+    """
+
+    def __init__(self, locator, generation):
+        self.locator = locator
+        self.generation = generation
+        self.rows = {part: {} for part in PERFORMANCE_FILES}
+        for part in PERFORMANCE_FILES:
+            if os.path.exists(self.get_path(part)):
+                os.remove(self.get_path(part))
+
+    def get_path(self, part):
+        generation_locator_method = PERFORMANCE_FILES[part][1]
+        return getattr(self.locator, generation_locator_method)(self.generation)
+
+    def add(self, individual_number, performance):
+        """
+        :param int individual_number: the number of the individual in the generation
+        :param dict performance: the performance of the individual (see :py:func:`get_performance`)
+        """
+        for part in PERFORMANCE_FILES:
+            row = dict(performance[part])
+            row['individual'] = individual_number
+            row['individual_name'] = "sys_" + str(self.generation) + "_" + str(individual_number)
+            row['generation'] = self.generation
+            self.rows[part][individual_number] = row
+            path = self.get_path(part)
+            pd.DataFrame(row, index=[0]).to_csv(path, mode='a', header=not os.path.exists(path), index=False,
+                                                float_format='%.3f')
+
+    def close(self):
+        for part in PERFORMANCE_FILES:
+            rows = [self.rows[part][individual_number] for individual_number in sorted(self.rows[part])]
+            performance = pd.DataFrame(rows) if rows else pd.DataFrame(columns=['individual', 'individual_name',
+                                                                                 'generation'])
+            performance.to_csv(self.get_path(part), index=False, float_format='%.3f')
@@ -39,7 +39,8 @@ def evaluation_main(individual,
                     district_heating_network,
                     district_cooling_network,
                     technologies_heating_allowed,
-                    technologies_cooling_allowed
+                    technologies_cooling_allowed,
+                    slave_inputs
                     ):
     """
     This function evaluates an individual
@@ -52,6 +53,7 @@ def evaluation_main(individual,
     :param optimization_constants: class containing constants used in optimization
     :param config: configuration file
     :param prices: class of prices used in optimization
+    :param slave_inputs: the read-only inputs of the slave routines, read once per process
     :type individual: list
     :type column_names_buildings_all: list
     :type solar_features: class
@@ -59,6 +61,7 @@ def evaluation_main(individual,
     :type optimization_constants: class
     :type config: class
     :type prices: class
+    :type slave_inputs: cea.optimization.slave_inputs.SlaveInputs
     :return: Resulting values of the objective function. costs, CO2, prim
     :rtype: tuple
 
@@ -92,6 +95,7 @@ def evaluation_main(individual,
                                                                        technologies_heating_allowed,
                                                                        technologies_cooling_allowed,
                                                                        weather_features,
+                                                                       slave_inputs,
                                                                        )
 
     # DISTRICT HEATING NETWORK
@@ -0,0 +1,184 @@
+"""
+Cache of the evaluated individuals of the optimization
+
+Crossover and mutation of a (mostly integer) genome often produce individuals that were already evaluated in an earlier
+generation. The :py:class:`EvaluationCache` keeps the objectives of each evaluated individual, keyed by a canonical hash
+of the individual (the shares of the technologies and the barcode of the buildings connected to the network), and the
+individual / generation its results were saved to disk for. An individual found in the cache is not evaluated again:
+its objectives are taken from the cache and its result files are copied from the earlier evaluation.
+
+The cache is saved next to the checkpoints of the optimization (see
+:py:meth:`cea.inputlocator.InputLocator.get_optimization_evaluation_cache`). A later run only reuses it if the inputs
+the objectives are calculated from did not change (see :py:func:`calc_inputs_hash`).
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+__author__ = "Jimeno A. Fonseca"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Jimeno A. Fonseca"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# the locator methods of the files saved for an individual by cea.optimization.master.data_saver.save_results
+INDIVIDUAL_RESULT_FILES = ['get_optimization_district_scale_heating_capacity',
+                           'get_optimization_district_scale_cooling_capacity',
+                           'get_optimization_district_scale_electricity_capacity',
+                           'get_optimization_building_scale_heating_capacity',
+                           'get_optimization_building_scale_cooling_capacity',
+                           'get_optimization_slave_building_connectivity',
+                           'get_optimization_slave_building_scale_performance',
+                           'get_optimization_slave_district_scale_performance',
+                           'get_optimization_slave_total_performance',
+                           'get_optimization_slave_electricity_requirements_data',
+                           'get_optimization_slave_electricity_activation_pattern',
+                           'get_optimization_slave_cooling_activation_pattern',
+                           'get_optimization_slave_heating_activation_pattern']
+
+
+# the parameters of the optimization section the objectives of an individual depend on
+CACHED_OPTIMIZATION_PARAMETERS = ['network-type', 'technologies-dh', 'technologies-dc', 'number-of-typical-days',
+                                  'typical-days-method']
+
+
+def calc_inputs_hash(locator, building_names, config):
+    """
+    A hash of the inputs the objectives of the individuals are calculated from: the contents of the demand results of
+    the buildings, the results of the decentralized buildings, the solar, water body, sewage and geothermal potentials,
+    the layout and results of the thermal network, the supply systems databases and the weather file and the
+    parameters of the optimization in ``CACHED_OPTIMIZATION_PARAMETERS``. Missing files are hashed by their name only.
+    The objectives saved by an earlier run are only reused if this hash is the same.
+
+    :param cea.inputlocator.InputLocator locator: the locator of the scenario
+    :param list building_names: the names of all buildings of the optimization
+    :param cea.config.Configuration config: the configuration of the optimization
+    :rtype: str
+    """
+    network_type = config.optimization.network_type
+    input_files = [locator.get_demand_results_file.existing_path(building_name) for building_name in building_names]
+    input_files.extend([locator.get_total_demand(),
+                        locator.PV_totals(),
+                        locator.PVT_totals(),
+                        locator.SC_totals(panel_type='FP'),
+                        locator.SC_totals(panel_type='ET'),
+                        locator.get_water_body_potential(),
+                        locator.get_sewage_heat_potential(),
+                        locator.get_geothermal_potential(),
+                        locator.get_thermal_network_edge_list_file(network_type, ''),
+                        locator.get_thermal_network_node_types_csv_file(network_type, ''),
+                        locator.get_network_energy_pumping_requirements_file.existing_path(network_type, ''),
+                        locator.get_network_total_thermal_loss_file.existing_path(network_type, ''),
+                        locator.get_database_conversion_systems(),
+                        locator.get_database_distribution_systems(),
+                        locator.get_database_feedstocks(),
+                        locator.get_weather_file()])
+    # the network layout (the files of the shapefiles) and the results of the decentralized buildings
+    for folder in [locator.get_input_network_folder(network_type, ''), locator.get_optimization_decentralized_folder()]:
+        input_files.extend(os.path.join(folder, file_name) for file_name in sorted(os.listdir(folder))
+                           if os.path.isfile(os.path.join(folder, file_name)))
+
+    key = hashlib.sha1()
+    key.update(repr([(parameter, config.get('optimization:' + parameter))
+                     for parameter in CACHED_OPTIMIZATION_PARAMETERS]).encode('utf-8'))
+    for input_file in input_files:
+        key.update(os.path.basename(input_file).encode('utf-8'))
+        if not os.path.exists(input_file):
+            key.update(b'missing')
+            continue
+        with open(input_file, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                key.update(block)
+    return key.hexdigest()
+
+
+def individual_key(individual):
+    """
+    A canonical hash of an individual: integers and floats with the same value (e.g. ``1`` and ``1.0``) give the same
+    key.
+
+    :param list individual: the technology shares and the connection of the buildings to the network (0 or 1)
+    :rtype: str
+    """
+    canonical = json.dumps([float(value) for value in individual])
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+class EvaluationCache(object):
+    """
+    The objectives of the individuals evaluated so far. Each entry is a dict with the (non-normalized) ``objectives``
+    and the ``individual`` and ``generation`` numbers its results were saved for (None if they were not saved).
+    """
+
+    def __init__(self, locator, column_names, reuse=False, typical_days=None, inputs_hash=None):
+        """
+        :param cea.inputlocator.InputLocator locator: the locator of the scenario
+        :param list column_names: the names of the genes of an individual (an earlier cache is only reused if they
+                                  are the same)
+        :param bool reuse: start from the objectives saved by an earlier run of the optimization
+        :param typical_days: the typical days the individuals are evaluated for, None for all hours of the year (an
+                             earlier cache is only reused if they are the same)
+        :type typical_days: cea.utilities.time_series_aggregation.TypicalDays
+        :param str inputs_hash: the hash of the inputs of the individuals (see :py:func:`calc_inputs_hash`, an earlier
+                                cache is only reused if it is the same)
+        """
+        self.locator = locator
+        self.column_names = list(column_names)
+        self.typical_days = None if typical_days is None else typical_days.to_frame()['typical_day'].tolist()
+        self.inputs_hash = inputs_hash
+        self.entries = {}
+        if reuse and os.path.exists(locator.get_optimization_evaluation_cache()):
+            with open(locator.get_optimization_evaluation_cache(), 'r') as fp:
+                saved = json.load(fp)
+            if (saved['column_names'] == self.column_names and saved.get('typical_days') == self.typical_days
+                    and saved.get('inputs_hash') == self.inputs_hash):
+                # the result files of the earlier run are overwritten by this run, only the objectives are reused
+                self.entries = {key: {'objectives': entry['objectives'], 'individual': None, 'generation': None}
+                                for key, entry in saved['entries'].items()}
+
+    def lookup(self, individual, individual_number, generation_number, save_results):
+        """
+        The objectives of an individual evaluated before, or None if it needs to be evaluated. If ``save_results`` is
+        set, an individual is only found if its results were saved - they are copied to the files of
+        ``individual_number`` and ``generation_number``.
+
+        :rtype: tuple
+        """
+        entry = self.entries.get(individual_key(individual))
+        if entry is None:
+            return None
+        if save_results:
+            if entry['individual'] is None or not os.path.exists(
+                    self.locator.get_optimization_slave_total_performance(entry['individual'], entry['generation'])):
+                return None
+            if (entry['individual'], entry['generation']) != (individual_number, generation_number):
+                for locator_method in INDIVIDUAL_RESULT_FILES:
+                    get_path = getattr(self.locator, locator_method)
+                    shutil.copyfile(get_path(entry['individual'], entry['generation']),
+                                    get_path(individual_number, generation_number))
+        return tuple(entry['objectives'])
+
+    def add(self, individual, objectives, individual_number=None, generation_number=None):
+        """Keep the objectives of an individual just evaluated and the numbers its results were saved for (if any)"""
+        key = individual_key(individual)
+        if individual_number is None and key in self.entries:
+            # keep the location of results saved earlier
+            individual_number = self.entries[key]['individual']
+            generation_number = self.entries[key]['generation']
+        self.entries[key] = {'objectives': list(objectives),
+                             'individual': individual_number,
+                             'generation': generation_number}
+
+    def save(self):
+        # write to a temporary file first, so an interrupted run never leaves a partially written cache
+        cache_path = self.locator.get_optimization_evaluation_cache()
+        temporary_path = '{cache_path}.{pid}.tmp'.format(cache_path=cache_path, pid=os.getpid())
+        with open(temporary_path, 'w') as fp:
+            json.dump({'column_names': self.column_names, 'typical_days': self.typical_days,
+                       'inputs_hash': self.inputs_hash, 'entries': self.entries}, fp)
+        os.replace(temporary_path, cache_path)
@@ -1,3 +1,4 @@
+import collections
 import json
 import multiprocessing
 import random
@@ -15,11 +16,13 @@ from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONV
     DC_ACRONYM
 from cea.optimization.master import evaluation
 from cea.optimization.master.crossover import crossover_main
-from cea.optimization.master.data_saver import save_results
+from cea.optimization.master.data_saver import save_results, get_performance, read_performance, \
+    GenerationPerformanceWriter
+from cea.optimization.master.evaluation_cache import EvaluationCache, calc_inputs_hash, individual_key
 from cea.optimization.master.generation import generate_main
-from cea.optimization.master.generation import individual_to_barcode
 from cea.optimization.master.mutations import mutation_main
 from cea.optimization.master.normalization import scaler_for_normalization, normalize_fitnesses
+from cea.optimization.slave_inputs import SlaveInputs
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -56,13 +59,17 @@ def objective_function(individual,
                        technologies_heating_allowed,
                        technologies_cooling_allowed,
                        column_names,
+                       slave_inputs,
                        print_final_results=False):
     """
     Objective function is used to calculate the costs, CO2, primary energy and the variables corresponding to the
     individual
     :param individual: Input individual
     :type individual: list
-    :return: returns costs, CO2, primary energy and the master_to_slave_vars
+    :param slave_inputs: the read-only inputs of the slave routines, read once per process
+    :type slave_inputs: cea.optimization.slave_inputs.SlaveInputs
+    :return: the costs and CO2 of the individual and, if its results are saved to disk, its performance (see
+             :py:func:`cea.optimization.master.data_saver.get_performance`, None otherwise)
     """
     print('cea optimization progress: individual ' + str(individual_number) + ' and generation ' + str(
         generation_number) + '/' + str(config.optimization.number_of_generations))
@@ -102,6 +109,7 @@ def objective_function(individual,
                                                                              district_cooling_network,
                                                                              technologies_heating_allowed,
                                                                              technologies_cooling_allowed,
+                                                                             slave_inputs,
                                                                              )
 
     if config.debug or print_final_results:  # print for the last generation and
@@ -125,14 +133,109 @@ def objective_function(individual,
                      district_electricity_capacity_installed,
                      buildings_building_scale_heating_capacities,
                      buildings_building_scale_cooling_capacities)
+        performance = get_performance(buildings_district_scale_costs,
+                                      buildings_district_scale_emissions,
+                                      buildings_building_scale_costs,
+                                      buildings_building_scale_emissions,
+                                      performance_totals)
+    else:
+        performance = None
 
-    return TAC_sys_USD, GHG_sys_tonCO2
+    return (TAC_sys_USD, GHG_sys_tonCO2), performance
 
 
 def objective_function_wrapper(args):
     """
-    Wrap arguments because multiprocessing only accepts one argument for the function"""
-    return objective_function(*args)
+    Wrap arguments because multiprocessing only accepts one argument for the function. The position of the individual
+    is returned with the results, as the worker processes return them in the order they finish"""
+    position, objective_function_args = args
+    return position, objective_function(*objective_function_args)
+
+
+def evaluate_individuals(toolbox,
+                         evaluation_cache,
+                         individuals,
+                         individual_numbers,
+                         generation_numbers,
+                         evaluation_arguments,
+                         results_are_saved,
+                         print_final_results=False,
+                         performance_writer=None):
+    """
+    Evaluate the individuals with the objective function, except for those found in the evaluation cache. Identical
+    individuals are only evaluated once. The results are handled as soon as an individual is evaluated (with
+    multiprocessing, ``toolbox.map`` is ``imap_unordered`` of the pool).
+
+    :param evaluation_cache: the individuals evaluated so far (None to evaluate all individuals)
+    :type evaluation_cache: cea.optimization.master.evaluation_cache.EvaluationCache
+    :param list individuals: the individuals to evaluate
+    :param list individual_numbers: the number of each individual
+    :param list generation_numbers: the generation of each individual
+    :param tuple evaluation_arguments: the remaining arguments of :py:func:`objective_function` (from
+                                       ``building_names_all`` to ``slave_inputs``)
+    :param bool results_are_saved: True if the results of each individual are saved to disk
+    :param bool print_final_results: save the results of each individual to disk, even if not in debug mode
+    :param performance_writer: writes the performance of each individual to the files of the generation (if the
+                               results are saved)
+    :type performance_writer: cea.optimization.master.data_saver.GenerationPerformanceWriter
+    :return: the (non-normalized) fitnesses of the individuals, the number of individuals found in the cache and the
+             performance of the individuals (None for each individual if the results are not saved)
+    """
+    fitnesses = [None] * len(individuals)
+    performances = [None] * len(individuals)
+    # the positions of the individuals to evaluate, the first of each group of identical individuals is evaluated
+    to_evaluate = collections.OrderedDict()
+    for i, (individual, individual_number, generation_number) in enumerate(zip(individuals, individual_numbers,
+                                                                               generation_numbers)):
+        if evaluation_cache is None:
+            to_evaluate[i] = [i]
+            continue
+        fitness = evaluation_cache.lookup(individual, individual_number, generation_number, results_are_saved)
+        if fitness is None:
+            to_evaluate.setdefault(individual_key(individual), []).append(i)
+        else:
+            fitnesses[i] = fitness
+            if results_are_saved:
+                # the results were copied from the earlier evaluation
+                performances[i] = read_performance(evaluation_cache.locator, individual_number, generation_number)
+                if performance_writer is not None:
+                    performance_writer.add(individual_number, performances[i])
+
+    number_to_evaluate = len(to_evaluate)
+    positions_of_first = {positions[0]: positions for positions in to_evaluate.values()}
+    first_positions = list(positions_of_first)
+    results = toolbox.map(toolbox.evaluate, zip(first_positions,
+                                                zip([individuals[i] for i in first_positions],
+                                                    [individual_numbers[i] for i in first_positions],
+                                                    [generation_numbers[i] for i in first_positions],
+                                                    *[repeat(argument, number_to_evaluate) for argument in
+                                                      evaluation_arguments],
+                                                    repeat(print_final_results, number_to_evaluate))))
+
+    # results is an iterator of lazy results (in the order the individuals finish) - iterate over it to evaluate
+    for first_position, (fitness, performance) in results:
+        positions = positions_of_first[first_position]
+        fitnesses[first_position] = fitness
+        performances[first_position] = performance
+        if evaluation_cache is not None:
+            if results_are_saved:
+                evaluation_cache.add(individuals[first_position], fitness, individual_numbers[first_position],
+                                     generation_numbers[first_position])
+            else:
+                evaluation_cache.add(individuals[first_position], fitness)
+            for i in positions[1:]:
+                fitnesses[i] = evaluation_cache.lookup(individuals[i], individual_numbers[i], generation_numbers[i],
+                                                       results_are_saved)
+                performances[i] = performance
+        if performance_writer is not None and performance is not None:
+            for i in positions:
+                performance_writer.add(individual_numbers[i], performance)
+
+    cached = len(individuals) - number_to_evaluate
+    if evaluation_cache is not None and individuals:
+        print("Evaluation cache: %s of %s individuals found (%.1f %%)" % (cached, len(individuals),
+                                                                          100.0 * cached / len(individuals)))
+    return fitnesses, cached, performances
 
 
 def calc_dictionary_of_all_individuals_tested(dictionary_individuals, gen, invalid_ind):
@@ -255,10 +358,39 @@ def non_dominated_sorting_genetic_algorithm(locator,
     toolbox.register("select",
                      tools.selNSGA3WithMemory(ref_points))
 
-    # configure multiprocessing
+    # the demand, solar potentials etc. are read once per process, not for each individual
+    slave_inputs = SlaveInputs(locator)
+    evaluation_arguments = (building_names_all,
+                            column_names_buildings_heating,
+                            column_names_buildings_cooling,
+                            building_names_heating,
+                            building_names_cooling,
+                            building_names_electricity,
+                            locator,
+                            network_features,
+                            weather_features,
+                            config,
+                            prices,
+                            lca,
+                            district_heating_network,
+                            district_cooling_network,
+                            technologies_heating_allowed,
+                            technologies_cooling_allowed,
+                            column_names,
+                            slave_inputs)
+
+    # individuals evaluated in an earlier generation (or run) are not evaluated again
+    if config.optimization.evaluation_cache == 'off':
+        evaluation_cache = None
+    else:
+        evaluation_cache = EvaluationCache(locator, column_names, reuse=config.optimization.evaluation_cache == 'reuse',
+                                           typical_days=slave_inputs.get_typical_days(),
+                                           inputs_hash=calc_inputs_hash(locator, building_names_all, config))
+
+    # configure multiprocessing: the results are handled in the order the individuals finish
     if config.multiprocessing:
-        pool = multiprocessing.Pool(processes=multiprocessing.cpu_count())
-        toolbox.register("map", pool.map)
+        pool = multiprocessing.Pool(processes=config.get_number_of_processes())
+        toolbox.register("map", pool.imap_unordered)
 
     # Initialize statistics object
     paretofrontier = tools.ParetoFront()
@@ -271,33 +403,20 @@ def non_dominated_sorting_genetic_algorithm(locator,
     stats.register("max", np.max, axis=0)
 
     logbook = tools.Logbook()
-    logbook.header = "gen", "evals", "std", "min", "avg", "max"
+    logbook.header = "gen", "evals", "cached", "std", "min", "avg", "max"
 
     pop = toolbox.population(n=MU)
 
     # Evaluate the individuals with an invalid fitness
     invalid_ind = [ind for ind in pop if not ind.fitness.valid]
-    fitnesses = toolbox.map(toolbox.evaluate, zip(invalid_ind, range(len(invalid_ind)), repeat(0, len(invalid_ind)),
-                                                  repeat(building_names_all, len(invalid_ind)),
-                                                  repeat(column_names_buildings_heating, len(invalid_ind)),
-                                                  repeat(column_names_buildings_cooling, len(invalid_ind)),
-                                                  repeat(building_names_heating, len(invalid_ind)),
-                                                  repeat(building_names_cooling, len(invalid_ind)),
-                                                  repeat(building_names_electricity, len(invalid_ind)),
-                                                  repeat(locator, len(invalid_ind)),
-                                                  repeat(network_features, len(invalid_ind)),
-                                                  repeat(weather_features, len(invalid_ind)),
-                                                  repeat(config, len(invalid_ind)),
-                                                  repeat(prices, len(invalid_ind)),
-                                                  repeat(lca, len(invalid_ind)),
-                                                  repeat(district_heating_network, len(invalid_ind)),
-                                                  repeat(district_cooling_network, len(invalid_ind)),
-                                                  repeat(technologies_heating_allowed, len(invalid_ind)),
-                                                  repeat(technologies_cooling_allowed, len(invalid_ind)),
-                                                  repeat(column_names, len(invalid_ind))))
+    fitnesses, cached, performances = evaluate_individuals(toolbox, evaluation_cache, invalid_ind,
+                                                           range(len(invalid_ind)), [0] * len(invalid_ind),
+                                                           evaluation_arguments, config.debug)
+    # the total performance of the individuals saved to disk, by (individual, generation)
+    performance_totals_tested = {}
+    add_performance_totals(performance_totals_tested, 0, performances)
 
     # normalization of the first generation
-    fitnesses = list(fitnesses)  # fitnesses is a map object - store a copy for iterating over multiple times
     scaler_dict = scaler_for_normalization(NOBJ, fitnesses)
     fitnesses = normalize_fitnesses(scaler_dict, fitnesses)
 
@@ -311,7 +430,7 @@ def non_dominated_sorting_genetic_algorithm(locator,
     performance_metrics = calc_performance_metrics(0.0, paretofrontier)
     generational_distances.append(performance_metrics[0])
     difference_generational_distances.append(performance_metrics[1])
-    logbook.record(gen=0, evals=len(invalid_ind), **record)
+    logbook.record(gen=0, evals=len(invalid_ind), cached=cached, **record)
 
     # create a dictionary to store which individuals that are being calculated
     record_individuals_tested = {'generation': [], "individual_id": [], "individual_code": []}
@@ -329,27 +448,14 @@ def non_dominated_sorting_genetic_algorithm(locator,
         # Evaluate the individuals with an invalid fitness
         invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
         invalid_ind = [ind for ind in invalid_ind if ind not in pop]
-        fitnesses = toolbox.map(toolbox.evaluate,
-                                zip(invalid_ind, range(len(invalid_ind)), repeat(gen, len(invalid_ind)),
-                                    repeat(building_names_all, len(invalid_ind)),
-                                    repeat(column_names_buildings_heating, len(invalid_ind)),
-                                    repeat(column_names_buildings_cooling, len(invalid_ind)),
-                                    repeat(building_names_heating, len(invalid_ind)),
-                                    repeat(building_names_cooling, len(invalid_ind)),
-                                    repeat(building_names_electricity, len(invalid_ind)),
-                                    repeat(locator, len(invalid_ind)),
-                                    repeat(network_features, len(invalid_ind)),
-                                    repeat(weather_features, len(invalid_ind)),
-                                    repeat(config, len(invalid_ind)),
-                                    repeat(prices, len(invalid_ind)),
-                                    repeat(lca, len(invalid_ind)),
-                                    repeat(district_heating_network, len(invalid_ind)),
-                                    repeat(district_cooling_network, len(invalid_ind)),
-                                    repeat(technologies_heating_allowed, len(invalid_ind)),
-                                    repeat(technologies_cooling_allowed, len(invalid_ind)),
-                                    repeat(column_names, len(invalid_ind))))
+        # in debug mode, the performance of each individual is written to the files of the generation as it finishes
+        performance_writer = GenerationPerformanceWriter(locator, gen) if config.debug else None
+        fitnesses, cached, performances = evaluate_individuals(toolbox, evaluation_cache, invalid_ind,
+                                                               range(len(invalid_ind)), [gen] * len(invalid_ind),
+                                                               evaluation_arguments, config.debug,
+                                                               performance_writer=performance_writer)
+        add_performance_totals(performance_totals_tested, gen, performances)
         # normalization of the second generation on
-        fitnesses = list(fitnesses)  # fitnesses is a map object - store a copy for iterating over multiple times
         fitnesses = normalize_fitnesses(scaler_dict, fitnesses)
 
         for ind, fit in zip(invalid_ind, fitnesses):
@@ -368,29 +474,16 @@ def non_dominated_sorting_genetic_algorithm(locator,
         performance_metrics = calc_performance_metrics(generational_distances[-1], paretofrontier)
         generational_distances.append(performance_metrics[0])
         difference_generational_distances.append(performance_metrics[1])
-        logbook.record(gen=gen, evals=len(invalid_ind), **record)
+        logbook.record(gen=gen, evals=len(invalid_ind), cached=cached, **record)
         print(logbook.stream)
 
-        DHN_network_list_tested = []
-        DCN_network_list_tested = []
-        for individual in invalid_ind:
-            DHN_barcode, DCN_barcode, individual_with_name_dict, _ = individual_to_barcode(individual,
-                                                                                           building_names_all,
-                                                                                           building_names_heating,
-                                                                                           building_names_cooling,
-                                                                                           column_names,
-                                                                                           column_names_buildings_heating,
-                                                                                           column_names_buildings_cooling)
-            DCN_network_list_tested.append(DCN_barcode)
-            DHN_network_list_tested.append(DHN_barcode)
-
         if config.debug:
             print("Saving results for generation", gen, "\n")
             valid_generation = [gen]
-            save_generation_dataframes(gen, invalid_ind, locator, DCN_network_list_tested, DHN_network_list_tested)
+            performance_writer.close()
             save_generation_individuals(column_names, gen, invalid_ind, locator)
             systems_name_list = save_generation_pareto_individuals(locator, gen, record_individuals_tested,
-                                                                   paretofrontier)
+                                                                   paretofrontier, performance_totals_tested)
         else:
             systems_name_list = []
             valid_generation = []
@@ -403,25 +496,14 @@ def non_dominated_sorting_genetic_algorithm(locator,
                                                                          gen,
                                                                          record_individuals_tested,
                                                                          paretofrontier,
-                                                                         building_names_all,
-                                                                         column_names_buildings_heating,
-                                                                         column_names_buildings_cooling,
-                                                                         building_names_heating,
-                                                                         building_names_cooling,
-                                                                         building_names_electricity,
-                                                                         network_features,
-                                                                         weather_features,
-                                                                         config,
-                                                                         prices,
-                                                                         lca,
-                                                                         district_heating_network,
-                                                                         district_cooling_network,
-                                                                         technologies_heating_allowed,
-                                                                         technologies_cooling_allowed,
-                                                                         column_names)
+                                                                         column_names,
+                                                                         evaluation_cache,
+                                                                         evaluation_arguments)
 
         # Create Checkpoint if necessary
         print("Creating CheckPoint", gen, "\n")
+        if evaluation_cache is not None:
+            evaluation_cache.save()
         with open(locator.get_optimization_checkpoint(gen), "w") as fp:
             cp = dict(generation=gen,
                       selected_population=pop,
@@ -438,29 +520,36 @@ def non_dominated_sorting_genetic_algorithm(locator,
     return pop, logbook
 
 
+def add_performance_totals(performance_totals_tested, generation, performances):
+    """
+    Keep the total performance of the individuals of a generation that were saved to disk, for the files of the
+    individuals in the pareto front (instead of reading the files of each individual again).
+
+    :param dict performance_totals_tested: the total performance by (individual, generation)
+    :param int generation: the generation of the individuals
+    :param list performances: the performance of each individual as returned by :py:func:`evaluate_individuals`
+    """
+    for individual_number, performance in enumerate(performances):
+        if performance is not None:
+            performance_totals_tested[(individual_number, generation)] = performance['totals']
+
+
+def get_performance_totals(locator, individual_number, generation_number, performance_totals_tested):
+    """The total performance of an individual, kept in memory or from the files of the individual"""
+    if (individual_number, generation_number) in performance_totals_tested:
+        return performance_totals_tested[(individual_number, generation_number)]
+    return read_performance(locator, individual_number, generation_number)['totals']
+
+
 def save_final_generation_pareto_individuals(toolbox,
                                              locator,
                                              generation,
                                              record_individuals_tested,
                                              paretofrontier,
-                                             building_names_all,
-                                             column_names_buildings_heating,
-                                             column_names_buildings_cooling,
-                                             building_names_heating,
-                                             building_names_cooling,
-                                             building_names_electricity,
-                                             network_features,
-                                             weather_features,
-                                             config,
-                                             prices,
-                                             lca,
-                                             district_heating_network,
-                                             district_cooling_network,
-                                             technologies_heating_allowed,
-                                             technologies_cooling_allowed,
-                                             column_names):
+                                             column_names,
+                                             evaluation_cache,
+                                             evaluation_arguments):
     # local variables
-    performance_totals_pareto = pd.DataFrame()
     individual_number_list = []
     generation_number_list = []
     individual_in_pareto_list = []
@@ -475,41 +564,11 @@ def save_final_generation_pareto_individuals(toolbox,
 
     save_generation_individuals(column_names, generation, individual_in_pareto_list, locator)
 
-    # evaluate once again and print results for the pareto curve
-    print_final_results = True
-    fitnesses = toolbox.map(toolbox.evaluate, zip(individual_in_pareto_list,
-                                                  individual_number_list,
-                                                  generation_number_list,
-                                                  repeat(building_names_all, len(individual_in_pareto_list)),
-                                                  repeat(column_names_buildings_heating,
-                                                         len(individual_in_pareto_list)),
-                                                  repeat(column_names_buildings_cooling,
-                                                         len(individual_in_pareto_list)),
-                                                  repeat(building_names_heating, len(individual_in_pareto_list)),
-                                                  repeat(building_names_cooling, len(individual_in_pareto_list)),
-                                                  repeat(building_names_electricity, len(individual_in_pareto_list)),
-                                                  repeat(locator, len(individual_in_pareto_list)),
-                                                  repeat(network_features, len(individual_in_pareto_list)),
-                                                  repeat(weather_features, len(individual_in_pareto_list)),
-                                                  repeat(config, len(individual_in_pareto_list)),
-                                                  repeat(prices, len(individual_in_pareto_list)),
-                                                  repeat(lca, len(individual_in_pareto_list)),
-                                                  repeat(district_heating_network, len(individual_in_pareto_list)),
-                                                  repeat(district_cooling_network, len(individual_in_pareto_list)),
-                                                  repeat(technologies_heating_allowed, len(individual_in_pareto_list)),
-                                                  repeat(technologies_cooling_allowed, len(individual_in_pareto_list)),
-                                                  repeat(column_names, len(individual_in_pareto_list)),
-                                                  repeat(print_final_results, len(individual_in_pareto_list))))
-
-    # fitnesses is a map object of lazy results - iterate over it to actually evaluate
-    fitnesses = list(fitnesses)
-
-    for individual_number, generation_number in zip(individual_number_list, generation_number_list):
-        performance_totals_pareto = pd.concat([performance_totals_pareto,
-                                               pd.read_csv(
-                                                   locator.get_optimization_slave_total_performance(
-                                                       individual_number, generation_number))],
-                                              ignore_index=True)
+    # evaluate once again and print results for the pareto curve (or copy the results saved earlier)
+    _, _, performances = evaluate_individuals(toolbox, evaluation_cache, individual_in_pareto_list,
+                                              individual_number_list, generation_number_list, evaluation_arguments,
+                                              results_are_saved=True, print_final_results=True)
+    performance_totals_pareto = pd.DataFrame([performance['totals'] for performance in performances])
 
     systems_name_list = ["sys_" + str(y) + "_" + str(x) for x, y in zip(individual_number_list, generation_number_list)]
     performance_totals_pareto['individual'] = individual_number_list
@@ -521,10 +580,11 @@ def save_final_generation_pareto_individuals(toolbox,
     return systems_name_list
 
 
-def save_generation_pareto_individuals(locator, generation, record_individuals_tested, paretofrontier):
-    performance_totals_pareto = pd.DataFrame()
+def save_generation_pareto_individuals(locator, generation, record_individuals_tested, paretofrontier,
+                                       performance_totals_tested):
     individual_list = []
     generation_list = []
+    performance_totals_list = []
 
     for i, record in enumerate(record_individuals_tested['individual_code']):
         if record in paretofrontier:
@@ -532,10 +592,8 @@ def save_generation_pareto_individuals(locator, generation, record_individuals_t
             gen = record_individuals_tested['generation'][i]
             individual_list.append(ind)
             generation_list.append(gen)
-            performance_totals_pareto = pd.concat([performance_totals_pareto,
-                                                   pd.read_csv(
-                                                       locator.get_optimization_slave_total_performance(ind, gen))],
-                                                  ignore_index=True)
+            performance_totals_list.append(get_performance_totals(locator, ind, gen, performance_totals_tested))
+    performance_totals_pareto = pd.DataFrame(performance_totals_list)
 
     systems_name_list = ["sys_" + str(y) + "_" + str(x) for x, y in zip(individual_list, generation_list)]
     performance_totals_pareto['individual'] = individual_list
@@ -547,48 +605,6 @@ def save_generation_pareto_individuals(locator, generation, record_individuals_t
     return systems_name_list
 
 
-def save_generation_dataframes(generation,
-                               slected_individuals,
-                               locator,
-                               DCN_network_list_selected,
-                               DHN_network_list_selected):
-    individual_list = range(len(slected_individuals))
-    individual_name_list = ["sys_" + str(generation) + "_" + str(x) for x in individual_list]
-    performance_disconnected = pd.DataFrame()
-    performance_connected = pd.DataFrame()
-    performance_totals = pd.DataFrame()
-    for ind, DCN_barcode, DHN_barcode in zip(individual_list, DCN_network_list_selected, DHN_network_list_selected):
-        performance_connected = pd.concat([performance_connected,
-                                           pd.read_csv(
-                                               locator.get_optimization_slave_district_scale_performance(ind,
-                                                                                                         generation))],
-                                          ignore_index=True)
-
-        performance_disconnected = pd.concat([performance_disconnected, pd.read_csv(
-            locator.get_optimization_slave_building_scale_performance(ind, generation))], ignore_index=True)
-        performance_totals = pd.concat([performance_totals,
-                                        pd.read_csv(
-                                            locator.get_optimization_slave_total_performance(ind, generation))],
-                                       ignore_index=True)
-
-    performance_disconnected['individual'] = individual_list
-    performance_connected['individual'] = individual_list
-    performance_totals['individual'] = individual_list
-    performance_disconnected['individual_name'] = individual_name_list
-    performance_connected['individual_name'] = individual_name_list
-    performance_totals['individual_name'] = individual_name_list
-    performance_disconnected['generation'] = generation
-    performance_connected['generation'] = generation
-    performance_totals['generation'] = generation
-
-    # save all results to disk
-    performance_disconnected.to_csv(locator.get_optimization_generation_building_scale_performance(generation),
-                                    index=False)
-    performance_connected.to_csv(locator.get_optimization_generation_district_scale_performance(generation),
-                                 index=False)
-    performance_totals.to_csv(locator.get_optimization_generation_total_performance(generation), index=False)
-
-
 def save_generation_individuals(columns_of_saved_files, generation, invalid_ind, locator):
     # now get information about individuals and save to disk
     individual_list = range(len(invalid_ind))
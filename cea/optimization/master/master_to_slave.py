@@ -6,10 +6,6 @@ Evaluation function of an individual
 
 
 
-import os
-
-import pandas as pd
-
 from cea.optimization import slave_data
 from cea.optimization.constants import *
 from cea.optimization.constants import DH_CONVERSION_TECHNOLOGIES_SHARE, DC_CONVERSION_TECHNOLOGIES_SHARE
@@ -31,7 +27,8 @@ def export_data_to_master_to_slave_class(locator,
                                          district_cooling_network,
                                          technologies_heating_allowed,
                                          technologies_cooling_allowed,
-                                         weather_features
+                                         weather_features,
+                                         slave_inputs
                                          ):
     # get thermal network for this individual
 
@@ -44,7 +41,8 @@ def export_data_to_master_to_slave_class(locator,
                                                                    district_heating_network,
                                                                    district_cooling_network,
                                                                    building_names_heating,
-                                                                   building_names_cooling)
+                                                                   building_names_cooling,
+                                                                   slave_inputs)
 
     # CALCULATE PEAK LOADS
     Q_cooling_nom_W, \
@@ -73,7 +71,8 @@ def export_data_to_master_to_slave_class(locator,
                                                           building_names_cooling,
                                                           building_names_electricity,
                                                           DH_network_summary_individual,
-                                                          DC_network_summary_individual
+                                                          DC_network_summary_individual,
+                                                          slave_inputs
                                                           )
     return master_to_slave_vars
 
@@ -113,15 +112,18 @@ def thermal_networks_in_individual(locator,
                                    district_heating_network,
                                    district_cooling_network,
                                    column_names_buildings_heating,
-                                   column_names_buildings_cooling
+                                   column_names_buildings_cooling,
+                                   slave_inputs
                                    ):
     # local variables
     ground_temp = weather_features.ground_temp
+    typical_days = slave_inputs.get_typical_days()
 
     # EVALUATE CASES TO CREATE A NETWORK OR NOT
     if district_heating_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DH', DHN_barcode)):
-            total_demand = createTotalNtwCsv(DHN_barcode, locator, column_names_buildings_heating)
+        DH_network_summary_individual = slave_inputs.get_network_summary('DH', DHN_barcode)
+        if DH_network_summary_individual is None:
+            total_demand = createTotalNtwCsv(DHN_barcode, slave_inputs, column_names_buildings_heating)
             num_total_buildings = len(column_names_buildings_heating)
             buildings_in_heating_network = total_demand.Name.values
             # Run the substation and distribution routines
@@ -133,16 +135,15 @@ def thermal_networks_in_individual(locator,
                                                                            buildings_in_heating_network,
                                                                            ground_temp,
                                                                            num_total_buildings,
-                                                                           "DH", DHN_barcode)
-        else:
-            DH_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DH', DHN_barcode))
+                                                                           "DH", DHN_barcode, typical_days)
+            slave_inputs.add_network_summary('DH', DHN_barcode, DH_network_summary_individual)
     else:
         DH_network_summary_individual = None
 
     if district_cooling_network:  # network exists
-        if not os.path.exists(locator.get_optimization_network_results_summary('DC', DCN_barcode)):
-            total_demand = createTotalNtwCsv(DCN_barcode, locator, column_names_buildings_cooling)
+        DC_network_summary_individual = slave_inputs.get_network_summary('DC', DCN_barcode)
+        if DC_network_summary_individual is None:
+            total_demand = createTotalNtwCsv(DCN_barcode, slave_inputs, column_names_buildings_cooling)
             num_total_buildings = len(column_names_buildings_cooling)
             buildings_in_cooling_network = total_demand.Name.values
 
@@ -152,10 +153,8 @@ def thermal_networks_in_individual(locator,
             DC_network_summary_individual = summarize_network.network_main(locator, buildings_in_cooling_network,
                                                                            ground_temp,
                                                                            num_total_buildings,
-                                                                           'DC', DCN_barcode)
-        else:
-            DC_network_summary_individual = pd.read_csv(
-                locator.get_optimization_network_results_summary('DC', DCN_barcode))
+                                                                           'DC', DCN_barcode, typical_days)
+            slave_inputs.add_network_summary('DC', DCN_barcode, DC_network_summary_individual)
     else:
         DC_network_summary_individual = None
 
@@ -183,7 +182,8 @@ def calc_master_to_slave_variables(locator, gen,
                                    building_names_cooling,
                                    building_names_electricity,
                                    DH_network_summary_individual,
-                                   DC_network_summary_individual
+                                   DC_network_summary_individual,
+                                   slave_inputs
                                    ):
     """
     This function reads the list encoding a configuration and implements the corresponding
@@ -191,9 +191,11 @@ def calc_master_to_slave_variables(locator, gen,
     :param individual_with_names_dict: list with inidividual
     :param Q_heating_max_W:  peak heating demand
     :param locator: locator class
+    :param slave_inputs: the read-only inputs of the slave routines, read once per process
     :type individual_with_names_dict: list
     :type Q_heating_max_W: float
     :type locator: string
+    :type slave_inputs: cea.optimization.slave_inputs.SlaveInputs
     :return: master_to_slave_vars : class MasterSlaveVariables
     :rtype: class
     """
@@ -245,6 +247,9 @@ def calc_master_to_slave_variables(locator, gen,
     master_to_slave_vars.individual_number = ind_num
     master_to_slave_vars.generation_number = gen
 
+    # the read-only inputs of the slave routines (demand, solar potentials etc.)
+    master_to_slave_vars.slave_inputs = slave_inputs
+
     # Store inforamtion about which units are activated
     master_to_slave_vars = master_to_slave_electrical_technologies(individual_with_names_dict, locator,
                                                                    master_to_slave_vars,
@@ -338,27 +343,27 @@ def calc_district_scale_names(building_names, barcode):
     return connected_buildings
 
 
-def calc_available_area_solar(locator, buildings, share_allowed, technology):
+def calc_available_area_solar(slave_inputs, buildings, share_allowed, technology):
     """
-    :param cea.inputlocator.InputLocator locator:
+    :param cea.optimization.slave_inputs.SlaveInputs slave_inputs:
     :param buildings:
     :param share_allowed:
     :param technology:
     :return:
     """
     area_m2 = 0.0
-    locator_methods = {"PVT": locator.PVT_results, "PV": locator.PV_results}
+    results_methods = {"PVT": slave_inputs.get_PVT_results, "PV": slave_inputs.get_PV_results}
     for building in buildings:
-        solar_technology_potential = pd.read_csv(locator_methods[technology](building))
+        solar_technology_potential = results_methods[technology](building)
         area_m2 += solar_technology_potential['Area_' + technology + '_m2'][0]
 
     return area_m2 * share_allowed
 
 
-def calc_available_area_solar_collectors(locator, buildings, share_allowed, panel_type):
+def calc_available_area_solar_collectors(slave_inputs, buildings, share_allowed, panel_type):
     """
 
-    :param cea.inputlocator.InputLocator locator:
+    :param cea.optimization.slave_inputs.SlaveInputs slave_inputs:
     :param buildings:
     :param share_allowed:
     :param str panel_type:
@@ -366,7 +371,7 @@ def calc_available_area_solar_collectors(locator, buildings, share_allowed, pane
     """
     area_m2 = 0.0
     for building in buildings:
-        solar_technology_potential = pd.read_csv(locator.SC_results(building, panel_type))
+        solar_technology_potential = slave_inputs.get_SC_results(building, panel_type)
         area_m2 += solar_technology_potential['Area_SC_m2'][0]
 
     return area_m2 * share_allowed
@@ -390,6 +395,7 @@ def master_to_slave_district_heating_technologies(Q_heating_nom_W,
                                                   locator,
                                                   master_to_slave_vars):
     technologies_heating_allowed = master_to_slave_vars.technologies_heating_allowed
+    slave_inputs = master_to_slave_vars.slave_inputs
     if 'NG_Trigen' in technologies_heating_allowed and individual_with_names_dict['NG_Cogen'] >= mimimum_valuedh(
             'NG_Cogen'):  # NG-fired CHPFurnace
         master_to_slave_vars.CC_on = 1
@@ -440,7 +446,7 @@ def master_to_slave_district_heating_technologies(Q_heating_nom_W,
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
         share_allowed = individual_with_names_dict['PVT']
         master_to_slave_vars.PVT_on = 1
-        master_to_slave_vars.A_PVT_m2 = calc_available_area_solar(locator, buildings, share_allowed, 'PVT')
+        master_to_slave_vars.A_PVT_m2 = calc_available_area_solar(slave_inputs, buildings, share_allowed, 'PVT')
         master_to_slave_vars.PVT_share = share_allowed
 
     if 'SC_ET' in technologies_heating_allowed and individual_with_names_dict[
@@ -448,7 +454,8 @@ def master_to_slave_district_heating_technologies(Q_heating_nom_W,
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
         share_allowed = individual_with_names_dict['SC_ET']
         master_to_slave_vars.SC_ET_on = 1
-        master_to_slave_vars.A_SC_ET_m2 = calc_available_area_solar_collectors(locator, buildings, share_allowed, "ET")
+        master_to_slave_vars.A_SC_ET_m2 = calc_available_area_solar_collectors(slave_inputs, buildings, share_allowed,
+                                                                                  "ET")
         master_to_slave_vars.SC_ET_share = share_allowed
 
     if 'SC_FP' in technologies_heating_allowed and individual_with_names_dict[
@@ -456,7 +463,8 @@ def master_to_slave_district_heating_technologies(Q_heating_nom_W,
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
         share_allowed = individual_with_names_dict['SC_FP']
         master_to_slave_vars.SC_FP_on = 1
-        master_to_slave_vars.A_SC_FP_m2 = calc_available_area_solar_collectors(locator, buildings, share_allowed, "FP")
+        master_to_slave_vars.A_SC_FP_m2 = calc_available_area_solar_collectors(slave_inputs, buildings, share_allowed,
+                                                                                  "FP")
         master_to_slave_vars.SC_FP_share = share_allowed
 
     return master_to_slave_vars
@@ -475,26 +483,27 @@ def master_to_slave_electrical_technologies(individual_with_names_dict,
         technologies_allowed = master_to_slave_vars.technologies_cooling_allowed
     else:
         raise Exception("option not available")
+    slave_inputs = master_to_slave_vars.slave_inputs
 
     if 'PV' in technologies_allowed and individual_with_names_dict['PV'] > 0.0:
         # different in this case, because solar technologies can have shares close to 0.0
         buildings = master_to_slave_vars.building_names_all
         share_allowed = individual_with_names_dict['PV']
         master_to_slave_vars.PV_on = 1
-        master_to_slave_vars.A_PV_m2 = calc_available_area_solar(locator, buildings, share_allowed, 'PV')
+        master_to_slave_vars.A_PV_m2 = calc_available_area_solar(slave_inputs, buildings, share_allowed, 'PV')
         master_to_slave_vars.PV_share = share_allowed
 
     return master_to_slave_vars
 
 
-def createTotalNtwCsv(barcode, locator, building_names):
+def createTotalNtwCsv(barcode, slave_inputs, building_names):
     """
     Create and saves the total file for a specific DH or DC configuration
     to make the distribution routine possible
     :param indCombi: string of 0 and 1: 0 if the building is disconnected, 1 if connected
-    :param locator: path to raw files
+    :param slave_inputs: the read-only inputs of the slave routines
     :type indCombi: string
-    :type locator: string
+    :type slave_inputs: cea.optimization.slave_inputs.SlaveInputs
     :return: name of the total file
     :rtype: string
     """
@@ -505,7 +514,7 @@ def createTotalNtwCsv(barcode, locator, building_names):
             buildings_in_this_network_config.append(name)
 
     # get total demand file fro selecte
-    df = pd.read_csv(locator.get_total_demand())
+    df = slave_inputs.get_total_demand()
     dfRes = df[df.Name.isin(buildings_in_this_network_config)]
     dfRes = dfRes.reset_index(drop=True)
 
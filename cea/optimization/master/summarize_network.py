@@ -28,21 +28,27 @@ __email__ = "thomas@arch.ethz.ch"
 __status__ = "Production"
 
 
-def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildings, network_type, key):
+def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildings, network_type, key,
+                 typical_days=None):
     """
     This function summarizes the distribution demands and will give them as:
     - absolute values (design values = extreme values)
     - hourly operation scheme of input/output of distribution
 
+    With typical days, the hourly values are only calculated for the hours of the typical days and expanded to the
+    year (each hour is calculated on its own, so the hours of the typical days are the same as in the full year).
+
     :param locator: locator class
     :param total_demand: dataframe with total demand of buildings
     :param buildings_in_this_network: vector with names of buildings
     :param key: when called by the optimization, a key will provide an id for the individual
         and the generation.
+    :param typical_days: the typical days to calculate (None to calculate each hour of the year)
     :type locator: class
     :type total_demand: list
     :type buildings_in_this_network: vector
     :type key: int
+    :type typical_days: cea.utilities.time_series_aggregation.TypicalDays
     :return: csv file stored in locator.get_optimization_network_results_folder() as fName_result
         where fName_result: FIXME: what?
     :rtype: Nonetype
@@ -51,7 +57,13 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     # local variables
     t0 = time.perf_counter()
     num_buildings_network = len(buildings_in_this_network)
-    date = pd.read_csv(locator.get_demand_results_file(buildings_in_this_network[0])).DATE.values
+    date = locator.get_demand_results_file.read(buildings_in_this_network[0]).DATE.values
+    if typical_days is not None:
+        hours = typical_days.hours
+        ground_temp = np.asarray(ground_temp)[hours]
+    else:
+        hours = np.arange(HOURS_IN_YEAR)
+    number_of_hours = len(hours)
 
     # CALCULATE RELATIVE LENGTH OF THIS NETWORK
     data_network = pd.read_csv(locator.get_thermal_network_edge_list_file(network_type))
@@ -61,41 +73,41 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
     # empty vectors
     demand_df = []
     substation_df = []
-    Qcdata_netw_total_kWh = np.zeros(HOURS_IN_YEAR)
-    mcpdata_netw_total_kWperC = np.zeros(HOURS_IN_YEAR)
-    mdot_heat_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
-    mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
-    mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers = np.zeros(HOURS_IN_YEAR)
-    Q_DH_building_netw_total_W = np.zeros(HOURS_IN_YEAR)
-    Q_DC_building_netw_space_cooling_and_refrigeration_total_W = np.zeros(HOURS_IN_YEAR)
-    Q_DC_building_netw_space_cooling_data_center_and_refrigeration_total_W = np.zeros(HOURS_IN_YEAR)
-    sum_tret_mdot_heat = np.zeros(HOURS_IN_YEAR)
-    sum_tret_mdot_cool_space_cooling_and_refrigeration = np.zeros(HOURS_IN_YEAR)
-    sum_tret_mdot_cool_space_cooling_data_center_and_refrigeration = np.zeros(HOURS_IN_YEAR)
-    mdot_heat_netw_min_kgpers = np.zeros(HOURS_IN_YEAR) + 1E6
-    mdot_cool_space_cooling_and_refrigeration_netw_min_kgpers = np.zeros(HOURS_IN_YEAR) + 1E6
-    mdot_cool_space_cooling_data_center_and_refrigeration_netw_min_kgpers = np.zeros(HOURS_IN_YEAR) + 1E6
+    Qcdata_netw_total_kWh = np.zeros(number_of_hours)
+    mcpdata_netw_total_kWperC = np.zeros(number_of_hours)
+    mdot_heat_netw_all_kgpers = np.zeros(number_of_hours)
+    mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers = np.zeros(number_of_hours)
+    mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers = np.zeros(number_of_hours)
+    Q_DH_building_netw_total_W = np.zeros(number_of_hours)
+    Q_DC_building_netw_space_cooling_and_refrigeration_total_W = np.zeros(number_of_hours)
+    Q_DC_building_netw_space_cooling_data_center_and_refrigeration_total_W = np.zeros(number_of_hours)
+    sum_tret_mdot_heat = np.zeros(number_of_hours)
+    sum_tret_mdot_cool_space_cooling_and_refrigeration = np.zeros(number_of_hours)
+    sum_tret_mdot_cool_space_cooling_data_center_and_refrigeration = np.zeros(number_of_hours)
+    mdot_heat_netw_min_kgpers = np.zeros(number_of_hours) + 1E6
+    mdot_cool_space_cooling_and_refrigeration_netw_min_kgpers = np.zeros(number_of_hours) + 1E6
+    mdot_cool_space_cooling_data_center_and_refrigeration_netw_min_kgpers = np.zeros(number_of_hours) + 1E6
 
     #RUN FOR HEATING NETWORKS
     if network_type == "DH":
         iteration = 0
         for building_name in buildings_in_this_network:
-            demand_df.append(pd.read_csv(locator.get_demand_results_file(building_name)))
+            demand_df.append(locator.get_demand_results_file.read(building_name))
             substation_df.append(pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key)))
-            mdot_heat_netw_all_kgpers += substation_df[iteration].mdot_DH_result_kgpers.values
+            mdot_heat_netw_all_kgpers += substation_df[iteration].mdot_DH_result_kgpers.values[hours]
 
-            Q_DH_building_netw_total_W += (substation_df[iteration].Q_heating_W.values +
-                                           substation_df[iteration].Q_dhw_W.values)
+            Q_DH_building_netw_total_W += (substation_df[iteration].Q_heating_W.values[hours] +
+                                           substation_df[iteration].Q_dhw_W.values[hours])
 
-            sum_tret_mdot_heat += substation_df[iteration].T_return_DH_result_K.values * substation_df[
-                iteration].mdot_DH_result_kgpers.values
+            sum_tret_mdot_heat += substation_df[iteration].T_return_DH_result_K.values[hours] * substation_df[
+                iteration].mdot_DH_result_kgpers.values[hours]
 
-            Qcdata_netw_total_kWh += demand_df[iteration].Qcdata_sys_kWh.values
-            mcpdata_netw_total_kWperC += demand_df[iteration].mcpcdata_sys_kWperC.values
+            Qcdata_netw_total_kWh += demand_df[iteration].Qcdata_sys_kWh.values[hours]
+            mcpdata_netw_total_kWperC += demand_df[iteration].mcpcdata_sys_kWperC.values[hours]
 
             # evaluate minimum flows
             mdot_heat_netw_min_kgpers = np.vectorize(calc_min_flow)(mdot_heat_netw_min_kgpers,
-                                                                    substation_df[iteration].mdot_DH_result_kgpers.values)
+                                                                    substation_df[iteration].mdot_DH_result_kgpers.values[hours])
 
             iteration += 1
 
@@ -125,11 +137,7 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
                                                          Q_DH_losses_sup_W, mdot_heat_netw_all_kgpers,
                                                          HEAT_CAPACITY_OF_WATER_JPERKGK, "positive")
 
-        day_of_max_heatmassflow_fin = np.zeros(HOURS_IN_YEAR)
-        day_of_max_heatmassflow = find_index_of_max(mdot_heat_netw_all_kgpers)
-        day_of_max_heatmassflow_fin[:] = day_of_max_heatmassflow
-
-        results = pd.DataFrame({"DATE": date,
+        results = pd.DataFrame({"DATE": date[hours],
                                 "mdot_DH_netw_total_kgpers": mdot_heat_netw_all_kgpers,
                                 "Q_DHNf_W": Q_DHNf_W,
                                 "T_DHNf_re_K": T_DHN_re_K,
@@ -143,31 +151,31 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
         iteration = 0
         for building_name in buildings_in_this_network:
             #get demand and substation file of buildings in this network
-            demand_df = pd.read_csv(locator.get_demand_results_file(building_name))
+            demand_df = locator.get_demand_results_file.read(building_name)
             substation_df = pd.read_csv(locator.get_optimization_substations_results_file(building_name, network_type, key))
 
             #add to demand of servers
-            Qcdata_netw_total_kWh += demand_df['Qcdata_sys_kWh'].values
-            mcpdata_netw_total_kWperC += demand_df['mcpcdata_sys_kWperC'].values
+            Qcdata_netw_total_kWh += demand_df['Qcdata_sys_kWh'].values[hours]
+            mcpdata_netw_total_kWperC += demand_df['mcpcdata_sys_kWperC'].values[hours]
 
-            mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_and_refrigeration_result_kgpers'].values
-            mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_data_center_and_refrigeration_result_kgpers'].values
+            mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_and_refrigeration_result_kgpers'].values[hours]
+            mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers += substation_df['mdot_space_cooling_data_center_and_refrigeration_result_kgpers'].values[hours]
 
-            Q_DC_building_netw_space_cooling_and_refrigeration_total_W += substation_df['Q_space_cooling_and_refrigeration_W'].values
-            Q_DC_building_netw_space_cooling_data_center_and_refrigeration_total_W += substation_df['Q_space_cooling_data_center_and_refrigeration_W'].values
+            Q_DC_building_netw_space_cooling_and_refrigeration_total_W += substation_df['Q_space_cooling_and_refrigeration_W'].values[hours]
+            Q_DC_building_netw_space_cooling_data_center_and_refrigeration_total_W += substation_df['Q_space_cooling_data_center_and_refrigeration_W'].values[hours]
 
-            sum_tret_mdot_cool_space_cooling_and_refrigeration += substation_df['T_return_DC_space_cooling_and_refrigeration_result_K'].values * \
-                                                                  substation_df['mdot_space_cooling_and_refrigeration_result_kgpers'].values
-            sum_tret_mdot_cool_space_cooling_data_center_and_refrigeration += substation_df['T_return_DC_space_cooling_data_center_and_refrigeration_result_K'].values * \
-                                                                              substation_df['mdot_space_cooling_data_center_and_refrigeration_result_kgpers'].values
+            sum_tret_mdot_cool_space_cooling_and_refrigeration += substation_df['T_return_DC_space_cooling_and_refrigeration_result_K'].values[hours] * \
+                                                                  substation_df['mdot_space_cooling_and_refrigeration_result_kgpers'].values[hours]
+            sum_tret_mdot_cool_space_cooling_data_center_and_refrigeration += substation_df['T_return_DC_space_cooling_data_center_and_refrigeration_result_K'].values[hours] * \
+                                                                              substation_df['mdot_space_cooling_data_center_and_refrigeration_result_kgpers'].values[hours]
 
             # evaluate minimum flows
             mdot_cool_space_cooling_and_refrigeration_netw_min_kgpers = np.vectorize(calc_min_flow)(
                 mdot_cool_space_cooling_and_refrigeration_netw_min_kgpers,
-                substation_df.mdot_space_cooling_and_refrigeration_result_kgpers.values)
+                substation_df.mdot_space_cooling_and_refrigeration_result_kgpers.values[hours])
             mdot_cool_space_cooling_data_center_and_refrigeration_netw_min_kgpers = np.vectorize(calc_min_flow)(
                 mdot_cool_space_cooling_data_center_and_refrigeration_netw_min_kgpers,
-                substation_df.mdot_space_cooling_data_center_and_refrigeration_result_kgpers.values)
+                substation_df.mdot_space_cooling_data_center_and_refrigeration_result_kgpers.values[hours])
             iteration += 1
 
         # calculate thermal losses of distribution
@@ -236,7 +244,7 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
             mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers,
             HEAT_CAPACITY_OF_WATER_JPERKGK, "negative")
 
-        results = pd.DataFrame({"DATE": date,
+        results = pd.DataFrame({"DATE": date[hours],
                                 "mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers": mdot_cool_space_cooling_and_refrigeration_netw_all_kgpers,
                                 "mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers": mdot_cool_space_cooling_data_center_and_refrigeration_netw_all_kgpers,
                                 "Q_DCNf_space_cooling_and_refrigeration_W": Q_DCNf_space_cooling_and_refrigeration_W,
@@ -251,6 +259,9 @@ def network_main(locator, buildings_in_this_network, ground_temp, num_tot_buildi
                                 "Q_DC_space_cooling_data_center_and_refrigeration_losses_W": Q_DC_space_cooling_data_center_and_refrigeration_losses_W})
 
 
+    if typical_days is not None:
+        results = typical_days.expand(results)
+        results['DATE'] = date
     results.to_csv(locator.get_optimization_network_results_summary(network_type, key), index=False, float_format='%.3f')
 
     print(time.perf_counter() - t0, "seconds process time for Network summary for configuration", key)
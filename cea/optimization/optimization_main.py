@@ -89,7 +89,9 @@ def moo_optimization(locator, weather_file, config):
                                                         buildings_cooling_demand,
                                                         weather_file,
                                                         district_heating_network,
-                                                        district_cooling_network)
+                                                        district_cooling_network,
+                                                        config.optimization.number_of_typical_days,
+                                                        config.optimization.typical_days_method)
 
     # optimize conversion systems
     print("SUPPLY SYSTEMS OPTIMIZATION")
@@ -154,7 +156,7 @@ def check_input_files(config, locator):
 
 def demand_files_exist(locator):
     """verify that the necessary demand files exist"""
-    return all(os.path.exists(locator.get_demand_results_file(building_name)) for building_name in
+    return all(os.path.exists(locator.get_demand_results_file.existing_path(building_name)) for building_name in
                locator.get_zone_building_names())
 
 
@@ -458,20 +458,16 @@ def calc_VCC_operation(T_chw_re_K, T_chw_sup_K, mdot_kgpers, VCC_chiller):
     from cea.optimization.constants import VCC_T_COOL_IN
     q_chw_Wh = mdot_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK * (T_chw_re_K - T_chw_sup_K)
     peak_cooling_load = np.nanmax(q_chw_Wh)
-    VCC_operation = np.vectorize(chiller_vapor_compression.calc_VCC)(peak_cooling_load,
-                                                                     q_chw_Wh,
-                                                                     T_chw_sup_K,
-                                                                     T_chw_re_K,
-                                                                     VCC_T_COOL_IN,
-                                                                     VCC_chiller)
-    q_cw_Wh = np.asarray([x['q_cw_W'] for x in VCC_operation])
-    el_VCC_Wh = np.asarray([x['wdot_W'] for x in VCC_operation])
+    VCC_operation = chiller_vapor_compression.calc_VCC(peak_cooling_load, q_chw_Wh, T_chw_sup_K, T_chw_re_K,
+                                                       VCC_T_COOL_IN, VCC_chiller)
+    q_cw_Wh = VCC_operation['q_cw_W']
+    el_VCC_Wh = VCC_operation['wdot_W']
     return el_VCC_Wh, q_cw_Wh, q_chw_Wh
 
 
 def calc_CT_operation(q_CT_load_Wh):
     Q_nom_CT_W = np.max(q_CT_load_Wh)
-    el_CT_Wh = np.vectorize(cooling_tower.calc_CT)(q_CT_load_Wh, Q_nom_CT_W)
+    el_CT_Wh = cooling_tower.calc_CT(q_CT_load_Wh, Q_nom_CT_W)
     return Q_nom_CT_W, el_CT_Wh
 
 
@@ -567,18 +563,18 @@ def initialize_result_tables_for_supply_configurations(Qc_nom_SCU_W):
 def calc_ACH_operation(T_ground_K, T_SC_hw_in_C, T_chw_re_K, T_chw_sup_K, absorption_chiller, mdot_chw_kgpers,
                        ACH_type):
     absorption_chiller = chiller_absorption.AbsorptionChiller(absorption_chiller, ACH_type)
-    SC_to_single_ACH_operation = np.vectorize(chiller_absorption.calc_chiller_main)(mdot_chw_kgpers,
-                                                                                    T_chw_sup_K,
-                                                                                    T_chw_re_K,
-                                                                                    T_SC_hw_in_C,
-                                                                                    T_ground_K,
-                                                                                    absorption_chiller)
-
-    el_ACH_Wh = np.asarray([x['wdot_W'] for x in SC_to_single_ACH_operation])
-    q_chw_ACH_Wh = np.asarray([x['q_chw_W'] for x in SC_to_single_ACH_operation])
-    q_cw_ACH_Wh = np.asarray([x['q_cw_W'] for x in SC_to_single_ACH_operation])
-    q_hw_ACH_Wh = np.asarray([x['q_hw_W'] for x in SC_to_single_ACH_operation])
-    T_hw_out_ACH_K = np.asarray([x['T_hw_out_C'] + 273.15 for x in SC_to_single_ACH_operation])
+    SC_to_single_ACH_operation = chiller_absorption.calc_chiller_main(mdot_chw_kgpers,
+                                                                      T_chw_sup_K,
+                                                                      T_chw_re_K,
+                                                                      T_SC_hw_in_C,
+                                                                      T_ground_K,
+                                                                      absorption_chiller)
+
+    el_ACH_Wh = SC_to_single_ACH_operation['wdot_W']
+    q_chw_ACH_Wh = SC_to_single_ACH_operation['q_chw_W']
+    q_cw_ACH_Wh = SC_to_single_ACH_operation['q_cw_W']
+    q_hw_ACH_Wh = SC_to_single_ACH_operation['q_hw_W']
+    T_hw_out_ACH_K = SC_to_single_ACH_operation['T_hw_out_C'] + 273.15
     return T_hw_out_ACH_K, el_ACH_Wh, q_cw_ACH_Wh, q_hw_ACH_Wh, q_chw_ACH_Wh
 
 
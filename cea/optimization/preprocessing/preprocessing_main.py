@@ -7,12 +7,15 @@ Pre-processing algorithm
 
 
 
+import pandas as pd
+
 from cea.optimization.constants import Z0
 from cea.optimization.distribution.network_optimization_features import NetworkOptimizationFeatures
 from cea.optimization.master import summarize_network
 from cea.resources.geothermal import calc_ground_temperature
 from cea.technologies import substation
 from cea.utilities import epwreader
+from cea.utilities.time_series_aggregation import calc_typical_days
 from cea.technologies.supply_systems_database import SupplySystemsDatabase
 from cea.optimization.lca_calculations import LcaCalculations
 from cea.optimization.prices import Prices as Prices
@@ -37,7 +40,8 @@ class WeatherFeatures(object):
 
 
 def preproccessing(locator, total_demand, buildings_heating_demand, buildings_cooling_demand,
-                   weather_file, district_heating_network, district_cooling_network):
+                   weather_file, district_heating_network, district_cooling_network, number_of_typical_days=0,
+                   typical_days_method='k-medoids'):
     """
     This function aims at preprocessing all data for the optimization.
 
@@ -45,6 +49,9 @@ def preproccessing(locator, total_demand, buildings_heating_demand, buildings_co
     :param total_demand: dataframe with total demand and names of all building in the area
     :param building_names: dataframe with names of all buildings in the area
     :param weather_file: path to wather file
+    :param number_of_typical_days: number of typical days the network summaries and the dispatch of the district cooling
+        network are calculated for (0 for all hours of the year)
+    :param typical_days_method: clustering method of the typical days
     :type locator: class
     :type total_demand: list
     :type building_names: list
@@ -79,6 +86,16 @@ def preproccessing(locator, total_demand, buildings_heating_demand, buildings_co
     lca = LcaCalculations(supply_systems)
 
     print("PRE-PROCESSING 4/4: network features")  # at first estimate a distribution with all the buildings connected
+    if number_of_typical_days:
+        if district_heating_network:
+            typical_days = calc_typical_days_of_network(locator, weather_features, buildings_heating_demand,
+                                                        'QH_sys_kWh', number_of_typical_days, typical_days_method)
+        else:
+            typical_days = calc_typical_days_of_network(locator, weather_features, buildings_cooling_demand,
+                                                        'QC_sys_kWh', number_of_typical_days, typical_days_method)
+    else:
+        typical_days = None
+
     if district_heating_network:
         num_tot_buildings = len(buildings_heating_demand)
         DHN_barcode = ''.join(str(1) for e in range(num_tot_buildings))
@@ -86,7 +103,7 @@ def preproccessing(locator, total_demand, buildings_heating_demand, buildings_co
                                            DHN_barcode=DHN_barcode)
 
         summarize_network.network_main(locator, buildings_heating_demand, weather_features.ground_temp, num_tot_buildings, "DH",
-                                       DHN_barcode)
+                                       DHN_barcode, typical_days)
         # "_all" key for all buildings
     if district_cooling_network:
         num_tot_buildings = len(buildings_cooling_demand)
@@ -95,13 +112,42 @@ def preproccessing(locator, total_demand, buildings_heating_demand, buildings_co
 
         summarize_network.network_main(locator, buildings_cooling_demand,
                                        weather_features.ground_temp, num_tot_buildings, "DC",
-                                       DCN_barcode)  # "_all" key for all buildings
+                                       DCN_barcode, typical_days)  # "_all" key for all buildings
 
     network_features = NetworkOptimizationFeatures(district_heating_network, district_cooling_network, locator)
 
     return weather_features, network_features, prices, lca
 
 
+def calc_typical_days_of_network(locator, weather_features, building_names, load_name, number_of_typical_days,
+                                 typical_days_method):
+    """
+    Cluster the days of the year into typical days (see
+    :py:func:`cea.utilities.time_series_aggregation.calc_typical_days`) by the demand of the buildings that can be
+    connected to the network and the ambient temperature. The day of the highest total demand is one of the typical
+    days. The typical days are saved for the slave routines (see
+    :py:meth:`cea.optimization.slave_inputs.SlaveInputs.get_typical_days`) and the error of the typical days in
+    representing the total demand and the ambient temperature is printed.
+
+    :param list building_names: the buildings that can be connected to the network
+    :param str load_name: the column of the demand results with the demand of the network, e.g. 'QH_sys_kWh'
+    :rtype: cea.utilities.time_series_aggregation.TypicalDays
+    """
+    demands = pd.DataFrame({building_name: locator.get_demand_results_file.read(building_name)[load_name].abs().values
+                            for building_name in building_names})
+    total_demand_kWh = demands.sum(axis=1)
+    profiles = demands.assign(T_ambient_C=weather_features.T_ambient.values)
+    typical_days = calc_typical_days(profiles, number_of_typical_days, typical_days_method,
+                                     peak_profile=total_demand_kWh)
+    typical_days.to_frame().to_csv(locator.get_optimization_typical_days(), index=False)
+
+    errors = typical_days.calc_error_metrics(pd.DataFrame({load_name: total_demand_kWh,
+                                                           'T_ambient_C': weather_features.T_ambient.values}))
+    print('Calculating %i typical days, error of the typical days over the year:' % len(typical_days))
+    print(errors.to_string(float_format='{:.2%}'.format))
+    return typical_days
+
+
 def get_building_names_with_load(total_demand, load_name):
     building_names = total_demand.Name.values
     buildings_names_connected = []
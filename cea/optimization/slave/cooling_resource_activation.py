@@ -3,14 +3,17 @@
 
 
 import numpy as np
+from numba import jit
 
 import cea.technologies.chiller_absorption as chiller_absorption
 import cea.technologies.chiller_vapor_compression as chiller_vapor_compression
 import cea.technologies.cooling_tower as CTModel
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.optimization.constants import VCC_T_COOL_IN, DT_COOL, ACH_T_IN_FROM_CHP_K
+from cea.optimization.slave.daily_storage import load_leveling
 from cea.technologies.constants import G_VALUE_CENTRALIZED  # this is where to differentiate chiller performances
 from cea.technologies.pumps import calc_water_body_uptake_pumping
+from cea.utilities import apply_where, vectorize_where
 import cea.technologies.chiller_absorption
 import pandas as pd
 
@@ -25,7 +28,7 @@ __status__ = "Production"
 
 
 def calc_vcc_operation(Qc_from_VCC_W, T_DCN_re_K, T_DCN_sup_K, T_source_K, chiller_size, VCC_chiller):
-    Qc_from_VCC_W = min(Qc_from_VCC_W, chiller_size) # The chiller can not supply more cooling than the installed capacity allows
+    Qc_from_VCC_W = np.minimum(Qc_from_VCC_W, chiller_size) # The chiller can not supply more cooling than the installed capacity allows
     VCC_operation = chiller_vapor_compression.calc_VCC(chiller_size, Qc_from_VCC_W, T_DCN_sup_K, T_DCN_re_K, T_source_K, VCC_chiller)
 
     # unpack outputs
@@ -59,11 +62,9 @@ def calc_vcc_CT_operation(Qc_from_VCC_W,
 
 def calc_chiller_absorption_operation(Qc_ACH_req_W, T_DCN_re_K, T_DCN_sup_K, T_ACH_in_C, T_ground_K, chiller_prop,
                                       size_ACH_W):
-    if T_DCN_re_K == T_DCN_sup_K:
-        mdot_ACH_kgpers = 0
-    else:
-        mdot_ACH_kgpers = Qc_ACH_req_W / (
-                (T_DCN_re_K - T_DCN_sup_K) * HEAT_CAPACITY_OF_WATER_JPERKGK)  # required chw flow rate from ACH
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mdot_ACH_kgpers = np.where(T_DCN_re_K == T_DCN_sup_K, 0.0, Qc_ACH_req_W / (
+                (T_DCN_re_K - T_DCN_sup_K) * HEAT_CAPACITY_OF_WATER_JPERKGK))  # required chw flow rate from ACH
 
     ACH_operation = chiller_absorption.calc_chiller_main(mdot_ACH_kgpers,
                                                          T_DCN_sup_K,
@@ -168,12 +169,12 @@ def cooling_resource_activator(Q_thermal_req,
             if Qh_CCGT_req_W <= Q_output_CC_max_W:  # Normal operation Possible within partload regime
                 Q_CHP_gen_W = float(Qh_CCGT_req_W)
                 NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = np.float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
+                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
 
             else:  # Only part of the demand can be delivered as 100% load achieved
                 Q_CHP_gen_W = Q_output_CC_max_W
                 NG_Trigen_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_Trigen_NG_gen_W = np.float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
+                E_Trigen_NG_gen_W = float(eta_elec_interpol(NG_Trigen_req_W)) * NG_Trigen_req_W
         else:
             Q_Trigen_gen_W = 0.0
             NG_Trigen_req_W = 0.0
@@ -390,3 +391,253 @@ def cooling_resource_activator(Q_thermal_req,
     }
 
     return daily_storage_class, thermal_output, electricity_output, gas_output
+
+
+def cooling_resource_dispatch(Q_thermal_req_W,
+                              T_district_cooling_supply_K,
+                              T_district_cooling_return_K,
+                              Q_therm_Lake_W,
+                              T_source_average_Lake_K,
+                              daily_storage_class,
+                              T_ground_K,
+                              master_to_slave_variables,
+                              absorption_chiller,
+                              CCGT_operation_data,
+                              VCC_chiller):
+    """
+    The dispatch of :py:func:`cooling_resource_activator` for all hours of the year at once.
+
+    Whether a technology can be activated in an hour does not depend on the other hours and is calculated for the
+    whole year in array form. Only the daily storage (charged with the spare capacity of a technology and discharged
+    when a technology runs at full load) links the hours: the allocation of the load in the merit order is calculated
+    hour by hour with the state of the storage in a compiled loop (:py:func:`calc_cooling_merit_order`). The operation
+    of each technology is then calculated for the hours it was activated.
+
+    The arguments are those of :py:func:`cooling_resource_activator`, with one value per hour instead of a scalar.
+
+    :param cea.optimization.slave.daily_storage.load_leveling.LoadLevelingDailyStorage daily_storage_class: the daily
+        storage, with the state at the beginning of the year (it is updated to the state at the end of the year)
+    :param cea.technologies.chiller_absorption.AbsorptionChiller absorption_chiller: absorption chiller of the trigen
+    :return: the daily storage and the thermal, electricity and gas outputs of :py:func:`cooling_resource_activator`
+        with one array per output
+    :rtype: tuple
+    """
+    Q_thermal_req_W = np.asarray(Q_thermal_req_W, dtype=float)
+    T_district_cooling_supply_K = np.asarray(T_district_cooling_supply_K, dtype=float)
+    T_district_cooling_return_K = np.asarray(T_district_cooling_return_K, dtype=float)
+    Q_therm_Lake_W = np.asarray(Q_therm_Lake_W, dtype=float)
+    T_source_average_Lake_K = np.asarray(T_source_average_Lake_K, dtype=float)
+    T_ground_K = np.asarray(T_ground_K, dtype=float)
+    number_of_hours = len(Q_thermal_req_W)
+
+    # CONDITIONS OF ACTIVATION (the unmet cooling load is checked in the merit order)
+    network_operating = (Q_thermal_req_W > 0.0) & ~np.isclose(T_district_cooling_supply_K,
+                                                               T_district_cooling_return_K)
+    lake_available = network_operating & (T_source_average_Lake_K < VCC_T_COOL_IN)
+
+    # the trigen is the first technology in the merit order: whether the CCGT can provide the heat required by the
+    # absorption chiller only depends on the load of the network
+    size_trigen_W = master_to_slave_variables.NG_Trigen_ACH_size_W
+    T_ACH_in_C = ACH_T_IN_FROM_CHP_K - 273
+    if master_to_slave_variables.NG_Trigen_on == 1:
+        _, Qh_CCGT_req_W, _ = apply_where(calc_chiller_absorption_operation, network_operating, 3,
+                                          np.minimum(Q_thermal_req_W, size_trigen_W),
+                                          T_district_cooling_return_K,
+                                          T_district_cooling_supply_K,
+                                          T_ACH_in_C,
+                                          T_ground_K,
+                                          absorption_chiller,
+                                          size_trigen_W)
+        trigen_available = network_operating & (Qh_CCGT_req_W >= CCGT_operation_data['q_output_min_W'])
+    else:
+        trigen_available = np.zeros(number_of_hours, dtype=bool)
+
+    # one row per technology, in the merit order of cooling_resource_activator: trigen, base and peak water-source VCC,
+    # base and peak air-source VCC
+    technology_available = np.array([trigen_available,
+                                     lake_available & (master_to_slave_variables.WS_BaseVCC_on == 1),
+                                     lake_available & (master_to_slave_variables.WS_PeakVCC_on == 1),
+                                     network_operating & (master_to_slave_variables.AS_BaseVCC_on == 1),
+                                     network_operating & (master_to_slave_variables.AS_PeakVCC_on == 1)])
+    technology_size_W = np.array([size_trigen_W,
+                                  master_to_slave_variables.WS_BaseVCC_size_W,
+                                  master_to_slave_variables.WS_PeakVCC_size_W,
+                                  master_to_slave_variables.AS_BaseVCC_size_W,
+                                  master_to_slave_variables.AS_PeakVCC_size_W], dtype=float)
+    technology_uses_lake = np.array([False, True, True, False, False])
+
+    # MERIT ORDER WITH THE DAILY STORAGE
+    storage = daily_storage_class.as_array()
+    activated, \
+    Q_gen_directload_W, \
+    Q_gen_storage_W, \
+    Q_DailyStorage_gen_directload_W, \
+    Q_cooling_unmet_W = calc_cooling_merit_order(Q_thermal_req_W,
+                                                 Q_therm_Lake_W,
+                                                 technology_available,
+                                                 technology_size_W,
+                                                 technology_uses_lake,
+                                                 storage)
+    daily_storage_class.set_state(storage)
+    Q_gen_W = Q_gen_directload_W + Q_gen_storage_W
+
+    # OPERATION OF THE TECHNOLOGIES
+    # trigen
+    trigen_activated = activated[0]
+    _, Qh_CCGT_req_W, _ = apply_where(calc_chiller_absorption_operation, trigen_activated, 3,
+                                      Q_gen_W[0],
+                                      T_district_cooling_return_K,
+                                      T_district_cooling_supply_K,
+                                      T_ACH_in_C,
+                                      T_ground_K,
+                                      absorption_chiller,
+                                      size_trigen_W)
+    NG_Trigen_req_W = np.zeros(number_of_hours)
+    E_Trigen_NG_gen_W = np.zeros(number_of_hours)
+    if trigen_activated.any():
+        # only part of the demand can be delivered above the maximum load of the CCGT
+        Q_CHP_gen_W = np.minimum(Qh_CCGT_req_W[trigen_activated], CCGT_operation_data['q_output_max_W'])
+        NG_Trigen_req_W[trigen_activated] = CCGT_operation_data['q_input_fn_q_output_W'](Q_CHP_gen_W)
+        E_Trigen_NG_gen_W[trigen_activated] = CCGT_operation_data['eta_el_fn_q_input'](
+            NG_Trigen_req_W[trigen_activated]) * NG_Trigen_req_W[trigen_activated]
+
+    # water-source VCC: with the lake water as the source of the chiller or, if the lake is cold enough, as a bypass
+    E_VCC_WS_req_W = []
+    for technology, size_W in [(1, master_to_slave_variables.WS_BaseVCC_size_W),
+                               (2, master_to_slave_variables.WS_PeakVCC_size_W)]:
+        chiller_activated = activated[technology] & (
+                T_source_average_Lake_K > T_district_cooling_supply_K - DT_COOL)
+        _, E_VCC_req_W = apply_where(calc_vcc_operation, chiller_activated, 2,
+                                     Q_gen_W[technology],
+                                     T_district_cooling_return_K,
+                                     T_district_cooling_supply_K,
+                                     T_source_average_Lake_K,
+                                     size_W,
+                                     VCC_chiller)
+        E_pump_WS_req_W, = vectorize_where(calc_water_body_uptake_pumping, activated[technology], 1,
+                                           Q_gen_W[technology],
+                                           T_district_cooling_return_K,
+                                           T_district_cooling_supply_K)
+        E_VCC_WS_req_W.append(E_VCC_req_W + E_pump_WS_req_W)
+
+    # air-source VCC with a cooling tower
+    E_VCC_AS_req_W = []
+    for technology, size_W in [(3, master_to_slave_variables.AS_BaseVCC_size_W),
+                               (4, master_to_slave_variables.AS_PeakVCC_size_W)]:
+        _, E_VCC_req_W = apply_where(calc_vcc_CT_operation, activated[technology], 2,
+                                     Q_gen_W[technology],
+                                     T_district_cooling_return_K,
+                                     T_district_cooling_supply_K,
+                                     VCC_T_COOL_IN,
+                                     size_W,
+                                     VCC_chiller)
+        E_VCC_AS_req_W.append(E_VCC_req_W)
+
+    # as in cooling_resource_activator, the direct load of the base VCC is not reported for the hours the peak VCC
+    # (air-source) is not activated
+    Q_BaseVCC_AS_gen_directload_W = np.where(activated[4], Q_gen_directload_W[3], 0.0)
+
+    # the back-up chiller covers the rest
+    Q_BackupVCC_AS_gen_W = np.where(Q_cooling_unmet_W > 1.0E-3, Q_cooling_unmet_W, 0.0)
+
+    ## writing outputs
+    electricity_output = {
+        'E_BaseVCC_WS_req_W': E_VCC_WS_req_W[0],
+        'E_PeakVCC_WS_req_W': E_VCC_WS_req_W[1],
+        'E_BaseVCC_AS_req_W': E_VCC_AS_req_W[0],
+        'E_PeakVCC_AS_req_W': E_VCC_AS_req_W[1],
+        'E_Trigen_NG_gen_W': E_Trigen_NG_gen_W
+    }
+
+    thermal_output = {
+        # cooling total
+        'Q_Trigen_NG_gen_W': Q_gen_W[0],
+        'Q_BaseVCC_WS_gen_W': Q_gen_W[1],
+        'Q_PeakVCC_WS_gen_W': Q_gen_W[2],
+        'Q_BaseVCC_AS_gen_W': Q_gen_W[3],
+        'Q_PeakVCC_AS_gen_W': Q_gen_W[4],
+        'Q_BackupVCC_AS_gen_W': Q_BackupVCC_AS_gen_W,
+
+        # cooling to direct load
+        'Q_DailyStorage_gen_directload_W': Q_DailyStorage_gen_directload_W,
+        "Q_Trigen_NG_gen_directload_W": Q_gen_directload_W[0],
+        "Q_BaseVCC_WS_gen_directload_W": Q_gen_directload_W[1],
+        "Q_PeakVCC_WS_gen_directload_W": Q_gen_directload_W[2],
+        "Q_BaseVCC_AS_gen_directload_W": Q_BaseVCC_AS_gen_directload_W,
+        "Q_PeakVCC_AS_gen_directload_W": Q_gen_directload_W[4],
+        "Q_BackupVCC_AS_directload_W": Q_BackupVCC_AS_gen_W.copy(),
+    }
+
+    gas_output = {
+        'NG_Trigen_req_W': NG_Trigen_req_W
+    }
+
+    return daily_storage_class, thermal_output, electricity_output, gas_output
+
+
+@jit(nopython=True, cache=True)
+def calc_cooling_merit_order(Q_thermal_req_W,
+                             Q_therm_Lake_W,
+                             technology_available,
+                             technology_size_W,
+                             technology_uses_lake,
+                             storage):
+    """
+    Allocate the cooling load of each hour to the technologies in their merit order, as
+    :py:func:`cooling_resource_activator`: a technology covers the unmet load up to its size and charges the daily
+    storage with its spare capacity, or discharges the storage if the unmet load is larger than its size.
+
+    :param Q_thermal_req_W: cooling load of the network in each hour
+    :param Q_therm_Lake_W: thermal potential of the lake in each hour, shared by the technologies using the lake
+    :param technology_available: boolean array (technologies x hours), True if a technology can be activated
+    :param technology_size_W: the size of each technology
+    :param technology_uses_lake: boolean array, True for the technologies limited by the potential of the lake
+    :param storage: the daily storage (see
+        :py:meth:`cea.optimization.slave.daily_storage.load_leveling.LoadLevelingDailyStorage.as_array`), its state
+        is updated hour by hour
+    :return: activated (technologies x hours, True if a technology was activated), the cooling of each technology to
+        the direct load and to the storage (technologies x hours), the cooling from the storage and the unmet load in
+        each hour
+    """
+    number_of_technologies, number_of_hours = technology_available.shape
+    activated = np.zeros((number_of_technologies, number_of_hours), dtype=np.bool_)
+    Q_gen_directload_W = np.zeros((number_of_technologies, number_of_hours))
+    Q_gen_storage_W = np.zeros((number_of_technologies, number_of_hours))
+    Q_DailyStorage_gen_directload_W = np.zeros(number_of_hours)
+    Q_cooling_unmet_W = np.zeros(number_of_hours)
+    for hour in range(number_of_hours):
+        Q_unmet_W = Q_thermal_req_W[hour]
+        Q_lake_W = Q_therm_Lake_W[hour]
+        Q_from_storage_total_W = 0.0
+        for technology in range(number_of_technologies):
+            if not technology_available[technology, hour] or not Q_unmet_W > 0.0:
+                continue
+            if technology_uses_lake[technology]:
+                Q_capacity_W = min(technology_size_W[technology], Q_lake_W)
+            else:
+                Q_capacity_W = technology_size_W[technology]
+
+            if Q_unmet_W > Q_capacity_W:
+                Q_directload_W = Q_capacity_W
+                Q_to_storage_W = 0.0
+                Qc_from_storage_W = load_leveling.discharge_storage_array(storage, Q_unmet_W - Q_capacity_W)
+            else:
+                Q_directload_W = Q_unmet_W
+                Q_to_storage_W = load_leveling.charge_storage_array(storage, Q_capacity_W - Q_unmet_W)
+                Qc_from_storage_W = 0.0
+
+            if technology_uses_lake[technology]:
+                Q_gen_W = Q_directload_W + Q_to_storage_W
+                Q_lake_W -= Q_gen_W  # discount availability
+                Q_unmet_W = Q_unmet_W - Q_gen_W - Qc_from_storage_W + Q_to_storage_W
+            else:
+                Q_unmet_W = Q_unmet_W - Q_directload_W - Qc_from_storage_W
+            Q_from_storage_total_W += Qc_from_storage_W
+
+            activated[technology, hour] = True
+            Q_gen_directload_W[technology, hour] = Q_directload_W
+            Q_gen_storage_W[technology, hour] = Q_to_storage_W
+        Q_DailyStorage_gen_directload_W[hour] = Q_from_storage_total_W
+        Q_cooling_unmet_W[hour] = Q_unmet_W
+
+    return activated, Q_gen_directload_W, Q_gen_storage_W, Q_DailyStorage_gen_directload_W, Q_cooling_unmet_W
@@ -1,8 +1,22 @@
 
 
 
+import numpy as np
+from numba.extending import register_jitable
+
 import cea.technologies.storage_tank as storage_tank
 
+# index of the properties and the state of the storage in the array used by the compiled dispatch of the district
+# cooling (see LoadLevelingDailyStorage.as_array)
+STORAGE_ON = 0
+CHARGING_LIMIT_W = 1
+V_TANK_M3 = 2
+AREA_TANK_SURFACE_M2 = 3
+T_GROUND_AVERAGE_K = 4
+EMPTY_CAPACITY_W = 5
+FILLED_CAPACITY_W = 6
+T_TANK_K = 7
+
 
 class LoadLevelingDailyStorage(object):
     def __init__(self, storage_on, Qc_tank_charging_limit_W, T_tank_fully_charged_K, T_tank_fully_discharged_K,
@@ -68,3 +82,80 @@ class LoadLevelingDailyStorage(object):
             Q_from_storage_possible_W = 0.0
 
         return Q_from_storage_possible_W
+
+    def as_array(self):
+        """
+        The properties and the current state of the storage as an array of floats, for the compiled dispatch of the
+        district cooling (see :py:func:`charge_storage_array` and :py:func:`discharge_storage_array`). The state is
+        copied back with :py:meth:`set_state`.
+        """
+        storage = np.zeros(8)
+        storage[STORAGE_ON] = 1.0 if self.storage_on else 0.0
+        storage[CHARGING_LIMIT_W] = self.Qc_tank_charging_limit_W
+        storage[V_TANK_M3] = self.V_tank_m3
+        storage[AREA_TANK_SURFACE_M2] = self.Area_tank_surface_m2
+        storage[T_GROUND_AVERAGE_K] = self.T_ground_average_K
+        storage[EMPTY_CAPACITY_W] = self.Q_current_storage_empty_capacity_W
+        storage[FILLED_CAPACITY_W] = self.Q_current_storage_filled_capacity_W
+        storage[T_TANK_K] = self.T_tank_K
+        return storage
+
+    def set_state(self, storage):
+        """Copy the state of the storage from an array created by :py:meth:`as_array`"""
+        self.Q_current_storage_empty_capacity_W = float(storage[EMPTY_CAPACITY_W])
+        self.Q_current_storage_filled_capacity_W = float(storage[FILLED_CAPACITY_W])
+        self.T_tank_K = float(storage[T_TANK_K])
+
+
+@register_jitable
+def storage_temperature_array(storage, Qc_from_Tank_W, Qc_to_tank_W):
+    """
+    :py:meth:`LoadLevelingDailyStorage.storage_temperature` for the array of
+    :py:meth:`LoadLevelingDailyStorage.as_array` (the fully mixed tank is solved with a single step over the hour, as
+    by the compiled kernel of :py:func:`cea.technologies.storage_tank.calc_tank_temperature`).
+    """
+    T_tank_C = storage[T_TANK_K] - 273
+    T_ground_C = storage[T_GROUND_AVERAGE_K] - 273
+    q_loss_W = storage_tank.calc_cold_tank_heat_loss(storage[AREA_TANK_SURFACE_M2], T_tank_C, T_ground_C)
+    return T_tank_C + storage_tank.ode_cold_water_tank(T_tank_C, 0.0, q_loss_W, Qc_from_Tank_W, Qc_to_tank_W,
+                                                       storage[V_TANK_M3])
+
+
+@register_jitable
+def charge_storage_array(storage, Q_request_W):
+    """
+    :py:meth:`LoadLevelingDailyStorage.charge_storage` for the array of :py:meth:`LoadLevelingDailyStorage.as_array`
+    """
+    if storage[STORAGE_ON] != 0.0 and storage[FILLED_CAPACITY_W] != storage[CHARGING_LIMIT_W]:
+        if Q_request_W < storage[EMPTY_CAPACITY_W]:
+            Q_to_storage_possible_W = Q_request_W
+        else:
+            Q_to_storage_possible_W = storage[EMPTY_CAPACITY_W]
+
+        storage[T_TANK_K] = storage_temperature_array(storage, 0.0, Q_to_storage_possible_W)
+        storage[EMPTY_CAPACITY_W] = storage[EMPTY_CAPACITY_W] - Q_to_storage_possible_W
+        storage[FILLED_CAPACITY_W] = storage[CHARGING_LIMIT_W] - storage[EMPTY_CAPACITY_W]
+    else:
+        Q_to_storage_possible_W = 0.0
+
+    return Q_to_storage_possible_W
+
+
+@register_jitable
+def discharge_storage_array(storage, Q_request_W):
+    """
+    :py:meth:`LoadLevelingDailyStorage.discharge_storage` for the array of :py:meth:`LoadLevelingDailyStorage.as_array`
+    """
+    if storage[STORAGE_ON] != 0.0 and storage[EMPTY_CAPACITY_W] != storage[CHARGING_LIMIT_W]:
+        if Q_request_W < storage[FILLED_CAPACITY_W]:
+            Q_from_storage_possible_W = Q_request_W
+        else:
+            Q_from_storage_possible_W = storage[FILLED_CAPACITY_W]
+
+        storage[T_TANK_K] = storage_temperature_array(storage, Q_from_storage_possible_W, 0.0)
+        storage[EMPTY_CAPACITY_W] = storage[EMPTY_CAPACITY_W] + Q_from_storage_possible_W
+        storage[FILLED_CAPACITY_W] = storage[FILLED_CAPACITY_W] - Q_from_storage_possible_W
+    else:
+        Q_from_storage_possible_W = 0.0
+
+    return Q_from_storage_possible_W
@@ -12,7 +12,6 @@ and recalculates the imports from grid and exports to the grid
 import os
 
 import numpy as np
-import pandas as pd
 
 import cea.technologies.solar.photovoltaic as pv
 from cea.constants import HOURS_IN_YEAR
@@ -293,7 +292,8 @@ def electricity_activation_curve(E_CHP_gen_W,
 def calc_district_system_electricity_generated(locator,
                                                master_to_slave_vars):
     # TECHNOLOGEIS THAT ONLY GENERATE ELECTRICITY
-    E_PV_gen_W = calc_available_generation_PV(locator, master_to_slave_vars.building_names_all,
+    E_PV_gen_W = calc_available_generation_PV(master_to_slave_vars.slave_inputs,
+                                              master_to_slave_vars.building_names_all,
                                               master_to_slave_vars.PV_share)
 
     district_electricity_generation_dispatch = {
@@ -303,16 +303,16 @@ def calc_district_system_electricity_generated(locator,
     return district_electricity_generation_dispatch
 
 
-def calc_available_generation_PV(locator, buildings, share_allowed):
+def calc_available_generation_PV(slave_inputs, buildings, share_allowed):
     """
-    :param cea.inputlocator.InputLocator locator:
+    :param cea.optimization.slave_inputs.SlaveInputs slave_inputs:
     :param buildings:
     :param share_allowed:
     :return:
     """
     E_PV_gen_kWh = np.zeros(HOURS_IN_YEAR)
     for building in buildings:
-        building_PVT = pd.read_csv(locator.PV_results(building)).fillna(value=0.0)
+        building_PVT = slave_inputs.get_PV_results(building)
         E_PV_gen_kWh += building_PVT['E_PV_gen_kWh']
     E_PVT_gen_Wh = E_PV_gen_kWh * share_allowed * 1000
     return E_PVT_gen_Wh
@@ -340,6 +340,8 @@ def calc_district_system_electricity_requirements(master_to_slave_vars,
 
 
 def extract_electricity_demand_buildings(master_to_slave_vars, building_names, locator):
+    slave_inputs = master_to_slave_vars.slave_inputs
+
     # store the names of the buildings connected to district heating or district cooling
     buildings_district_scale_to_district_heating = master_to_slave_vars.buildings_district_scale_to_district_heating
     buildings_district_scale_to_district_cooling = master_to_slave_vars.buildings_district_scale_to_district_cooling
@@ -362,7 +364,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
 
     # for all buildings with electricity demand
     for name in building_names:  # adding the electricity demand of
-        building_demand = pd.read_csv(locator.get_demand_results_file(name))
+        building_demand = slave_inputs.get_demand(name)
         # end-use electrical demands
         Eal_req_W += (building_demand['Eal_kWh'] * 1000).values
         Edata_req_W += (building_demand['Edata_kWh'] * 1000).values
@@ -372,7 +374,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = slave_inputs.get_demand(name)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)
@@ -392,9 +394,9 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
                                   building_demand['E_ww_kWh']) * 1000).values  # to W
                 E_cs_cre_cdata_req_W += np.zeros(HOURS_IN_YEAR)
             else:
-                building_dencentralized_system_heating = pd.read_csv(
+                building_dencentralized_system_heating = slave_inputs.read(
                     locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
-                building_dencentralized_system_cooling = pd.read_csv(
+                building_dencentralized_system_cooling = slave_inputs.read(
                     locator.get_optimization_decentralized_folder_building_cooling_activation(name))
                 E_hs_ww_req_building_scale_W += building_dencentralized_system_heating['E_hs_ww_req_W'].values
                 E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system_cooling['E_cs_cre_cdata_req_W'].values
@@ -402,7 +404,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
     # if only a district heating network exists.
     elif master_to_slave_vars.DHN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = slave_inputs.get_demand(name)
             if name in buildings_district_scale_to_district_heating:
                 # if connected to the heating network
                 E_hs_ww_req_W += np.zeros(HOURS_IN_YEAR)  # because it is connected to the heating network
@@ -420,14 +422,14 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
                                          building_demand['E_cdata_kWh']) * 1000).values  # to W
                 if name in building_names_heating:
                     # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
+                    building_dencentralized_system = slave_inputs.read(
                         locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
                     E_hs_ww_req_building_scale_W += building_dencentralized_system['E_hs_ww_req_W'].values
 
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = slave_inputs.get_demand(name)
             E_hs_ww_req_W += ((building_demand['E_hs_kWh'] +
                                building_demand['E_ww_kWh']) * 1000).values  # to W
             if name in buildings_district_scale_to_district_cooling:
@@ -435,7 +437,7 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
             else:
                 if name in building_names_cooling:
                     # if there is a decentralized cooling use it.
-                    building_dencentralized_system = pd.read_csv(
+                    building_dencentralized_system = slave_inputs.read(
                         locator.get_optimization_decentralized_folder_building_cooling_activation(name))
                     E_cs_cre_cdata_req_building_scale_W += building_dencentralized_system['E_cs_cre_cdata_req_W'].values
 
@@ -457,6 +459,8 @@ def extract_electricity_demand_buildings(master_to_slave_vars, building_names, l
 
 
 def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator):
+    slave_inputs = master_to_slave_vars.slave_inputs
+
     # store the names of the buildings connected to district heating or district cooling
     buildings_district_scale_to_district_heating = master_to_slave_vars.buildings_district_scale_to_district_heating
     buildings_district_scale_to_district_cooling = master_to_slave_vars.buildings_district_scale_to_district_cooling
@@ -470,7 +474,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # when the two networks are present
     if master_to_slave_vars.DHN_exists and master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = slave_inputs.get_demand(name)
             if name in buildings_district_scale_to_district_heating and name in buildings_district_scale_to_district_cooling:
                 # if connected to the heating network
                 NG_hs_ww_req_W += 0.0
@@ -480,7 +484,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
             elif name in buildings_district_scale_to_district_cooling:
                 NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
             else:
-                building_dencentralized_system_heating = pd.read_csv(
+                building_dencentralized_system_heating = slave_inputs.read(
                     locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
                 NG_hs_ww_req_W += building_dencentralized_system_heating['NG_BackupBoiler_req_Wh'] + \
                                   building_dencentralized_system_heating['NG_Boiler_req_Wh']
@@ -495,7 +499,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
                 # if not then get airconditioning loads of the baseline
                 if name in building_names_heating:
                     # if there is a decentralized heating use it.
-                    building_dencentralized_system = pd.read_csv(
+                    building_dencentralized_system = slave_inputs.read(
                         locator.get_optimization_decentralized_folder_building_result_heating_activation(name))
                     NG_hs_ww_req_W += building_dencentralized_system['NG_BackupBoiler_req_Wh'] + \
                                       building_dencentralized_system['NG_Boiler_req_Wh']
@@ -506,7 +510,7 @@ def extract_fuels_demand_buildings(master_to_slave_vars, building_names, locator
     # if only a district cooling network exists.
     elif master_to_slave_vars.DCN_exists:
         for name in building_names:
-            building_demand = pd.read_csv(locator.get_demand_results_file(name))
+            building_demand = slave_inputs.get_demand(name)
             # if not then get electric boilers etc form baseline.
             NG_hs_ww_req_W += (building_demand['NG_hs_kWh'] + building_demand['NG_ww_kWh']) * 1000  # to W
 
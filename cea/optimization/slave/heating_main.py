@@ -9,13 +9,11 @@ USING PRESET ORDER
 
 
 import numpy as np
-import pandas as pd
 
 from cea.constants import HOURS_IN_YEAR
 from cea.optimization.master import cost_model
-from cea.optimization.slave.heating_resource_activation import heating_source_activator
+from cea.optimization.slave.heating_resource_activation import heating_source_dispatch, backup_boiler_dispatch
 from cea.optimization.slave.seasonal_storage import storage_main
-from cea.technologies.boiler import cond_boiler_op_cost
 
 __author__ = "Tim Vollrath"
 __copyright__ = "Copyright 2017, Architecture and Building Systems - ETH Zurich"
@@ -101,7 +99,7 @@ def district_heating_network(locator,
         # FIXED ORDER ACTIVATION STARTS
         # Import Data - Sewage heat
         if master_to_slave_variables.HPSew_on == 1:
-            HPSew_Data = pd.read_csv(locator.get_sewage_heat_potential())
+            HPSew_Data = master_to_slave_variables.slave_inputs.read(locator.get_sewage_heat_potential())
             Q_therm_Sew = np.array(HPSew_Data['Qsw_kW']) * 1E3
             Q_therm_Sew_W = [
                 x if x < master_to_slave_variables.HPSew_maxSize_W else master_to_slave_variables.HPSew_maxSize_W for x
@@ -114,7 +112,7 @@ def district_heating_network(locator,
 
         # Import Data - lake heat
         if master_to_slave_variables.HPLake_on == 1:
-            HPlake_Data = pd.read_csv(locator.get_water_body_potential())
+            HPlake_Data = master_to_slave_variables.slave_inputs.read(locator.get_water_body_potential())
             Q_therm_Lake = np.array(HPlake_Data['QLake_kW']) * 1E3
             Q_therm_Lake_W = [
                 x if x < master_to_slave_variables.HPLake_maxSize_W else master_to_slave_variables.HPLake_maxSize_W for
@@ -127,7 +125,7 @@ def district_heating_network(locator,
 
         # Import Data - geothermal (shallow)
         if master_to_slave_variables.GHP_on == 1:
-            GHP_Data = pd.read_csv(locator.get_geothermal_potential())
+            GHP_Data = master_to_slave_variables.slave_inputs.read(locator.get_geothermal_potential())
             Q_therm_GHP = np.array(GHP_Data['QGHP_kW']) * 1E3
             Q_therm_GHP_W = [
                 x if x < master_to_slave_variables.GHP_maxSize_W else master_to_slave_variables.GHP_maxSize_W
@@ -159,17 +157,17 @@ def district_heating_network(locator,
         NG_BaseBoiler_req_W, \
         NG_PeakBoiler_req_W, \
         WetBiomass_Furnace_req_W, \
-        DryBiomass_Furnace_req_W = np.vectorize(heating_source_activator)(Q_thermal_req_W,
-                                                                          master_to_slave_variables,
-                                                                          Q_therm_GHP_W,
-                                                                          T_source_average_GHP_W,
-                                                                          T_source_average_Lake_K,
-                                                                          Q_therm_Lake_W,
-                                                                          Q_therm_Sew_W,
-                                                                          T_source_average_sewage_K,
-                                                                          T_district_heating_supply_K,
-                                                                          T_district_heating_return_K
-                                                                          )
+        DryBiomass_Furnace_req_W = heating_source_dispatch(Q_thermal_req_W,
+                                                           master_to_slave_variables,
+                                                           Q_therm_GHP_W,
+                                                           T_source_average_GHP_W,
+                                                           T_source_average_Lake_K,
+                                                           Q_therm_Lake_W,
+                                                           Q_therm_Sew_W,
+                                                           T_source_average_sewage_K,
+                                                           T_district_heating_supply_K,
+                                                           T_district_heating_return_K
+                                                           )
 
         # COgen size for electricity production
         master_to_slave_variables.CCGT_SIZE_electrical_W = max(E_CHP_gen_W)
@@ -177,15 +175,11 @@ def district_heating_network(locator,
         master_to_slave_variables.DBFurnace_electrical_W = max(E_Furnace_dry_gen_W)
 
         # BACK-UP BOILER
-        master_to_slave_variables.BackupBoiler_size_W = np.amax(Q_BackupBoiler_gen_W)
+        master_to_slave_variables.BackupBoiler_size_W, \
+        NG_BackupBoiler_req_W, \
+        E_BackupBoiler_req_W = backup_boiler_dispatch(Q_BackupBoiler_gen_W, T_district_heating_return_K)
         if master_to_slave_variables.BackupBoiler_size_W != 0:
             master_to_slave_variables.BackupBoiler_on = 1
-            NG_BackupBoiler_req_W, E_BackupBoiler_req_W = np.vectorize(cond_boiler_op_cost)(Q_BackupBoiler_gen_W,
-                                                                                            master_to_slave_variables.BackupBoiler_size_W,
-                                                                                            T_district_heating_return_K)
-        else:
-            E_BackupBoiler_req_W = np.zeros(HOURS_IN_YEAR)
-            NG_BackupBoiler_req_W = np.zeros(HOURS_IN_YEAR)
 
         # CAPEX (ANNUAL, TOTAL) AND OPEX (FIXED, VAR) GENERATION UNITS
         mdotnMax_kgpers = np.amax(mdot_DH_kgpers)
@@ -11,6 +11,7 @@ from cea.technologies.constants import BOILER_MIN
 from cea.technologies.furnace import furnace_op_cost
 from cea.technologies.heatpumps import GHP_op_cost, HPSew_op_cost, HPLake_op_cost
 from cea.technologies.pumps import calc_water_body_uptake_pumping
+from cea.utilities import vectorize_where
 
 __author__ = "Sreepathi Bhargava Krishna"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -62,11 +63,11 @@ def heating_source_activator(Q_therm_req_W,
             if Q_heat_unmet_W <= Q_output_CC_max_W:  # Normal operation Possible within partload regime
                 Q_CHP_gen_W = Q_heat_unmet_W
                 NG_CHP_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_CHP_gen_W = np.float(eta_elec_interpol(NG_CHP_req_W)) * NG_CHP_req_W
+                E_CHP_gen_W = float(eta_elec_interpol(NG_CHP_req_W)) * NG_CHP_req_W
             else:  # Only part of the demand can be delivered as 100% load achieved
                 Q_CHP_gen_W = Q_output_CC_max_W
                 NG_CHP_req_W = Q_used_prim_CC_fn_W(Q_CHP_gen_W)
-                E_CHP_gen_W = np.float(eta_elec_interpol(NG_CHP_req_W)) * NG_CHP_req_W
+                E_CHP_gen_W = float(eta_elec_interpol(NG_CHP_req_W)) * NG_CHP_req_W
         else:
             NG_CHP_req_W = 0.0
             E_CHP_gen_W = 0.0
@@ -275,3 +276,201 @@ def heating_source_activator(Q_therm_req_W,
            NG_PeakBoiler_req_W, \
            WetBiomass_Furnace_req_W, \
            DryBiomass_Furnace_req_W
+
+
+def heating_source_dispatch(Q_therm_req_W,
+                            master_to_slave_vars,
+                            Q_therm_GHP_W,
+                            TretGHPArray_K,
+                            TretLakeArray_K,
+                            Q_therm_Lake_W,
+                            Q_therm_Sew_W,
+                            TretsewArray_K,
+                            tdhsup_K,
+                            tdhret_req_K):
+    """
+    The activation of :py:func:`heating_source_activator` for all hours of the year at once.
+
+    The technologies are activated one after the other in their merit order, each for all hours of the year in array
+    form: the unmet heating load is an array that is reduced by each technology. The operation of a technology is only
+    calculated for the hours it is activated and the part load curves of the CCGT are only calculated once for each
+    supply temperature of the network (instead of once per hour).
+
+    The arguments are those of :py:func:`heating_source_activator`, with one value per hour instead of a scalar.
+
+    :return: the outputs of :py:func:`heating_source_activator`, with one array per output
+    :rtype: tuple
+    """
+    Q_therm_req_W = np.asarray(Q_therm_req_W, dtype=float)
+    Q_therm_GHP_W = np.asarray(Q_therm_GHP_W, dtype=float)
+    TretGHPArray_K = np.asarray(TretGHPArray_K, dtype=float)
+    TretLakeArray_K = np.asarray(TretLakeArray_K, dtype=float)
+    Q_therm_Lake_W = np.asarray(Q_therm_Lake_W, dtype=float)
+    Q_therm_Sew_W = np.asarray(Q_therm_Sew_W, dtype=float)
+    TretsewArray_K = np.asarray(TretsewArray_K, dtype=float)
+    tdhsup_K = np.asarray(tdhsup_K, dtype=float)
+    tdhret_req_K = np.asarray(tdhret_req_K, dtype=float)
+    network_operating = ~np.isclose(tdhsup_K, tdhret_req_K)
+
+    ## initializing unmet heating load
+    Q_heat_unmet_W = Q_therm_req_W.copy()
+
+    # ACTIVATE THE COGEN
+    NG_CHP_req_W = np.zeros(len(Q_heat_unmet_W))
+    E_CHP_gen_W = np.zeros(len(Q_heat_unmet_W))
+    Q_CHP_gen_W = np.zeros(len(Q_heat_unmet_W))
+    if master_to_slave_vars.CC_on == 1:
+        CHP_on = Q_heat_unmet_W > 0.0
+        for T_supply_K in np.unique(tdhsup_K[CHP_on]):
+            CC_op_cost_data = calc_cop_CCGT(master_to_slave_vars.CCGT_SIZE_W, T_supply_K, "NG")
+            # operation possible if above minimal load
+            hours = CHP_on & (tdhsup_K == T_supply_K) & (Q_heat_unmet_W >= CC_op_cost_data['q_output_min_W'])
+            if hours.any():
+                # only part of the demand can be delivered above the maximum load
+                Q_CHP_gen_W[hours] = np.where(Q_heat_unmet_W[hours] <= CC_op_cost_data['q_output_max_W'],
+                                              Q_heat_unmet_W[hours], CC_op_cost_data['q_output_max_W'])
+                NG_CHP_req_W[hours] = CC_op_cost_data['q_input_fn_q_output_W'](Q_CHP_gen_W[hours])
+                E_CHP_gen_W[hours] = CC_op_cost_data['eta_el_fn_q_input'](NG_CHP_req_W[hours]) * NG_CHP_req_W[hours]
+        Q_heat_unmet_W = Q_heat_unmet_W - Q_CHP_gen_W
+
+    # WET FURNACE (operates at maximum capacity)
+    Furnace_wet_on = (master_to_slave_vars.Furnace_wet_on == 1) & (Q_heat_unmet_W > 0.0) & (
+            Q_heat_unmet_W > master_to_slave_vars.WBFurnace_Q_max_W)
+    Q_Furnace_wet_gen_W = np.where(Furnace_wet_on, master_to_slave_vars.WBFurnace_Q_max_W, 0.0)
+    DryBiomass_Furnace_req_W, E_Furnace_wet_gen_W = vectorize_where(furnace_op_cost, Furnace_wet_on, 2,
+                                                                    Q_Furnace_wet_gen_W,
+                                                                    master_to_slave_vars.WBFurnace_Q_max_W,
+                                                                    tdhret_req_K,
+                                                                    "wet")
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_Furnace_wet_gen_W
+
+    # DRY FURNACE (operates at maximum capacity)
+    Furnace_dry_on = (master_to_slave_vars.Furnace_dry_on == 1) & (Q_heat_unmet_W > 0.0) & (
+            Q_heat_unmet_W > master_to_slave_vars.DBFurnace_Q_max_W)
+    Q_Furnace_dry_gen_W = np.where(Furnace_dry_on, master_to_slave_vars.DBFurnace_Q_max_W, 0.0)
+    WetBiomass_Furnace_req_W, E_Furnace_dry_gen_W = vectorize_where(furnace_op_cost, Furnace_dry_on, 2,
+                                                                    Q_Furnace_dry_gen_W,
+                                                                    master_to_slave_vars.DBFurnace_Q_max_W,
+                                                                    tdhret_req_K,
+                                                                    "dry")
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_Furnace_dry_gen_W
+
+    # SEWAGE HEAT PUMP
+    HPSew_on = (master_to_slave_vars.HPSew_on == 1) & (Q_heat_unmet_W > 0.0) & network_operating
+    # the outputs of HPSew_op_cost are unpacked in the same order as in heating_source_activator
+    E_HPSew_req_W, _, Q_HPSew_gen_W = vectorize_where(_calc_HPSew_operation, HPSew_on, 3,
+                                                      Q_heat_unmet_W,
+                                                      Q_therm_Sew_W,
+                                                      tdhsup_K,
+                                                      tdhret_req_K,
+                                                      TretsewArray_K)
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_HPSew_gen_W
+
+    # LAKE HEAT PUMP
+    HPLake_on = (master_to_slave_vars.HPLake_on == 1) & (Q_heat_unmet_W > 0.0) & network_operating
+    E_HPLake_req_W, Q_HPLake_gen_W = vectorize_where(_calc_HPLake_operation, HPLake_on, 2,
+                                                     Q_heat_unmet_W,
+                                                     Q_therm_Lake_W,
+                                                     tdhsup_K,
+                                                     tdhret_req_K,
+                                                     TretLakeArray_K)
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_HPLake_gen_W
+
+    # GROUND SOURCE HEAT PUMP
+    GHP_on = (master_to_slave_vars.GHP_on == 1) & (Q_heat_unmet_W > 0.0) & network_operating
+    E_GHP_req_W, _, Q_GHP_gen_W = vectorize_where(_calc_GHP_operation, GHP_on, 3,
+                                                  Q_heat_unmet_W,
+                                                  Q_therm_GHP_W,
+                                                  tdhsup_K,
+                                                  tdhret_req_K,
+                                                  TretGHPArray_K)
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_GHP_gen_W
+
+    # BASE BOILER
+    Boiler_on = (master_to_slave_vars.Boiler_on == 1) & (Q_heat_unmet_W > 0.0) & (
+            Q_heat_unmet_W >= BOILER_MIN * master_to_slave_vars.Boiler_Q_max_W)
+    Q_BaseBoiler_gen_W = np.where(Boiler_on, np.where(Q_heat_unmet_W >= master_to_slave_vars.Boiler_Q_max_W,
+                                                      master_to_slave_vars.Boiler_Q_max_W, Q_heat_unmet_W), 0.0)
+    NG_BaseBoiler_req_W, E_BaseBoiler_req_W = vectorize_where(cond_boiler_op_cost, Boiler_on, 2,
+                                                              Q_BaseBoiler_gen_W,
+                                                              master_to_slave_vars.Boiler_Q_max_W,
+                                                              tdhret_req_K)
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_BaseBoiler_gen_W
+
+    # PEAK BOILER
+    BoilerPeak_on = (master_to_slave_vars.BoilerPeak_on == 1) & (Q_heat_unmet_W > 0.0) & (
+            Q_heat_unmet_W >= BOILER_MIN * master_to_slave_vars.BoilerPeak_Q_max_W)
+    Q_PeakBoiler_gen_W = np.where(BoilerPeak_on, np.where(Q_heat_unmet_W > master_to_slave_vars.BoilerPeak_Q_max_W,
+                                                          master_to_slave_vars.BoilerPeak_Q_max_W, Q_heat_unmet_W),
+                                  0.0)
+    NG_PeakBoiler_req_W, E_PeakBoiler_req_W = vectorize_where(cond_boiler_op_cost, BoilerPeak_on, 2,
+                                                              Q_PeakBoiler_gen_W,
+                                                              master_to_slave_vars.BoilerPeak_Q_max_W,
+                                                              tdhret_req_K)
+    Q_heat_unmet_W = Q_heat_unmet_W - Q_PeakBoiler_gen_W
+
+    # this will become the back-up boiler
+    Q_uncovered_W = np.where(Q_heat_unmet_W > 1.0E-3, Q_heat_unmet_W, 0.0)
+
+    return Q_HPSew_gen_W, \
+           Q_HPLake_gen_W, \
+           Q_GHP_gen_W, \
+           Q_CHP_gen_W, \
+           Q_Furnace_dry_gen_W, \
+           Q_Furnace_wet_gen_W, \
+           Q_BaseBoiler_gen_W, \
+           Q_PeakBoiler_gen_W, \
+           Q_uncovered_W, \
+           E_HPSew_req_W, \
+           E_HPLake_req_W, \
+           E_BaseBoiler_req_W, \
+           E_PeakBoiler_req_W, \
+           E_GHP_req_W, \
+           E_CHP_gen_W, \
+           E_Furnace_dry_gen_W, \
+           E_Furnace_wet_gen_W, \
+           NG_CHP_req_W, \
+           NG_BaseBoiler_req_W, \
+           NG_PeakBoiler_req_W, \
+           WetBiomass_Furnace_req_W, \
+           DryBiomass_Furnace_req_W
+
+
+def backup_boiler_dispatch(Q_BackupBoiler_gen_W, tdhret_req_K):
+    """
+    The operation of the back-up boiler, which covers the load left uncovered by the other technologies (see
+    :py:func:`heating_source_dispatch`). The boiler is sized for the highest uncovered load.
+
+    :param Q_BackupBoiler_gen_W: the heat generated by the back-up boiler in each hour
+    :param tdhret_req_K: the return temperature of the network in each hour (e.g. a pd.Series of the network summary)
+    :return: the size of the back-up boiler and its natural gas and electricity requirements in each hour
+    :rtype: tuple(float, ndarray, ndarray)
+    """
+    Q_BackupBoiler_gen_W = np.asarray(Q_BackupBoiler_gen_W, dtype=float)
+    BackupBoiler_size_W = np.amax(Q_BackupBoiler_gen_W)
+    NG_BackupBoiler_req_W, E_BackupBoiler_req_W = vectorize_where(cond_boiler_op_cost, Q_BackupBoiler_gen_W > 0.0, 2,
+                                                                  Q_BackupBoiler_gen_W, BackupBoiler_size_W,
+                                                                  np.asarray(tdhret_req_K, dtype=float))
+    return BackupBoiler_size_W, NG_BackupBoiler_req_W, E_BackupBoiler_req_W
+
+
+def _calc_HPSew_operation(Q_heat_unmet_W, Q_therm_Sew_W, tdhsup_K, tdhret_req_K, TretsewArray_K):
+    """The operation of the sewage heat pump in one hour, as in :py:func:`heating_source_activator`"""
+    Q_HPSew_gen_W = Q_therm_Sew_W if Q_heat_unmet_W > Q_therm_Sew_W else Q_heat_unmet_W
+    mdot_DH_to_Sew_kgpers = Q_HPSew_gen_W / (HEAT_CAPACITY_OF_WATER_JPERKGK * (tdhsup_K - tdhret_req_K))
+    return HPSew_op_cost(mdot_DH_to_Sew_kgpers, tdhsup_K, tdhret_req_K, TretsewArray_K, Q_HPSew_gen_W)
+
+
+def _calc_HPLake_operation(Q_heat_unmet_W, Q_therm_Lake_W, tdhsup_K, tdhret_req_K, TretLakeArray_K):
+    """The operation of the lake heat pump in one hour (with pumping), as in :py:func:`heating_source_activator`"""
+    Q_HPLake_gen_W = Q_therm_Lake_W if Q_heat_unmet_W > Q_therm_Lake_W else Q_heat_unmet_W
+    E_HPLake_req_W, _, Q_HPLake_gen_W = HPLake_op_cost(Q_HPLake_gen_W, tdhsup_K, tdhret_req_K, TretLakeArray_K)
+    E_pump_req_W = calc_water_body_uptake_pumping(Q_HPLake_gen_W, tdhret_req_K, tdhsup_K)
+    return E_HPLake_req_W + E_pump_req_W, Q_HPLake_gen_W
+
+
+def _calc_GHP_operation(Q_heat_unmet_W, Q_therm_GHP_W, tdhsup_K, tdhret_req_K, TretGHPArray_K):
+    """The operation of the ground source heat pump in one hour, as in :py:func:`heating_source_activator`"""
+    Q_GHP_gen_W = Q_therm_GHP_W if Q_heat_unmet_W > Q_therm_GHP_W else Q_heat_unmet_W
+    mdot_DH_to_GHP_kgpers = Q_GHP_gen_W / (HEAT_CAPACITY_OF_WATER_JPERKGK * (tdhsup_K - tdhret_req_K))
+    return GHP_op_cost(mdot_DH_to_GHP_kgpers, tdhsup_K, tdhret_req_K, TretGHPArray_K, Q_GHP_gen_W)
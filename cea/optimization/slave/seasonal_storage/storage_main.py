@@ -18,7 +18,6 @@ It is possible to turn off the plots by setting Tempplot = 0 and Qplot = 0
 import os
 
 import numpy as np
-import pandas as pd
 
 import cea.optimization.slave.seasonal_storage.design_operation as StDesOp
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, DENSITY_OF_WATER_AT_60_DEGREES_KGPERM3, WH_TO_J
@@ -333,14 +332,13 @@ def calc_storage_volume_from_heat_requirement(Q_required_in_storage_W, T_ST_MAX,
 
 
 def read_solar_technologies_data(locator, master_to_slave_vars):
+    slave_inputs = master_to_slave_vars.slave_inputs
     # Import Solar Data
     if master_to_slave_vars.SC_ET_on == 1 and master_to_slave_vars.SC_ET_share > 0.0:
         share_allowed = master_to_slave_vars.SC_ET_share
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
-        Q_SC_ET_gen_Wh, Tscr_th_SC_ET_K, Area_SC_ET_m2, E_SC_ET_req_Wh = calc_available_generation_solar(locator,
-                                                                                                         buildings,
-                                                                                                         share_allowed,
-                                                                                                         panel_type="ET")
+        Q_SC_ET_gen_Wh, Tscr_th_SC_ET_K, Area_SC_ET_m2, E_SC_ET_req_Wh = calc_available_generation_solar(
+            slave_inputs, buildings, share_allowed, panel_type="ET")
     else:
         Q_SC_ET_gen_Wh = np.zeros(HOURS_IN_YEAR)
         Tscr_th_SC_ET_K = np.zeros(HOURS_IN_YEAR)
@@ -350,10 +348,8 @@ def read_solar_technologies_data(locator, master_to_slave_vars):
     if master_to_slave_vars.SC_FP_on == 1 and master_to_slave_vars.SC_FP_share > 0.0:
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
         share_allowed = master_to_slave_vars.SC_FP_share
-        Q_SC_FP_gen_Wh, Tscr_th_SC_FP_K, Area_SC_FP_m2, E_SC_FP_req_Wh = calc_available_generation_solar(locator,
-                                                                                                         buildings,
-                                                                                                         share_allowed,
-                                                                                                         panel_type="FP")
+        Q_SC_FP_gen_Wh, Tscr_th_SC_FP_K, Area_SC_FP_m2, E_SC_FP_req_Wh = calc_available_generation_solar(
+            slave_inputs, buildings, share_allowed, panel_type="FP")
     else:
         Q_SC_FP_gen_Wh = np.zeros(HOURS_IN_YEAR)
         Tscr_th_SC_FP_K = np.zeros(HOURS_IN_YEAR)
@@ -363,9 +359,8 @@ def read_solar_technologies_data(locator, master_to_slave_vars):
     if master_to_slave_vars.PVT_on == 1 and master_to_slave_vars.PVT_share > 0.0:
         buildings = master_to_slave_vars.buildings_district_scale_to_district_heating
         share_allowed = master_to_slave_vars.PVT_share
-        E_PVT_gen_Wh, Q_PVT_gen_Wh, Area_PVT_m2, Tscr_th_PVT_K, E_PVT_req_Wh = calc_available_generation_PVT(locator,
-                                                                                                             buildings,
-                                                                                                             share_allowed)
+        E_PVT_gen_Wh, Q_PVT_gen_Wh, Area_PVT_m2, Tscr_th_PVT_K, E_PVT_req_Wh = calc_available_generation_PVT(
+            slave_inputs, buildings, share_allowed)
     else:
         E_PVT_gen_Wh = np.zeros(HOURS_IN_YEAR)
         Q_PVT_gen_Wh = np.zeros(HOURS_IN_YEAR)
@@ -388,7 +383,7 @@ def read_solar_technologies_data(locator, master_to_slave_vars):
     return solar_technologies_data
 
 
-def calc_available_generation_PVT(locator, buildings, share_allowed):
+def calc_available_generation_PVT(slave_inputs, buildings, share_allowed):
     """
     :param cea.inputlocator.InputLocator locator:
     :param buildings:
@@ -402,7 +397,7 @@ def calc_available_generation_PVT(locator, buildings, share_allowed):
     mcp_x_T = np.zeros(HOURS_IN_YEAR)
     mcp = np.zeros(HOURS_IN_YEAR)
     for building in buildings:
-        building_PVT = pd.read_csv(locator.PVT_results(building)).fillna(value=0.0)
+        building_PVT = slave_inputs.get_PVT_results(building)
         E_PVT_gen_kWh += building_PVT['E_PVT_gen_kWh']
         Q_PVT_gen_kWh += building_PVT['Q_PVT_gen_kWh']
         E_PVT_req_kWh += building_PVT['Eaux_PVT_kWh']
@@ -420,7 +415,7 @@ def calc_available_generation_PVT(locator, buildings, share_allowed):
     return E_PVT_gen_Wh, Q_PVT_gen_Wh, Area_PVT_m2, Tscr_th_PVT_K, E_PVT_req_Wh
 
 
-def calc_available_generation_solar(locator, buildings, share_allowed, panel_type):
+def calc_available_generation_solar(slave_inputs, buildings, share_allowed, panel_type):
     """
     :param cea.inputlocator.InputLocator locator:
     :param buildings:
@@ -434,7 +429,7 @@ def calc_available_generation_solar(locator, buildings, share_allowed, panel_typ
     mcp_x_T = np.zeros(HOURS_IN_YEAR)
     mcp = np.zeros(HOURS_IN_YEAR)
     for building_name in buildings:
-        data = pd.read_csv(locator.SC_results(building_name, panel_type)).fillna(value=0.0)
+        data = slave_inputs.get_SC_results(building_name, panel_type)
         Q_PVT_gen_kWh += data['Q_SC_gen_kWh']
         E_SC_req_kWh += data['Eaux_SC_kWh']
         A_PVT_m2 += data['Area_SC_m2'][0]
@@ -35,6 +35,7 @@ class SlaveData(object):
         self.technologies_cooling_allowed = None
         self.technologies_heating_allowed = None
         self.individual_with_names_dict= {}
+        self.slave_inputs = None  # the read-only inputs of the optimization run (slave_inputs.SlaveInputs)
         self.building_names_all = []
         self.building_names_heating = []
         self.building_names_cooling = []
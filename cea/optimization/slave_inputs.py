@@ -0,0 +1,142 @@
+"""
+Read-only inputs of the slave routines of the optimization
+
+The demand, the solar potentials of the buildings, the potentials of the heat sources and the results of the
+decentralized buildings are the same for each individual of an optimization run. A :py:class:`SlaveInputs` object
+reads each of these files only once per process (i.e. once per worker process of the multiprocessing pool) and keeps
+them for the rest of the run, instead of reading them again for each individual. Each individual gets its own copy of
+the data, so the slave routines can modify it.
+
+The summaries of the thermal networks depend on the barcode of the individual - the most recently used ones are kept
+in a least-recently-used cache.
+
+With optimization:number-of-typical-days, the typical days clustered by the pre-processing are read from their file
+the same way, so the worker processes use the typical days of the run.
+"""
+
+import collections
+import os
+import uuid
+
+import pandas as pd
+
+from cea.optimization.constants import NETWORK_SUMMARIES_CACHE_SIZE
+from cea.schemas import read_dataframe
+from cea.utilities.time_series_aggregation import TypicalDays
+
+__author__ = "Jimeno A. Fonseca"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Jimeno A. Fonseca"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# the columns of the demand results used by the slave routines
+DEMAND_COLUMNS = ['Eal_kWh', 'Edata_kWh', 'Epro_kWh', 'Eaux_kWh', 'E_cs_kWh', 'E_cre_kWh', 'E_cdata_kWh', 'E_hs_kWh',
+                  'E_ww_kWh', 'NG_hs_kWh', 'NG_ww_kWh']
+
+# the data read by this process, by run (see SlaveInputs.run_id) - only the data of the latest run is kept
+_loaded = {}
+
+
+class SlaveInputs(object):
+    """
+    The read-only inputs of the slave routines of an optimization run, read on first use. Only the locator and an id
+    of the run are pickled (e.g. when the object is sent to the worker processes with each individual), the data
+    itself stays in the process that read it.
+
+    The DataFrames returned are copies of the data kept in memory, so modifying them does not change the inputs of the
+    other individuals.
+    """
+
+    def __init__(self, locator, network_summaries_cache_size=NETWORK_SUMMARIES_CACHE_SIZE):
+        """
+        :param cea.inputlocator.InputLocator locator: the locator of the scenario
+        :param int network_summaries_cache_size: the number of thermal network summaries to keep in memory
+        """
+        self.locator = locator
+        self.network_summaries_cache_size = network_summaries_cache_size
+        self.run_id = uuid.uuid4().hex
+
+    @property
+    def _data(self):
+        if self.run_id not in _loaded:
+            # a new run: the data of the earlier runs in this process is not needed any more
+            _loaded.clear()
+            _loaded[self.run_id] = {'files': {}, 'network_summaries': collections.OrderedDict()}
+        return _loaded[self.run_id]
+
+    def read(self, path, columns=None, fill_value=None):
+        """
+        Read a csv file (or a file in one of the binary formats, see :py:func:`cea.schemas.read_dataframe`), the
+        first time it is requested.
+
+        :param str path: path to the file
+        :param columns: the subset of columns to read (all columns if None)
+        :param fill_value: the value to replace missing values with (keep them if None)
+        :rtype: pd.DataFrame
+        """
+        key = (path, None if columns is None else tuple(columns), fill_value)
+        files = self._data['files']
+        if key not in files:
+            df = read_dataframe(path, columns)
+            files[key] = df if fill_value is None else df.fillna(value=fill_value)
+        return files[key].copy()
+
+    def get_demand(self, building_name):
+        """The demand results of a building (only the ``DEMAND_COLUMNS``)"""
+        return self.read(self.locator.get_demand_results_file.existing_path(building_name), DEMAND_COLUMNS)
+
+    def get_total_demand(self):
+        return self.read(self.locator.get_total_demand())
+
+    def get_PV_results(self, building_name):
+        return self.read(self.locator.PV_results(building_name), fill_value=0.0)
+
+    def get_PVT_results(self, building_name):
+        return self.read(self.locator.PVT_results(building_name), fill_value=0.0)
+
+    def get_SC_results(self, building_name, panel_type):
+        return self.read(self.locator.SC_results(building_name, panel_type), fill_value=0.0)
+
+    def get_typical_days(self):
+        """
+        The typical days of the run (see
+        :py:func:`cea.optimization.preprocessing.preprocessing_main.calc_typical_days_of_network`) or None if each
+        hour of the year is calculated.
+
+        :rtype: cea.utilities.time_series_aggregation.TypicalDays
+        """
+        path = self.locator.get_optimization_typical_days()
+        if not os.path.exists(path):
+            return None
+        return TypicalDays.from_frame(self.read(path))
+
+    def get_network_summary(self, network_type, barcode):
+        """
+        The summary of the thermal network of the individual with the given barcode (see
+        :py:func:`cea.optimization.master.summarize_network.network_main`) or None if it has not been calculated yet.
+
+        :param str network_type: "DH" or "DC"
+        :param str barcode: the buildings connected to the network (e.g. "0101")
+        :rtype: pd.DataFrame
+        """
+        network_summaries = self._data['network_summaries']
+        key = (network_type, barcode)
+        if key not in network_summaries:
+            path = self.locator.get_optimization_network_results_summary(network_type, barcode)
+            if not os.path.exists(path):
+                return None
+            self.add_network_summary(network_type, barcode, pd.read_csv(path))
+        network_summaries.move_to_end(key)
+        return network_summaries[key].copy()
+
+    def add_network_summary(self, network_type, barcode, network_summary):
+        """Keep the summary of a thermal network that was just calculated, see :py:meth:`get_network_summary`"""
+        network_summaries = self._data['network_summaries']
+        network_summaries[(network_type, barcode)] = network_summary.copy()
+        network_summaries.move_to_end((network_type, barcode))
+        while len(network_summaries) > self.network_summaries_cache_size:
+            network_summaries.popitem(last=False)
@@ -12,6 +12,7 @@ import pandas as pd
 import cea.plots.cache
 from cea.constants import HOURS_IN_YEAR
 from cea.plots.variable_naming import get_color_array
+from cea.schemas import read_dataframe
 from cea.utilities.standardize_coordinates import get_geographic_coordinate_system
 
 """
@@ -88,22 +89,23 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     def date(self):
         """Read in the date information from demand results of the first building in the zone"""
         buildings = self.locator.get_zone_building_names()
-        df_date = pd.read_csv(self.locator.get_demand_results_file(buildings[0]))
+        df_date = self.locator.get_demand_results_file.read(buildings[0])
         return df_date["DATE"]
 
     @property
     @cea.plots.cache.cached
     def plant_pumping_requirement_kWh(self):
-        hourly_pressure_loss = pd.read_csv(
-            self.locator.get_network_energy_pumping_requirements_file(self.network_type, self.network_name))
+        hourly_pressure_loss = read_dataframe(
+            self.locator.get_network_energy_pumping_requirements_file.existing_path(self.network_type,
+                                                                                    self.network_name))
         hourly_pressure_loss = hourly_pressure_loss['pressure_loss_total_kW']
         return pd.DataFrame(hourly_pressure_loss)
 
     @property
     @cea.plots.cache.cached
     def total_thermal_losses_kWh(self):
-        hourly_thermal_loss = pd.read_csv(
-            self.locator.get_network_total_thermal_loss_file(self.network_type, self.network_name))
+        hourly_thermal_loss = read_dataframe(
+            self.locator.get_network_total_thermal_loss_file.existing_path(self.network_type, self.network_name))
         hourly_thermal_loss = hourly_thermal_loss['thermal_loss_total_kW']
         return pd.DataFrame(hourly_thermal_loss)
 
@@ -114,8 +116,9 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
                 2. Divide absolute losses by that value
                 """
         # read plant heat supply
-        plant_heat_supply = pd.read_csv(self.locator.get_thermal_network_plant_heat_requirement_file(self.network_type,
-                                                                                                     self.network_name))
+        plant_heat_supply = read_dataframe(
+            self.locator.get_thermal_network_plant_heat_requirement_file.existing_path(self.network_type,
+                                                                                       self.network_name))
         plant_heat_supply = abs(plant_heat_supply)  # make sure values are positive
         if len(plant_heat_supply.columns.values) > 1:  # sum of all plants
             plant_heat_supply = plant_heat_supply.sum(axis=1)
@@ -133,41 +136,44 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @property
     @cea.plots.cache.cached
     def hourly_heat_loss(self):
-        hourly_heat_loss = pd.read_csv(
-            self.locator.get_network_thermal_loss_edges_file(self.network_type, self.network_name))
+        hourly_heat_loss = read_dataframe(
+            self.locator.get_network_thermal_loss_edges_file.existing_path(self.network_type, self.network_name))
         hourly_heat_loss = abs(hourly_heat_loss).sum(axis=1)  # aggregate heat losses of all edges
         return pd.DataFrame(hourly_heat_loss)
 
     @property
     @cea.plots.cache.cached
     def P_loss_kWh(self):
-        return pd.read_csv(self.locator.get_thermal_network_pressure_losses_edges_file(self.network_type,
-                                                                                       self.network_name))
+        return read_dataframe(
+            self.locator.get_thermal_network_pressure_losses_edges_file.existing_path(self.network_type,
+                                                                                      self.network_name))
 
     @property
     @cea.plots.cache.cached
     def linear_pressure_loss_Paperm(self):
-        return pd.read_csv(self.locator.get_network_linear_pressure_drop_edges(self.network_type,
-                                                                               self.network_name))
+        return read_dataframe(
+            self.locator.get_network_linear_pressure_drop_edges.existing_path(self.network_type, self.network_name))
 
     @property
     @cea.plots.cache.cached
     def pressure_at_nodes_Pa(self):
-        return pd.read_csv(self.locator.get_network_pressure_at_nodes(self.network_type,
-                                                                      self.network_name))
+        return read_dataframe(
+            self.locator.get_network_pressure_at_nodes.existing_path(self.network_type, self.network_name))
 
     @property
     @cea.plots.cache.cached
     def mass_flow_kgs_pipes(self):
-        return pd.read_csv(self.locator.get_thermal_network_layout_massflow_edges_file(self.network_type,
-                                                                                       self.network_name))
+        return read_dataframe(
+            self.locator.get_thermal_network_layout_massflow_edges_file.existing_path(self.network_type,
+                                                                                      self.network_name))
 
     @property
     @cea.plots.cache.cached
     def velocity_mps_pipes(self):
         try:
-            return pd.read_csv(self.locator.get_thermal_network_velocity_edges_file(self.network_type,
-                                                                                       self.network_name))
+            return read_dataframe(
+                self.locator.get_thermal_network_velocity_edges_file.existing_path(self.network_type,
+                                                                                   self.network_name))
         except:
             #backward compatibility with detailed network simulation (which does not produce this data)
             return None
@@ -176,8 +182,9 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @cea.plots.cache.cached
     def mass_flow_kgs_nodes(self):
         try:
-            return pd.read_csv(self.locator.get_thermal_network_layout_massflow_nodes_file(self.network_type,
-                                                                                       self.network_name))
+            return read_dataframe(
+                self.locator.get_thermal_network_layout_massflow_nodes_file.existing_path(self.network_type,
+                                                                                          self.network_name))
         except:
         # backward compatibility with detailed network simulation (which does not produce this data)
             return None
@@ -185,15 +192,17 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @property
     @cea.plots.cache.cached
     def thermal_loss_edges_kWh(self):
-        return pd.read_csv(self.locator.get_network_thermal_loss_edges_file(self.network_type,
-                                                                            self.network_name))  # edge loss
+        return read_dataframe(
+            self.locator.get_network_thermal_loss_edges_file.existing_path(self.network_type,
+                                                                           self.network_name))  # edge loss
 
     @property
     @cea.plots.cache.cached
     def thermal_loss_edges_Wperm(self):
         try:
-            return pd.read_csv(self.locator.get_network_linear_thermal_loss_edges_file(self.network_type,
-                                                                                       self.network_name))  # edge loss
+            return read_dataframe(
+                self.locator.get_network_linear_thermal_loss_edges_file.existing_path(self.network_type,
+                                                                                      self.network_name))  # edge loss
         except:
             # backward compatibility with detailed network simulation (which does not produce this data)
             return None
@@ -208,8 +217,8 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @cea.plots.cache.cached
     def temperature_supply_nodes_C(self):
         """Node supply temperatures"""
-        supply_df = pd.read_csv(
-            self.locator.get_network_temperature_supply_nodes_file(self.network_type, self.network_name))
+        supply_df = read_dataframe(
+            self.locator.get_network_temperature_supply_nodes_file.existing_path(self.network_type, self.network_name))
         supply_df -= 273.15  # convert from Kelvin to C
         return supply_df
 
@@ -217,8 +226,8 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @cea.plots.cache.cached
     def temperature_return_nodes_C(self):
         """Node return temperatures"""
-        return_df = pd.read_csv(
-            self.locator.get_network_temperature_return_nodes_file(self.network_type, self.network_name))
+        return_df = read_dataframe(
+            self.locator.get_network_temperature_return_nodes_file.existing_path(self.network_type, self.network_name))
         return_df -= 273.15  # convert from Kelvin to C
         return return_df
 
@@ -226,8 +235,8 @@ class ThermalNetworksPlotBase(cea.plots.PlotBase):
     @cea.plots.cache.cached
     def temperature_supply_return_plant_C(self):
         """Node supply temperatures"""
-        supply_df = pd.read_csv(
-            self.locator.get_network_temperature_plant(self.network_type, self.network_name))
+        supply_df = read_dataframe(
+            self.locator.get_network_temperature_plant.existing_path(self.network_type, self.network_name))
         return supply_df
 
 
@@ -260,7 +269,7 @@ class ThermalNetworksMapPlotBase(ThermalNetworksPlotBase):
         self.input_files = [(self.locator.get_zone_geometry, []),
                             (self.locator.get_thermal_demand_csv_file, self.network_args),
                             (self.locator.get_thermal_network_edge_list_file, self.network_args),
-                            (self.locator.get_network_thermal_loss_edges_file, self.network_args),
+                            (self.locator.get_network_thermal_loss_edges_file.existing_path, self.network_args),
                             (self.locator.get_thermal_network_node_types_csv_file, self.network_args)]
 
     @property
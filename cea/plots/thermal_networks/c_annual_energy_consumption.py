@@ -31,8 +31,8 @@ class AnnualEnergyConsumptionPlot(cea.plots.thermal_networks.ThermalNetworksPlot
             self.network_args = [self.network_type, self.network_name]
             self.input_files = [
                 (self.locator.get_thermal_demand_csv_file, self.network_args),
-                (self.locator.get_network_energy_pumping_requirements_file, self.network_args),
-                (self.locator.get_network_total_thermal_loss_file, self.network_args)]
+                (self.locator.get_network_energy_pumping_requirements_file.existing_path, self.network_args),
+                (self.locator.get_network_total_thermal_loss_file.existing_path, self.network_args)]
 
         @property
         def layout(self):
@@ -8,6 +8,7 @@ import plotly.graph_objs as go
 from plotly.offline import plot
 import cea.plots.thermal_networks
 from cea.plots.variable_naming import LOGO, NAMING, COLOR
+from cea.schemas import read_dataframe
 
 __author__ = "Lennart Rogenhofer"
 __copyright__ = "Copyright 2018, Architecture and Building Systems - ETH Zurich"
@@ -37,8 +38,9 @@ class SupplyReturnAmbientCurvePlot(cea.plots.thermal_networks.ThermalNetworksPlo
         self.network_args = [self.network_type, self.network_name]
         self._plant_node = self.parameters['plant-node']
         self.input_files = [(self.locator.get_thermal_demand_csv_file, self.network_args),
-                            (self.locator.get_network_energy_pumping_requirements_file, self.network_args),
-                            (self.locator.get_network_thermal_loss_edges_file, self.network_args)]
+                            (self.locator.get_network_energy_pumping_requirements_file.existing_path,
+                             self.network_args),
+                            (self.locator.get_network_thermal_loss_edges_file.existing_path, self.network_args)]
 
     @property
     def plant_node(self):
@@ -89,7 +91,7 @@ class SupplyReturnAmbientCurvePlot(cea.plots.thermal_networks.ThermalNetworksPlo
         This assumes that all buildings are relatively close to each other and have the same ambient temperature.
         """
         building_name = self.locator.get_zone_building_names()[0]  # read in first building name
-        demand_file = pd.read_csv(self.locator.get_demand_results_file(building_name))
+        demand_file = self.locator.get_demand_results_file.read(building_name)
         ambient_temp = demand_file["T_ext_C"].values  # read in amb temp
         return pd.DataFrame(ambient_temp)
 
@@ -104,10 +106,10 @@ class SupplyReturnAmbientCurvePlot(cea.plots.thermal_networks.ThermalNetworksPlo
 
     @property
     def plant_temperatures(self):
-        supply_df = pd.read_csv(
-            self.locator.get_network_temperature_supply_nodes_file(self.network_type, self.network_name))
-        return_df = pd.read_csv(
-            self.locator.get_network_temperature_return_nodes_file(self.network_type, self.network_name))
+        supply_df = read_dataframe(
+            self.locator.get_network_temperature_supply_nodes_file.existing_path(self.network_type, self.network_name))
+        return_df = read_dataframe(
+            self.locator.get_network_temperature_return_nodes_file.existing_path(self.network_type, self.network_name))
 
         plant_node_supply = supply_df[self.plant_node]
         plant_node_return = return_df[self.plant_node]
@@ -30,8 +30,9 @@ class LoadDurationCurvePlot(cea.plots.thermal_networks.ThermalNetworksPlotBase):
         self.network_name = parameters['network-name']
         self.network_args = [self.network_type, self.network_name]
         self.input_files = [(self.locator.get_thermal_demand_csv_file, self.network_args),
-                            (self.locator.get_network_energy_pumping_requirements_file, self.network_args),
-                            (self.locator.get_network_thermal_loss_edges_file, self.network_args)]
+                            (self.locator.get_network_energy_pumping_requirements_file.existing_path,
+                             self.network_args),
+                            (self.locator.get_network_thermal_loss_edges_file.existing_path, self.network_args)]
 
     @property
     def layout(self):
@@ -2,7 +2,6 @@
 
 
 
-import json
 import os
 import shutil
 
@@ -232,25 +231,35 @@ def isolation_daysim(chunk_n, rad, geometry_3D_zone, locator, settings, max_glob
                                             sensor_intersection_zone):
         # select sensors data
         selection_of_results = solar_res[index:index + sensors_number_building]
-        result = [(array * (1.0 - intersection)).tolist() for array, intersection in
-                  zip(selection_of_results, sensor_intersection_building)]
-        items_sensor_name_and_result = dict(zip(sensor_code_building, result))
+        sensor_results = selection_of_results * (1.0 - np.asarray(sensor_intersection_building))[:, np.newaxis]
+        items_sensor_name_and_result = dict(zip(sensor_code_building, sensor_results))
         index = index + sensors_number_building
 
         # create summary and save to disk
         write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile)
 
         if settings.write_sensor_data:
-            write_sensor_results(building_name, items_sensor_name_and_result, locator)
+            write_sensor_results(building_name, sensor_code_building, sensor_results, locator)
 
     # erase daysim folder to avoid conflicts after every iteration
     print('Removing results folder')
     shutil.rmtree(daysim_dir)
 
 
-def write_sensor_results(building_name, items_sensor_name_and_result, locator):
-    with open(locator.get_radiation_building_sensors(building_name), 'w') as outfile:
-        json.dump(items_sensor_name_and_result, outfile)
+def write_sensor_results(building_name, sensor_code_building, sensor_results, locator):
+    """
+    Write the hourly insolation of the sensors of a building as a float32 matrix with one row per sensor (so the
+    solar tools can memory-map the rows of the sensors they need) and the sensor index with the yearly insolation of
+    each sensor (so the sensors can be filtered without reading the matrix).
+
+    :param str building_name: name of the building
+    :param list sensor_code_building: the names of the sensors (``SURFACE`` in the radiation metadata)
+    :param np.ndarray sensor_results: hourly insolation of each sensor [Wh/m2] with shape (sensors, hours)
+    :param cea.inputlocator.InputLocator locator: the locator to use
+    """
+    np.save(locator.get_radiation_building_sensors(building_name), sensor_results.astype(np.float32))
+    sensors_index = pd.DataFrame({'SURFACE': sensor_code_building, 'total_rad_Whm2': sensor_results.sum(axis=1)})
+    sensors_index.to_csv(locator.get_radiation_building_sensors_index(building_name), index=False)
 
 
 def write_aggregated_results(building_name, items_sensor_name_and_result, locator, weatherfile):
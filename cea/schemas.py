@@ -33,6 +33,10 @@ from cea.utilities.yaml_ordered_dict import OrderedDictYAMLLoader
 
 __schemas = {}
 
+# binary formats that can be used instead of csv for some (large) output files, e.g. the demand results. Files in these
+# formats are found and read transparently by ``CsvSchemaIo.read``
+BINARY_FORMATS = ['parquet', 'feather']
+
 
 def schemas(plugins):
     """Return the contents of the schemas.yml file
@@ -285,10 +289,27 @@ class CsvSchemaIo(SchemaIo):
         :param kwargs:
         :rtype: pd.DataFrame
         """
-        df = pd.read_csv(self(*args, **kwargs))
+        df = read_dataframe(self.existing_path(*args, **kwargs))
         self.validate(df)
         return df
 
+    def existing_path(self, *args, **kwargs):
+        """
+        Return the path to the file indicated by the locator method in whichever format exists: The csv file or, if it
+        does not exist, the same file in one of the ``BINARY_FORMATS`` (e.g. ``B001.parquet`` instead of
+        ``B001.csv``). If none of them exist, the path to the csv file is returned.
+
+        :rtype: str
+        """
+        path = self(*args, **kwargs)
+        if os.path.exists(path):
+            return path
+        for file_format in BINARY_FORMATS:
+            binary_path = os.path.splitext(path)[0] + '.' + file_format
+            if os.path.exists(binary_path):
+                return binary_path
+        return path
+
     def write(self, df, *args, **kwargs):
         """
         :type df: pd.Dataframe
@@ -307,6 +328,22 @@ class CsvSchemaIo(SchemaIo):
         return pd.DataFrame(columns=(self.schema["schema"]["columns"].keys()))
 
 
+def read_dataframe(path, columns=None):
+    """
+    Read a csv file or a file in one of the ``BINARY_FORMATS`` (based on the file extension) to a Dataframe.
+
+    :param str path: path to the file
+    :param columns: the subset of columns to read (all columns if None)
+    :rtype: pd.DataFrame
+    """
+    file_format = os.path.splitext(path)[1][1:]
+    if file_format == 'parquet':
+        return pd.read_parquet(path, columns=columns)
+    elif file_format == 'feather':
+        return pd.read_feather(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
 class DbfSchemaIo(SchemaIo):
     """Read and write .dbf files - and attempt to validate them."""
 
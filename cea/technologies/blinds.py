@@ -3,20 +3,18 @@
 blinds
 """
 
-
-
+import numpy as np
 
 
 def calc_blinds_activation(radiation, g_gl, Rf_sh):
     """
     This function calculates the blind operation according to ISO 13790.
 
+    The arguments can be scalars or (broadcastable) numpy arrays, e.g. the hourly radiation of a set of buildings.
+
     :param radiation: radiation in [W/m2]
     :param g_gl: window g value
     :param Rf_sh: shading factor
     """
     # activate blinds when I =300 W/m2
-    if radiation > 300:  # in w/m2
-        return g_gl * Rf_sh
-    else:
-        return g_gl
+    return np.where(radiation > 300, g_gl * Rf_sh, g_gl)  # in w/m2
@@ -43,67 +43,86 @@ def calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_gro
     :type T_ground_K: float
     :param locator: locator class
     :return:
+
+    The flow rates and temperatures can be arrays (e.g. for each hour of the year), the values of the dict returned are
+    then arrays too.
+
     ..[Kuhn A. & Ziegler F., 2005] Operational results of a 10kW absorption chiller and adaptation of the characteristic
     equation. In: Proceedings of the interantional conference solar air conditioning. Bad Staffelstein, Germany: 2005.
     ..[Puig-Arnavat M. et al, 2010] Analysis and parameter identification for characteristic equations of single- and
     double-effect absorption chillers by means of multivariable regression. Int J Refrig: 2010.
     """
     chiller_prop = absorption_chiller.chiller_prop # get data from the class
-    # create a dict of input operating conditions
-    input_conditions = {'T_chw_sup_K': T_chw_sup_K,
-                        'T_chw_re_K': T_chw_re_K,
-                        'T_hw_in_C': T_hw_in_C,
-                        'T_ground_K': T_ground_K}
+    shape = np.broadcast(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K).shape
+    mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, T_hw_in_C, T_ground_K = [
+        np.broadcast_to(np.asarray(value, dtype=float), shape).ravel() for value in (mdot_chw_kgpers, T_chw_sup_K,
+                                                                                      T_chw_re_K, T_hw_in_C,
+                                                                                      T_ground_K)]
     mcp_chw_WperK = mdot_chw_kgpers * HEAT_CAPACITY_OF_WATER_JPERKGK
     q_chw_total_W = mcp_chw_WperK * (T_chw_re_K - T_chw_sup_K)
 
-    if np.isclose(q_chw_total_W, 0.0):
-        wdot_W = 0.0
-        q_cw_W = 0.0
-        q_hw_W = 0.0
-        T_hw_out_C = np.nan
-        EER = 0.0
-        input_conditions['q_chw_W'] = 0.0
-    else:
-        min_chiller_size_W = min(chiller_prop['cap_min'].values)
-        max_chiller_size_W = max(chiller_prop['cap_max'].values)
-        # get chiller properties and input conditions according to load
-        if q_chw_total_W < min_chiller_size_W:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[chiller_prop['cap_min'] == min_chiller_size_W]
-            # operate at minimum load
-            number_of_chillers_activated = 1.0  # only activate one chiller
-            input_conditions['q_chw_W'] = chiller_prop['cap_min'].values  # minimum load
-        elif q_chw_total_W <= max_chiller_size_W:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[(chiller_prop['cap_min'] <= q_chw_total_W) &
-                                        (chiller_prop['cap_max'] >= q_chw_total_W)]
-            # operate one chiller at the cooling load
-            number_of_chillers_activated = 1.0  # only activate one chiller
-            input_conditions['q_chw_W'] = q_chw_total_W # operate at the chilled water load
-        else:
-            # get chiller property according to load
-            chiller_prop = chiller_prop[chiller_prop['cap_max'] == max_chiller_size_W]
-            # distribute loads to multiple chillers
-            number_of_chillers_activated = q_chw_total_W / max_chiller_size_W
-            # operate at maximum load
-            input_conditions['q_chw_W'] = max(chiller_prop['cap_max'].values)
-
-        absorption_chiller.update_data(chiller_prop)
-        operating_conditions = calc_operating_conditions(absorption_chiller, input_conditions)
-
-        # calculate chiller outputs
-        wdot_W = calc_power_demand(input_conditions['q_chw_W'], chiller_prop) * number_of_chillers_activated
-        q_cw_W = operating_conditions['q_cw_W'] * number_of_chillers_activated
-        q_hw_W = operating_conditions['q_hw_W'] * number_of_chillers_activated
-        T_hw_out_C = operating_conditions['T_hw_out_C']
-        EER = q_chw_total_W / (q_hw_W + wdot_W)
-
-        if T_hw_out_C < 0.0 :
-            print ('T_hw_out_C = ', T_hw_out_C, ' incorrect condition, check absorption chiller script.')
-
-    chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_hw_W': q_hw_W, 'T_hw_out_C': T_hw_out_C,
-                         'q_chw_W': q_chw_total_W, 'EER': EER}
+    wdot_W = np.zeros_like(q_chw_total_W)
+    q_cw_W = np.zeros_like(q_chw_total_W)
+    q_hw_W = np.zeros_like(q_chw_total_W)
+    T_hw_out_C = np.full_like(q_chw_total_W, np.nan)
+    EER = np.zeros_like(q_chw_total_W)
+
+    operating = ~np.isclose(q_chw_total_W, 0.0)
+    if np.any(operating):
+        cap_min = chiller_prop['cap_min'].values
+        cap_max = chiller_prop['cap_max'].values
+        min_chiller_size_W = min(cap_min)
+        max_chiller_size_W = max(cap_max)
+        q_operating_W = q_chw_total_W[operating]
+        # get chiller properties (the row of chiller_prop) and input conditions according to load
+        below_minimum = q_operating_W < min_chiller_size_W
+        above_maximum = ~below_minimum & ~(q_operating_W <= max_chiller_size_W)
+        # 1. operate one chiller at the cooling load
+        covered = (cap_min <= q_operating_W[:, None]) & (cap_max >= q_operating_W[:, None])
+        not_covered = ~below_minimum & ~above_maximum & ~covered.any(axis=1)
+        if np.any(not_covered):
+            raise ValueError('None of the absorption chillers of the database covers a cooling load of {load} W, check '
+                             'the capacity ranges (cap_min, cap_max) of the absorption chillers.'.format(
+                                 load=q_operating_W[not_covered][0]))
+        chiller_row = np.argmax(covered, axis=1)
+        q_chw_W = q_operating_W.copy()
+        number_of_chillers_activated = np.ones_like(q_operating_W)
+        # 2. below the minimum capacity, operate one chiller at minimum load
+        chiller_row[below_minimum] = np.argmax(cap_min == min_chiller_size_W)
+        q_chw_W[below_minimum] = min_chiller_size_W
+        # 3. above the maximum capacity, distribute loads to multiple chillers operating at maximum load
+        chiller_row[above_maximum] = np.argmax(cap_max == max_chiller_size_W)
+        q_chw_W[above_maximum] = max_chiller_size_W
+        number_of_chillers_activated[above_maximum] = q_operating_W[above_maximum] / max_chiller_size_W
+
+        operating_index = np.flatnonzero(operating)
+        for row in np.unique(chiller_row):
+            # the hours operating with the same chiller
+            selected = chiller_row == row
+            index = operating_index[selected]
+            absorption_chiller.update_data(chiller_prop.iloc[[row]])
+            input_conditions = {'T_chw_sup_K': T_chw_sup_K[index],
+                                'T_chw_re_K': T_chw_re_K[index],
+                                'T_hw_in_C': T_hw_in_C[index],
+                                'T_ground_K': T_ground_K[index],
+                                'q_chw_W': q_chw_W[selected]}
+            operating_conditions = calc_operating_conditions(absorption_chiller, input_conditions)
+
+            # calculate chiller outputs
+            wdot_W[index] = calc_power_demand(input_conditions['q_chw_W'], chiller_prop.iloc[[row]]) * \
+                            number_of_chillers_activated[selected]
+            q_cw_W[index] = operating_conditions['q_cw_W'] * number_of_chillers_activated[selected]
+            q_hw_W[index] = operating_conditions['q_hw_W'] * number_of_chillers_activated[selected]
+            T_hw_out_C[index] = operating_conditions['T_hw_out_C']
+        EER[operating] = q_operating_W / (q_hw_W[operating] + wdot_W[operating])
+
+        if np.any(T_hw_out_C[operating] < 0.0):
+            print('T_hw_out_C = ', np.min(T_hw_out_C[operating]),
+                  ' incorrect condition, check absorption chiller script.')
+
+    chiller_operation = {'wdot_W': wdot_W.reshape(shape), 'q_cw_W': q_cw_W.reshape(shape),
+                         'q_hw_W': q_hw_W.reshape(shape), 'T_hw_out_C': T_hw_out_C.reshape(shape),
+                         'q_chw_W': q_chw_total_W.reshape(shape), 'EER': EER.reshape(shape)}
 
     return chiller_operation
 
@@ -4,7 +4,6 @@ Vapor-compressor chiller
 
 
 
-import pandas as pd
 from math import log, ceil
 import numpy as np
 
@@ -14,6 +13,7 @@ from cea.technologies.constants import G_VALUE_CENTRALIZED, G_VALUE_DECENTRALIZE
 
 from cea.optimization.constants import VCC_CODE_CENTRALIZED, VCC_CODE_DECENTRALIZED
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 from cea.utilities.physics import kelvin_to_fahrenheit
 
 __author__ = "Thuy-An Nguyen"
@@ -40,25 +40,25 @@ def calc_VCC(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, T_cw_in_
     :param T_chw_re_K: plant return temperature from DCN
     :rtype Q_VCC_unit_size_W : float
     :returns Q_VCC_unit_size_W: chiller installed capacity
+
+    The loads and temperatures can be arrays (e.g. for each hour of the year), the values of the dict returned are
+    then arrays too.
+
     ..[D.J. Swider, 2003] D.J. Swider (2003). A comparison of empirically based steady-state models for
     vapor-compression liquid chillers. Applied Thermal Engineering.
     """
+    if np.any(q_chw_load_Wh < 0.0):
+        raise ValueError('negative cooling load to VCC: ', np.min(q_chw_load_Wh))
 
-    if q_chw_load_Wh == 0.0:
-        wdot_W = 0.0
-        q_cw_W = 0.0
-
-    elif q_chw_load_Wh > 0.0:
+    # the COP is not defined without load (the chiller is off)
+    with np.errstate(divide='ignore', invalid='ignore'):
         COP = calc_COP_with_carnot_efficiency(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K, VCC_chiller)
-        if COP < 0.0:
-            print(f'Negative COP: {COP} {T_chw_sup_K} {T_chw_re_K} {q_chw_load_Wh}', )
+        if np.any((q_chw_load_Wh > 0.0) & (COP < 0.0)):
+            print(f'Negative COP: {np.min(COP)} {T_chw_sup_K} {T_chw_re_K} {q_chw_load_Wh}', )
 
         # calculate chiller outputs
-        # print('COP is: ', COP)
-        wdot_W = q_chw_load_Wh / COP
-        q_cw_W = wdot_W + q_chw_load_Wh  # heat rejected to the cold water (cw) loop
-    else:
-        raise ValueError('negative cooling load to VCC: ', q_chw_load_Wh)
+        wdot_W = np.where(q_chw_load_Wh > 0.0, q_chw_load_Wh / COP, 0.0)
+    q_cw_W = wdot_W + q_chw_load_Wh  # heat rejected to the cold water (cw) loop
 
     chiller_operation = {'wdot_W': wdot_W, 'q_cw_W': q_cw_W, 'q_chw_W': q_chw_load_Wh}
 
@@ -96,7 +96,7 @@ def calc_Cinv_VCC(Q_nom_W, locator, technology_type):
     Capex_VCC_USD = 0
 
     if Q_nom_W > 0:
-        VCC_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="Chiller")
+        VCC_cost_data = SupplySystemsDatabase(locator).Chiller
         VCC_cost_data = VCC_cost_data[VCC_cost_data['code'] == technology_type]
         max_chiller_size = max(VCC_cost_data['cap_max'].values)
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
@@ -183,7 +183,7 @@ def calc_VCC_COP(weather_data, load_types, centralized=True):
     return cop_system, cop_chiller
 
 def get_max_VCC_unit_size(locator, VCC_code='CH3'):
-    VCC_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="Chiller")
+    VCC_cost_data = SupplySystemsDatabase(locator).Chiller
     VCC_cost_data = VCC_cost_data[VCC_cost_data['code'] == VCC_code]
     max_VCC_unit_size_W = max(VCC_cost_data['cap_max'].values)
     return max_VCC_unit_size_W
@@ -194,9 +194,9 @@ def calc_averaged_PLF(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K,
     Calculates the part load factor of installed Vapor compression chillers for a given cooling load.
     Includes the design of the chillers based on peak load and chiller plant scale to define the part load ratio.
     :param float peak_cooling_load: in W
-    :param float q_chw_load_Wh: in W
-    :param float T_chw_sup_K: in Kelvin
-    :param float T_cw_in_K: in Kelvin
+    :param q_chw_load_Wh: in W (a float or an array, e.g. for each hour of the year)
+    :param T_chw_sup_K: in Kelvin (a float or an array)
+    :param T_cw_in_K: in Kelvin (a float or an array)
     :param VaporCompressionChiller VCC_chiller: VCC_chiller object containing scale, capacity and config properties
     :param str scale: either "BUILDING" or "DISTRICT"
     :return float averaged_PLF: averaged part load factor over all chillers [0..1]
@@ -244,19 +244,14 @@ def calc_averaged_PLF(peak_cooling_load, q_chw_load_Wh, T_chw_sup_K, T_cw_in_K,
     available_capacity_per_unit = calc_available_capacity(cooling_capacity_per_unit, ch_configuration_values['Qs'], T_chw_sup_K, T_cw_in_K) # calculate the available capacity(dependent on conditions)
 
     # calculate the load distribution across the chillers heuristically,
-    # assuming the PLF factor is monotonously increasing with increasing PLR. Filling one chiller after the other.
-    n_chillers_filled = int(q_chw_load_Wh // available_capacity_per_unit)
-    part_load_chiller = float(divmod(q_chw_load_Wh, available_capacity_per_unit)[1])/float(available_capacity_per_unit)
-
-    load_distribution_list = []
-    for i in range(n_chillers_filled):
-        load_distribution_list.append(1)
-    load_distribution_list.append(part_load_chiller)
-    for i in range(int(n_units)-n_chillers_filled-1):
-        load_distribution_list.append(0)
-    load_distribution = np.array(load_distribution_list)
-
-    averaged_PLF = np.sum(calc_PLF(load_distribution, ch_configuration_values['PLFs']) * load_distribution * available_capacity_per_unit) / q_chw_load_Wh # calculates the weighted average PLF value
+    # assuming the PLF factor is monotonously increasing with increasing PLR. Filling one chiller after the other:
+    # the filled chillers run at a part load ratio of 1, one chiller runs at part load and the others are off.
+    n_chillers_filled = q_chw_load_Wh // available_capacity_per_unit
+    part_load_chiller = np.mod(q_chw_load_Wh, available_capacity_per_unit) / available_capacity_per_unit
+
+    PLFs = ch_configuration_values['PLFs']
+    averaged_PLF = ((n_chillers_filled * calc_PLF(1.0, PLFs) + calc_PLF(part_load_chiller, PLFs) * part_load_chiller)
+                    * available_capacity_per_unit / q_chw_load_Wh)  # calculates the weighted average PLF value
     return averaged_PLF
 
 
@@ -300,7 +295,8 @@ class VaporCompressionChiller(object):
         self.setup()
 
     def setup(self):
-        VCC_database = pd.read_excel(self.locator.get_database_conversion_systems(), sheet_name="Chiller")
+        supply_systems = SupplySystemsDatabase(self.locator)
+        VCC_database = supply_systems.Chiller
         if self.scale == 'DISTRICT':
             technology_type = VCC_CODE_CENTRALIZED
         elif self.scale == 'BUILDING':
@@ -312,8 +308,7 @@ class VaporCompressionChiller(object):
         self.max_VCC_capacity = int(VCC_database['cap_max'])
         self.min_VCC_capacity = int(VCC_database['cap_min'])
         self.g_value = float(VCC_database['G_VALUE'])
-        self.chiller_configuration = pd.read_excel(self.locator.get_database_conversion_systems(),
-                                                   sheet_name="Chiller_configuration")
+        self.chiller_configuration = supply_systems.Chiller_configuration
 
     def configuration_values(self, source_type, compressor_type):
         df = self.chiller_configuration
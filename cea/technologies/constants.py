@@ -32,6 +32,12 @@ NETWORK_DEPTH = 1  # m
 # Initial Diameter guess
 REDUCED_TIME_STEPS = 50 # number of time steps of maximum demand which are evaluated as an initial guess of the edge diameters
 MAX_INITIAL_DIAMETER_ITERATIONS = 20 #number of initial guess iterations for pipe diameters
+HOURS_PER_RESULTS_BLOCK = 24 * 7 * 4  # number of time steps of the thermal network solved before storing the results
+HOURS_PER_TASK = 24  # number of time steps of the thermal network whose return networks are solved together
+NETWORK_TOPOLOGIES_CACHE_SIZE = 256  # number of thermal network topologies (and factorizations) kept by a process
+# hours of the first week of each month, calculated by the thermal network with use-representative-week-per-month
+REPRESENTATIVE_WEEK_HOURS = [first_hour + hour for first_hour in [0, 744, 1416, 2160, 2880, 3624, 4344, 5088, 5832, 6522,
+                                                                  7296, 8016] for hour in range(24 * 7)]
 
 # Cogeneration (CCGT)
 SPEC_VOLUME_STEAM = 0.0010  # m3/kg
@@ -4,9 +4,10 @@ System Modeling: Cooling tower
 
 
 
-import pandas as pd
+import numpy as np
 from math import ceil, log
 from cea.technologies.constants import CT_MIN_PARTLOAD_RATIO
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -24,15 +25,17 @@ def calc_CT(q_hot_Wh, Q_nom_W):
     For the operation of a water condenser + direct cooling tower based on [B. Stephane, 2012]_
     Maximum cooling power is 10 MW.
     
-    :type q_hot_Wh : float
-    :param q_hot_Wh: heat rejected from chiller condensers
+    :type q_hot_Wh : float or np.array
+    :param q_hot_Wh: heat rejected from chiller condensers (e.g. for each hour of the year)
     :type Q_nom_W : float
     :param Q_nom_W: installed CT size
+    :rtype: float or np.array
+    :returns: the electricity consumption of the cooling tower for each value of ``q_hot_Wh``
 
     ..[B. Stephane, 2012] B. Stephane (2012), Evidence-Based Model Calibration for Efficient Building Energy Services.
     PhD Thesis, University de Liege, Belgium
     """
-    if (Q_nom_W > 0.0 and q_hot_Wh > 0.0):
+    if Q_nom_W > 0.0:
         # calculate CT operation at part load
         q_partload_ratio = q_hot_Wh / Q_nom_W
         w_partload_factor = calc_CT_partload_factor(q_partload_ratio)
@@ -40,11 +43,11 @@ def calc_CT(q_hot_Wh, Q_nom_W):
         # calculate nominal fan power
         w_nom_fan = 0.011 * Q_nom_W # _[B. Stephane, 2012]
 
-        # calculate total electricity consumption
-        el_W = w_partload_factor * w_nom_fan
+        # calculate total electricity consumption (only when heat is rejected)
+        el_W = np.where(q_hot_Wh > 0.0, w_partload_factor * w_nom_fan, 0.0)
 
     else:
-        el_W = 0.0
+        el_W = np.zeros_like(q_hot_Wh, dtype=float)
 
     return el_W
 
@@ -61,8 +64,7 @@ def calc_CT_partload_factor(q_part_load_ratio):
     OPTIMAL DIMENSIONS TO MINIMIZE COSTS OR EMISSIONS. Presented at the Forth German-Austrian IBPSA Conference BauSIM,
     Berlin University of the Arts.
     """
-    if q_part_load_ratio < CT_MIN_PARTLOAD_RATIO:
-        q_part_load_ratio = CT_MIN_PARTLOAD_RATIO
+    q_part_load_ratio = np.maximum(q_part_load_ratio, CT_MIN_PARTLOAD_RATIO)
     w_partload_factor = 0.8603 * q_part_load_ratio ** 3 + 0.2045 * q_part_load_ratio ** 2 - 0.0623 * q_part_load_ratio + 0.0026
     return w_partload_factor
 
@@ -99,7 +101,7 @@ def calc_Cinv_CT(Q_nom_CT_W, locator, technology_type):
     Capex_CT_USD = 0.0
 
     if Q_nom_CT_W > 0:
-        CT_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="CT")
+        CT_cost_data = SupplySystemsDatabase(locator).CT
         CT_cost_data = CT_cost_data[CT_cost_data['code'] == technology_type]
         max_chiller_size = max(CT_cost_data['cap_max'].values)
 
@@ -151,10 +153,9 @@ def calc_Cinv_CT(Q_nom_CT_W, locator, technology_type):
 
 
 def main():
-    import numpy as np
     q_hot_Wh = np.arange(0.0, 1E3, 100)
     Q_nom_W = 1E3
-    wdot_W = np.vectorize(calc_CT)(q_hot_Wh, Q_nom_W)
+    wdot_W = calc_CT(q_hot_Wh, Q_nom_W)
     print(wdot_W)
 
 
@@ -8,11 +8,11 @@ furnaces
 
 from math import log
 
-import pandas as pd
 from scipy import interpolate
 from cea.technologies.constants import FURNACE_FUEL_COST_WET, FURNACE_FUEL_COST_DRY, FURNACE_MIN_LOAD, \
     FURNACE_MIN_ELECTRIC, BOILER_P_AUX
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -194,7 +194,7 @@ def calc_Cinv_furnace(Q_design_W, locator, technology_type):
     :returns InvCa: annualized investment costs in [CHF] including O&M
         
     """
-    furnace_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="Furnace")
+    furnace_cost_data = SupplySystemsDatabase(locator).Furnace
     furnace_cost_data = furnace_cost_data[furnace_cost_data['code'] == technology_type]
     # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
     # capacity for the corresponding technology from the database
@@ -11,6 +11,7 @@ import numpy as np
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.technologies.constants import MAX_NODE_FLOW
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -39,7 +40,7 @@ def calc_Cinv_HEX(Q_design_W, locator, config, technology_type):
 
     """
     if Q_design_W > 0:
-        HEX_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HEX")
+        HEX_cost_data = SupplySystemsDatabase(locator).HEX
         HEX_cost_data = HEX_cost_data[HEX_cost_data['code'] == technology_type]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
         # capacity for the corresponding technology from the database
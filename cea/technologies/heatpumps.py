@@ -7,12 +7,12 @@ heatpumps
 
 
 from math import floor, log, ceil
-import pandas as pd
 from cea.optimization.constants import HP_DELTA_T_COND, HP_DELTA_T_EVAP, HP_ETA_EX, HP_ETA_EX_COOL, HP_AUXRATIO, \
     GHP_AUXRATIO, HP_MAX_T_COND, GHP_ETA_EX, GHP_CMAX_SIZE_TH, HP_MAX_SIZE, HP_COP_MAX, HP_COP_MIN
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 import numpy as np
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -351,7 +351,7 @@ def calc_Cinv_HP(HP_Size, locator, technology_type):
     Capex_HP_USD = 0.0
 
     if HP_Size > 0.0:
-        HP_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="HP")
+        HP_cost_data = SupplySystemsDatabase(locator).HP
         HP_cost_data = HP_cost_data[HP_cost_data['code'] == technology_type]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
         # capacity for the corresponding technology from the database
@@ -9,13 +9,13 @@ pumps
 from math import log
 
 import numpy as np
-import pandas as pd
 from scipy.interpolate import interp1d
 
 from cea.constants import DENSITY_OF_WATER_AT_60_DEGREES_KGPERM3, HEAT_CAPACITY_OF_WATER_JPERKGK
 from cea.constants import P_WATER_KGPERM3
 from cea.optimization.constants import PUMP_ETA
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -141,7 +141,7 @@ def calc_Cinv_pump(pump_peak_W, locator, technology_type):
             Pump_Array_W[pump_i] = Pump_min_kW * 1000
         Pump_Remain_W -= Pump_Array_W[pump_i]
 
-        PUMP_COST_DATA = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="Pump")
+        PUMP_COST_DATA = SupplySystemsDatabase(locator).Pump
         pump_cost_data = PUMP_COST_DATA[PUMP_COST_DATA['code'] == technology_type]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
         # capacity for the corresponding technology from the database
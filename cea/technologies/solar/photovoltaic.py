@@ -8,7 +8,6 @@ Photovoltaic
 
 import os
 import time
-from itertools import repeat
 from math import *
 
 import numpy as np
@@ -25,6 +24,7 @@ from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -36,95 +36,166 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local, building_name):
+def calc_PV(building_name, locator, config, latitude, solar_properties, weather_data, datetime_local,
+            panel_properties_PV):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
     tilt angles, and global irradiation. In the last, electricity generation from PV panels of each group is calculated.
 
+    :param building_name: name of the building
+    :type building_name: str
     :param locator: An InputLocator to locate input files
     :type locator: cea.inputlocator.InputLocator
-    :param radiation_path: solar insulation data on all surfaces of each building (path
-    :type radiation_path: String
-    :param metadata_csv: data of sensor points measuring solar insulation of each building
-    :type metadata_csv: .csv
+    :param config: the configuration of the PV simulation
+    :type config: cea.config.Configuration
     :param latitude: latitude of the case study location
     :type latitude: float
-    :param longitude: longitude of the case study location
-    :type longitude: float
-    :param weather_path: path to the weather data file of the case study location
-    :type weather_path: .epw
-    :param building_name: list of building names in the case study
-    :type building_name: Series
-    :return: Building_PV.csv with PV generation potential of each building, Building_sensors.csv with sensor data of
-        each PV panel.
-
+    :param solar_properties: the properties of the sun at the case study location (see
+        :py:func:`cea.utilities.solar_equations.calc_sun_properties`)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
+    :param weather_data: weather data read from the epw file
+    :type weather_data: pd.DataFrame
+    :param datetime_local: the local date and time of each hour of the year
+    :param panel_properties_PV: properties of the PV panel (see :py:func:`calc_properties_PV_db`)
+    :type panel_properties_PV: dict
+    :return: the hourly PV generation potential of the building (also written to Building_PV.csv, the sensor data of
+        each PV panel is written to Building_sensors.csv)
+    :rtype: pd.DataFrame
     """
 
     t0 = time.perf_counter()
-    radiation_path = locator.get_radiation_building_sensors(building_name)
-    metadata_csv_path = locator.get_radiation_metadata(building_name)
+    sensors_metadata_cat, sensor_groups = calc_sensor_groups_PV(building_name, locator, config, latitude,
+                                                                solar_properties, panel_properties_PV)
+    if sensor_groups is not None:
+        final = calc_pv_generation(sensor_groups, weather_data, datetime_local, solar_properties, latitude,
+                                   panel_properties_PV)
+        print(building_name, 'done - time elapsed: %.2f seconds' % (time.perf_counter() - t0))
+    else:  # the building has not sufficient solar potential
+        final = calc_pv_potential(np.zeros((0, HOURS_IN_YEAR)), np.zeros((0, HOURS_IN_YEAR)), np.zeros(0), [],
+                                  datetime_local)
+    write_PV_results(building_name, final, sensors_metadata_cat, locator)
+    return final
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, datetime_local, config)
-    print('calculating solar properties done')
 
-    # calculate properties of PV panel
-    panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
-    print('gathering properties of PV panel')
+def calc_PV_district(building_names, locator, config, latitude, solar_properties, weather_data, datetime_local,
+                     panel_properties_PV):
+    """
+    Same as :py:func:`calc_PV`, but for a batch of buildings: The sensor groups of all buildings are stacked into one
+    array and their electricity generation is calculated at once. The results of each building are then written
+    building by building.
+
+    :param building_names: names of the buildings of the batch
+    :type building_names: list[str]
+    :return: the hourly PV generation potential of each building, by building name
+    :rtype: dict[str, pd.DataFrame]
+    """
+    t0 = time.perf_counter()
+    buildings = []
+    for building_name in building_names:
+        sensors_metadata_cat, sensor_groups = calc_sensor_groups_PV(building_name, locator, config, latitude,
+                                                                    solar_properties, panel_properties_PV)
+        if sensor_groups is not None:
+            buildings.append((building_name, sensors_metadata_cat, sensor_groups['prop_observers'],
+                              sensor_groups['hourlydata_groups']))
+        else:
+            buildings.append((building_name, None, None, None))
+
+    # stack the sensor groups of all buildings
+    groups = [building for building in buildings if building[2] is not None]
+    if groups:
+        prop_observers = pd.concat([prop_observers for _, _, prop_observers, _ in groups], ignore_index=True)
+        hourly_radiation_Wperm2 = np.concatenate(
+            [hourly_radiation[prop_observers_building.index].values.T
+             for _, _, prop_observers_building, hourly_radiation in groups])
+    else:
+        prop_observers = pd.DataFrame(columns=['B_deg', 'surface_azimuth_deg', 'area_installed_module_m2',
+                                               'type_orientation'])
+        hourly_radiation_Wperm2 = np.zeros((0, HOURS_IN_YEAR))
+    tot_module_area_m2 = prop_observers['area_installed_module_m2'].values.astype(float)
+    el_output_PV_kW, radiation_kWh = calc_pv_generation_groups(hourly_radiation_Wperm2,
+                                                               prop_observers['B_deg'].values.astype(float),
+                                                               prop_observers['surface_azimuth_deg'].values.astype(
+                                                                   float), tot_module_area_m2, weather_data,
+                                                               solar_properties, latitude, panel_properties_PV)
+    print('calculating PV generation of %i sensor groups done' % len(prop_observers))
+
+    results = {}
+    start = 0
+    for building_name, sensors_metadata_cat, prop_observers_building, _ in buildings:
+        number_groups = 0 if prop_observers_building is None else len(prop_observers_building)
+        rows = slice(start, start + number_groups)
+        start += number_groups
+        final = calc_pv_potential(el_output_PV_kW[rows], radiation_kWh[rows], tot_module_area_m2[rows],
+                                  prop_observers['type_orientation'].values[rows], datetime_local)
+        write_PV_results(building_name, final, sensors_metadata_cat, locator)
+        results[building_name] = final
+    print(', '.join(building_names), 'done - time elapsed: %.2f seconds' % (time.perf_counter() - t0))
+    return results
+
+
+def calc_sensor_groups_PV(building_name, locator, config, latitude, solar_properties, panel_properties_PV):
+    """
+    Select the sensor points of a building with sufficient solar radiation, calculate the tilt angle and spacing of
+    the panels and group the sensor points by their tilt angle, surface azimuth and total radiation.
+
+    :return: the metadata of the selected sensor points and their groups (see
+        :py:func:`cea.utilities.solar_equations.calc_groups`), or ``(None, None)`` if the building has not sufficient
+        solar potential
+    """
+    radiation_path = locator.get_radiation_building_sensors(building_name)
+    sensors_index_path = locator.get_radiation_building_sensors_index(building_name)
+    metadata_csv_path = locator.get_radiation_metadata(building_name)
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_path, metadata_csv_path, config)
+        solar_equations.filter_low_potential(radiation_path, sensors_index_path, metadata_csv_path, config)
 
     print('filtering low potential sensor points done')
 
+    if sensors_metadata_clean.empty:
+        return None, None
+
     # set the maximum roof coverage
     if config.solar.custom_roof_coverage:
         max_roof_coverage = config.solar.max_roof_coverage
     else:
         max_roof_coverage = 1.0
 
-    if not sensors_metadata_clean.empty:
-        if not config.solar.custom_tilt_angle:
-            # calculate optimal angle and tilt for panels
-            sensors_metadata_cat = solar_equations.optimal_angle_and_tilt(sensors_metadata_clean, latitude,
-                                                                          solar_properties,
-                                                                          max_annual_radiation, panel_properties_PV,
-                                                                          max_roof_coverage)
-            print('calculating optimal tilt angle and separation done')
-        else:
-            # calculate spacing required by user-supplied tilt angle for panels
-            sensors_metadata_cat = solar_equations.calc_spacing_custom_angle(sensors_metadata_clean, solar_properties,
-                                                                           max_annual_radiation, panel_properties_PV,
-                                                                           config.solar.panel_tilt_angle,
-                                                                           max_roof_coverage)
-            print('calculating separation for custom tilt angle done')
-
+    if not config.solar.custom_tilt_angle:
+        # calculate optimal angle and tilt for panels
+        sensors_metadata_cat = solar_equations.optimal_angle_and_tilt(sensors_metadata_clean, latitude,
+                                                                      solar_properties,
+                                                                      max_annual_radiation, panel_properties_PV,
+                                                                      max_roof_coverage)
+        print('calculating optimal tilt angle and separation done')
+    else:
+        # calculate spacing required by user-supplied tilt angle for panels
+        sensors_metadata_cat = solar_equations.calc_spacing_custom_angle(sensors_metadata_clean, solar_properties,
+                                                                       max_annual_radiation, panel_properties_PV,
+                                                                       config.solar.panel_tilt_angle,
+                                                                       max_roof_coverage)
+        print('calculating separation for custom tilt angle done')
 
-        # group the sensors with the same tilt, surface azimuth, and total radiation
-        sensor_groups = solar_equations.calc_groups(sensors_rad_clean, sensors_metadata_cat)
+    # group the sensors with the same tilt, surface azimuth, and total radiation
+    sensor_groups = solar_equations.calc_groups(sensors_rad_clean, sensors_metadata_cat)
 
-        print('generating groups of sensor points done')
+    print('generating groups of sensor points done')
+    return sensors_metadata_cat, sensor_groups
 
-        final = calc_pv_generation(sensor_groups, weather_data, datetime_local, solar_properties, latitude,
-                                   panel_properties_PV)
 
-        final.to_csv(locator.PV_results(building=building_name), index=True,
-                     float_format='%.2f')  # print PV generation potential
+def write_PV_results(building_name, final, sensors_metadata_cat, locator):
+    """
+    Write the hourly PV generation potential of a building and the metadata of its PV panels (``None`` if the
+    building has not sufficient solar potential).
+    """
+    final.to_csv(locator.PV_results(building=building_name), index=True,
+                 float_format='%.2f', na_rep='nan')  # print PV generation potential
+    if sensors_metadata_cat is not None:
         sensors_metadata_cat.to_csv(locator.PV_metadata_results(building=building_name), index=True,
                                     index_label='SURFACE',
                                     float_format='%.2f', na_rep='nan')  # print selected metadata of the selected sensors
-
-        print(building_name, 'done - time elapsed: %.2f seconds' % (time.perf_counter() - t0))
-    else:  # This loop is activated when a building has not sufficient solar potential
-        final = pd.DataFrame(
-            {'Date': datetime_local, 'PV_walls_north_E_kWh': 0, 'PV_walls_north_m2': 0, 'PV_walls_south_E_kWh': 0,
-             'PV_walls_south_m2': 0,
-             'PV_walls_east_E_kWh': 0, 'PV_walls_east_m2': 0, 'PV_walls_west_E_kWh': 0, 'PV_walls_west_m2': 0,
-             'PV_roofs_top_E_kWh': 0, 'PV_roofs_top_m2': 0,
-             'E_PV_gen_kWh': 0, 'Area_PV_m2': 0, 'radiation_kWh': 0}, index=range(HOURS_IN_YEAR))
-        final.to_csv(locator.PV_results(building=building_name), index=False, float_format='%.2f', na_rep='nan')
+    else:
         sensors_metadata_cat = pd.DataFrame(
             {'SURFACE': 0, 'AREA_m2': 0, 'BUILDING': 0, 'TYPE': 0, 'Xcoor': 0, 'Xdir': 0, 'Ycoor': 0, 'Ydir': 0,
              'Zcoor': 0, 'Zdir': 0, 'orientation': 0, 'total_rad_Whm2': 0, 'tilt_deg': 0, 'B_deg': 0,
@@ -133,7 +204,46 @@ def calc_PV(locator, config, latitude, longitude, weather_data, datetime_local,
         sensors_metadata_cat.to_csv(locator.PV_metadata_results(building=building_name), index=False,
                                     float_format='%.2f', na_rep='nan')
 
-    return
+
+class PVTotals(object):
+    """
+    Collects the hourly PV generation potential of the buildings, as their simulations complete, into the hourly
+    totals of the district and the annual results of each building - instead of reading the results of each building
+    back from disk.
+    """
+
+    def __init__(self, building_names):
+        self.building_names = list(building_names)
+        self.hourly_results = None
+        self.annual_results = {}
+
+    def add(self, building_name, final):
+        if self.hourly_results is None:
+            self.hourly_results = final.copy()
+        else:
+            self.hourly_results += final
+        annual_energy_production = final.filter(like='_kWh').sum()
+        panel_area_per_building = final.filter(like='_m2').iloc[0]
+        self.annual_results[building_name] = pd.concat([annual_energy_production, panel_area_per_building])
+
+    def add_building(self, i, n, args, final):
+        """``on_complete`` callback of :py:func:`calc_PV`"""
+        self.add(args[0], final)
+        print("Building No. {i} completed out of {n}: {building}".format(i=i + 1, n=n, building=args[0]))
+
+    def add_batch(self, i, n, args, results):
+        """``on_complete`` callback of :py:func:`calc_PV_district`"""
+        for building_name, final in results.items():
+            self.add(building_name, final)
+        print("Batch No. {i} completed out of {n}: {buildings}".format(i=i + 1, n=n, buildings=", ".join(args[0])))
+
+    def write(self, locator):
+        # save hourly results
+        self.hourly_results.to_csv(locator.PV_totals(), index=True, float_format='%.2f', na_rep='nan')
+        # save annual results
+        aggregated_annual_results_df = pd.DataFrame(self.annual_results).T.reindex(self.building_names)
+        aggregated_annual_results_df.to_csv(locator.PV_total_buildings(), index=True, index_label="Name",
+                                            float_format='%.2f', na_rep='nan')
 
 
 # =========================
@@ -144,105 +254,107 @@ def calc_pv_generation(sensor_groups, weather_data, date_local, solar_properties
     """
     To calculate the electricity generated from PV panels.
 
-    :param hourly_radiation: mean hourly radiation of sensors in each group [Wh/m2]
-    :type hourly_radiation: dataframe
-    :param number_groups: number of groups of sensor points
-    :type number_groups: float
-    :param number_points: number of sensor points in each group
-    :type number_points: float
-    :param prop_observers: mean values of sensor properties of each group of sensors
-    :type prop_observers: dataframe
+    :param sensor_groups: the groups of sensor points of a building (see
+        :py:func:`cea.utilities.solar_equations.calc_groups`)
+    :type sensor_groups: dict
     :param weather_data: weather data read from the epw file
     :type weather_data: dataframe
-    :param g: declination
-    :type g: float
-    :param Sz: zenith angle
-    :type Sz: float
-    :param Az: solar azimuth
-    :param ha: hour angle
+    :param date_local: the local date and time of each hour of the year
+    :param solar_properties: the properties of the sun at the case study location
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param latitude: latitude of the case study location
-    :return:
+    :param panel_properties_PV: properties of the PV panel
+    :return: the hourly PV generation potential by panel orientation
+    :rtype: pd.DataFrame
 
     """
 
     # local variables
-    number_groups = sensor_groups['number_groups']  # number of groups of sensor points
     prop_observers = sensor_groups['prop_observers']  # mean values of sensor properties of each group of sensors
     hourly_radiation = sensor_groups['hourlydata_groups']  # mean hourly radiation of sensors in each group [Wh/m2]
 
+    tot_module_area_m2 = prop_observers['area_installed_module_m2'].values.astype(float)
+    el_output_PV_kW, radiation_kWh = calc_pv_generation_groups(hourly_radiation[prop_observers.index].values.T,
+                                                               prop_observers['B_deg'].values.astype(float),
+                                                               prop_observers['surface_azimuth_deg'].values.astype(
+                                                                   float), tot_module_area_m2, weather_data,
+                                                               solar_properties, latitude, panel_properties_PV)
+    return calc_pv_potential(el_output_PV_kW, radiation_kWh, tot_module_area_m2,
+                             prop_observers['type_orientation'].values, date_local)
+
+
+def calc_pv_generation_groups(hourly_radiation_Wperm2, tilt_angle_deg, teta_z_deg, tot_module_area_m2, weather_data,
+                              solar_properties, latitude, panel_properties_PV):
+    """
+    To calculate the electricity generated from the PV panels of a number of sensor groups at once (one row per
+    group).
+
+    :param hourly_radiation_Wperm2: mean hourly radiation of sensors in each group [Wh/m2]
+    :type hourly_radiation_Wperm2: np.array (groups x hours)
+    :param tilt_angle_deg: tilt angle of the panels of each group [degrees]
+    :type tilt_angle_deg: np.array
+    :param teta_z_deg: surface azimuth of the panels of each group [degrees]
+    :type teta_z_deg: np.array
+    :param tot_module_area_m2: total module area of each group [m2]
+    :type tot_module_area_m2: np.array
+    :return: the electricity generated [kW] and the radiation on the modules [kWh] of each group (groups x hours)
+    :rtype: tuple[np.array, np.array]
+    """
     # convert degree to radians
     lat = radians(latitude)
-    g_rad = np.radians(solar_properties.g)
-    ha_rad = np.radians(solar_properties.ha)
-    Sz_rad = np.radians(solar_properties.Sz)
-    Az_rad = np.radians(solar_properties.Az)
+    g_rad = np.radians(np.asarray(solar_properties.g, dtype=float))
+    ha_rad = np.radians(np.asarray(solar_properties.ha, dtype=float))
+    Sz_rad = np.radians(np.asarray(solar_properties.Sz, dtype=float))
+    tilt_rad = np.radians(tilt_angle_deg)[:, np.newaxis]  # tilt angle
+    teta_z_rad = np.radians(teta_z_deg)[:, np.newaxis]  # surface azimuth
+    tot_module_area_m2 = tot_module_area_m2[:, np.newaxis]
+
+    # calculate radiation types (direct/diffuse) in each group, see solar_equations.cal_radiation_type
+    I_sol = hourly_radiation_Wperm2
+    I_diffuse = weather_data.ratio_diffhout.values * I_sol  # calculate diffuse radiation
+    I_direct = I_sol - I_diffuse  # calculate direct radiation
+    I_sol, I_diffuse, I_direct = [np.where(np.isnan(I), 0.0, I) for I in (I_sol, I_diffuse, I_direct)]
+
+    # calculate effective indicent angles necessary
+    teta_rad = solar_equations.calc_angle_of_incidence(g_rad, lat, ha_rad, tilt_rad, teta_z_rad)
+    teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
+
+    absorbed_radiation_Wperm2 = calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt_rad, Sz_rad, teta_rad,
+                                                           teta_ed_rad, teta_eg_rad, panel_properties_PV)
+
+    T_cell_C = calc_cell_temperature(absorbed_radiation_Wperm2, weather_data.drybulb_C.values, panel_properties_PV)
+
+    el_output_PV_kW = calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, panel_properties_PV['PV_n'],
+                                    tot_module_area_m2, panel_properties_PV['PV_Bref'],
+                                    panel_properties_PV['misc_losses'])  # misc_losses: cabling, resistances etc..
+    radiation_kWh = I_sol * tot_module_area_m2 / 1000  # kWh
+    return el_output_PV_kW, radiation_kWh
 
-    # empty list to store results
-    list_groups_area = [0 for i in range(number_groups)]
-    total_el_output_PV_kWh = [0 for i in range(number_groups)]
-    total_radiation_kWh = [0 for i in range(number_groups)]
 
+def calc_pv_potential(el_output_PV_kW, radiation_kWh, tot_module_area_m2, type_orientation, date_local):
+    """
+    Aggregate the electricity generated by the sensor groups of a building by panel orientation.
+
+    :param el_output_PV_kW: electricity generated by each group [kW] (groups x hours)
+    :param radiation_kWh: radiation on the modules of each group [kWh] (groups x hours)
+    :param tot_module_area_m2: total module area of each group [m2]
+    :param type_orientation: panel orientation of each group (e.g. "walls_south")
+    :param date_local: the local date and time of each hour of the year
+    :return: the hourly PV generation potential by panel orientation
+    :rtype: pd.DataFrame
+    """
+    type_orientation = np.asarray(type_orientation)
     potential = pd.DataFrame(index=range(HOURS_IN_YEAR))
     panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
     for panel_orientation in panel_orientations:
-        potential['PV_' + panel_orientation + '_E_kWh'] = 0
-        potential['PV_' + panel_orientation + '_m2'] = 0
-
-    eff_nom = panel_properties_PV['PV_n']
-
-    Bref = panel_properties_PV['PV_Bref']
-
-    misc_losses = panel_properties_PV['misc_losses']  # cabling, resistances etc..
-
-    for group in prop_observers.index.values:
-        # calculate radiation types (direct/diffuse) in group
-        radiation_Wperm2 = solar_equations.cal_radiation_type(group, hourly_radiation, weather_data)
-
-        # read panel properties of each group
-        teta_z_deg = prop_observers.loc[group, 'surface_azimuth_deg']
-        tot_module_area_m2 = prop_observers.loc[group, 'area_installed_module_m2']
-        tilt_angle_deg = prop_observers.loc[group, 'B_deg']  # tilt angle of panels
-        # degree to radians
-        tilt_rad = radians(tilt_angle_deg)  # tilt angle
-        teta_z_deg = radians(teta_z_deg)  # surface azimuth
-
-        # calculate effective indicent angles necessary
-        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat, ha_rad, tilt_rad, teta_z_deg)
-        teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
-
-        absorbed_radiation_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                             radiation_Wperm2.I_direct,
-                                                                             radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                             Sz_rad, teta_rad, teta_ed_rad,
-                                                                             teta_eg_rad, panel_properties_PV)
-
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
-
-        el_output_PV_kW = np.vectorize(calc_PV_power)(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2,
-                                                      Bref, misc_losses)
-
-        # write results from each group
-        panel_orientation = prop_observers.loc[group, 'type_orientation']
-        potential['PV_' + panel_orientation + '_E_kWh'] = potential[
-                                                              'PV_' + panel_orientation + '_E_kWh'] + el_output_PV_kW
-        potential['PV_' + panel_orientation + '_m2'] = potential['PV_' + panel_orientation + '_m2'] + tot_module_area_m2
-
-        # aggregate results from all modules
-        list_groups_area[group] = tot_module_area_m2
-        total_el_output_PV_kWh[group] = el_output_PV_kW
-        total_radiation_kWh[group] = (radiation_Wperm2['I_sol'] * tot_module_area_m2 / 1000)  # kWh
-
-    # check for missing groups and asign 0 as el_output_PV_kW
-    # panel_orientations = ['walls_south', 'walls_north', 'roofs_top', 'walls_east', 'walls_west']
-    # for panel_orientation in panel_orientations:
-    #     if panel_orientation not in prop_observers['type_orientation'].values:
-    #         potential['PV_' + panel_orientation + '_E_kWh'] = 0
-    #         potential['PV_' + panel_orientation + '_m2'] = 0
-
-    potential['E_PV_gen_kWh'] = sum(total_el_output_PV_kWh)
-    potential['radiation_kWh'] = sum(total_radiation_kWh).values
-    potential['Area_PV_m2'] = sum(list_groups_area)
+        groups = type_orientation == panel_orientation
+        potential['PV_' + panel_orientation + '_E_kWh'] = el_output_PV_kW[groups].sum(axis=0)
+        potential['PV_' + panel_orientation + '_m2'] = tot_module_area_m2[groups].sum()
+
+    # aggregate results from all modules
+    potential['E_PV_gen_kWh'] = el_output_PV_kW.sum(axis=0)
+    potential['radiation_kWh'] = radiation_kWh.sum(axis=0)
+    potential['Area_PV_m2'] = tot_module_area_m2.sum()
     potential['Date'] = date_local
     potential = potential.set_index('Date')
 
@@ -321,10 +433,10 @@ def calc_diffuseground_comp(tilt_radians):
                  doi: 10.1002/9781118671603.ch5
 
     """
-    tilt = degrees(tilt_radians)
+    tilt = np.degrees(tilt_radians)
     teta_ed = 59.68 - 0.1388 * tilt + 0.001497 * tilt ** 2  # [degrees] (5.4.2)
     teta_eG = 90 - 0.5788 * tilt + 0.002693 * tilt ** 2  # [degrees] (5.4.1)
-    return radians(teta_ed), radians(teta_eG)
+    return np.radians(teta_ed), np.radians(teta_eG)
 
 
 def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetaed, tetaeg, panel_properties_PV):
@@ -337,12 +449,12 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     :param teta: angle of incidence [rad]
     :param tetaed: effective incidence angle from diffuse radiation [rad]
     :param tetaeg: effective incidence angle from ground-reflected radiation [rad]
-    :type I_sol: float
-    :type I_direct: float
-    :type I_diffuse: float
-    :type tilt: float
-    :type Sz: float
-    :type teta: float
+    :type I_sol: np.array
+    :type I_direct: np.array
+    :type I_diffuse: np.array
+    :type tilt: float or np.array
+    :type Sz: np.array
+    :type teta: np.array
     :type tetaed: float
     :type tetaeg: float
     :param panel_properties_PV: properties of the PV panel
@@ -373,65 +485,67 @@ def calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz, teta, tetae
     lim2 = radians(90)
     lim3 = radians(89.999)
 
-    if teta < lim1:
-        teta = min(lim3, abs(teta))
-    if teta >= lim2:
-        teta = lim3
+    teta = np.where(teta < lim1, np.minimum(lim3, np.abs(teta)), teta)
+    teta = np.where(teta >= lim2, lim3, teta)
 
-    if Sz < lim1:
-        Sz = min(lim3, abs(Sz))
-    if Sz >= lim2:
-        Sz = lim3
+    Sz = np.where(Sz < lim1, np.minimum(lim3, np.abs(Sz)), Sz)
+    Sz = np.where(Sz >= lim2, lim3, Sz)
 
     # Rb: ratio of beam radiation of tilted surface to that on horizontal surface
-    if Sz <= radians(85):  # Sz is Zenith angle   # TODO: FIND REFERENCE
-        Rb = cos(teta) / cos(Sz)
-    else:
-        Rb = 0  # Assume there is no direct radiation when the sun is close to the horizon.
+    # Sz is Zenith angle   # TODO: FIND REFERENCE
+    # Assume there is no direct radiation when the sun is close to the horizon.
+    Rb = np.where(Sz <= radians(85), np.cos(teta) / np.cos(Sz), 0)
 
     # calculate air mass modifier
-    m = 1 / cos(Sz)  # air mass
+    m = 1 / np.cos(Sz)  # air mass
     M = a0 + a1 * m + a2 * m ** 2 + a3 * m ** 3 + a4 * m ** 4  # air mass modifier
 
-    # incidence angle modifier for direct (beam) radiation
-    teta_r = asin(sin(teta) / n)  # refraction angle in radians(aproximation accrding to Soteris A.) (5.1.4)
+    # incidence angle modifier for direct (beam) radiation (teta is always below 90 degrees after the limits above)
     Ta_n = exp(-K * L) * (1 - ((n - 1) / (n + 1)) ** 2)
-    if teta < radians(90):  # 90 degrees in radians
-        part1 = teta_r + teta
-        part2 = teta_r - teta
-        Ta_B = exp((-K * L) / cos(teta_r)) * (
-                1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-        kteta_B = Ta_B / Ta_n
-    else:
-        kteta_B = 0
+    kteta_B = calc_incidence_angle_modifier(teta, n, K, L, Ta_n)
 
     # incidence angle modifier for diffuse radiation
-    teta_r = asin(sin(tetaed) / n)  # refraction angle for diffuse radiation [rad]
-    part1 = teta_r + tetaed
-    part2 = teta_r - tetaed
-    Ta_D = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-    kteta_D = Ta_D / Ta_n
+    kteta_D = calc_incidence_angle_modifier(tetaed, n, K, L, Ta_n)
 
     # incidence angle modifier for ground-reflected radiation
-    teta_r = asin(sin(tetaeg) / n)  # refraction angle for ground-reflected radiation [rad]
-    part1 = teta_r + tetaeg
-    part2 = teta_r - tetaeg
-    Ta_eG = exp((-K * L) / cos(teta_r)) * (
-            1 - 0.5 * ((sin(part2) ** 2) / (sin(part1) ** 2) + (tan(part2) ** 2) / (tan(part1) ** 2)))
-    kteta_eG = Ta_eG / Ta_n
+    kteta_eG = calc_incidence_angle_modifier(tetaeg, n, K, L, Ta_n)
 
     # absorbed solar radiation
     absorbed_radiation_Wperm2 = M * Ta_n * (
-            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
-            1 - cos(tilt)) / 2)  # [W/m2] (5.12.1)
-    if absorbed_radiation_Wperm2 < 0.0:  # when points are 0 and too much losses
-        # print ('the absorbed radiation', absorbed_radiation_Wperm2 ,'is negative, please check calc_absorbed_radiation_PVT')
-        absorbed_radiation_Wperm2 = 0.0
+            kteta_B * I_direct * Rb + kteta_D * I_diffuse * (1 + np.cos(tilt)) / 2 + kteta_eG * I_sol * Pg * (
+            1 - np.cos(tilt)) / 2)  # [W/m2] (5.12.1)
+    # when points are 0 and too much losses
+    absorbed_radiation_Wperm2 = np.where(absorbed_radiation_Wperm2 < 0.0, 0.0, absorbed_radiation_Wperm2)
 
     return absorbed_radiation_Wperm2
 
 
+def calc_incidence_angle_modifier(teta, n, K, L, Ta_n):
+    """
+    To calculate the incidence angle modifier of the glazing of a PV panel (ratio of the transmittance-absorptance
+    product at the incidence angle teta to the product at normal incidence).
+
+    :param teta: incidence angle [rad]
+    :type teta: np.array
+    :param n: refractive index of glass [-]
+    :param K: glazing extinction coefficient [1/m]
+    :param L: glazing thickness [m]
+    :param Ta_n: transmittance-absorptance product at normal incidence [-]
+    :return kteta: incidence angle modifier [-]
+    :rtype kteta: np.array
+
+    :References: Duffie, J. A. and Beckman, W. A. (2013) Radiation Transmission through Glazing: Absorbed Radiation, in
+                 Solar Engineering of Thermal Processes, Fourth Edition, John Wiley & Sons, Inc., Hoboken, NJ, USA.
+                 doi: 10.1002/9781118671603.ch5
+    """
+    teta_r = np.arcsin(np.sin(teta) / n)  # refraction angle in radians(aproximation accrding to Soteris A.) (5.1.4)
+    part1 = teta_r + teta
+    part2 = teta_r - teta
+    Ta = np.exp((-K * L) / np.cos(teta_r)) * (
+            1 - 0.5 * ((np.sin(part2) ** 2) / (np.sin(part1) ** 2) + (np.tan(part2) ** 2) / (np.tan(part1) ** 2)))
+    return Ta / Ta_n
+
+
 def calc_PV_power(absorbed_radiation_Wperm2, T_cell_C, eff_nom, tot_module_area_m2, Bref_perC, misc_losses):
     """
     To calculate the power production of PV panels.
@@ -502,9 +616,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, worst_sh, worst_Az,
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     optimal_angle_flat = calc_optimal_angle(180, latitude,
                                             transmissivity)  # assume surface azimuth = 180 (N,E), south facing
-    sensors_metadata_clean['tilt'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt'] = np.vectorize(degrees)(
-        sensors_metadata_clean['tilt'])  # surface tilt angle in degrees
+    # surface tilt angle in degrees
+    sensors_metadata_clean['tilt'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir']))
     sensors_metadata_clean['B'] = np.where(sensors_metadata_clean['tilt'] >= 5, sensors_metadata_clean['tilt'],
                                            degrees(optimal_angle_flat))  # panel tilt angle in degrees
 
@@ -512,10 +625,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, worst_sh, worst_Az,
 
     optimal_spacing_flat = calc_optimal_spacing(worst_sh, worst_Az, optimal_angle_flat, module_length)
     sensors_metadata_clean['array_s'] = np.where(sensors_metadata_clean['tilt'] >= 5, 0, optimal_spacing_flat)
-    sensors_metadata_clean['surface_azimuth'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                   sensors_metadata_clean['Ydir'],
-                                                                                   sensors_metadata_clean[
-                                                                                       'B'])  # degrees
+    sensors_metadata_clean['surface_azimuth'] = solar_equations.calc_surface_azimuth(
+        sensors_metadata_clean['Xdir'], sensors_metadata_clean['Ydir'], sensors_metadata_clean['B'])  # degrees
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     surface_area_flat = module_length * (
@@ -528,9 +639,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, worst_sh, worst_Az,
                                                              sensors_metadata_clean.AREA_m2 / surface_area_flat))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(solar_equations.calc_categoriesroof)(sensors_metadata_clean.surface_azimuth,
-                                                               sensors_metadata_clean.B,
-                                                               sensors_metadata_clean.total_rad_Whm2, Max_Isol)
+    result = solar_equations.calc_categoriesroof(sensors_metadata_clean.surface_azimuth, sensors_metadata_clean.B,
+                                                 sensors_metadata_clean.total_rad_Whm2, Max_Isol)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -656,35 +766,6 @@ def calc_optimal_spacing(Sh, Az, tilt_angle, module_length):
 #     return CATteta_z, CATB, CATGB
 
 
-def calc_surface_azimuth(xdir, ydir, B):
-    """
-    Calculate surface azimuth from the surface normal vector (x,y,z) and tilt angle (B).
-    Following the geological sign convention, an azimuth of 0 and 360 degree represents north, 90 degree is east.
-
-    :param xdir: surface normal vector x in (x,y,z) representing east-west direction
-    :param ydir: surface normal vector y in (x,y,z) representing north-south direction
-    :param B: surface tilt angle in degree
-    :type xdir: float
-    :type ydir: float
-    :type B: float
-    :returns surface azimuth: the azimuth of the surface of a solar panel in degree
-    :rtype surface_azimuth: float
-    """
-    B = radians(B)
-    teta_z = degrees(asin(xdir / sin(B)))
-    # set the surface azimuth with on the sing convention (E,N)=(+,+)
-    if xdir < 0:
-        if ydir < 0:
-            surface_azimuth = 180 + teta_z  # (xdir,ydir) = (-,-)
-        else:
-            surface_azimuth = 360 + teta_z  # (xdir,ydir) = (-,+)
-    elif ydir < 0:
-        surface_azimuth = 180 + teta_z  # (xdir,ydir) = (+,-)
-    else:
-        surface_azimuth = teta_z  # (xdir,ydir) = (+,+)
-    return surface_azimuth  # degree
-
-
 # ============================
 # properties of module
 # ============================
@@ -714,7 +795,7 @@ def calc_Cinv_pv(total_module_area_m2, locator, technology=0):
     :param P_peak: installed capacity of PV module [kW]
     :return InvCa: capital cost of the installed PV module [CHF/Y]
     """
-    PV_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="PV")
+    PV_cost_data = SupplySystemsDatabase(locator).PV
     technology_code = list(set(PV_cost_data['code']))
     PV_cost_data = PV_cost_data[PV_cost_data['code'] == technology_code[technology]]
     nominal_efficiency = PV_cost_data[PV_cost_data['code'] == technology_code[technology]]['PV_n'].max()
@@ -791,6 +872,11 @@ def main(config):
               (config.solar.custom_roof_coverage, config.solar.max_roof_coverage))
     else:
         print('Running photovoltaic with custom-roof-coverage = %s' % config.solar.custom_roof_coverage)
+    if config.solar.pv_engine == 'district':
+        print('Running photovoltaic with pv-engine = %s and pv-batch-size = %s' %
+              (config.solar.pv_engine, config.solar.pv_batch_size))
+    else:
+        print('Running photovoltaic with pv-engine = %s' % config.solar.pv_engine)
 
     buildings_names = locator.get_zone_building_names()
     zone_geometry_df = gdf.from_file(locator.get_zone_geometry())
@@ -800,35 +886,50 @@ def main(config):
     weather_data = epwreader.epw_reader(locator.get_weather_file())
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
 
-    n = len(buildings_names)
-    cea.utilities.parallel.vectorize(calc_PV, config.get_number_of_processes())(repeat(locator, n),
-                                                                                repeat(config, n),
-                                                                                repeat(latitude, n),
-                                                                                repeat(longitude, n),
-                                                                                repeat(weather_data, n),
-                                                                                repeat(date_local, n),
-                                                                                buildings_names)
-
-    # aggregate results from all buildings
-    aggregated_annual_results = {}
-    for i, building in enumerate(buildings_names):
-        hourly_results_per_building = pd.read_csv(locator.PV_results(building))
-        if i == 0:
-            aggregated_hourly_results_df = hourly_results_per_building
-        else:
-            aggregated_hourly_results_df = aggregated_hourly_results_df + hourly_results_per_building
-
-        annual_energy_production = hourly_results_per_building.filter(like='_kWh').sum()
-        panel_area_per_building = hourly_results_per_building.filter(like='_m2').iloc[0]
-        building_annual_results = annual_energy_production.append(panel_area_per_building)
-        aggregated_annual_results[building] = building_annual_results
-
-    # save hourly results
-    aggregated_hourly_results_df = aggregated_hourly_results_df.set_index('Date')
-    aggregated_hourly_results_df.to_csv(locator.PV_totals(), index=True, float_format='%.2f', na_rep='nan')
-    # save annual results
-    aggregated_annual_results_df = pd.DataFrame(aggregated_annual_results).T
-    aggregated_annual_results_df.to_csv(locator.PV_total_buildings(), index=True, index_label="Name", float_format='%.2f', na_rep='nan')
+    # solar properties (the same for all buildings)
+    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local,
+                                                           config.solar.solar_window_solstice, locator)
+    print('calculating solar properties done')
+
+    # calculate properties of PV panel
+    panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
+    print('gathering properties of PV panel')
+
+    # the inputs that are the same for all buildings are sent to each worker process only once, the tasks only carry
+    # the building names
+    shared = {'locator': locator,
+              'config': config,
+              'latitude': latitude,
+              'solar_properties': solar_properties,
+              'weather_data': weather_data,
+              'datetime_local': date_local,
+              'panel_properties_PV': panel_properties_PV}
+
+    # calculate the buildings with the most sensors (largest sensor files) first
+    sensor_file_sizes = [os.path.getsize(locator.get_radiation_building_sensors(building))
+                         if os.path.exists(locator.get_radiation_building_sensors(building)) else 0
+                         for building in buildings_names]
+
+    # the results are aggregated as the buildings complete
+    totals = PVTotals(buildings_names)
+    if config.solar.pv_engine == 'district':
+        # split the buildings into batches whose sensor groups are calculated together
+        batch_size = max(config.solar.pv_batch_size, 1)
+        batches = [buildings_names[i:i + batch_size] for i in range(0, len(buildings_names), batch_size)]
+        timings_path = os.path.join(locator.get_cache_folder(), 'photovoltaic-district-timings.json')
+        cea.utilities.parallel.vectorize(calc_PV_district, config.get_number_of_processes(),
+                                         on_complete=totals.add_batch, shared=shared,
+                                         costs=[sum(sensor_file_sizes[i:i + batch_size])
+                                                for i in range(0, len(buildings_names), batch_size)],
+                                         timings_path=timings_path)(batches)
+    else:
+        timings_path = os.path.join(locator.get_cache_folder(), 'photovoltaic-timings.json')
+        cea.utilities.parallel.vectorize(calc_PV, config.get_number_of_processes(), on_complete=totals.add_building,
+                                         shared=shared, costs=sensor_file_sizes, timings_path=timings_path,
+                                         keys=buildings_names)(buildings_names)
+
+    # save hourly results of the district and annual results of each building
+    totals.write(locator)
 
 
 if __name__ == '__main__':
@@ -31,6 +31,7 @@ from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
@@ -42,7 +43,7 @@ __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
 
-def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, building_name):
+def calc_PVT(locator, config, latitude, solar_properties, weather_data, date_local, building_name):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
@@ -56,8 +57,9 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
     :type metadata_csv_path: string
     :param latitude: latitude of the case study location
     :type latitude: float
-    :param longitude: longitude of the case study location
-    :type longitude: float
+    :param solar_properties: the properties of the sun at the case study location (see
+        :py:func:`cea.utilities.solar_equations.calc_sun_properties`)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param weather_path: path to the weather data file of the case study location
     :type weather_path: .epw
     :param building_name: list of building names in the case study
@@ -68,13 +70,10 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
     """
     t0 = time.perf_counter()
 
-    radiation_json_path = locator.get_radiation_building_sensors(building_name)
+    radiation_path = locator.get_radiation_building_sensors(building_name)
+    sensors_index_path = locator.get_radiation_building_sensors_index(building_name)
     metadata_csv_path = locator.get_radiation_metadata(building_name)
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
-    print('calculating solar properties done for building %s' % building_name)
-
     # get properties of the panel to evaluate # TODO: find a PVT module reference
     panel_properties_PV = calc_properties_PV_db(locator.get_database_conversion_systems(), config)
     panel_properties_SC = calc_properties_SC_db(locator.get_database_conversion_systems(), config)
@@ -82,7 +81,7 @@ def calc_PVT(locator, config, latitude, longitude, weather_data, date_local, bui
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_json_path, metadata_csv_path, config)
+        solar_equations.filter_low_potential(radiation_path, sensors_index_path, metadata_csv_path, config)
 
     print('filtering low potential sensor points done for building %s' % building_name)
 
@@ -230,18 +229,18 @@ def calc_PVT_generation(sensor_groups, weather_data, date_local, solar_propertie
 
         ## calculate absorbed solar irradiation on tilt surfaces
         # calculate effective indicent angles necessary
-        teta_rad = np.vectorize(solar_equations.calc_angle_of_incidence)(g_rad, lat_rad, ha_rad, tilt_rad, teta_z_rad)
+        teta_rad = solar_equations.calc_angle_of_incidence(g_rad, lat_rad, ha_rad, tilt_rad, teta_z_rad)
         teta_ed_rad, teta_eg_rad = calc_diffuseground_comp(tilt_rad)
 
         # absorbed radiation and Tcell
-        absorbed_radiation_PV_Wperm2 = np.vectorize(calc_absorbed_radiation_PV)(radiation_Wperm2.I_sol,
-                                                                                radiation_Wperm2.I_direct,
-                                                                                radiation_Wperm2.I_diffuse, tilt_rad,
-                                                                                Sz_rad, teta_rad, teta_ed_rad,
-                                                                                teta_eg_rad, panel_properties_PV)
+        absorbed_radiation_PV_Wperm2 = calc_absorbed_radiation_PV(radiation_Wperm2.I_sol.values,
+                                                                  radiation_Wperm2.I_direct.values,
+                                                                  radiation_Wperm2.I_diffuse.values, tilt_rad,
+                                                                  Sz_rad, teta_rad, teta_ed_rad,
+                                                                  teta_eg_rad, panel_properties_PV)
 
-        T_cell_C = np.vectorize(calc_cell_temperature)(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C,
-                                                       panel_properties_PV)
+        T_cell_C = calc_cell_temperature(absorbed_radiation_PV_Wperm2, weather_data.drybulb_C.values,
+                                         panel_properties_PV)
 
         ## SC heat generation
         # calculate incidence angle modifier for beam radiation
@@ -399,123 +398,67 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
     tilt_rad = radians(tilt_angle_deg)
     q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
                                             tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
-    counter = 0
-    Flag = False
-    Flag2 = False
-    for flow in range(6):
-        Mo_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for time in range(HOURS_IN_YEAR):
-            # c1_pvt = c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time] #todo: to delete
-            c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time)
-            Mfl_kgpers = calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, specific_flows_kgpers[flow], time,
-                                         Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
-
-            # calculate average fluid temperature and average absorber temperature at the beginning of the time-step
-            Tamb_C = Tamb_vector_C[time]
-            q_rad_Wperm2 = q_rad_vector[time]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
-                                 aperture_area_m2, c1_pvt, q_rad_Wperm2)
-
-            # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1_pvt, c2,
-                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
-
-            Aseg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
-            # multi-segment calculation to avoid temperature jump at times of flow rate changes
-            Tout_Seg_C = do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Mo_seg,
-                                                      Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C,
-                                                      c1_pvt, c2, delts, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
-
-            # resulting energy output
-            q_out_kW = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000  # [kW]
-            Tabs[2] = 0
-            # storage of the mean temperature
-            for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
-
+    # the four fixed flow rates are calculated together, the optimal flow rate (4) depends on their results and the
+    # optimal flow rate without negative supply (5) on the results of the optimal flow rate.
+    for flows in [[0, 1, 2, 3], [4], [5]]:
+        Tout_Seg_C, q_out_kW = calc_PVT_flows(np.array([specific_flows_kgpers[flow] for flow in flows]), q_rad_vector,
+                                              np.asarray(Tamb_vector_C, dtype=np.float64), Tin_C, aperture_area_m2,
+                                              c1, c2, C_eff_Jperm2K, Cp_fluid_JperkgK, Nseg, eff_nom, Bref,
+                                              np.asarray(absorbed_radiation_PV_Wperm2, dtype=np.float64))
+        for i, flow in enumerate(flows):
             # outputs
-            temperature_out[flow][time] = Tout_Seg_C
-            temperature_in[flow][time] = Tin_C
-            supply_out_kW[flow][time] = q_out_kW
-            temperature_mean[flow][time] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            q_gain_Wperm2 = 0
-            TavgB = 0
-            TavgA = 0
-            for Iseg in range(1, Nseg + 1):
-                q_gain_Wperm2 = q_gain_Wperm2 + q_gain_Seg * Aseg_m2  # W
-                TavgA = TavgA + TflA[Iseg] / Nseg
-                TavgB = TavgB + TflB[Iseg] / Nseg
-
-                # # OUT[9] = qgain/Area_a # in W/m2
-                # q_mtherm_Wperm2 = (TavgB - TavgA) * C_eff_Jperm2K * aperture_area_m2 / delts
-                # q_balance_error = q_gain_Wperm2 - q_mtherm_Wperm2 - q_out_kW
-
-                # OUT[11] = q_mtherm
-                # OUT[12] = q_balance_error
-        if flow < 4:
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow], pipe_lengths,
-                                                                    aperture_area_m2)  # in kW
-        if flow == 3:
-            q1 = supply_out_kW[0]
-            q2 = supply_out_kW[1]
-            q3 = supply_out_kW[2]
-            q4 = supply_out_kW[3]
-            E1 = auxiliary_electricity_kW[0]
-            E2 = auxiliary_electricity_kW[1]
-            E3 = auxiliary_electricity_kW[2]
-            E4 = auxiliary_electricity_kW[3]
-            specific_flows_kgpers[4], specific_pressure_losses_Pa[4] = calc_optimal_mass_flow(q1, q2, q3, q4, E1, E2,
-                                                                                              E3, E4, 0, mB0_r,
-                                                                                              mB_max_r, mB_min_r, 0,
-                                                                                              dP2, dP3, dP4,
-                                                                                              aperture_area_m2)
-        if flow == 4:
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow], pipe_lengths,
-                                                                    aperture_area_m2)  # in kW
-            dp5 = specific_pressure_losses_Pa[flow]
-            q5 = supply_out_kW[flow]
-            m5 = specific_flows_kgpers[flow]
-            # set points to zero when load is negative
-            specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
-
-        if flow == 5:  # optimal mass flow
-            supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
-                                                                      pipe_lengths['l_ext_mperm2'],
-                                                                      aperture_area_m2, temperature_mean[flow],
-                                                                      Tamb_vector_C, msc_max_kgpers)
-            supply_out_pre = supply_out_kW[flow].copy() + supply_losses_kW[flow].copy()
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow], pipe_lengths,
-                                                                    aperture_area_m2)  # in kW
-            supply_out_total_kW = supply_out_kW + 0.5 * auxiliary_electricity_kW[flow] - supply_losses_kW[flow]
-            mcp_kWperK = specific_flows_kgpers[flow] * (Cp_fluid_JperkgK / 1000)  # mcp in kW/c
+            temperature_out[flow] = Tout_Seg_C[i]
+            temperature_in[flow][:] = Tin_C
+            supply_out_kW[flow] = q_out_kW[i]
+            temperature_mean[flow] = (Tin_C + Tout_Seg_C[i]) / 2  # Mean absorber temperature at present
+
+            if flow < 4:
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow], pipe_lengths,
+                                                                        aperture_area_m2)  # in kW
+            if flow == 3:
+                q1 = supply_out_kW[0]
+                q2 = supply_out_kW[1]
+                q3 = supply_out_kW[2]
+                q4 = supply_out_kW[3]
+                E1 = auxiliary_electricity_kW[0]
+                E2 = auxiliary_electricity_kW[1]
+                E3 = auxiliary_electricity_kW[2]
+                E4 = auxiliary_electricity_kW[3]
+                specific_flows_kgpers[4], specific_pressure_losses_Pa[4] = calc_optimal_mass_flow(q1, q2, q3, q4, E1,
+                                                                                                  E2, E3, E4, 0,
+                                                                                                  mB0_r, mB_max_r,
+                                                                                                  mB_min_r, 0,
+                                                                                                  dP2, dP3, dP4,
+                                                                                                  aperture_area_m2)
+            if flow == 4:
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow], pipe_lengths,
+                                                                        aperture_area_m2)  # in kW
+                dp5 = specific_pressure_losses_Pa[flow]
+                q5 = supply_out_kW[flow]
+                m5 = specific_flows_kgpers[flow]
+                # set points to zero when load is negative
+                specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
+
+            if flow == 5:  # optimal mass flow
+                supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
+                                                                          pipe_lengths['l_ext_mperm2'],
+                                                                          aperture_area_m2, temperature_mean[flow],
+                                                                          Tamb_vector_C, msc_max_kgpers)
+                supply_out_pre = supply_out_kW[flow].copy() + supply_losses_kW[flow].copy()
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow], pipe_lengths,
+                                                                        aperture_area_m2)  # in kW
+                supply_out_total_kW = supply_out_kW + 0.5 * auxiliary_electricity_kW[flow] - supply_losses_kW[flow]
+                mcp_kWperK = specific_flows_kgpers[flow] * (Cp_fluid_JperkgK / 1000)  # mcp in kW/c
 
     turn_off_the_water_circuit_if_total_energy_supply_is_zero(T_module_C, Tcell_PV_C, auxiliary_electricity_kW[flow],
                                                               mcp_kWperK, supply_out_total_kW[5], temperature_in[5],
                                                               temperature_out[5])
 
-    el_output_PV_kW = np.vectorize(calc_PV_power)(absorbed_radiation_PV_Wperm2, T_module_C, eff_nom,
-                                                  module_area_per_group_m2,
-                                                  Bref, misc_losses)
+    el_output_PV_kW = calc_PV_power(absorbed_radiation_PV_Wperm2, T_module_C, eff_nom, module_area_per_group_m2, Bref,
+                                    misc_losses)
 
     # write results into a list
     result = [supply_losses_kW[5], supply_out_total_kW[5], auxiliary_electricity_kW[5], temperature_out[5],
@@ -525,6 +468,84 @@ def calc_PVT_module(config, radiation_Wperm2, panel_properties_SC, panel_propert
     return result
 
 
+@jit(nopython=True)
+def calc_PVT_flows(specific_flows_kgpers, q_rad_vector, Tamb_vector_C, Tin_C, aperture_area_m2, c1, c2, C_eff_Jperm2K,
+                   Cp_fluid_JperkgK, Nseg, eff_nom, Bref, absorbed_radiation_PV_Wperm2):
+    """
+    Calculate the outlet temperature and the heat production of a PVT collector for several flow rate scenarios
+    (adapted from :py:func:`cea.technologies.solar.solar_collector.calc_SC_flows`). The scenarios are independent of
+    each other and advance together through the time-steps, each with its own state.
+
+    :param specific_flows_kgpers: mass flow of each scenario (row) and time-step (column) [kg/s]
+    :type specific_flows_kgpers: ndarray
+    :param q_rad_vector: absorbed radiation [W/m2]
+    :param Tamb_vector_C: ambient temperatures [C]
+    :param Tin_C: inlet temperature [C]
+    :param aperture_area_m2: aperture area of each module [m2]
+    :param c1: collector heat loss coefficient at zero temperature difference and wind speed [W/m2K]
+    :param c2: temperature difference dependency of the heat loss coefficient [W/m2K2]
+    :param C_eff_Jperm2K: thermal capacitance of module [J/m2K]
+    :param Cp_fluid_JperkgK: heat capacity of the fluid [J/kgK]
+    :param Nseg: number of segments
+    :param eff_nom: nominal efficiency of the PV module [-]
+    :param Bref: cell maximum power temperature coefficient [degree C^(-1)]
+    :param absorbed_radiation_PV_Wperm2: absorbed solar radiation of PV module [Wh/m2]
+    :return: outlet temperature [C] and heat production [kW] of each scenario (row) and time-step (column)
+    """
+    number_of_flows, number_of_hours = specific_flows_kgpers.shape
+    Mo_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
+    TIME0 = 0
+    DELT = 1  # timestep 1 hour
+    delts = DELT * 3600  # convert time step in seconds
+    Aseg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
+
+    # the state of each scenario (row)
+    Tfl = np.zeros((number_of_flows, 3))  # create vector to store value at previous [1] and present [2] time-steps
+    DT = np.zeros((number_of_flows, 3))
+    Tabs = np.zeros((number_of_flows, 3))
+    STORED = np.zeros((number_of_flows, 600))
+    TflA = np.zeros((number_of_flows, 600))
+    TflB = np.zeros((number_of_flows, 600))
+    TabsB = np.zeros((number_of_flows, 600))
+    TabsA = np.zeros((number_of_flows, 600))
+    q_gain_Seg = np.zeros((number_of_flows, 101))  # maximum Iseg = maximum Nseg + 1 = 101
+
+    temperature_out_C = np.zeros((number_of_flows, number_of_hours))
+    supply_out_kW = np.zeros((number_of_flows, number_of_hours))
+    for time in range(number_of_hours):
+        c1_pvt = calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time)
+        Tamb_C = Tamb_vector_C[time]
+        q_rad_Wperm2 = q_rad_vector[time]
+        for flow in range(number_of_flows):
+            Mfl_kgpers = calc_Mfl_kgpers(DELT, Nseg, STORED[flow], TIME0, Tin_C, specific_flows_kgpers[flow], time,
+                                         Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
+
+            # calculate average fluid temperature and average absorber temperature at the beginning of the time-step
+            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT[flow], Mfl_kgpers, Nseg, STORED[flow], Tabs[flow], Tamb_C,
+                                 Tfl[flow], Tin_C, aperture_area_m2, c1_pvt, q_rad_Wperm2)
+
+            # calculate q_gain with the guess for DT[1]
+            q_gain_Wperm2 = calc_q_gain(Tfl[flow], q_rad_Wperm2, DT[flow], Tin_C, aperture_area_m2, c1_pvt, c2,
+                                        Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
+
+            # multi-segment calculation to avoid temperature jump at times of flow rate changes
+            Tout_Seg_C = do_multi_segment_calculation(Aseg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT[flow], Mfl_kgpers,
+                                                      Mo_seg, Nseg, STORED[flow], Tabs[flow], TabsA[flow], Tamb_C,
+                                                      Tfl[flow], TflA[flow], TflB[flow], Tin_C, Tout_C, c1_pvt, c2,
+                                                      delts, q_gain_Seg[flow], q_gain_Wperm2, q_rad_Wperm2)
+
+            # resulting energy output
+            supply_out_kW[flow, time] = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000  # [kW]
+            temperature_out_C[flow, time] = Tout_Seg_C
+            Tabs[flow, 2] = 0
+            # storage of the mean temperature
+            for Iseg in range(1, Nseg + 1):
+                STORED[flow, 200 + Iseg] = TflB[flow, Iseg]
+                STORED[flow, 400 + Iseg] = TabsB[flow, Iseg]
+                Tabs[flow, 2] = Tabs[flow, 2] + TabsB[flow, Iseg] / Nseg
+    return temperature_out_C, supply_out_kW
+
+
 @jit(nopython=True)
 def calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time):
     c1_pvt = max(0, c1 - eff_nom * Bref * absorbed_radiation_PV_Wperm2[time])  # _[J. Allan et al., 2015] eq.(18)
@@ -647,7 +668,7 @@ def calc_Cinv_PVT(PVT_peak_W, locator, technology=0):
     FIXME: handle multiple technologies when cost calculations are done
     """
     if PVT_peak_W > 0.0:
-        PVT_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="PV")
+        PVT_cost_data = SupplySystemsDatabase(locator).PV
         technology_code = list(set(PVT_cost_data['code']))
         PVT_cost_data = PVT_cost_data[PVT_cost_data['code'] == technology_code[technology]]
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
@@ -709,11 +730,16 @@ def main(config):
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
     print('reading weather hourly_results_per_building done.')
 
+    # solar properties (the same for all buildings)
+    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local,
+                                                           config.solar.solar_window_solstice, locator)
+    print('calculating solar properties done')
+
     n = len(building_names)
     cea.utilities.parallel.vectorize(calc_PVT, config.get_number_of_processes())(repeat(locator, n),
                                                                                  repeat(config, n),
                                                                                  repeat(latitude, n),
-                                                                                 repeat(longitude, n),
+                                                                                 repeat(solar_properties, n),
                                                                                  repeat(weather_data, n),
                                                                                  repeat(date_local, n),
                                                                                  building_names)
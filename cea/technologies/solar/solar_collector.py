@@ -25,6 +25,7 @@ from cea.utilities import epwreader
 from cea.utilities import solar_equations
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 __author__ = "Jimeno A. Fonseca"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Jimeno A. Fonseca", "Shanshan Hsieh", "Daren Thomas"]
@@ -37,7 +38,7 @@ __status__ = "Production"
 
 # SC heat generation
 
-def calc_SC(locator, config, latitude, longitude, weather_data, date_local, building_name):
+def calc_SC(locator, config, latitude, solar_properties, weather_data, date_local, building_name):
     """
     This function first determines the surface area with sufficient solar radiation, and then calculates the optimal
     tilt angles of panels at each surface location. The panels are categorized into groups by their surface azimuths,
@@ -47,8 +48,9 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
     :param config: cea.config
     :param latitude: latitude of the case study location
     :type latitude: float
-    :param longitude: longitude of the case study location
-    :type longitude: float
+    :param solar_properties: the properties of the sun at the case study location (see
+        :py:func:`cea.utilities.solar_equations.calc_sun_properties`)
+    :type solar_properties: cea.utilities.solar_equations.SunProperties
     :param weather_data: Data frame containing the weather data in the .epw file as per config
     :type weather_data: pandas.DataFrame
     :param date_local: contains the localized (to timezone) dates for each timestep of the year
@@ -62,20 +64,17 @@ def calc_SC(locator, config, latitude, longitude, weather_data, date_local, buil
 
     type_panel = config.solar.type_SCpanel
 
-    radiation_csv = locator.get_radiation_building_sensors(building=building_name)
+    radiation_path = locator.get_radiation_building_sensors(building=building_name)
+    sensors_index_csv = locator.get_radiation_building_sensors_index(building=building_name)
     metadata_csv = locator.get_radiation_metadata(building=building_name)
 
-    # solar properties
-    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local, config)
-    print('calculating solar properties done for building %s' % building_name)
-
     # get properties of the panel to evaluate
     panel_properties_SC = calc_properties_SC_db(locator.get_database_conversion_systems(), config)
     print('gathering properties of Solar collector panel for building %s' % building_name)
 
     # select sensor point with sufficient solar radiation
     max_annual_radiation, annual_radiation_threshold, sensors_rad_clean, sensors_metadata_clean = \
-        solar_equations.filter_low_potential(radiation_csv, metadata_csv, config)
+        solar_equations.filter_low_potential(radiation_path, sensors_index_csv, metadata_csv, config)
 
     print('filtering low potential sensor points done for building %s' % building_name)
 
@@ -379,119 +378,145 @@ def calc_SC_module(config, radiation_Wperm2, panel_properties, Tamb_vector_C, IA
     tilt_rad = radians(tilt_angle_deg)
     q_rad_vector = np.vectorize(calc_q_rad)(n0, IAM_b, IAM_d, radiation_Wperm2.I_direct, radiation_Wperm2.I_diffuse,
                                             tilt_rad)  # absorbed solar radiation in W/m2 is a mean of the group
-    for flow in range(6):
-        mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
-        TIME0 = 0
-        DELT = 1  # timestep 1 hour
-        delts = DELT * 3600  # convert time step in seconds
-        Tfl = np.zeros(3)  # create vector to store value at previous [1] and present [2] time-steps
-        DT = np.zeros(3)
-        Tabs = np.zeros(3)
-        STORED = np.zeros(600)
-        TflA = np.zeros(600)
-        TflB = np.zeros(600)
-        TabsB = np.zeros(600)
-        TabsA = np.zeros(600)
-        q_gain_Seg = np.zeros(101)  # maximum Iseg = maximum Nseg + 1 = 101
-
-        for time in range(HOURS_IN_YEAR):
-            Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C,
-                                         aperture_area_m2, specific_flows_kgpers[flow], time)
+    # the four fixed flow rates are calculated together, the optimal flow rate (4) depends on their results and the
+    # optimal flow rate without negative supply (5) on the results of the optimal flow rate.
+    for flows in [[0, 1, 2, 3], [4], [5]]:
+        Tout_Seg_C, q_out_kW = calc_SC_flows(np.array([specific_flows_kgpers[flow] for flow in flows]), q_rad_vector,
+                                             np.asarray(Tamb_vector_C, dtype=np.float64), Tin_C, aperture_area_m2, c1,
+                                             c2, C_eff_Jperm2K, Cp_fluid_JperkgK, Nseg)
+        for i, flow in enumerate(flows):
+            # outputs
+            temperature_out_C[flow] = Tout_Seg_C[i]
+            temperature_in_C[flow][:] = Tin_C
+            supply_out_kW[flow] = q_out_kW[i]
+            temperature_mean_C[flow] = (Tin_C + Tout_Seg_C[i]) / 2  # Mean absorber temperature at present
+
+            if flow < 4:
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow], pipe_lengths,
+                                                                        aperture_area_m2)  # in kW
+            if flow == 3:
+                q1 = supply_out_kW[0]
+                q2 = supply_out_kW[1]
+                q3 = supply_out_kW[2]
+                q4 = supply_out_kW[3]
+                E1 = auxiliary_electricity_kW[0]
+                E2 = auxiliary_electricity_kW[1]
+                E3 = auxiliary_electricity_kW[2]
+                E4 = auxiliary_electricity_kW[3]
+                # calculate optimal mass flow and the corresponding pressure loss
+                specific_flows_kgpers[4], specific_pressure_losses_Pa[4] = calc_optimal_mass_flow(q1, q2, q3, q4, E1,
+                                                                                                  E2, E3, E4, 0,
+                                                                                                  mB0_r, mB_max_r,
+                                                                                                  mB_min_r, 0,
+                                                                                                  dP2, dP3, dP4,
+                                                                                                  aperture_area_m2)
+            if flow == 4:
+                # calculate pumping electricity when operates at optimal mass flow
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow], pipe_lengths,
+                                                                        aperture_area_m2)  # in kW
+                dp5 = specific_pressure_losses_Pa[flow]
+                q5 = supply_out_kW[flow]
+                m5 = specific_flows_kgpers[flow]
+                # set flow rate to zero when supply_out_kW is negative
+                specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
+
+            if flow == 5:  # optimal mass flow
+                supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
+                                                                          pipe_lengths['l_ext_mperm2'],
+                                                                          aperture_area_m2,
+                                                                          temperature_mean_C[flow], Tamb_vector_C,
+                                                                          msc_max_kgpers)
+                auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
+                                                                        specific_pressure_losses_Pa[flow],
+                                                                        pipe_lengths, aperture_area_m2)  # in kW
+                supply_out_total_kW = supply_out_kW[flow].copy() + 0.5 * auxiliary_electricity_kW[flow].copy() - \
+                                      supply_losses_kW[flow].copy()  # eq.(58) _[J. Fonseca et al., 2016]
+                mcp_kWperK = specific_flows_kgpers[flow] * (Cp_fluid_JperkgK / 1000)  # mcp in kW/K
+
+                update_negative_total_supply(aperture_area_m2, auxiliary_electricity_kW, flow, mcp_kWperK,
+                                             pipe_lengths, specific_flows_kgpers, specific_pressure_losses_Pa,
+                                             supply_losses_kW, supply_out_total_kW)
 
-            Tamb_C = Tamb_vector_C[time]
-            q_rad_Wperm2 = q_rad_vector[time]
-            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C, aperture_area_m2, c1,
-                                 q_rad_Wperm2, Mfl_kgpers)
+    result = [supply_losses_kW[5], supply_out_total_kW, auxiliary_electricity_kW[5], temperature_out_C[5],
+              temperature_in_C[5], mcp_kWperK]
+
+    return result
+
+
+@jit(nopython=True)
+def calc_SC_flows(specific_flows_kgpers, q_rad_vector, Tamb_vector_C, Tin_C, aperture_area_m2, c1, c2, C_eff_Jperm2K,
+                  Cp_fluid_JperkgK, Nseg):
+    """
+    Calculate the outlet temperature and the heat production of a solar collector for several flow rate scenarios
+    (TRNSYS Type 832, see :py:func:`calc_SC_module`). The scenarios are independent of each other and advance together
+    through the time-steps, each with its own state.
+
+    :param specific_flows_kgpers: mass flow of each scenario (row) and time-step (column) [kg/s]
+    :type specific_flows_kgpers: ndarray
+    :param q_rad_vector: absorbed radiation [W/m2]
+    :param Tamb_vector_C: ambient temperatures [C]
+    :param Tin_C: inlet temperature [C]
+    :param aperture_area_m2: aperture area of each module [m2]
+    :param c1: collector heat loss coefficient at zero temperature difference and wind speed [W/m2K]
+    :param c2: temperature difference dependency of the heat loss coefficient [W/m2K2]
+    :param C_eff_Jperm2K: thermal capacitance of module [J/m2K]
+    :param Cp_fluid_JperkgK: heat capacity of the fluid [J/kgK]
+    :param Nseg: number of segments
+    :return: outlet temperature [C] and heat production [kW] of each scenario (row) and time-step (column)
+    """
+    number_of_flows, number_of_hours = specific_flows_kgpers.shape
+    mode_seg = 1  # mode of segmented heat loss calculation. only one mode is implemented.
+    TIME0 = 0
+    DELT = 1  # timestep 1 hour
+    delts = DELT * 3600  # convert time step in seconds
+    A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
+
+    # the state of each scenario (row)
+    Tfl = np.zeros((number_of_flows, 3))  # create vector to store value at previous [1] and present [2] time-steps
+    DT = np.zeros((number_of_flows, 3))
+    Tabs = np.zeros((number_of_flows, 3))
+    STORED = np.zeros((number_of_flows, 600))
+    TflA = np.zeros((number_of_flows, 600))
+    TflB = np.zeros((number_of_flows, 600))
+    TabsB = np.zeros((number_of_flows, 600))
+    TabsA = np.zeros((number_of_flows, 600))
+    q_gain_Seg = np.zeros((number_of_flows, 101))  # maximum Iseg = maximum Nseg + 1 = 101
+
+    temperature_out_C = np.zeros((number_of_flows, number_of_hours))
+    supply_out_kW = np.zeros((number_of_flows, number_of_hours))
+    for time in range(number_of_hours):
+        Tamb_C = Tamb_vector_C[time]
+        q_rad_Wperm2 = q_rad_vector[time]
+        for flow in range(number_of_flows):
+            Mfl_kgpers = calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED[flow], TIME0, Tin_C,
+                                         aperture_area_m2, specific_flows_kgpers[flow], time)
+            Tout_C = calc_Tout_C(Cp_fluid_JperkgK, DT[flow], Nseg, STORED[flow], Tabs[flow], Tamb_C, Tfl[flow], Tin_C,
+                                 aperture_area_m2, c1, q_rad_Wperm2, Mfl_kgpers)
             # calculate q_gain with the guess for DT[1]
-            q_gain_Wperm2 = calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1, c2,
+            q_gain_Wperm2 = calc_q_gain(Tfl[flow], q_rad_Wperm2, DT[flow], Tin_C, aperture_area_m2, c1, c2,
                                         Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
 
-            A_seg_m2 = aperture_area_m2 / Nseg  # aperture area per segment
-
             # multi-segment calculation to avoid temperature jump at times of flow rate changes.
-            Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg,
-                                                      STORED, Tabs, TabsA, Tamb_C, Tfl, TflA, TflB, Tin_C, Tout_C, c1,
-                                                      c2, delts, mode_seg, q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
+            Tout_Seg_C = do_multi_segment_calculation(A_seg_m2, C_eff_Jperm2K, Cp_fluid_JperkgK, DT[flow], Mfl_kgpers,
+                                                      Nseg, STORED[flow], Tabs[flow], TabsA[flow], Tamb_C, Tfl[flow],
+                                                      TflA[flow], TflB[flow], Tin_C, Tout_C, c1, c2, delts, mode_seg,
+                                                      q_gain_Seg[flow], q_gain_Wperm2, q_rad_Wperm2)
 
             # resulting net energy output
-            q_out_kW = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # [kW]
-            Tabs[2] = 0
+            supply_out_kW[flow, time] = (Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C)) / 1000  # [kW]
+            temperature_out_C[flow, time] = Tout_Seg_C
+            Tabs[flow, 2] = 0
             # storage of the mean temperature
             for Iseg in range(1, Nseg + 1):
-                STORED[200 + Iseg] = TflB[Iseg]
-                STORED[400 + Iseg] = TabsB[Iseg]
-                Tabs[2] = Tabs[2] + TabsB[Iseg] / Nseg
+                STORED[flow, 200 + Iseg] = TflB[flow, Iseg]
+                STORED[flow, 400 + Iseg] = TabsB[flow, Iseg]
+                Tabs[flow, 2] = Tabs[flow, 2] + TabsB[flow, Iseg] / Nseg
 
-            # outputs
-            temperature_out_C[flow][time] = Tout_Seg_C
-            temperature_in_C[flow][time] = Tin_C
-            supply_out_kW[flow][time] = q_out_kW
-            temperature_mean_C[flow][time] = (Tin_C + Tout_Seg_C) / 2  # Mean absorber temperature at present
-
-            # the following lines do not perform meaningful operation, the iteration on DT are performed in calc_q_gain
-            # these lines are kept here as a reference to the original model in FORTRAN
-            # q_gain = 0
-            # TavgB = 0
-            # TavgA = 0
-            # for Iseg in range(1, Nseg + 1):
-            #     q_gain = q_gain + q_gain_Seg[Iseg] * A_seg_m2  # [W]
-            #     TavgA = TavgA + TflA[Iseg] / Nseg
-            #     TavgB = TavgB + TflB[Iseg] / Nseg
-            # # OUT[9] = q_gain/Area_a # in W/m2
-            # OUT[11] = q_mtherm
-            # OUT[12] = q_balance_error
-        if flow < 4:
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow], pipe_lengths,
-                                                                    aperture_area_m2)  # in kW
-        if flow == 3:
-            q1 = supply_out_kW[0]
-            q2 = supply_out_kW[1]
-            q3 = supply_out_kW[2]
-            q4 = supply_out_kW[3]
-            E1 = auxiliary_electricity_kW[0]
-            E2 = auxiliary_electricity_kW[1]
-            E3 = auxiliary_electricity_kW[2]
-            E4 = auxiliary_electricity_kW[3]
-            # calculate optimal mass flow and the corresponding pressure loss
-            specific_flows_kgpers[4], specific_pressure_losses_Pa[4] = calc_optimal_mass_flow(q1, q2, q3, q4, E1, E2,
-                                                                                              E3, E4, 0,
-                                                                                              mB0_r, mB_max_r, mB_min_r,
-                                                                                              0,
-                                                                                              dP2, dP3, dP4,
-                                                                                              aperture_area_m2)
-        if flow == 4:
-            # calculate pumping electricity when operates at optimal mass flow
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow], pipe_lengths,
-                                                                    aperture_area_m2)  # in kW
-            dp5 = specific_pressure_losses_Pa[flow]
-            q5 = supply_out_kW[flow]
-            m5 = specific_flows_kgpers[flow]
-            # set flow rate to zero when supply_out_kW is negative
-            specific_flows_kgpers[5], specific_pressure_losses_Pa[5] = calc_optimal_mass_flow_2(m5, q5, dp5)
-
-        if flow == 5:  # optimal mass flow
-            supply_losses_kW[flow] = np.vectorize(calc_qloss_network)(specific_flows_kgpers[flow],
-                                                                      pipe_lengths['l_ext_mperm2'],
-                                                                      aperture_area_m2,
-                                                                      temperature_mean_C[flow], Tamb_vector_C,
-                                                                      msc_max_kgpers)
-            auxiliary_electricity_kW[flow] = vectorize_calc_Eaux_SC(specific_flows_kgpers[flow],
-                                                                    specific_pressure_losses_Pa[flow],
-                                                                    pipe_lengths, aperture_area_m2)  # in kW
-            supply_out_total_kW = supply_out_kW[flow].copy() + 0.5 * auxiliary_electricity_kW[flow].copy() - \
-                                  supply_losses_kW[flow].copy()  # eq.(58) _[J. Fonseca et al., 2016]
-            mcp_kWperK = specific_flows_kgpers[flow] * (Cp_fluid_JperkgK / 1000)  # mcp in kW/K
-
-            update_negative_total_supply(aperture_area_m2, auxiliary_electricity_kW, flow, mcp_kWperK, pipe_lengths,
-                                         specific_flows_kgpers, specific_pressure_losses_Pa, supply_losses_kW,
-                                         supply_out_total_kW)
-
-    result = [supply_losses_kW[5], supply_out_total_kW, auxiliary_electricity_kW[5], temperature_out_C[5],
-              temperature_in_C[5], mcp_kWperK]
-
-    return result
+            # the balance of the original model in FORTRAN (q_gain, TavgA, TavgB, q_mtherm and q_balance_error) is not
+            # calculated, the iteration on DT is performed in calc_q_gain
+    return temperature_out_C, supply_out_kW
 
 
 @jit(nopython=True)
@@ -814,7 +839,8 @@ def calc_properties_SC_db(database_path, config):
 def vectorize_calc_Eaux_SC(scpecific_flow_kgpers, dP_collector_Pa, pipe_lengths, Aa_m2):
     Leq_mperm2 = pipe_lengths['Leq_mperm2']
     l_int_mperm2 = pipe_lengths['l_int_mperm2']
-    return np.vectorize(calc_Eaux_SC)(scpecific_flow_kgpers, dP_collector_Pa, Leq_mperm2, l_int_mperm2, Aa_m2)
+    return calc_Eaux_SC(np.asarray(scpecific_flow_kgpers, dtype=np.float64), dP_collector_Pa, Leq_mperm2, l_int_mperm2,
+                        Aa_m2)
 
 
 def calc_Eaux_SC(specific_flow_kgpers, dP_collector_Pa, Leq_mperm2, l_int_mperm2, Aa_m2):
@@ -903,18 +929,14 @@ def calc_optimal_mass_flow(q1, q2, q3, q4, E1, E2, E3, E4, m1, m2, m3, m4, dP1,
     Energy and Buildings, 2016.
     """
 
-    mass_flow_opt = np.empty(HOURS_IN_YEAR)
-    dP_opt = np.empty(HOURS_IN_YEAR)
     const = Area_a / 3600
-    mass_flow_all_kgpers = [m1 * const, m2 * const, m3 * const, m4 * const]  # [kg/s]
-    dP_all_Pa = [dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a]  # [Pa]
-    balances = [abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2]  # energy generation function eq.(63)
-    for time in range(HOURS_IN_YEAR):
-        balances_time = [balances[0][time], balances[1][time], balances[2][time], balances[3][time]]
-        max_heat_production = np.max(balances_time)
-        ix_max_heat_production = np.where(balances_time == max_heat_production)
-        mass_flow_opt[time] = mass_flow_all_kgpers[ix_max_heat_production[0][0]]
-        dP_opt[time] = dP_all_Pa[ix_max_heat_production[0][0]]
+    mass_flow_all_kgpers = np.array([m1 * const, m2 * const, m3 * const, m4 * const])  # [kg/s]
+    dP_all_Pa = np.array([dP1 * Area_a, dP2 * Area_a, dP3 * Area_a, dP4 * Area_a])  # [Pa]
+    balances = np.array([abs(q1) - E1 * 2, q2 - E2 * 2, q3 - E3 * 2, q4 - E4 * 2])  # energy generation function eq.(63)
+    # the first flow rate with the maximum heat production in each time-step
+    ix_max_heat_production = np.argmax(balances, axis=0)
+    mass_flow_opt = mass_flow_all_kgpers[ix_max_heat_production]
+    dP_opt = dP_all_Pa[ix_max_heat_production]
     return mass_flow_opt, dP_opt
 
 
@@ -927,10 +949,8 @@ def calc_optimal_mass_flow_2(m, q, dp):
     :return m: hourly mass flow rate [kg/s]
     :return dp: hourly pressure drop [Pa]
     """
-    for time in range(HOURS_IN_YEAR):
-        if q[time] <= 0:
-            m[time] = 0
-            dp[time] = 0
+    m[q <= 0] = 0
+    dp[q <= 0] = 0
     return m, dp
 
 
@@ -940,7 +960,7 @@ def calc_Cinv_SC(Area_m2, locator, panel_type):
     Lifetime 35 years
     """
     if Area_m2 > 0.0:
-        SC_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="SC")
+        SC_cost_data = SupplySystemsDatabase(locator).SC
         SC_cost_data = SC_cost_data[SC_cost_data['type'] == panel_type]
         cap_min = SC_cost_data['cap_min'].values[0]
         cap_max = SC_cost_data['cap_max'].values[0]
@@ -1004,11 +1024,16 @@ def main(config):
     date_local = solar_equations.calc_datetime_local_from_weather_file(weather_data, latitude, longitude)
     print('reading weather data done')
 
+    # solar properties (the same for all buildings)
+    solar_properties = solar_equations.calc_sun_properties(latitude, longitude, weather_data, date_local,
+                                                           config.solar.solar_window_solstice, locator)
+    print('calculating solar properties done')
+
     n = len(building_names)
     cea.utilities.parallel.vectorize(calc_SC, config.get_number_of_processes())(repeat(locator, n),
                                                                                 repeat(config, n),
                                                                                 repeat(latitude, n),
-                                                                                repeat(longitude, n),
+                                                                                repeat(solar_properties, n),
                                                                                 repeat(weather_data, n),
                                                                                 repeat(date_local, n),
                                                                                 building_names)
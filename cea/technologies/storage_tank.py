@@ -9,9 +9,12 @@ Sensible Heat Storage - Fully Mixed tank
 import math
 
 import numpy as np
+from numba import jit
+from numba.extending import register_jitable
 from scipy.integrate import odeint
 
 from cea.constants import ASPECT_RATIO, HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, WH_TO_J
+from cea.demand import constants as demand_constants
 from cea.demand.constants import TWW_SETPOINT, B_F
 from cea.optimization.constants import T_TANK_FULLY_DISCHARGED_K, T_TANK_FULLY_CHARGED_K, DT_COOL
 from cea.technologies.constants import U_COOL, U_HEAT, TANK_HEX_EFFECTIVENESS
@@ -95,6 +98,7 @@ def calc_hot_tank_heat_loss(Area_tank_surface_m2, T_tank_C, tamb):
     return q_loss_W
 
 
+@register_jitable
 def calc_cold_tank_heat_loss(Area_tank_surface_m2, T_tank_C, T_ambient_C):
     q_loss_W = U_DHWTANK * Area_tank_surface_m2 * (T_ambient_C - T_tank_C)  # tank heat gain from the room in [Wh]
     return q_loss_W
@@ -111,6 +115,7 @@ def calc_tank_surface_area(V_tank_m3):
     return A_tank_m2
 
 
+@register_jitable
 def ode_hot_water_tank(y, t, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3):
     """
     This algorithm describe the energy balance of the dhw tank with a differential equation.
@@ -140,6 +145,7 @@ def ode_hot_water_tank(y, t, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3):
     return dydt
 
 
+@register_jitable
 def ode_cold_water_tank(y, t, q_gain_W, q_discharged_W, q_charged_W, V_tank_m3):
     """
     This algorithm describe the energy balance of the dhw tank with a differential equation.
@@ -188,27 +194,36 @@ def calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_ta
     :returns T_tank_C: tank temperature after the energy balance
     :rtype T_tank_C: float
     """
+    if tank_type not in ('hot_water', 'cold_water'):
+        raise ValueError('Please specified the tank type, it should be either cold_water or hot_water.')
+    if demand_constants.USE_JIT_KERNEL:
+        return _calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3,
+                                      tank_type == 'hot_water')
+
     t = np.linspace(0, 1, 2)
     if tank_type == 'hot_water':
         y = odeint(ode_hot_water_tank, T_start_C, t, args=(
             q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
-    elif tank_type == 'cold_water':
+    else:
         y = odeint(ode_cold_water_tank, T_start_C, t, args=(
             q_loss_W, q_discharged_W, q_charged_W, V_tank_m3))
-    else:
-        raise ValueError('Please specified the tank type, it should be either cold_water or hot_water.')
     T_tank_C = y[1]
     return T_tank_C[0]
 
 
-# use the optimized (numba_cc) versions of the ode function in this module if available
-try:
-    # import Numba AOT versions of the functions above, overwriting them
-    from .storagetank_cc import (ode)
-except ImportError:
-    # fall back to using the python version
-    # print('failed to import from storagetank_cc.pyd, falling back to pure python functions')
-    pass
+@jit(nopython=True, cache=True)
+def _calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3, hot_water):
+    """
+    Numba compiled version of :py:func:`calc_tank_temperature` (see ``cea.demand.constants.USE_JIT_KERNEL``).
+
+    The energy balance of the fully mixed tank does not depend on the tank temperature, so the ode is solved exactly
+    by a single step over the time step of one hour (instead of integrating it with ``odeint``).
+    """
+    if hot_water:
+        dydt = ode_hot_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
+    else:
+        dydt = ode_cold_water_tank(T_start_C, 0.0, q_loss_W, q_discharged_W, q_charged_W, V_tank_m3)
+    return T_start_C + dydt
 
 
 # ================================
@@ -1,16 +1,45 @@
 """
 This module provides an interface to the "supply_systems.xls" file (locator.get_database_supply_systems()) - the point
 is to avoid reading this data (which is constant during the lifetime of a script) again and again.
+
+The worksheets are kept per process, by the path of each database file: a database file is read the first time one of
+its worksheets is used and the technology cost curves are then shared by all the tasks of a process (e.g. the buildings
+of the decentralized preprocessing of the optimization), also when each task gets its own copy of the locator. Each
+worksheet is returned as a copy, so modifying it does not change the worksheets of the other tasks. Only the locator is
+pickled when a :py:class:`SupplySystemsDatabase` is sent to a worker process.
 """
 
 
 
 
+import os
+
 import pandas as pd
 import cea.inputlocator
 
-# keep track of locators previously seen so we don't re-read excel files twice
-_locators = {}
+# keep track of the database files previously read so we don't re-read excel files twice, by the path (and the
+# modification time) of each file
+_databases = {}
+
+
+def read_worksheets(path):
+    """
+    Read all worksheets of a database file, using the cache _databases. The file is read again if it was changed.
+
+    :param str path: path to the database file
+    :rtype: dict
+    """
+    key = (path, os.path.getmtime(path))
+    if key not in _databases:
+        for outdated_key in [outdated_key for outdated_key in _databases if outdated_key[0] == path]:
+            del _databases[outdated_key]
+        _databases[key] = pd.read_excel(path, sheet_name=None)
+    return _databases[key]
+
+
+def _worksheet(locator_method, sheet_name):
+    """A property returning a copy of a worksheet of the database file at the path given by ``locator_method``"""
+    return property(lambda self: read_worksheets(getattr(self.locator, locator_method)())[sheet_name].copy())
 
 
 class SupplySystemsDatabase(object):
@@ -18,40 +47,37 @@ class SupplySystemsDatabase(object):
     Expose the worksheets in supply_systems.xls as pandas.Dataframes.
     """
     def __init__(self, locator):
-        """        
+        """
         :param cea.inputlocator.InputLocator locator: provides the path to the
         """
+        self.locator = locator
+
+    def __getstate__(self):
+        """Only pickle the locator, the worksheets are read (once) by the process the object is sent to"""
+        return {'locator': self.locator}
+
+    def __setstate__(self, state):
+        self.__init__(state['locator'])
+
+    @property
+    def FEEDSTOCKS(self):
+        return {sheet_name: worksheet.copy() for sheet_name, worksheet in
+                read_worksheets(self.locator.get_database_feedstocks()).items()}
 
-        conversion_systems_worksheets,\
-        distribution_systems_worksheets,\
-        feedstocks_worksheets = self.read_excel(locator)
-
-        self.FEEDSTOCKS = feedstocks_worksheets
-        self.PIPING = distribution_systems_worksheets["THERMAL_GRID"]
-        self.PV = conversion_systems_worksheets["PV"]
-        self.SC = conversion_systems_worksheets["SC"]
-        self.PVT = conversion_systems_worksheets["PVT"]
-        self.Boiler = conversion_systems_worksheets["Boiler"]
-        self.Furnace = conversion_systems_worksheets["Furnace"]
-        self.FC = conversion_systems_worksheets["FC"]
-        self.CCGT = conversion_systems_worksheets["CCGT"]
-        self.Chiller = conversion_systems_worksheets["Chiller"]
-        self.Absorption_chiller = conversion_systems_worksheets["Absorption_chiller"]
-        self.CT = conversion_systems_worksheets["CT"]
-        self.HEX = conversion_systems_worksheets["HEX"]
-        self.BH = conversion_systems_worksheets["BH"]
-        self.HP = conversion_systems_worksheets["HP"]
-        self.TES = conversion_systems_worksheets["TES"]
-        self.Pump = conversion_systems_worksheets["Pump"]
-
-    def read_excel(self, locator):
-        """Read in the excel file, using the cache _locators"""
-        global _locators
-        if locator in _locators:
-            conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets = _locators[locator]
-        else:
-            conversion_systems_worksheets = pd.read_excel(locator.get_database_conversion_systems(), sheet_name=None)
-            distribution_systems_worksheets = pd.read_excel(locator.get_database_distribution_systems(), sheet_name=None)
-            feedstocks_worksheets = pd.read_excel(locator.get_database_feedstocks(), sheet_name=None)
-            _locators[locator] = conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets
-        return conversion_systems_worksheets, distribution_systems_worksheets, feedstocks_worksheets
+    PIPING = _worksheet('get_database_distribution_systems', "THERMAL_GRID")
+    PV = _worksheet('get_database_conversion_systems', "PV")
+    SC = _worksheet('get_database_conversion_systems', "SC")
+    PVT = _worksheet('get_database_conversion_systems', "PVT")
+    Boiler = _worksheet('get_database_conversion_systems', "Boiler")
+    Furnace = _worksheet('get_database_conversion_systems', "Furnace")
+    FC = _worksheet('get_database_conversion_systems', "FC")
+    CCGT = _worksheet('get_database_conversion_systems', "CCGT")
+    Chiller = _worksheet('get_database_conversion_systems', "Chiller")
+    Chiller_configuration = _worksheet('get_database_conversion_systems', "Chiller_configuration")
+    Absorption_chiller = _worksheet('get_database_conversion_systems', "Absorption_chiller")
+    CT = _worksheet('get_database_conversion_systems', "CT")
+    HEX = _worksheet('get_database_conversion_systems', "HEX")
+    BH = _worksheet('get_database_conversion_systems', "BH")
+    HP = _worksheet('get_database_conversion_systems', "HP")
+    TES = _worksheet('get_database_conversion_systems', "TES")
+    Pump = _worksheet('get_database_conversion_systems', "Pump")
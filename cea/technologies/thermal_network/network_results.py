@@ -0,0 +1,188 @@
+"""
+Hourly results of the detailed thermal network
+
+The results of each time step of the thermal-hydraulic calculation (see
+:py:func:`cea.technologies.thermal_network.thermal_network.hourly_thermal_calculation`) are copied into preallocated
+arrays (one row per time step) by a :py:class:`HourlyResultsWriter` as soon as the time step is calculated, so the
+results of the whole year are never held as lists of Series or DataFrames. The temperatures, mass flows, velocities and
+thermal losses of the pipes are kept as float32, so their last digit in the csv files can differ from the float64
+values. The pressures, the pressure losses and the totals of the network (e.g. the plant heat requirement), whose
+values are too large for the 7 significant digits of a float32, are kept as float64. The output files are written from
+the arrays when the calculation is done, in the format set by the thermal-network:output-format parameter: csv, or one
+of the binary formats of :py:data:`cea.schemas.BINARY_FORMATS`, which are written without formatting the values as
+text and are read transparently by ``CsvSchemaIo.existing_path`` / :py:func:`cea.schemas.read_dataframe`.
+"""
+
+import collections
+import os
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand.demand_writers import FLOAT_FORMAT, write_binary, remove_other_formats
+
+__author__ = "Martin Mosteiro Romero, Lennart Rogenhofer"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Martin Mosteiro Romero", "Lennart Rogenhofer", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# collect the results of each call to hourly_thermal_calculation in a record
+HourlyThermalResults = collections.namedtuple('HourlyThermalResults',
+                                              ['T_supply_nodes', 'T_return_nodes',
+                                               'temperatures_at_plant_K',
+                                               'q_loss_supply_edges_kW',
+                                               'linear_thermal_loss_supply_edges_Wperm',
+                                               'thermal_losses_system_kW',
+                                               'plant_heat_requirement',
+                                               'pressure_at_supply_nodes_Pa',
+                                               'pressure_loss_system_Pa',
+                                               'pressure_loss_system_kW',
+                                               'pressure_loss_substations_kW',
+                                               'linear_pressure_loss_supply_Paperm',
+                                               'edge_mass_flows', 'node_mass_flows',
+                                               'velocities_in_supply_edges_mpers',
+                                               'pressure_loss_supply_edge_kW'])
+
+# an output file of the hourly results: the field of ``HourlyThermalResults`` written to it, the name of its locator
+# method, its columns, the representation of missing values and the type of the values stored (float32 by default)
+ResultFile = collections.namedtuple('ResultFile', ['field', 'locator_method', 'columns', 'na_rep', 'dtype'],
+                                    defaults=[np.float32])
+
+
+def get_result_files(thermal_network):
+    """
+    The output files of the hourly results of a thermal network.
+
+    :param ThermalNetwork thermal_network: the thermal network, with its edge-node matrix and nodes
+    :rtype: list[ResultFile]
+    """
+    nodes = list(thermal_network.edge_node_df.index)
+    edges = list(thermal_network.edge_node_df.columns)
+    all_nodes_df = thermal_network.all_nodes_df
+    plants = list(filter(None, all_nodes_df[all_nodes_df.Type == 'PLANT'].Building.values))
+    return [
+        ResultFile('edge_mass_flows', 'get_thermal_network_layout_massflow_edges_file', edges, 'NaN'),
+        ResultFile('node_mass_flows', 'get_thermal_network_layout_massflow_nodes_file', nodes, 'NaN'),
+        ResultFile('velocities_in_supply_edges_mpers', 'get_thermal_network_velocity_edges_file', edges, 'NaN'),
+        ResultFile('pressure_at_supply_nodes_Pa', 'get_network_pressure_at_nodes', nodes, '', np.float64),
+        ResultFile('pressure_loss_system_Pa', 'get_network_total_pressure_drop_file',
+                   ['pressure_loss_supply_Pa', 'pressure_loss_return_Pa', 'pressure_loss_substations_Pa',
+                    'pressure_loss_total_Pa'], '', np.float64),
+        ResultFile('pressure_loss_system_kW', 'get_network_energy_pumping_requirements_file',
+                   ['pressure_loss_supply_kW', 'pressure_loss_return_kW', 'pressure_loss_substations_kW',
+                    'pressure_loss_total_kW'], '', np.float64),
+        ResultFile('pressure_loss_substations_kW', 'get_thermal_network_substation_ploss_file',
+                   list(thermal_network.building_names), '', np.float64),
+        ResultFile('thermal_losses_system_kW', 'get_network_total_thermal_loss_file',
+                   ['thermal_loss_supply_kW', 'thermal_loss_return_kW', 'thermal_loss_total_kW'], '', np.float64),
+        ResultFile('q_loss_supply_edges_kW', 'get_network_thermal_loss_edges_file', edges, ''),
+        ResultFile('linear_thermal_loss_supply_edges_Wperm', 'get_network_linear_thermal_loss_edges_file', edges, ''),
+        ResultFile('pressure_loss_supply_edge_kW', 'get_thermal_network_pressure_losses_edges_file', edges, '',
+                   np.float64),
+        ResultFile('linear_pressure_loss_supply_Paperm', 'get_network_linear_pressure_drop_edges', edges, '',
+                   np.float64),
+        # a single plant is written as 'thermal_load_kW' (see schemas.yml), several plants by building
+        ResultFile('plant_heat_requirement', 'get_thermal_network_plant_heat_requirement_file',
+                   ['thermal_load_kW'] if len(plants) == 1 else plants, '', np.float64),
+        ResultFile('T_supply_nodes', 'get_network_temperature_supply_nodes_file', nodes, 'NaN'),
+        ResultFile('T_return_nodes', 'get_network_temperature_return_nodes_file', nodes, 'NaN'),
+        ResultFile('temperatures_at_plant_K', 'get_network_temperature_plant',
+                   ['temperature_supply_K', 'temperature_return_K'], ''),
+    ]
+
+
+class HourlyResultsWriter(object):
+    """
+    Collect the hourly results of a thermal network in preallocated arrays (of the type of each output file) and write
+    them to the output files of the network when the calculation is done. The time steps can be added in any order.
+    """
+
+    def __init__(self, thermal_network, number_of_time_steps):
+        """
+        :param ThermalNetwork thermal_network: the thermal network, with its edge-node matrix and nodes
+        :param int number_of_time_steps: the number of time steps calculated, starting at ``thermal_network.start_t``
+        """
+        self.thermal_network = thermal_network
+        self.start_t = thermal_network.start_t
+        self.result_files = get_result_files(thermal_network)
+        self.results = {result_file.field: np.full((number_of_time_steps, len(result_file.columns)), np.nan,
+                                                   dtype=result_file.dtype)
+                        for result_file in self.result_files}
+
+    def add(self, t, hourly_thermal_results):
+        """
+        Copy the results of a time step into the arrays.
+
+        :param int t: the time step
+        :param HourlyThermalResults hourly_thermal_results: the results of the time step
+        """
+        row = t - self.start_t
+        for result_file in self.result_files:
+            value = getattr(hourly_thermal_results, result_file.field)
+            if isinstance(value, list):
+                # a list of values and 1-element arrays, e.g. the plant temperatures
+                value = np.hstack(value)
+            self.results[result_file.field][row] = np.ravel(value)
+
+    def get_plant_peak_heat_requirement(self):
+        """The highest absolute heat requirement of each plant over the time steps calculated (kW)"""
+        return np.nanmax(np.abs(self.results['plant_heat_requirement']), axis=0)
+
+    def save(self, output_format='csv'):
+        """
+        Write the results to the output files of the network. The time steps of the typical days or the representative
+        weeks of each month are expanded to a full year (see :py:func:`expand_to_year`), as the plots and the network
+        optimization expect 8760 time steps.
+
+        :param str output_format: one of ``cea.demand.demand_writers.OUTPUT_FORMATS``
+        """
+        locator = self.thermal_network.locator
+        for result_file in self.result_files:
+            values = expand_to_year(self.thermal_network, self.results[result_file.field])
+            df = pd.DataFrame(values, columns=result_file.columns)
+            path = getattr(locator, result_file.locator_method)(self.thermal_network.network_type,
+                                                                self.thermal_network.network_name)
+            if output_format == 'csv':
+                df.to_csv(path, na_rep=result_file.na_rep, index=False, float_format=FLOAT_FORMAT)
+            else:
+                write_binary(df, os.path.splitext(path)[0] + '.' + output_format, output_format)
+            remove_other_formats(path, output_format)
+
+
+def expand_to_year(thermal_network, values):
+    """
+    Expand the values of the time steps calculated to the 8760 hours of the year if the network was calculated for its
+    typical days (see :py:meth:`cea.utilities.time_series_aggregation.TypicalDays.expand`) or for the representative
+    weeks of each month (see :py:func:`extrapolate_representative_weeks`), else return them as they are.
+
+    :param ThermalNetwork thermal_network: the thermal network calculated
+    :param values: the values of each time step calculated (one row per time step)
+    :type values: ndarray or pd.DataFrame
+    :return: the values of each hour of the year, in the type of ``values``
+    """
+    if thermal_network.typical_days is not None:
+        return thermal_network.typical_days.expand(values)
+    if thermal_network.use_representative_week_per_month:
+        if isinstance(values, pd.DataFrame):
+            return pd.DataFrame(extrapolate_representative_weeks(values.values), columns=values.columns)
+        return extrapolate_representative_weeks(values)
+    return values
+
+
+def extrapolate_representative_weeks(representative_week_values):
+    """
+    Extend the values of the representative weeks to 8760 time steps: the 2016 time steps are repeated 4 times and the
+    remaining time steps are filled with their average.
+
+    :param ndarray representative_week_values: the values of the representative weeks (one row per time step)
+    :rtype: ndarray
+    """
+    repeated = np.tile(representative_week_values, (4, 1))
+    average = pd.DataFrame(representative_week_values).mean().values.astype(representative_week_values.dtype)
+    return np.vstack([repeated, np.tile(average, (HOURS_IN_YEAR - len(repeated), 1))])
+
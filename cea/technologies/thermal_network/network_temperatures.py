@@ -0,0 +1,405 @@
+"""
+Compiled temperature propagation of the detailed thermal network
+
+The temperature of a node of the supply or the return network only depends on the temperatures of the pipes flowing
+into it, so the temperatures of a network are solved by visiting its nodes once in the order of the flow (a
+topological order). The kernels work on the integer node-edge adjacency of a
+:py:class:`cea.technologies.thermal_network.network_topology.NetworkTopology`, which is computed once per layout, and
+solve a block of time steps per call (one row of edge directions and mass flows per time step).
+
+The kernels reproduce the sweep over the nodes of :py:func:`cea.technologies.thermal_network.thermal_network.
+calculate_outflow_temp`, including the pass of the sweep in which each node is reached: it decides the temperature of
+the nodes where several flows end and of the plant in the return network. Time steps in which the flows form a loop, or
+in which the sweep would stop before all the nodes are solved, are reported as ``NOT_ORDERED`` and are left to the
+sweep.
+"""
+
+import numpy as np
+from numba import jit
+from numba.extending import register_jitable
+
+from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+
+__author__ = "Martin Mosteiro Romero, Lennart Rogenhofer"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Martin Mosteiro Romero", "Lennart Rogenhofer", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# status of each time step solved by the kernels
+SOLVED = 0
+NOT_ORDERED = 1  # the flows form a loop or the sweep over the nodes stops early
+NO_INFLOW = 2  # no water flows into a node with outflows
+
+MAX_TEMPERATURE_LOSS_K = 30  # assumed maximum temperature loss of a pipe at very low mass flows
+TOLERANCE = 1e-8  # absolute tolerance of numpy.isclose
+
+
+@register_jitable
+def calc_pipe_outlet_temperature(t_in, mass_flow, k, t_ground, is_district_heating):
+    """
+    The outlet temperature of a pipe (see :py:func:`cea.technologies.thermal_network.thermal_network.calc_t_out`) and
+    whether its temperature loss was limited to ``MAX_TEMPERATURE_LOSS_K``.
+    """
+    if abs(mass_flow) <= TOLERANCE:
+        return np.nan, False
+    t_out = calc_temperature_out_per_pipe(t_in, mass_flow, k, t_ground)
+    if abs(t_in - t_out) > MAX_TEMPERATURE_LOSS_K:
+        if is_district_heating:
+            return t_in - MAX_TEMPERATURE_LOSS_K, True
+        return t_in + MAX_TEMPERATURE_LOSS_K, True
+    return t_out, False
+
+
+@register_jitable
+def orient_edges(edge_start, edge_end, edge_directions, upstream, downstream):
+    """The node each edge leaves and the node it points to for the given directions (+1 or -1) of the edges"""
+    for edge in range(edge_start.size):
+        if edge_directions[edge] > 0:
+            upstream[edge] = edge_start[edge]
+            downstream[edge] = edge_end[edge]
+        else:
+            upstream[edge] = edge_end[edge]
+            downstream[edge] = edge_start[edge]
+
+
+@register_jitable
+def find_active_edges(node_edges_indptr, node_edges, upstream, downstream, mass_flows, isolated, active):
+    """
+    The nodes without flows entering or leaving them (isolated) and the edges between nodes that are not isolated
+    (active). The edges of the isolated nodes are left out of the temperature calculation.
+    """
+    for node in range(isolated.size):
+        inflow = 0.0
+        outflow = 0.0
+        for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+            edge = node_edges[i]
+            if downstream[edge] == node:
+                inflow += mass_flows[edge]
+            else:
+                outflow += mass_flows[edge]
+        isolated[node] = abs(inflow) <= TOLERANCE and abs(outflow) <= TOLERANCE
+    for edge in range(upstream.size):
+        active[edge] = not (isolated[upstream[edge]] or isolated[downstream[edge]])
+
+
+@register_jitable
+def order_nodes(node_edges_indptr, node_edges, upstream, downstream, active, unknown, order):
+    """
+    Writes the nodes with an unknown temperature in topological order of the active edges (Kahn's algorithm) to
+    ``order`` and returns the number of nodes ordered, which is less than the number of unknown nodes if the flows
+    form a loop.
+    """
+    inflows = np.zeros(unknown.size, dtype=np.int64)
+    for edge in range(upstream.size):
+        if active[edge] and unknown[upstream[edge]] and unknown[downstream[edge]]:
+            inflows[downstream[edge]] += 1
+    number_ordered = 0
+    for node in range(unknown.size):
+        if unknown[node] and inflows[node] == 0:
+            order[number_ordered] = node
+            number_ordered += 1
+    position = 0
+    while position < number_ordered:
+        node = order[position]
+        position += 1
+        for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+            edge = node_edges[i]
+            next_node = downstream[edge]
+            if active[edge] and upstream[edge] == node and unknown[next_node]:
+                inflows[next_node] -= 1
+                if inflows[next_node] == 0:
+                    order[number_ordered] = next_node
+                    number_ordered += 1
+    return number_ordered
+
+
+@register_jitable
+def visible_pass(solved_pass, upstream_node, node):
+    """
+    The pass of the sweep over the nodes in which ``node`` sees the outflow of ``upstream_node``, solved in
+    ``solved_pass`` (0 if it was solved before the sweep). The sweep visits the nodes in order of their index.
+    """
+    if solved_pass == 0:
+        return 1
+    if upstream_node < node:
+        return solved_pass
+    return solved_pass + 1
+
+
+@jit(nopython=True, cache=True)
+def calc_supply_temperatures_of_time_steps(node_edges_indptr, node_edges, edge_start, edge_end, is_plant,
+                                           is_district_heating, edge_directions, mass_flows, k, t_ground,
+                                           t_plant_supply):
+    """
+    The temperatures of the supply network, starting from the plants. At nodes where several flows meet, the mixing
+    temperature is calculated. At the ends of the network, the node takes the highest temperature of the flows reaching
+    it in the first pass of the sweep in which any of them arrives.
+
+    :param node_edges_indptr: the index of the first edge of each node in ``node_edges`` (CSR)           (n + 1 x 1)
+    :param node_edges: the edges of each node (CSR)
+    :param edge_start: the node each edge leaves in the direction of the topology                              (e x 1)
+    :param edge_end: the node each edge points to in the direction of the topology                             (e x 1)
+    :param is_plant: True for the plant nodes                                                                  (n x 1)
+    :param bool is_district_heating: True for a district heating network, False for a district cooling network
+    :param edge_directions: the direction of the flow in each edge relative to the topology (+1 or -1)         (t x e)
+    :param mass_flows: the mass flow in each edge [kg/s]                                                       (t x e)
+    :param k: the aggregated heat conduction coefficient of each edge [kW/K]                                   (t x e)
+    :param t_ground: the ground temperature [K]                                                                (t x 1)
+    :param t_plant_supply: the supply temperature of the plants [K]                                            (t x 1)
+
+    :return: the temperature of each node [K] (t x n), the temperature at the inlet (t x e) and the outlet (t x e) of
+             each edge [K], whether the temperature loss of each edge was limited (t x e), the status of each time step
+             (t x 1) and the node without inflow of the time steps with the status ``NO_INFLOW`` (t x 1)
+    """
+    number_of_time_steps, number_of_edges = mass_flows.shape
+    number_of_nodes = is_plant.size
+    t_node = np.zeros((number_of_time_steps, number_of_nodes))
+    t_edge_in = np.zeros((number_of_time_steps, number_of_edges))
+    t_edge_out = np.zeros((number_of_time_steps, number_of_edges))
+    limited = np.zeros((number_of_time_steps, number_of_edges), dtype=np.bool_)
+    status = np.zeros(number_of_time_steps, dtype=np.int64)
+    error_node = np.full(number_of_time_steps, -1, dtype=np.int64)
+
+    upstream = np.empty(number_of_edges, dtype=np.int64)
+    downstream = np.empty(number_of_edges, dtype=np.int64)
+    active = np.empty(number_of_edges, dtype=np.bool_)
+    isolated = np.empty(number_of_nodes, dtype=np.bool_)
+    unknown = np.empty(number_of_nodes, dtype=np.bool_)
+    has_outflows = np.zeros(number_of_nodes, dtype=np.bool_)
+    order = np.empty(number_of_nodes, dtype=np.int64)
+    solved_pass = np.zeros(number_of_nodes, dtype=np.int64)
+
+    for t in range(number_of_time_steps):
+        m = mass_flows[t]
+        m_rounded = np.round(m, 5)  # round to avoid errors at very very low mass flows
+        orient_edges(edge_start, edge_end, edge_directions[t], upstream, downstream)
+
+        # the plants supply their pipes before the nodes without flows are removed
+        for edge in range(number_of_edges):
+            if is_plant[upstream[edge]]:
+                t_edge_in[t, edge] = t_plant_supply[t]
+                t_edge_out[t, edge], limited[t, edge] = calc_pipe_outlet_temperature(
+                    t_plant_supply[t], m_rounded[edge], k[t, edge], t_ground[t], is_district_heating)
+        find_active_edges(node_edges_indptr, node_edges, upstream, downstream, m, isolated, active)
+
+        number_unknown = 0
+        for node in range(number_of_nodes):
+            if is_plant[node]:
+                t_node[t, node] = t_plant_supply[t]
+            if isolated[node]:
+                t_node[t, node] = np.nan
+            unknown[node] = not (is_plant[node] or isolated[node])
+            number_unknown += unknown[node]
+            solved_pass[node] = 0
+        if order_nodes(node_edges_indptr, node_edges, upstream, downstream, active, unknown, order) < number_unknown:
+            status[t] = NOT_ORDERED
+            continue
+
+        last_pass = 0  # the sweep stops after the pass in which the last node gets a temperature
+        for position in range(number_unknown):
+            node = order[position]
+            first_inflow_pass = number_of_nodes + 1
+            node_solved_pass = 1
+            mcp_in = 0.0
+            mass_flow_in = 0.0
+            has_outflows[node] = False
+            for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                edge = node_edges[i]
+                if not active[edge]:
+                    continue
+                if downstream[edge] == node:
+                    inflow_pass = visible_pass(solved_pass[upstream[edge]], upstream[edge], node)
+                    first_inflow_pass = min(first_inflow_pass, inflow_pass)
+                    node_solved_pass = max(node_solved_pass, inflow_pass)
+                    if not np.isnan(t_edge_out[t, edge]):
+                        mcp_in += m[edge] * t_edge_out[t, edge]
+                    mass_flow_in += m[edge]
+                else:
+                    has_outflows[node] = True
+            last_pass = max(last_pass, min(first_inflow_pass, node_solved_pass))
+
+            if has_outflows[node]:
+                # mixing temperature of the flows entering the node, written to the pipes leaving it
+                solved_pass[node] = node_solved_pass
+                if mass_flow_in != 0.0:
+                    temperature = mcp_in / mass_flow_in
+                elif mcp_in == 0.0:
+                    temperature = np.nan
+                else:
+                    temperature = np.sign(mcp_in) * np.inf
+                if np.isnan(temperature) and status[t] == SOLVED:
+                    status[t] = NO_INFLOW
+                    error_node[t] = node
+                t_node[t, node] = temperature
+                for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                    edge = node_edges[i]
+                    if active[edge] and upstream[edge] == node:
+                        t_edge_in[t, edge] = temperature
+                        t_edge_out[t, edge], limited[t, edge] = calc_pipe_outlet_temperature(
+                            temperature, m_rounded[edge], k[t, edge], t_ground[t], is_district_heating)
+            else:
+                # end of the network: highest temperature of the flows arriving in the first pass any of them arrives
+                temperature = 0.0
+                for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                    edge = node_edges[i]
+                    if active[edge] and downstream[edge] == node and visible_pass(
+                            solved_pass[upstream[edge]], upstream[edge], node) == first_inflow_pass:
+                        if np.isnan(t_edge_out[t, edge]) or np.isnan(temperature):
+                            temperature = np.nan
+                        else:
+                            temperature = max(temperature, t_edge_out[t, edge])
+                t_node[t, node] = temperature
+
+        for position in range(number_unknown):
+            node = order[position]
+            if has_outflows[node] and solved_pass[node] > last_pass:
+                status[t] = NOT_ORDERED
+    return t_node, t_edge_in, t_edge_out, limited, status, error_node
+
+
+@jit(nopython=True, cache=True)
+def calc_return_temperatures_of_time_steps(node_edges_indptr, node_edges, edge_start, edge_end, is_district_heating,
+                                           edge_directions, mass_flows, k, t_ground, substation_mass_flows,
+                                           t_substation_return):
+    """
+    The temperatures of the return network, starting from the substations at the ends of the branches. At nodes where
+    several flows meet, the mixing temperature of the flows and of the return flow of the substation is calculated.
+
+    :param node_edges_indptr: the index of the first edge of each node in ``node_edges`` (CSR)           (n + 1 x 1)
+    :param node_edges: the edges of each node (CSR)
+    :param edge_start: the node each edge leaves in the direction of the topology                              (e x 1)
+    :param edge_end: the node each edge points to in the direction of the topology                             (e x 1)
+    :param bool is_district_heating: True for a district heating network, False for a district cooling network
+    :param edge_directions: the direction of the flow of the supply network in each edge relative to the topology
+                            (+1 or -1), the water flows in the opposite direction in the return network        (t x e)
+    :param mass_flows: the mass flow in each edge [kg/s]                                                       (t x e)
+    :param k: the aggregated heat conduction coefficient of each edge [kW/K]                                   (t x e)
+    :param t_ground: the ground temperature [K]                                                                (t x 1)
+    :param substation_mass_flows: the mass flow of the substation at each node [kg/s]                          (t x n)
+    :param t_substation_return: the return temperature of the substation at each node, nan if none [K]         (t x n)
+
+    :return: the temperature of each node [K] (t x n), the temperature at the inlet (t x e) and the outlet (t x e) of
+             each edge [K], whether the temperature loss of each edge was limited (t x e) and the status of each time
+             step (t x 1)
+    """
+    number_of_time_steps, number_of_edges = mass_flows.shape
+    number_of_nodes = substation_mass_flows.shape[1]
+    t_node = np.zeros((number_of_time_steps, number_of_nodes))
+    t_edge_in = np.zeros((number_of_time_steps, number_of_edges))
+    t_edge_out = np.zeros((number_of_time_steps, number_of_edges))
+    limited = np.zeros((number_of_time_steps, number_of_edges), dtype=np.bool_)
+    status = np.zeros(number_of_time_steps, dtype=np.int64)
+
+    upstream = np.empty(number_of_edges, dtype=np.int64)
+    downstream = np.empty(number_of_edges, dtype=np.int64)
+    active = np.empty(number_of_edges, dtype=np.bool_)
+    isolated = np.empty(number_of_nodes, dtype=np.bool_)
+    unknown = np.empty(number_of_nodes, dtype=np.bool_)
+    inflows = np.zeros(number_of_nodes, dtype=np.int64)
+    outflows = np.zeros(number_of_nodes, dtype=np.int64)
+    order = np.empty(number_of_nodes, dtype=np.int64)
+    solved_pass = np.zeros(number_of_nodes, dtype=np.int64)
+    mcp_in = np.zeros(number_of_nodes)
+    mass_flow_in = np.zeros(number_of_nodes)
+
+    for t in range(number_of_time_steps):
+        m = mass_flows[t]
+        m_rounded = np.round(m, 5)  # round to avoid errors at very very low mass flows
+        orient_edges(edge_start, edge_end, -edge_directions[t], upstream, downstream)
+        find_active_edges(node_edges_indptr, node_edges, upstream, downstream, m, isolated, active)
+
+        inflows[:] = 0
+        outflows[:] = 0
+        for edge in range(number_of_edges):
+            if active[edge]:
+                outflows[upstream[edge]] += 1
+                inflows[downstream[edge]] += 1
+
+        # the substations at the ends of the branches return their water before the sweep over the nodes, in order of
+        # the nodes: a node whose inflows all come from such substations of a lower index starts with the return
+        # temperature of its own substation
+        number_unknown = 0
+        for node in range(number_of_nodes):
+            solved_pass[node] = 0
+            unknown[node] = False
+            if isolated[node]:
+                t_node[t, node] = np.nan
+                continue
+            if inflows[node] == 0 and outflows[node] > 0:
+                t_node[t, node] = t_substation_return[t, node]
+                if not np.isnan(t_node[t, node]):
+                    for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                        edge = node_edges[i]
+                        if active[edge] and upstream[edge] == node:
+                            inflows[downstream[edge]] -= 1
+                            t_edge_in[t, edge] = t_node[t, node]
+                            t_edge_out[t, edge], limited[t, edge] = calc_pipe_outlet_temperature(
+                                t_node[t, node], m_rounded[edge], k[t, edge], t_ground[t], is_district_heating)
+                    continue
+            unknown[node] = True
+            number_unknown += 1
+        if order_nodes(node_edges_indptr, node_edges, upstream, downstream, active, unknown, order) < number_unknown:
+            status[t] = NOT_ORDERED
+            continue
+
+        last_pass = 0  # the sweep stops after the pass in which the last pipe gets its temperature
+        for position in range(number_unknown):
+            node = order[position]
+            node_solved_pass = 1
+            mcp_in[node] = 0.0
+            mass_flow_in[node] = 0.0
+            for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                edge = node_edges[i]
+                if active[edge] and downstream[edge] == node:
+                    node_solved_pass = max(node_solved_pass,
+                                           visible_pass(solved_pass[upstream[edge]], upstream[edge], node))
+                    if not np.isnan(t_edge_out[t, edge]):
+                        mcp_in[node] += m[edge] * t_edge_out[t, edge]
+                    mass_flow_in[node] += m[edge]
+            solved_pass[node] = node_solved_pass
+            if outflows[node] > 0:
+                last_pass = max(last_pass, node_solved_pass)
+                temperature = calc_return_node_temperature(mcp_in[node], mass_flow_in[node],
+                                                           substation_mass_flows[t, node],
+                                                           t_substation_return[t, node])
+                t_node[t, node] = temperature
+                for i in range(node_edges_indptr[node], node_edges_indptr[node + 1]):
+                    edge = node_edges[i]
+                    if active[edge] and upstream[edge] == node:
+                        t_edge_in[t, edge] = temperature
+                        t_edge_out[t, edge], limited[t, edge] = calc_pipe_outlet_temperature(
+                            temperature, m_rounded[edge], k[t, edge], t_ground[t], is_district_heating)
+
+        # the ends of the return network (the plants) reached by the sweep include the flow of their substation, the
+        # first one left after the sweep does not and the others are not calculated
+        first_left = True
+        for node in range(number_of_nodes):
+            if unknown[node] and outflows[node] == 0:
+                if solved_pass[node] <= last_pass:
+                    t_node[t, node] = calc_return_node_temperature(mcp_in[node], mass_flow_in[node],
+                                                                   substation_mass_flows[t, node],
+                                                                   t_substation_return[t, node])
+                elif first_left:
+                    t_node[t, node] = calc_return_node_temperature(mcp_in[node], mass_flow_in[node], 0.0, np.nan)
+                    first_left = False
+    return t_node, t_edge_in, t_edge_out, limited, status
+
+
+@register_jitable
+def calc_return_node_temperature(mcp_in, mass_flow_in, substation_mass_flow, t_substation_return):
+    """
+    The mixing temperature of the flows entering a node of the return network and of the return flow of its substation
+    (see :py:func:`cea.technologies.thermal_network.thermal_network.calc_return_node_temperature`), nan if no water
+    flows into the node.
+    """
+    substation_mass_flow = max(substation_mass_flow, 0.0)  # the plants draw water from the return network
+    total_mass_flow = mass_flow_in + substation_mass_flow
+    if abs(total_mass_flow) <= TOLERANCE:
+        return np.nan
+    if abs(substation_mass_flow) <= TOLERANCE:
+        return mcp_in / total_mass_flow
+    return (mcp_in + substation_mass_flow * t_substation_return) / total_mass_flow
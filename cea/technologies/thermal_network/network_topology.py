@@ -0,0 +1,237 @@
+"""
+Sparse hydraulic core of the detailed thermal network
+
+The mass flows in the edges and the pressures at the nodes of a thermal network are the solutions of linear systems
+built from the edge-node incidence matrix (see :py:func:`cea.technologies.thermal_network.thermal_network.
+calc_mass_flow_edges` and :py:func:`cea.technologies.thermal_network.thermal_network.calc_pressure_nodes`). These
+systems only depend on the topology of the network, so a :py:class:`NetworkTopology` keeps the sparse incidence matrix,
+the fundamental loops and the LU factorizations of a topology and reuses them for each hour of the year.
+
+The thermal network flips the direction of the edges to keep the mass flows positive (see
+:py:func:`cea.technologies.thermal_network.thermal_network.change_to_edge_node_matrix_t`). Flipping an edge scales a
+column of the incidence matrix ``A`` by -1, which leaves ``A * A^T`` unchanged: the same factorizations are used for
+all directions, only the directions of the edges (+1 or -1 relative to the topology) are passed to the solvers.
+
+The systems of a network that is not connected are singular. They are solved by least squares instead (see
+:py:class:`LeastSquaresSolver`).
+"""
+
+import collections
+
+import networkx as nx
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+from cea.technologies.constants import NETWORK_TOPOLOGIES_CACHE_SIZE
+
+__author__ = "Martin Mosteiro Romero, Lennart Rogenhofer"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Martin Mosteiro Romero", "Lennart Rogenhofer", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+# the topologies last used by this process, keyed by the shape and the non-zero entries of the edge-node matrix
+_topologies = collections.OrderedDict()
+
+
+def get_network_topology(edge_node_df):
+    """
+    The topology of an edge-node matrix and the direction of each of its edges relative to the topology. The topology
+    is created the first time a network is seen by the process, the ``NETWORK_TOPOLOGIES_CACHE_SIZE`` topologies
+    used last are kept.
+
+    :param edge_node_df: DataFrame (or array) consisting of n rows (number of nodes) and e columns (number of edges)
+                         and indicating the direction of flow of each edge e at node n: if e points to n, value is 1;
+                         if e leaves node n, -1; else, 0.
+    :type edge_node_df: DataFrame
+
+    :return topology: the topology of the network
+    :return edge_directions: +1 if an edge has the direction it has in the topology, -1 if it is flipped     (e x 1)
+    :rtype topology: NetworkTopology
+    :rtype edge_directions: ndarray
+    """
+    edge_node_matrix = np.asarray(edge_node_df, dtype=float)
+    positions = np.flatnonzero(edge_node_matrix)
+    key = (edge_node_matrix.shape, positions.tobytes())
+    if key not in _topologies:
+        _topologies[key] = NetworkTopology(edge_node_matrix)
+        while len(_topologies) > NETWORK_TOPOLOGIES_CACHE_SIZE:
+            _topologies.popitem(last=False)
+    _topologies.move_to_end(key)
+    topology = _topologies[key]
+    return topology, topology.get_edge_directions(edge_node_matrix.ravel()[positions])
+
+
+class NetworkTopology(object):
+    """
+    The sparse incidence matrix of a network, its fundamental loops and the factorizations of the systems solved by the
+    hydraulic calculation.
+
+    :ivar incidence: sparse edge-node matrix in the direction of the edges of the topology                    (n x e)
+    :ivar edge_start: the node each edge leaves in the direction of the topology                              (e x 1)
+    :ivar edge_end: the node each edge points to in the direction of the topology                             (e x 1)
+    :ivar list loops: the fundamental loops of the network as lists of nodes (see :py:func:`networkx.cycle_basis`)
+    :ivar graph: undirected networkx graph of the network, the edges carry their column in ``edge_number``
+    :ivar loop_matrix: sparse matrix with the direction (+1 clockwise, -1 counterclockwise) of each edge of each loop
+                       for the edges in the direction of the topology                                        (l x e)
+    """
+
+    def __init__(self, edge_node_matrix):
+        """
+        :param ndarray edge_node_matrix: the edge-node matrix (n x e), the directions of its edges are the directions
+                                         of the topology
+        """
+        self.number_of_nodes, self.number_of_edges = edge_node_matrix.shape
+        self.incidence = scipy.sparse.csr_matrix(edge_node_matrix)
+        self.incidence.sort_indices()
+        self.edge_of_entry = self.incidence.indices.copy()
+        self.entry_values = self.incidence.data.copy()
+        incidence = self.incidence.tocoo()
+        self.edge_start = np.zeros(self.number_of_edges, dtype=np.int64)
+        self.edge_end = np.zeros(self.number_of_edges, dtype=np.int64)
+        self.edge_start[incidence.col[incidence.data == -1]] = incidence.row[incidence.data == -1]
+        self.edge_end[incidence.col[incidence.data == 1]] = incidence.row[incidence.data == 1]
+
+        self.graph = self.build_graph()
+        self.loops = nx.cycle_basis(self.graph, 0)  # identifies all linear independent loops
+        self.loop_matrix = self.build_loop_matrix()
+
+        self._tree_factorizations = {}  # {plant_index: LU factorization of the incidence matrix without the plant}
+        self._laplacian_factorization = None  # LU factorization of A * A^T without the first node
+
+    def build_graph(self):
+        """
+        The undirected graph of the network. The edges are added in the order of the columns of the edge-node matrix,
+        from the node an edge points to to the node it leaves, so that the loops are those found by the earlier
+        dense implementation.
+        """
+        incidence = self.incidence.tocsc()
+        graph = nx.Graph()  # set up networkx type graph
+        for edge in range(self.number_of_edges):
+            nodes = incidence.indices[incidence.indptr[edge]:incidence.indptr[edge + 1]]
+            values = incidence.data[incidence.indptr[edge]:incidence.indptr[edge + 1]]
+            end_node = nodes[values == 1][-1] if (values == 1).any() else 0
+            start_node = nodes[values == -1][-1] if (values == -1).any() else 0
+            # edge number necessary to later identify which edges are in loop since graph is a dictionary
+            graph.add_edge(int(end_node), int(start_node), edge_number=edge)
+        return graph
+
+    def build_loop_matrix(self):
+        """The direction of each edge of each fundamental loop, following the nodes of the loop"""
+        incidence = self.incidence.tocsc()
+        loop_indices, edge_indices, directions = [], [], []
+        for i, loop in enumerate(self.loops):
+            for j, node in enumerate(loop):
+                next_node = loop[(j + 1) % len(loop)]
+                edge = self.graph.get_edge_data(node, next_node)['edge_number']
+                # check if nodes defined in clockwise loop, to keep sign convention for Hardy Cross Method
+                clockwise = incidence[node, edge] == 1 and incidence[next_node, edge] == -1
+                loop_indices.append(i)
+                edge_indices.append(edge)
+                directions.append(1.0 if clockwise else -1.0)
+        return scipy.sparse.csr_matrix((directions, (loop_indices, edge_indices)),
+                                       shape=(len(self.loops), self.number_of_edges))
+
+    def get_edge_directions(self, entry_values):
+        """
+        The direction of each edge relative to the topology.
+
+        :param ndarray entry_values: the non-zero entries of an edge-node matrix with this topology, in row-major order
+        """
+        edge_directions = np.ones(self.number_of_edges)
+        edge_directions[self.edge_of_entry] = entry_values / self.entry_values
+        return edge_directions
+
+    def get_incidence(self, edge_directions):
+        """The sparse edge-node matrix (n x e) for edges in the given directions"""
+        return self.incidence.multiply(edge_directions.reshape(1, -1)).tocsr()
+
+    def get_loop_matrix(self, edge_directions):
+        """The direction of each edge of each loop (l x e) for edges in the given directions"""
+        return self.loop_matrix.multiply(edge_directions.reshape(1, -1)).tocsr()
+
+    def get_tree_factorization(self, plant_index):
+        if plant_index not in self._tree_factorizations:
+            rows = np.delete(np.arange(self.number_of_nodes), plant_index)
+            self._tree_factorizations[plant_index] = factorize(self.incidence[rows])
+        return self._tree_factorizations[plant_index]
+
+    def get_laplacian_factorization(self):
+        if self._laplacian_factorization is None:
+            incidence = self.incidence[1:]
+            self._laplacian_factorization = factorize(incidence * incidence.T)
+        return self._laplacian_factorization
+
+    def solve_radial_mass_flows(self, node_mass_flows, plant_index, edge_directions):
+        """
+        The mass flows in the edges of a radial network, solving the mass balance at all nodes but the plant. Several
+        time steps are solved at once by passing one column of node mass flows per time step.
+
+        :param ndarray node_mass_flows: the mass flow required at each node except the plant        (n-1 x 1 or n-1 x t)
+        :param int plant_index: the node of the plant
+        :param ndarray edge_directions: the direction of each edge relative to the topology                  (e x 1)
+        :return: the mass flow in each edge                                                          (e x 1 or e x t)
+        """
+        mass_flows = self.get_tree_factorization(plant_index).solve(node_mass_flows)
+        return mass_flows * edge_directions.reshape((-1,) + (1,) * (mass_flows.ndim - 1))
+
+    def solve_minimum_norm_mass_flows(self, node_mass_flows, edge_directions):
+        """
+        The mass flows with the smallest norm that satisfy the mass balance at all nodes but the first (the least
+        squares solution of the mass balance): ``m = A^T * (A * A^T)^-1 * b``.
+
+        :param ndarray node_mass_flows: the mass flow required at each node except the first                 (n-1 x 1)
+        :param ndarray edge_directions: the direction of each edge relative to the topology                  (e x 1)
+        :return: the mass flow in each edge                                                                   (e x 1)
+        """
+        return (self.incidence[1:].T * self.get_laplacian_factorization().solve(node_mass_flows)) * edge_directions
+
+    def solve_node_pressures(self, edge_pressure_differences, edge_directions):
+        """
+        The pressures at the nodes with the smallest norm that best match the pressure difference of each edge (the
+        least squares solution of ``A^T * p = dp``). The normal equations ``A * A^T * p = A * dp`` are solved with
+        the pressure of the first node set to 0, the solution with the smallest norm has a mean pressure of 0.
+
+        :param ndarray edge_pressure_differences: the pressure difference of each edge                       (e x 1)
+        :param ndarray edge_directions: the direction of each edge relative to the topology                  (e x 1)
+        :return: the pressure at each node                                                                    (n x 1)
+        """
+        right_hand_side = self.incidence * (edge_pressure_differences * edge_directions)
+        pressures = np.zeros(self.number_of_nodes)
+        pressures[1:] = self.get_laplacian_factorization().solve(right_hand_side[1:])
+        return pressures - pressures.mean()
+
+
+def factorize(matrix):
+    """
+    The LU factorization of a sparse matrix or, if the matrix is singular or not square (the systems of a network that
+    is not connected), a :py:class:`LeastSquaresSolver` of the matrix. Both solve systems with ``solve``.
+    """
+    try:
+        return scipy.sparse.linalg.splu(matrix.tocsc())
+    except (RuntimeError, ValueError):
+        print('The mass balance of the thermal network is singular, the network is probably not connected. The '
+              'network is solved by least squares instead.')
+        return LeastSquaresSolver(matrix)
+
+
+class LeastSquaresSolver(object):
+    """The least squares solutions of the systems of a singular matrix, for the matrices without a factorization"""
+
+    def __init__(self, matrix):
+        self.matrix = matrix.tocsr()
+
+    def solve(self, right_hand_side):
+        """
+        :param ndarray right_hand_side: one or several right hand sides, one per column                (m x 1 or m x t)
+        :return: the least squares solution of each right hand side                                   (e x 1 or e x t)
+        """
+        right_hand_side = np.asarray(right_hand_side, dtype=float)
+        if right_hand_side.ndim == 1:
+            return scipy.sparse.linalg.lsqr(self.matrix, right_hand_side, atol=1e-12, btol=1e-12)[0]
+        return np.column_stack([scipy.sparse.linalg.lsqr(self.matrix, column, atol=1e-12, btol=1e-12)[0]
+                                for column in right_hand_side.T])
@@ -21,18 +21,25 @@ import pandas as pd
 import cea.config
 import cea.inputlocator
 import cea.technologies.thermal_network.substation_matrix as substation_matrix
+from cea.technologies.thermal_network.network_results import HourlyResultsWriter, HourlyThermalResults, \
+    expand_to_year
+from cea.technologies.thermal_network.network_temperatures import calc_supply_temperatures_of_time_steps, \
+    calc_return_temperatures_of_time_steps, NOT_ORDERED, NO_INFLOW
+from cea.technologies.thermal_network.network_topology import get_network_topology
 from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
 import cea.utilities.parallel
 import cea.utilities.workerstream
+from cea.demand.demand_writers import check_output_format
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK, P_WATER_KGPERM3, HOURS_IN_YEAR
 from cea.constants import PUR_lambda_WmK, STEEL_lambda_WmK, SOIL_lambda_WmK
 from cea.optimization.constants import PUMP_ETA
 from cea.resources import geothermal
 from cea.technologies.thermal_network.simplified_thermal_network import thermal_network_simplified
 from cea.technologies.constants import ROUGHNESS, NETWORK_DEPTH, REDUCED_TIME_STEPS, MAX_INITIAL_DIAMETER_ITERATIONS, \
-    MAX_NODE_FLOW
+    MAX_NODE_FLOW, HOURS_PER_RESULTS_BLOCK, HOURS_PER_TASK, REPRESENTATIVE_WEEK_HOURS
 from cea.utilities import epwreader
 from cea.utilities.standardize_coordinates import get_lat_lon_projected_shapefile, get_projected_coordinate_system
+from cea.utilities.time_series_aggregation import calc_typical_days
 
 __author__ = "Martin Mosteiro Romero, Shanshan Hsieh, Lennart Rogenhofer"
 __copyright__ = "Copyright 2016, Architecture and Building Systems - ETH Zurich"
@@ -47,6 +54,11 @@ __status__ = "Production"
 # Some types to group parameters in (see here for more information on named tuples:
 # https://docs.python.org/2/library/collections.html#collections.namedtuple)
 
+# the return network of a time step, solved once its supply network converged: the arguments of
+# calc_return_temperatures
+ReturnNetwork = collections.namedtuple('ReturnNetwork', ['t_ground', 'edge_node_df', 'mass_flow_df',
+                                                         'mass_flow_substation_df', 'k', 't_return'])
+
 class ThermalNetwork(object):
     """
     A thermal network instance contains information about the edges, nodes and buildings of a thermal network
@@ -60,8 +72,6 @@ class ThermalNetwork(object):
                                   and, if it is a consumer or plant, the name of the corresponding building (2 x n)
     :ivar DataFrame edge_df:
     """
-    loops_cache = {}  # {edge_nodes_df.to_string(): find_loops(edge_nodes_df)
-
     def __init__(self, locator, network_name, thermal_network_section=None):
         self.locator = locator
         self.network_name = network_name
@@ -75,6 +85,8 @@ class ThermalNetwork(object):
         self.start_t = 0
         self.stop_t = 8760
         self.use_representative_week_per_month = True
+        self.number_of_typical_days = 0
+        self.typical_days_method = "k-medoids"
         self.minimum_mass_flow_iteration_limit = 30
         self.minimum_edge_mass_flow = 0.1
         self.diameter_iteration_limit = 10
@@ -83,6 +95,7 @@ class ThermalNetwork(object):
         self.temperature_control = "VT"
         self.plant_supply_temperature = 80
         self.equivalent_length_factor = 0.2
+        self.output_format = "csv"
 
         # replace default values with those in the config file section
         self.copy_config_section(thermal_network_section)
@@ -97,6 +110,7 @@ class ThermalNetwork(object):
         self.substations_HEX_specs = None  # to be filled by substation_matrix.substation_HEX_design_main
         self.t_target_supply_C = None  # to be filled from buildings_demands properties
         self.t_target_supply_df = None  # to be filled from all_nodes_df
+        self.typical_days = None  # to be filled by calc_typical_days_of_network if number_of_typical_days is set
 
         self.edge_mass_flow_df = None
         self.node_mass_flow_df = None
@@ -127,10 +141,12 @@ class ThermalNetwork(object):
     def copy_config_section(self, thermal_network_section):
         thermal_network_section_fields = ["network_type", "network_names", "file_type", "set_diameter",
                                           "load_max_edge_flowrate_from_previous_run", "start_t", "stop_t",
-                                          "use_representative_week_per_month", "minimum_mass_flow_iteration_limit",
+                                          "use_representative_week_per_month", "number_of_typical_days",
+                                          "typical_days_method", "minimum_mass_flow_iteration_limit",
                                           "minimum_edge_mass_flow", "diameter_iteration_limit",
                                           "substation_cooling_systems", "substation_heating_systems",
-                                          "temperature_control", "plant_supply_temperature", "equivalent_length_factor"]
+                                          "temperature_control", "plant_supply_temperature", "equivalent_length_factor",
+                                          "output_format"]
         for field in thermal_network_section_fields:
             if hasattr(thermal_network_section, field):
                 setattr(self, field, getattr(thermal_network_section, field))
@@ -143,6 +159,7 @@ class ThermalNetwork(object):
         mini_me.substations_HEX_specs = self.substations_HEX_specs.copy()
         mini_me.t_target_supply_C = self.t_target_supply_C.copy()
         mini_me.t_target_supply_df = self.t_target_supply_df.copy()
+        mini_me.typical_days = self.typical_days
 
         mini_me.edge_mass_flow_df = self.edge_mass_flow_df
         mini_me.node_mass_flow_df = self.node_mass_flow_df
@@ -303,9 +320,10 @@ class ThermalNetwork(object):
 
     def find_loops(self, edge_node_df=None):
         """
-        This function converts the input matrix into a networkx type graph and identifies all fundamental loops
-        of the network. The group of fundamental loops is defined as the series of linear independent loops which
-        can be combined to form all other loops.
+        This function identifies all fundamental loops of the network. The group of fundamental loops is defined as the
+        series of linear independent loops which can be combined to form all other loops. The loops are found once
+        per topology of the network (see :py:func:`cea.technologies.thermal_network.network_topology.
+        get_network_topology`).
 
         :param pd.DataFrame edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
                             and indicating the direction of flow of each edge e at node n: if e points to n,
@@ -321,47 +339,8 @@ class ThermalNetwork(object):
         if edge_node_df is None:
             edge_node_df = self.edge_node_df
 
-        # check to see if we've already computed the loops
-        edge_node_str = edge_node_df.to_string()
-        if edge_node_str in ThermalNetwork.loops_cache:
-            return ThermalNetwork.loops_cache[edge_node_str]
-
-        edge_node_df_t = np.transpose(edge_node_df)  # transpose matrix to more intuitively setup graph
-
-        graph = nx.Graph()  # set up networkx type graph
-
-        for i in range(edge_node_df_t.shape[0]):
-            new_edge = [0, 0]
-            for j in range(0, edge_node_df_t.shape[1]):
-                if edge_node_df_t.iloc[i][edge_node_df_t.columns[j]] == 1:
-                    new_edge[0] = j
-                elif edge_node_df_t.iloc[i][edge_node_df_t.columns[j]] == -1:
-                    new_edge[1] = j
-            graph.add_edge(new_edge[0], new_edge[1], edge_number=i)  # add edges to graph
-            # edge number necessary to later identify which edges are in loop since graph is a dictionary
-
-        loops = nx.cycle_basis(graph, 0)  # identifies all linear independent loops
-
-        ThermalNetwork.loops_cache[edge_node_str] = (loops, graph)
-        return loops, graph
-
-
-# collect the results of each call to hourly_thermal_calculation in a record
-HourlyThermalResults = collections.namedtuple('HourlyThermalResults',
-                                              ['T_supply_nodes', 'T_return_nodes',
-                                               'temperatures_at_plant_K',
-                                               'q_loss_supply_edges_kW',
-                                               'linear_thermal_loss_supply_edges_Wperm',
-                                               'thermal_losses_system_kW',
-                                               'plant_heat_requirement',
-                                               'pressure_at_supply_nodes_Pa',
-                                               'pressure_loss_system_Pa',
-                                               'pressure_loss_system_kW',
-                                               'pressure_loss_substations_kW',
-                                               'linear_pressure_loss_supply_Paperm',
-                                               'edge_mass_flows', 'node_mass_flows',
-                                               'velocities_in_supply_edges_mpers',
-                                               'pressure_loss_supply_edge_kW'])
+        topology, _ = get_network_topology(edge_node_df)
+        return topology.loops, topology.graph
 
 
 def thermal_network_main(locator, thermal_network, processes=1):
@@ -420,6 +399,7 @@ def thermal_network_main(locator, thermal_network, processes=1):
     """
 
     # # prepare data for calculation
+    check_output_format(thermal_network.output_format)
 
     # calculate ground temperature
     thermal_network.T_ground_K = calculate_ground_temperature(locator)
@@ -455,11 +435,17 @@ def thermal_network_main(locator, thermal_network, processes=1):
                              'the plant supply temperature set in config should be lower than this number.' % str(
                 t_min))
 
-    if thermal_network.use_representative_week_per_month:
+    if thermal_network.number_of_typical_days:
+        # we run the typical days clustered from the demand of the buildings and the ground temperature
+        thermal_network.typical_days = calc_typical_days_of_network(thermal_network)
+        thermal_network.start_t = 0
+        thermal_network.stop_t = len(thermal_network.typical_days.hours)
+        prepare_inputs_of_hours(thermal_network, thermal_network.typical_days.hours)
+    elif thermal_network.use_representative_week_per_month:
         # we run the predefined schedule of the first week of each month for the year
         thermal_network.start_t = 0
         thermal_network.stop_t = 2016  # 24 hours x 7 days x 12 months
-        prepare_inputs_of_representative_weeks(thermal_network)
+        prepare_inputs_of_hours(thermal_network, REPRESENTATIVE_WEEK_HOURS)
 
     print('Calculating edge mass flows for pipe sizing')
     if thermal_network.load_max_edge_flowrate_from_previous_run:
@@ -469,23 +455,11 @@ def thermal_network_main(locator, thermal_network, processes=1):
         # calculate maximum edge mass flow
         thermal_network.edge_mass_flow_df = calc_max_edge_flowrate(thermal_network, processes=processes)
 
-        # save results to file
-        if thermal_network.use_representative_week_per_month:
-            # need to repeat lines to make sure our outputs have 8760 timesteps. Otherwise plots
-            # and network optimization will fail as they expect 8760 timesteps.
-            edge_mass_flow_for_csv = pd.DataFrame(thermal_network.edge_mass_flow_df)
-            # we need to extrapolate 8760 datapoints from 2016 points from our representative weeks.
-            # To do this, the initial dataset is repeated 4 times, the remaining values are filled with the average values of all above.
-            edge_mass_flow_for_csv = pd.concat([edge_mass_flow_for_csv] * 4, ignore_index=True)
-            while len(edge_mass_flow_for_csv.index) < HOURS_IN_YEAR:
-                edge_mass_flow_for_csv = edge_mass_flow_for_csv.append(edge_mass_flow_for_csv.mean(), ignore_index=True)
-            edge_mass_flow_for_csv.to_csv(
-                thermal_network.locator.get_nominal_edge_mass_flow_csv_file(thermal_network.network_type,
-                                                                            thermal_network.network_name), index=False)
-        else:
-            thermal_network.edge_mass_flow_df.to_csv(
-                thermal_network.locator.get_nominal_edge_mass_flow_csv_file(thermal_network.network_type,
-                                                                            thermal_network.network_name), index=False)
+        # save results to file, expanded to 8760 time steps if only part of the year was calculated. Otherwise plots
+        # and network optimization will fail as they expect 8760 timesteps.
+        expand_to_year(thermal_network, thermal_network.edge_mass_flow_df).to_csv(
+            thermal_network.locator.get_nominal_edge_mass_flow_csv_file(thermal_network.network_type,
+                                                                        thermal_network.network_name), index=False)
 
     # assign pipe id/od according to maximum edge mass flow
     thermal_network.pipe_properties = assign_pipes_to_edges(thermal_network)
@@ -514,15 +488,21 @@ def thermal_network_main(locator, thermal_network, processes=1):
     ## Start solving hydraulic and thermal equations at each time-step
     nhours = (thermal_network.stop_t - thermal_network.start_t)
 
-    hourly_thermal_results = cea.utilities.parallel.vectorize(hourly_thermal_calculation, processes)(
-        range(thermal_network.start_t, thermal_network.stop_t),
-        repeat(thermal_network, nhours))
-
-    # save results of hourly values over full year, write to csv
-    # edge flow rates (flow direction corresponding to edge_node_df)
-    csv_outputs = {field: [getattr(htr, field) for htr in hourly_thermal_results]
-                   for field in HourlyThermalResults._fields}
-    save_all_results_to_csv(csv_outputs, thermal_network)
+    # the results are copied into the arrays of the writer block by block, so the results of each time step are only
+    # kept until the end of their block. Each task solves HOURS_PER_TASK time steps, whose return networks are solved
+    # together
+    results_writer = HourlyResultsWriter(thermal_network, nhours)
+    with cea.utilities.parallel.persistent_pool():
+        for block_start_t in range(thermal_network.start_t, thermal_network.stop_t, HOURS_PER_RESULTS_BLOCK):
+            block = range(block_start_t, min(block_start_t + HOURS_PER_RESULTS_BLOCK, thermal_network.stop_t))
+            tasks = [block[i:i + HOURS_PER_TASK] for i in range(0, len(block), HOURS_PER_TASK)]
+            thermal_results_of_tasks = cea.utilities.parallel.vectorize(thermal_calculation_of_hours, processes)(
+                tasks, repeat(thermal_network, len(tasks)))
+            for t, results in zip(block, chain.from_iterable(thermal_results_of_tasks)):
+                results_writer.add(t, results)
+
+    # save results of hourly values over full year
+    results_writer.save(thermal_network.output_format)
 
     # identify all plants
     plant_indexes = np.where(thermal_network.all_nodes_df['Type'] == 'PLANT')[0]
@@ -533,14 +513,11 @@ def thermal_network_main(locator, thermal_network, processes=1):
     # add new column to dataframe
     all_nodes_df_output = all_nodes_df_output.assign(Q_hex_plant_kW=pd.Series(np.zeros(len(all_nodes_df_output.index))))
     # calculate maximum plant heat demand
+    plant_peak_heat_requirement_kW = results_writer.get_plant_peak_heat_requirement()
     for index_number, plant_index in enumerate(plant_indexes):
-        if len(plant_indexes) > 1:
-            max_demand = abs(max(csv_outputs['plant_heat_requirement'][index_number]))
-        else:
-            max_demand = abs(max(csv_outputs['plant_heat_requirement'], key=abs))
         # add plant heat demand to node.csv file
         ID = np.where(all_nodes_df_output['Name'] == 'NODE' + str(plant_index))[0][0]
-        all_nodes_df_output['Q_hex_plant_kW'][ID] = max_demand
+        all_nodes_df_output.loc[ID, 'Q_hex_plant_kW'] = plant_peak_heat_requirement_kW[index_number]
     # Output substation HEX node data
     all_nodes_df_output.to_csv(
         thermal_network.locator.get_thermal_network_node_types_csv_file(thermal_network.network_type,
@@ -613,312 +590,68 @@ def output_hex_specs_at_nodes(substation_HEX_Q, thermal_network):
     return np.nan
 
 
-def prepare_inputs_of_representative_weeks(thermal_network):
-    hours_list = chain(range(0, 168), range(744, 912), range(1416, 1584), range(2160, 2328), range(2880, 3048),
-                       range(3624, 3792), range(4344, 4512), range(5088, 5256), range(5832, 6000), range(6522, 6690),
-                       range(7296, 7464), range(8016, 8184))
+def prepare_inputs_of_hours(thermal_network, hours):
+    """
+    Cut the hourly inputs of the thermal network down to the hours calculated (e.g. the representative weeks or the
+    typical days), which become the time steps 0 to len(hours).
+
+    :param ThermalNetwork thermal_network: the thermal network, with the inputs of the full year
+    :param hours: the hours of the year to calculate
+    """
+    hours = np.asarray(hours)
     # cut out relevant parts of all dataframes
-    thermal_network.T_ground_K = [value for index, value in enumerate(thermal_network.T_ground_K) if
-                                  index in hours_list]
+    thermal_network.T_ground_K = list(np.asarray(thermal_network.T_ground_K)[hours])
     for building in thermal_network.buildings_demands.keys():
-        thermal_network.buildings_demands[building] = thermal_network.buildings_demands[building].iloc[hours_list]
-        thermal_network.buildings_demands[building].index = range(0, 2016)
-    thermal_network.t_target_supply_C = thermal_network.t_target_supply_C.iloc[hours_list]
-    thermal_network.t_target_supply_C.index = range(0, 2016)
-    thermal_network.t_target_supply_df = thermal_network.t_target_supply_df.iloc[hours_list]
-    thermal_network.t_target_supply_df.index = range(0, 2016)
-    return np.nan
+        thermal_network.buildings_demands[building] = thermal_network.buildings_demands[building].iloc[
+            hours].reset_index(drop=True)
+    thermal_network.t_target_supply_C = thermal_network.t_target_supply_C.iloc[hours].reset_index(drop=True)
+    thermal_network.t_target_supply_df = thermal_network.t_target_supply_df.iloc[hours].reset_index(drop=True)
 
 
-def save_all_results_to_csv(csv_outputs, thermal_network):
-    if thermal_network.use_representative_week_per_month:
-        # Flag indicating that we are running the representative week option, important for the creation of a subfolder with original results below
-        representative_week = True
-        # we need to extrapolate 8760 datapoints from 2016 points from our representative weeks.
-        # To do this, the initial dataset is repeated 4 times, the remaining values are filled with the average values of all above.
-        edge_mass_flows_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['edge_mass_flows'])
-        node_mass_flows_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['node_mass_flows'])
-        velocities_in_supply_edges_mpers_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['velocities_in_supply_edges_mpers'])
-        T_supply_nodes_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['T_supply_nodes'])
-        T_return_nodes_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['T_return_nodes'])
-        temperatures_at_plants_K_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['temperatures_at_plant_K'])
-        q_loss_supply_edges_kW_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['q_loss_supply_edges_kW'])
-        linear_thermal_loss_supply_edges_Wperm_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['linear_thermal_loss_supply_edges_Wperm'])
-        thermal_losses_system_kW_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['thermal_losses_system_kW'])
-        plant_heat_requirement_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['plant_heat_requirement'])
-        pressure_at_supply_nodes_Pa_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['pressure_at_supply_nodes_Pa'])
-        pressure_loss_system_kW_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['pressure_loss_system_kW'])
-        pressure_loss_system_Pa_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['pressure_loss_system_Pa'])
-        pressure_loss_substations_kW_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['pressure_loss_substations_kW'])
-        linear_pressure_loss_supply_Paperm_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['linear_pressure_loss_supply_Paperm'])
-        pressure_loss_supply_edge_for_csv = extrapolate_datapoints_for_representative_weeks(csv_outputs['pressure_loss_supply_edge_kW'])
-
-        # Output values
-        # Edge Mass Flows
-        edge_mass_flows_for_csv.columns = thermal_network.edge_node_df.columns
-        edge_mass_flows_for_csv.to_csv(
-            thermal_network.locator.get_thermal_network_layout_massflow_edges_file(thermal_network.network_type,
-                                                                                   thermal_network.network_name),
-            # , representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # Node Mass Flows
-        node_mass_flows_for_csv.columns = thermal_network.edge_node_df.index
-        node_mass_flows_for_csv.to_csv(
-            thermal_network.locator.get_thermal_network_layout_massflow_nodes_file(thermal_network.network_type,
-                                                                                   thermal_network.network_name),
-            # , representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # velocities in supply edges
-        velocities_in_supply_edges_mpers_for_csv.columns = thermal_network.edge_node_df.columns
-        velocities_in_supply_edges_mpers_for_csv.to_csv(
-            thermal_network.locator.get_thermal_network_velocity_edges_file(thermal_network.network_type,
-                                                                            thermal_network.network_name),
-            # , representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # pressure at nodes in the supply pipes
-        pressure_at_supply_nodes_Pa_for_csv.columns = thermal_network.edge_node_df.index
-        pressure_at_supply_nodes_Pa_for_csv.to_csv(
-            thermal_network.locator.get_network_pressure_at_nodes(thermal_network.network_type,
-                                                                  thermal_network.network_name),
-            index=False, float_format='%.3f')
-
-        # pressure losses over entire network in kW
-        pressure_loss_system_kW_for_csv.columns = ['pressure_loss_supply_kW', 'pressure_loss_return_kW',
-                                                   'pressure_loss_substations_kW',
-                                                   'pressure_loss_total_kW']
-        pressure_loss_system_kW_for_csv.to_csv(
-            thermal_network.locator.get_network_energy_pumping_requirements_file(thermal_network.network_type,
-                                                                                 thermal_network.network_name),
-            # representative_week),
-            index=False, float_format='%.3f')
-
-        # pressure losses over substations of network
-        pressure_loss_substations_kW_for_csv.columns = thermal_network.building_names
-        pressure_loss_substations_kW_for_csv.to_csv(
-            thermal_network.locator.get_thermal_network_substation_ploss_file(thermal_network.network_type,
-                                                                              thermal_network.network_name),
-            # , representative_week),
-            index=False,
-            float_format='%.3f')
-
-        # pressure losses over entire network in Pa
-        pressure_loss_system_Pa_for_csv.columns = ['pressure_loss_supply_Pa', 'pressure_loss_return_Pa',
-                                                   'pressure_loss_substations_Pa', 'pressure_loss_total_Pa']
-        pressure_loss_system_Pa_for_csv.to_csv(
-            thermal_network.locator.get_network_total_pressure_drop_file(thermal_network.network_type,
-                                                                         thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # linear pressure drop in the supply pipes in Pa/m
-        linear_pressure_loss_supply_Paperm_for_csv.columns = thermal_network.edge_node_df.columns
-        linear_pressure_loss_supply_Paperm_for_csv.to_csv(
-            thermal_network.locator.get_network_linear_pressure_drop_edges(thermal_network.network_type,
-                                                                           thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # heat losses over entire network
-        thermal_losses_system_kW_for_csv.columns = ['thermal_loss_supply_kW', 'thermal_loss_return_kW',
-                                                    'thermal_loss_total_kW']
-        pd.DataFrame(thermal_losses_system_kW_for_csv).to_csv(
-            thermal_network.locator.get_network_total_thermal_loss_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # heat losses per edges in supply pipes
-        q_loss_supply_edges_kW_for_csv.columns = thermal_network.edge_node_df.columns
-        pd.DataFrame(q_loss_supply_edges_kW_for_csv).to_csv(
-            thermal_network.locator.get_network_thermal_loss_edges_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # linear heat losses per edges in supply pipes
-        linear_thermal_loss_supply_edges_Wperm_for_csv.columns = thermal_network.edge_node_df.columns
-        pd.DataFrame(linear_thermal_loss_supply_edges_Wperm_for_csv).to_csv(
-            thermal_network.locator.get_network_linear_thermal_loss_edges_file(thermal_network.network_type,
-                                                                               thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # pressure losses over entire network
-        pressure_loss_supply_edge_for_csv.columns = thermal_network.edge_node_df.columns
-        pd.DataFrame(pressure_loss_supply_edge_for_csv).to_csv(
-            thermal_network.locator.get_thermal_network_pressure_losses_edges_file(thermal_network.network_type,
-                                                                                   thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # plant heat requirements
-        plant_heat_requirement_for_csv.columns = filter(None, thermal_network.all_nodes_df[
-            thermal_network.all_nodes_df.Type == 'PLANT'].Building.values)
-        plant_heat_requirement_for_csv.to_csv(
-            thermal_network.locator.get_thermal_network_plant_heat_requirement_file(
-                thermal_network.network_type,
-                thermal_network.network_name), index=False,
-            float_format='%.3f')
-
-        # node temperatures
-        T_supply_nodes_for_csv.columns = thermal_network.edge_node_df.index
-        T_supply_nodes_for_csv.to_csv(
-            thermal_network.locator.get_network_temperature_supply_nodes_file(
-                thermal_network.network_type,
-                thermal_network.network_name),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        T_return_nodes_for_csv.columns = thermal_network.edge_node_df.index
-        T_return_nodes_for_csv.to_csv(
-            thermal_network.locator.get_network_temperature_return_nodes_file(
-                thermal_network.network_type,
-                thermal_network.network_name),
-            na_rep='NaN', index=False, float_format='%.3f')
+def get_network_demands_of_buildings(thermal_network):
+    """
+    The hourly demand of each building for the systems supplied by the network (kWh).
 
-        # plant supply and return temperatures
-        temperatures_at_plants_K_for_csv.columns = ['temperature_supply_K', 'temperature_return_K']
-        temperatures_at_plants_K_for_csv.to_csv(
-            thermal_network.locator.get_network_temperature_plant(
-                thermal_network.network_type, thermal_network.network_name), index=False, float_format='%.3f')
+    :param ThermalNetwork thermal_network: the thermal network, with the demands of the buildings
+    :rtype: pd.DataFrame
+    """
+    network_demands = {}
+    for building, building_demands in thermal_network.buildings_demands.items():
+        if thermal_network.network_type == 'DH':
+            columns = ['Qww_sys_kWh' if system == 'ww' else 'Qhs_sys_' + system + '_kWh'
+                       for system in thermal_network.substation_systems['heating']]
+        else:
+            columns = ['Qc' + system + '_sys_kWh' if system in ['data', 're'] else 'Qcs_sys_' + system + '_kWh'
+                       for system in thermal_network.substation_systems['cooling']]
+        network_demands[building] = building_demands[columns].abs().sum(axis=1).values
+    return pd.DataFrame(network_demands)
 
-    else:
-        representative_week = False
-
-        # Edge Mass Flows
-        pd.DataFrame(csv_outputs['edge_mass_flows'], columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_thermal_network_layout_massflow_edges_file(thermal_network.network_type,
-                                                                                   thermal_network.network_name,
-                                                                                   representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # Node Mass Flows
-        pd.DataFrame(csv_outputs['node_mass_flows'], columns=thermal_network.edge_node_df.index).to_csv(
-            thermal_network.locator.get_thermal_network_layout_massflow_nodes_file(thermal_network.network_type,
-                                                                                   thermal_network.network_name,
-                                                                                   representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # velocities in supply edges
-        pd.DataFrame(csv_outputs['velocities_in_supply_edges_mpers'],
-                     columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_thermal_network_velocity_edges_file(thermal_network.network_type,
-                                                                            thermal_network.network_name),
-            na_rep='NaN', index=False, float_format='%.3f')
-
-        # pressure at nodes in the supply pipes
-        pd.DataFrame(csv_outputs['pressure_at_supply_nodes_Pa'], columns=thermal_network.edge_node_df.index).to_csv(
-            thermal_network.locator.get_network_pressure_at_nodes(thermal_network.network_type,
-                                                                  thermal_network.network_name),
-            index=False, float_format='%.3f')
-
-        # pressure losses over entire network in Pa
-        pd.DataFrame(csv_outputs['pressure_loss_system_Pa'],
-                     columns=['pressure_loss_supply_Pa', 'pressure_loss_return_Pa',
-                              'pressure_loss_substations_Pa', 'pressure_loss_total_Pa']).to_csv(
-            thermal_network.locator.get_network_total_pressure_drop_file(thermal_network.network_type,
-                                                                         thermal_network.network_name,
-                                                                         representative_week),
-            index=False,
-            float_format='%.3f')
-
-        # pressure losses over entire network in kW
-        pd.DataFrame(csv_outputs['pressure_loss_system_kW'],
-                     columns=['pressure_loss_supply_kW', 'pressure_loss_return_kW',
-                              'pressure_loss_substations_kW', 'pressure_loss_total_kW']).to_csv(
-            thermal_network.locator.get_network_energy_pumping_requirements_file(thermal_network.network_type,
-                                                                                 thermal_network.network_name,
-                                                                                 representative_week),
-            index=False,
-            float_format='%.3f')
-
-        # pressure losses over substations of network
-        pd.DataFrame(csv_outputs['pressure_loss_substations_kW'], columns=thermal_network.building_names).to_csv(
-            thermal_network.locator.get_thermal_network_substation_ploss_file(thermal_network.network_type,
-                                                                              thermal_network.network_name,
-                                                                              representative_week),
-            index=False,
-            float_format='%.3f')
-
-        # heat losses over entire network
-        pd.DataFrame(csv_outputs['thermal_losses_system_kW'],
-                     columns=['thermal_loss_supply_kW', 'thermal_loss_return_kW',
-                              'thermal_loss_total_kW']).to_csv(
-            thermal_network.locator.get_network_total_thermal_loss_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # heat losses per edges in supply pipes
-        pd.DataFrame(csv_outputs['q_loss_supply_edges_kW'],
-                     columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_network_thermal_loss_edges_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # linear heat losses per edges in supply pipes
-        pd.DataFrame(csv_outputs['linear_thermal_loss_supply_edges_Wperm'],
-                     columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_network_linear_thermal_loss_edges_file(thermal_network.network_type,
-                                                                               thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # pressure losses over entire network per edge
-        pd.DataFrame(csv_outputs['pressure_loss_supply_edge_kW'], columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_thermal_network_pressure_losses_edges_file(
-                thermal_network.network_type,
-                thermal_network.network_name, representative_week),
-            index=False,
-            float_format='%.3f')
-
-        # linear pressure drop in the supply pipes in Pa/m
-        pd.DataFrame(csv_outputs['linear_pressure_loss_supply_Paperm'],
-                     columns=thermal_network.edge_node_df.columns).to_csv(
-            thermal_network.locator.get_network_linear_pressure_drop_edges(thermal_network.network_type,
-                                                                           thermal_network.network_name),
-            index=False,
-            float_format='%.3f')
-
-        # plant heat requirements
-        pd.DataFrame(csv_outputs['plant_heat_requirement'],
-                     columns=list(filter(None, thermal_network.all_nodes_df[
-                         thermal_network.all_nodes_df.Type == 'PLANT'].Building.values))).to_csv(
-            thermal_network.locator.get_thermal_network_plant_heat_requirement_file(
-                thermal_network.network_type,
-                thermal_network.network_name, representative_week),
-            index=False,
-            header=['thermal_load_kW'],
-            float_format='%.3f')
-
-        # node temperatures
-        pd.DataFrame(csv_outputs['T_supply_nodes'], columns=thermal_network.edge_node_df.index).to_csv(
-            thermal_network.locator.get_network_temperature_supply_nodes_file(
-                thermal_network.network_type,
-                thermal_network.network_name, representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
-        pd.DataFrame(csv_outputs['T_return_nodes'], columns=thermal_network.edge_node_df.index).to_csv(
-            thermal_network.locator.get_network_temperature_return_nodes_file(
-                thermal_network.network_type,
-                thermal_network.network_name, representative_week),
-            na_rep='NaN', index=False, float_format='%.3f')
 
-        # plant supply and return temperatures
-        pd.DataFrame(csv_outputs['temperatures_at_plant_K'],
-                     columns=['temperature_supply_K', 'temperature_return_K']).to_csv(
-            thermal_network.locator.get_network_temperature_plant(
-                thermal_network.network_type, thermal_network.network_name), index=False, float_format='%.3f')
+def calc_typical_days_of_network(thermal_network):
+    """
+    Cluster the days of the year into the typical days calculated by the thermal network (see
+    :py:func:`cea.utilities.time_series_aggregation.calc_typical_days`) by the demand of the buildings connected and the
+    ground temperature. The day of the highest total demand is one of the typical days, for the sizing of the pipes.
+    The typical day of each day is saved and the error of the typical days in representing the total demand and the
+    ground temperature is printed.
 
+    :param ThermalNetwork thermal_network: the thermal network, with the inputs of the full year
+    :rtype: cea.utilities.time_series_aggregation.TypicalDays
+    """
+    network_demands = get_network_demands_of_buildings(thermal_network)
+    total_demand_kWh = network_demands.sum(axis=1)
+    profiles = network_demands.assign(T_ground_K=thermal_network.T_ground_K)
+    typical_days = calc_typical_days(profiles, thermal_network.number_of_typical_days,
+                                     thermal_network.typical_days_method, peak_profile=total_demand_kWh)
+    typical_days.to_frame().to_csv(
+        thermal_network.locator.get_thermal_network_typical_days_file(thermal_network.network_type,
+                                                                      thermal_network.network_name), index=False)
 
-def extrapolate_datapoints_for_representative_weeks(representative_week_data):
-    representative_week_df = pd.DataFrame(representative_week_data)
-    representative_week_df = pd.concat([representative_week_df] * 4, ignore_index=True)
-    while len(representative_week_df.index) < HOURS_IN_YEAR:
-        representative_week_df = representative_week_df.append(representative_week_df.mean(), ignore_index=True)
-    return representative_week_df
+    errors = typical_days.calc_error_metrics(pd.DataFrame({'total_demand_kWh': total_demand_kWh,
+                                                           'T_ground_K': thermal_network.T_ground_K}))
+    print('Calculating %i typical days, error of the typical days over the year:' % len(typical_days))
+    print(errors.to_string(float_format='{:.2%}'.format))
+    return typical_days
 
 
 def calculate_ground_temperature(locator):
@@ -955,58 +688,73 @@ def hourly_thermal_calculation(t, thermal_network):
     :param substations_HEX_specs: DataFrame with substation heat exchanger specs at each building
     :param edge_df: list of edges and their corresponding lengths and start and end nodes
     :param pipe_properties_df: DataFrame containing the pipe properties for each edge in the network
-    :param csv_outputs: Dictionary collecting all variables which are stored for all 8760 timesteps and
-        later written to csv files
 
-    :return csv_outputs: DataFrame with calculated values
-    :return edge_mass_flow_df_kgs: updated edge mass flows
+    :return hourly_thermal_results: the results of the time step, stored by
+        :py:class:`cea.technologies.thermal_network.network_results.HourlyResultsWriter`
+    :rtype hourly_thermal_results: HourlyThermalResults
     """
-    print('calculating thermal hydraulic properties of', thermal_network.network_type, 'network',
-          thermal_network.network_name, '...  time step', t)
+    return thermal_calculation_of_hours([t], thermal_network)[0]
+
+
+def thermal_calculation_of_hours(hours, thermal_network):
+    """
+    The thermal and hydraulic calculation of several time steps (see :py:func:`hourly_thermal_calculation`), whose
+    network temperatures are solved by :py:func:`solve_network_temperatures_of_hours`.
 
+    :param hours: the time steps to calculate
+    :param ThermalNetwork thermal_network: A container for all the thermal network data
+    :return: the results of each time step
+    :rtype: list[HourlyThermalResults]
+    """
     ## solve network temperatures
-    T_supply_nodes_K, \
-    T_return_nodes_K, \
-    temperatures_at_plant_K, \
-    plant_heat_requirement_kW, \
-    thermal_network.edge_mass_flow_df.iloc[t], \
-    thermal_network.node_mass_flow_df.iloc[t], \
-    velocities_in_supply_edges_mpers, \
-    q_loss_supply_edges_kW, \
-    linear_thermal_loss_supply_edges_Wperm, \
-    thermal_losses_system_kW = solve_network_temperatures(thermal_network, t)
-
-    # calculate pressure at each node and pressure drop throughout the entire network
-    pressure_at_supply_nodes_Pa, \
-    linear_pressure_loss_supply_Paperm, \
-    linear_pressure_loss_return_Paperm, \
-    delta_P_network_Pa, \
-    pressure_loss_system_kW, \
-    pressure_loss_supply_edge_kW, \
-    pressure_loss_substations_kW = calc_pressure_nodes(T_supply_nodes_K, T_return_nodes_K, thermal_network, t)
-
-    # store node temperatures and pressures, as well as plant heat requirement and overall pressure drop at each
-    # time step
-    hourly_thermal_results = HourlyThermalResults(
-        T_supply_nodes=T_supply_nodes_K,
-        T_return_nodes=T_return_nodes_K,
-        temperatures_at_plant_K=temperatures_at_plant_K,
-        q_loss_supply_edges_kW=q_loss_supply_edges_kW,
-        linear_thermal_loss_supply_edges_Wperm=linear_thermal_loss_supply_edges_Wperm,
-        thermal_losses_system_kW=thermal_losses_system_kW,
-        plant_heat_requirement=plant_heat_requirement_kW,
-        pressure_at_supply_nodes_Pa=pressure_at_supply_nodes_Pa,
-        pressure_loss_system_Pa=delta_P_network_Pa,
-        pressure_loss_system_kW=pressure_loss_system_kW,
-        pressure_loss_substations_kW=pressure_loss_substations_kW,
-        linear_pressure_loss_supply_Paperm=linear_pressure_loss_supply_Paperm,
-        edge_mass_flows=thermal_network.edge_mass_flow_df.iloc[t],
-        node_mass_flows=thermal_network.node_mass_flow_df.iloc[t],
-        velocities_in_supply_edges_mpers=velocities_in_supply_edges_mpers,
-        pressure_loss_supply_edge_kW=pressure_loss_supply_edge_kW
-    )
-
-    return hourly_thermal_results
+    network_temperatures = solve_network_temperatures_of_hours(thermal_network, hours)
+
+    thermal_results = []
+    for t, network_temperatures_of_hour in zip(hours, network_temperatures):
+        T_supply_nodes_K, \
+        T_return_nodes_K, \
+        temperatures_at_plant_K, \
+        plant_heat_requirement_kW, \
+        thermal_network.edge_mass_flow_df.iloc[t], \
+        thermal_network.node_mass_flow_df.iloc[t], \
+        velocities_in_supply_edges_mpers, \
+        q_loss_supply_edges_kW, \
+        linear_thermal_loss_supply_edges_Wperm, \
+        thermal_losses_system_kW = network_temperatures_of_hour
+
+        # calculate pressure at each node and pressure drop throughout the entire network
+        pressure_at_supply_nodes_Pa, \
+        linear_pressure_loss_supply_Paperm, \
+        linear_pressure_loss_return_Paperm, \
+        delta_P_network_Pa, \
+        pressure_loss_system_kW, \
+        pressure_loss_supply_edge_kW, \
+        pressure_loss_substations_kW = calc_pressure_nodes(T_supply_nodes_K, T_return_nodes_K, thermal_network, t)
+
+        # store node temperatures and pressures, as well as plant heat requirement and overall pressure drop at each
+        # time step
+        hourly_thermal_results = HourlyThermalResults(
+            T_supply_nodes=T_supply_nodes_K,
+            T_return_nodes=T_return_nodes_K,
+            temperatures_at_plant_K=temperatures_at_plant_K,
+            q_loss_supply_edges_kW=q_loss_supply_edges_kW,
+            linear_thermal_loss_supply_edges_Wperm=linear_thermal_loss_supply_edges_Wperm,
+            thermal_losses_system_kW=thermal_losses_system_kW,
+            plant_heat_requirement=plant_heat_requirement_kW,
+            pressure_at_supply_nodes_Pa=pressure_at_supply_nodes_Pa,
+            pressure_loss_system_Pa=delta_P_network_Pa,
+            pressure_loss_system_kW=pressure_loss_system_kW,
+            pressure_loss_substations_kW=pressure_loss_substations_kW,
+            linear_pressure_loss_supply_Paperm=linear_pressure_loss_supply_Paperm,
+            edge_mass_flows=thermal_network.edge_mass_flow_df.iloc[t],
+            node_mass_flows=thermal_network.node_mass_flow_df.iloc[t],
+            velocities_in_supply_edges_mpers=velocities_in_supply_edges_mpers,
+            pressure_loss_supply_edge_kW=pressure_loss_supply_edge_kW
+        )
+
+        thermal_results.append(hourly_thermal_results)
+
+    return thermal_results
 
 
 # ===========================
@@ -1014,12 +762,15 @@ def hourly_thermal_calculation(t, thermal_network):
 # ===========================
 
 def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pipe_diameter_m, pipe_length_m,
-                         T_edge_K, find_loops):
+                         T_edge_K):
     """
     This function carries out the steady-state mass flow rate calculation for a predefined network with predefined mass
     flow rates at each substation based on the method from Todini et al. (1987), Ikonen et al. (2016), Oppelt et al.
     (2016), etc.
 
+    The sparse factorizations of the mass balance are computed once per topology of the network and reused for all
+    time steps (see :py:mod:`cea.technologies.thermal_network.network_topology`).
+
     :param all_nodes_df: DataFrame containing all nodes and whether a node n is a consumer or plant node
                         (and if so, which building that node corresponds to), or neither.
     :param edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
@@ -1032,8 +783,6 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
     :param pipe_length_m: vector containing the length in m of each edge e in the network                (e x 1)
     :param T_edge_K: matrix containing the temperature of the water in each edge e at time t             (t x e)
 
-    :param find_loops: function that returns the loops in a thermal network
-
     :type all_nodes_df: DataFrame(t x n)
     :type edge_node_df: DataFrame
     :type mass_flow_substation_df: DataFrame
@@ -1053,21 +802,21 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
     .. [Oppelt, T., et al., 2016] Oppelt, T., et al. Dynamic thermo-hydraulic model of district cooling networks.
        Applied Thermal Engineering, 2016.
     """
-    edge_node_df = edge_node_df.copy()
-    loops, graph = find_loops(edge_node_df)  # identifies all linear independent loops
+    topology, edge_directions = get_network_topology(edge_node_df)
+    loops = topology.loops  # identifies all linear independent loops
+    node_mass_flows = np.nan_to_num(np.asarray(mass_flow_substation_df, dtype=float)).ravel()  # node demands
+    plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
     if loops:
         # print('Fundamental loops in the network:', loops)  # returns nodes that define loop, useful for visiual
         # verification in testing phase,
 
-        sum_delta_m_num = np.zeros((1, len(loops)))[0]
-
         # if loops exist:
-        # 1. calculate initial guess solution of matrix A
-        # delete first plant on an edge of matrix and solution space b as these are redundant
-        A = edge_node_df.drop(edge_node_df.index[0], 0)  # solution matrix A without loop equations (kirchhoff 2)
-        b_init = np.nan_to_num(mass_flow_substation_df.drop(mass_flow_substation_df.columns[0], 1).transpose())
-        # solution vector b of node demands
-        mass_flow_edge = np.linalg.lstsq(A, b_init, rcond=-1)[0].transpose()[0]  # solve system
+        # 1. calculate initial guess solution of the mass balance (without loop equations, kirchhoff 2)
+        # delete first node of matrix and solution space b as these are redundant
+        mass_flow_edge = topology.solve_minimum_norm_mass_flows(node_mass_flows[1:], edge_directions)
+        # direction of each edge in each loop, to keep sign convention for Hardy Cross Method
+        loop_matrix = topology.get_loop_matrix(edge_directions)
+        loop_edges = abs(loop_matrix)
 
         # setup iterations for implicit matrix solver
         tolerance = 0.01  # tolerance for mass flow convergence
@@ -1084,50 +833,15 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
                                                   2) * np.sign(m_old)  # calculate pressure losses
             delta_m_den = abs(calc_pressure_loss_pipe(pipe_diameter_m, pipe_length_m, m_old, T_edge_K,
                                                       1))  # calculate derivatives of pressure losses
-            delta_m_num = delta_m_num.transpose()
-
-            sum_delta_m_num = np.zeros((1, len(loops)))[0]
-            sum_delta_m_den = np.zeros((1, len(loops)))[0]
-
-            for i in range(len(loops)):
-                # calculate the mass flow correction for each loop
-                # iterate over loops
-                # save the edge number connecting the nodes of the loops into the variable index
-                for j in range(len(loops[i])):
-                    if j == len(loops[i]) - 1:
-                        value = loops[i][0]
-                    else:
-                        value = loops[i][j + 1]
-                    index = graph.get_edge_data(loops[i][j], value)
-                    # check if nodes  defined in clockwise loop, to keep sign convention for Hardy Cross Method
-                    if not (edge_node_df.iloc[loops[i][j]][index['edge_number']] == 1) & \
-                           (edge_node_df.iloc[value][index['edge_number']] == -1):
-                        clockwise = -1
-                    else:
-                        clockwise = 1
-                    sum_delta_m_num[i] = sum_delta_m_num[i] + delta_m_num[index["edge_number"]] * clockwise
-                    sum_delta_m_den[i] = sum_delta_m_den[i] + delta_m_den[index["edge_number"]]
-                # calculate flow correction for each loop
-                if np.isclose(sum_delta_m_den[i], 0):
-                    delta_m = 0
-                else:
-                    delta_m = -sum_delta_m_num[i] / sum_delta_m_den[i]
 
-                # apply mass flow correction to all edges of each loop
-                for j in range(len(loops[i])):
-                    if j == len(loops[i]) - 1:
-                        value = loops[i][0]
-                    else:
-                        value = loops[i][j + 1]
-                    index = graph.get_edge_data(loops[i][j], value)
-                    # check if nodes  defined in clockwise loop
-                    if not (edge_node_df.iloc[loops[i][j]][index['edge_number']] == 1) & \
-                           (edge_node_df.iloc[value][index['edge_number']] == -1):
-                        clockwise = -1
-                    else:
-                        clockwise = 1
-                    # apply loop correction
-                    mass_flow_edge[index["edge_number"]] = mass_flow_edge[index["edge_number"]] + delta_m * clockwise
+            # calculate the mass flow correction for each loop
+            sum_delta_m_num = loop_matrix * np.ravel(delta_m_num)
+            sum_delta_m_den = loop_edges * np.ravel(delta_m_den)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                delta_m = np.where(np.isclose(sum_delta_m_den, 0), 0.0, -sum_delta_m_num / sum_delta_m_den)
+
+            # apply mass flow correction to all edges of each loop
+            mass_flow_edge = mass_flow_edge + loop_matrix.T * delta_m
             iterations = iterations + 1
 
             # adapt tolerance to reduce total amount of iterations
@@ -1146,18 +860,12 @@ def calc_mass_flow_edges(edge_node_df, mass_flow_substation_df, all_nodes_df, pi
 
     else:  # no loops
         # remove one equation (at plant node) to build a well-determined matrix, A.
-        plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-        A = edge_node_df.drop(edge_node_df.index[plant_index])
-        b = np.nan_to_num(mass_flow_substation_df.T)
-        b = np.delete(b, plant_index)
-        mass_flow_edge = np.linalg.solve(A.values, b)
+        mass_flow_edge = topology.solve_radial_mass_flows(np.delete(node_mass_flows, plant_index), plant_index,
+                                                          edge_directions)
 
     # verify calculated solution
-    plant_index = np.where(all_nodes_df['Type'] == 'PLANT')[0][0]  # find index of the first plant node
-    A = edge_node_df.drop(edge_node_df.index[plant_index])
-    b_verification = A.dot(mass_flow_edge)
-    b_original = np.nan_to_num(mass_flow_substation_df.T)
-    b_original = np.delete(b_original, plant_index)
+    b_verification = np.delete(topology.get_incidence(edge_directions) * mass_flow_edge, plant_index)
+    b_original = np.delete(node_mass_flows, plant_index)
     if max(abs(b_original - b_verification)) > 0.01:
         print('Error in the defined mass flows, deviation of ', max(abs(b_original - b_verification)),
               ' from node demands.')
@@ -1286,7 +994,7 @@ def calc_pressure_nodes(t_supply_node__k, t_return_node__k, thermal_network, t):
        Applied Thermal Engineering, 2016.
     """
 
-    edge_node_df = thermal_network.edge_node_df.copy()
+    edge_node_df = thermal_network.edge_node_df
     pipe_diameter = np.array(thermal_network.pipe_properties[:]['D_int_m':'D_int_m'], dtype='float')
     pipe_length = thermal_network.edge_df['pipe length'].values
     edge_mass_flow = thermal_network.edge_mass_flow_df.iloc[t].values
@@ -1347,18 +1055,12 @@ def calc_pressure_nodes(t_supply_node__k, t_return_node__k, thermal_network, t):
 
     # solve for the pressure at each node based on Eq. 1 in Todini & Pilati for no = 0 (no nodes with fixed head):
     # A12 * H + F(Q) = -A10 * H0 = 0
-    # edge_node_transpose * pressure_nodes = - (pressure_loss_pipe) (Ax = b)
+    # edge_node_transpose * pressure_nodes = - (pressure_loss_pipe) (Ax = b), solved in the least squares sense
     # ToDo: does not apply for looped networks
-    edge_node_transpose = np.transpose(edge_node_df.values)
+    topology, edge_directions = get_network_topology(edge_node_df)
     pressure_nodes_supply__pa = np.round(
-        np.transpose(
-            np.linalg.lstsq(edge_node_transpose, np.transpose(pressure_loss_pipe_supply__pa) * (-1), rcond=-1)[0]),
-        decimals=5)
-    pressure_nodes_return__pa = np.round(
-        np.transpose(
-            np.linalg.lstsq(-edge_node_transpose, np.transpose(pressure_loss_pipe_return__pa) * (-1), rcond=-1)[0]),
-        decimals=5)
-    return pressure_nodes_supply__pa[0], linear_pressure_loss_supply_Paperm[0], linear_pressure_loss_return_Paperm[0], \
+        topology.solve_node_pressures(np.ravel(pressure_loss_pipe_supply__pa) * (-1), edge_directions), decimals=5)
+    return pressure_nodes_supply__pa, linear_pressure_loss_supply_Paperm[0], linear_pressure_loss_return_Paperm[0], \
            pressure_loss_system__pa, pressure_loss_total_kw, pressure_loss_pipe_supply_kW[0], pressure_loss_substations_kW
 
 
@@ -1718,32 +1420,20 @@ def calc_max_edge_flowrate(thermal_network, processes=1):
 
     """
 
-    # create empty DataFrames to store results
-    if thermal_network.use_representative_week_per_month:
-        thermal_network.edge_mass_flow_df = pd.DataFrame(
-            data=np.zeros((2016, len(thermal_network.edge_node_df.columns.values))),
-            columns=thermal_network.edge_node_df.columns.values)  # stores values for 2016 timesteps
-
-        thermal_network.node_mass_flow_df = pd.DataFrame(
-            data=np.zeros((2016, len(thermal_network.edge_node_df.index))),
-            columns=thermal_network.edge_node_df.index.values)  # stores values for 2016 timestep
-
-        thermal_network.thermal_demand = pd.DataFrame(
-            data=np.zeros((2016, len(thermal_network.building_names))),
-            columns=thermal_network.building_names.values)  # stores values for 8760 timesteps
-
-    else:
-        thermal_network.edge_mass_flow_df = pd.DataFrame(
-            data=np.zeros((HOURS_IN_YEAR, len(thermal_network.edge_node_df.columns.values))),
-            columns=thermal_network.edge_node_df.columns.values)  # stores values for 8760 timesteps
+    # create empty DataFrames to store results, one row per hour of the inputs (8760, or the hours of the
+    # representative weeks or typical days, see prepare_inputs_of_hours)
+    number_of_hours = len(thermal_network.T_ground_K)
+    thermal_network.edge_mass_flow_df = pd.DataFrame(
+        data=np.zeros((number_of_hours, len(thermal_network.edge_node_df.columns.values))),
+        columns=thermal_network.edge_node_df.columns.values)
 
-        thermal_network.node_mass_flow_df = pd.DataFrame(
-            data=np.zeros((HOURS_IN_YEAR, len(thermal_network.edge_node_df.index))),
-            columns=thermal_network.edge_node_df.index.values)  # stores values for 8760 timesteps
+    thermal_network.node_mass_flow_df = pd.DataFrame(
+        data=np.zeros((number_of_hours, len(thermal_network.edge_node_df.index))),
+        columns=thermal_network.edge_node_df.index.values)
 
-        thermal_network.thermal_demand = pd.DataFrame(
-            data=np.zeros((HOURS_IN_YEAR, len(thermal_network.building_names))),
-            columns=thermal_network.building_names.values)  # stores values for 8760 timesteps
+    thermal_network.thermal_demand = pd.DataFrame(
+        data=np.zeros((number_of_hours, len(thermal_network.building_names))),
+        columns=thermal_network.building_names.values)
 
     loops, graph = thermal_network.find_loops()
 
@@ -1765,14 +1455,15 @@ def calc_max_edge_flowrate(thermal_network, processes=1):
         print('\n Diameter iteration number ', iterations)
         diameter_guess_old = diameter_guess
 
-        # hourly_mass_flow_calculation
+        # hourly_mass_flow_calculation, in blocks of time steps. the thermal network is sent once to each process
         time_step_slice = range(thermal_network.start_t, thermal_network.stop_t)
-        nhours = thermal_network.stop_t - thermal_network.start_t
+        number_of_blocks = 1 if processes == 1 else min(processes * 4, len(time_step_slice))
+        blocks = [block.tolist() for block in np.array_split(np.array(time_step_slice), number_of_blocks)]
 
-        mass_flows = cea.utilities.parallel.vectorize(hourly_mass_flow_calculation, processes)(
-            time_step_slice,
-            repeat(diameter_guess, nhours),
-            repeat(thermal_network, nhours))
+        mass_flows_of_blocks = cea.utilities.parallel.vectorize(
+            mass_flow_calculation_of_time_steps, processes,
+            shared={'diameter_guess': diameter_guess, 'thermal_network': thermal_network})(blocks)
+        mass_flows = list(chain.from_iterable(mass_flows_of_blocks))
 
         # write mass flows to the dataframes
         thermal_network.edge_mass_flow_df.iloc[time_step_slice] = [mfe[0] for mfe in mass_flows]
@@ -1816,37 +1507,18 @@ def calc_max_edge_flowrate(thermal_network, processes=1):
 
         iterations += 1
 
-    # output csv files with node mass flows
-    if thermal_network.use_representative_week_per_month:
-        # we need to extrapolate 8760 datapoints from 2016 points from our representative weeks.
-        # To do this, the initial dataset is repeated 4 times, the remaining values are filled with the average values of all above.
-
-        # Nominal node mass flow
-        node_mass_flow_for_csv = extrapolate_datapoints_for_representative_weeks(thermal_network.node_mass_flow_df)
-        node_mass_flow_for_csv.to_csv(
-            thermal_network.locator.get_nominal_node_mass_flow_csv_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False)
-
-        # output csv files with aggregated demand
-        thermal_demand_for_csv = extrapolate_datapoints_for_representative_weeks(thermal_network.thermal_demand)
-        thermal_demand_for_csv.to_csv(
-            thermal_network.locator.get_thermal_demand_csv_file(thermal_network.network_type,
-                                                                thermal_network.network_name),
-            columns=thermal_network.building_names)
+    # output csv files with node mass flows, expanded to 8760 time steps if only part of the year was calculated
+    # Nominal node mass flow
+    expand_to_year(thermal_network, thermal_network.node_mass_flow_df).to_csv(
+        thermal_network.locator.get_nominal_node_mass_flow_csv_file(thermal_network.network_type,
+                                                                    thermal_network.network_name),
+        index=False)
 
-    else:
-        # Nominal node mass flow
-        thermal_network.node_mass_flow_df.to_csv(
-            thermal_network.locator.get_nominal_node_mass_flow_csv_file(thermal_network.network_type,
-                                                                        thermal_network.network_name),
-            index=False)
-
-        # output csv files with aggregated demand
-        thermal_network.thermal_demand.to_csv(
-            thermal_network.locator.get_thermal_demand_csv_file(thermal_network.network_type,
-                                                                thermal_network.network_name),
-            columns=thermal_network.building_names, index=False)
+    # output csv files with aggregated demand
+    expand_to_year(thermal_network, thermal_network.thermal_demand).to_csv(
+        thermal_network.locator.get_thermal_demand_csv_file(thermal_network.network_type,
+                                                            thermal_network.network_name),
+        columns=thermal_network.building_names, index=False)
 
     return thermal_network.edge_mass_flow_df
 
@@ -1878,7 +1550,7 @@ def read_in_diameters_from_shapefile(thermal_network):
     return diameter_guess
 
 
-def hourly_mass_flow_calculation(t, diameter_guess, thermal_network):
+def hourly_mass_flow_calculation(t, diameter_guess, thermal_network, iteration=0):
     """
     This function calculates the edge mass flows and node mass flows of each hour of the year.
 
@@ -1900,12 +1572,55 @@ def hourly_mass_flow_calculation(t, diameter_guess, thermal_network):
     :param pipe_length:  Length of each edge
 
     :param node_mass_flow_df:  Storage for node mass flows of all hours of the year
+    :param iteration: number of minimum edge mass flow iterations already carried out for the time step (by
+                      :py:func:`mass_flow_calculation_of_time_steps`)
     :return edge_mass_flow_df: Storage for edge mass flows of all hours of the year
     :return node_mass_flow_df: Storage for node mass flows of all hours of the year
     """
 
-    print('calculating mass flows in edges... time step', t)
+    if iteration == 0:
+        print('calculating mass flows in edges... time step', t)
+        if not t in thermal_network.delta_cap_mass_flow.keys():
+            thermal_network.delta_cap_mass_flow[t] = 0
+        reset_min_mass_flow_variables(thermal_network, t)
+
+    min_edge_flow_flag = False
+    while min_edge_flow_flag == False:  # too low edge mass flows
+        reset_min_mass_flow_variables(thermal_network, t)  # reset storage variables
+        # calculate substation flow rates and return temperatures
+        required_flow_rate_df, thermal_demand_for_t, T_edge_K_initial = calc_substation_mass_flows(t, thermal_network)
+
+        if required_flow_rate_df.abs().max(axis=1)[0] > 0:  # non 0 demand
+            # solve mass flow rates on edges
+            mass_flow_edges_for_t = calc_mass_flow_edges(thermal_network.edge_node_df, required_flow_rate_df,
+                                                         thermal_network.all_nodes_df, diameter_guess,
+                                                         thermal_network.edge_df['pipe length'], T_edge_K_initial)
+        else:
+            mass_flow_edges_for_t = np.zeros(len(thermal_network.edge_node_df.columns))
+
+        mass_flow_nodes_for_t = required_flow_rate_df.values[0]
+
+        iteration, \
+        min_edge_flow_flag = edge_mass_flow_iteration(thermal_network,
+                                                      mass_flow_edges_for_t, iteration, t)
+    return mass_flow_edges_for_t, mass_flow_nodes_for_t, thermal_demand_for_t
+
+
+def calc_substation_mass_flows(t, thermal_network):
+    """
+    Calculates the mass flow required at each node of the network at time step t, assuming the supply temperature of
+    the network reaches all the substations without losses.
+
+    :param int t: time step
+    :param ThermalNetwork thermal_network: object holding all the information about the thermal network
 
+    :return required_flow_rate_df: mass flow rate required at each node                                      (1 x n)
+    :return thermal_demand_for_t: thermal demand of each building                                            (b x 1)
+    :return T_edge_K_initial: initial guess of the temperature of each edge                                  (e x 1)
+    :rtype required_flow_rate_df: DataFrame
+    :rtype thermal_demand_for_t: ndarray
+    :rtype T_edge_K_initial: ndarray
+    """
     if thermal_network.network_type == 'DH':
         # set to the highest value in the network and assume no loss within the network
         T_substation_supply_K = np.array(
@@ -1922,52 +1637,96 @@ def hourly_mass_flow_calculation(t, diameter_guess, thermal_network):
     T_substation_supply_K = pd.DataFrame(T_substation_supply_K,
                                          columns=thermal_network.buildings_demands.keys(), index=['T_supply'])
 
-    min_edge_flow_flag = False
-    if not t in thermal_network.delta_cap_mass_flow.keys():
-        thermal_network.delta_cap_mass_flow[t] = 0
-    iteration = 0
-    reset_min_mass_flow_variables(thermal_network, t)
-    while min_edge_flow_flag == False:  # too low edge mass flows
-        reset_min_mass_flow_variables(thermal_network, t)  # reset storage variables
-        # calculate substation flow rates and return temperatures
-        if thermal_network.network_type == 'DH' or (
-                thermal_network.network_type == 'DC' and math.isnan(T_substation_supply_K.values[0][0]) == False):
-            _, mdot_all, thermal_demand_for_t = substation_matrix.substation_return_model_main(thermal_network,
-                                                                                               T_substation_supply_K, t,
-                                                                                               thermal_network.building_names)
-        else:
-            mdot_all = pd.DataFrame(data=np.zeros(len(thermal_network.buildings_demands.keys())),
-                                    index=thermal_network.buildings_demands.keys()).T
-            for key in thermal_network.substation_heating_systems:
-                key = 'hs_' + key
-                thermal_network.ch_value[key][t] = 0
-            for key in thermal_network.substation_cooling_systems:
-                key = 'cs_' + key
-                thermal_network.cc_value[key][t] = 0
-            thermal_demand_for_t = np.zeros(len(thermal_network.building_names))
-        # write consumer substation required flow rate to nodes
-        required_flow_rate_df = write_substation_values_to_nodes_df(thermal_network.all_nodes_df, mdot_all)
-        # (1 x n)
+    if thermal_network.network_type == 'DH' or (
+            thermal_network.network_type == 'DC' and math.isnan(T_substation_supply_K.values[0][0]) == False):
+        _, mdot_all, thermal_demand_for_t = substation_matrix.substation_return_model_main(thermal_network,
+                                                                                           T_substation_supply_K, t,
+                                                                                           thermal_network.building_names)
+    else:
+        mdot_all = pd.DataFrame(data=np.zeros(len(thermal_network.buildings_demands.keys())),
+                                index=thermal_network.buildings_demands.keys()).T
+        for key in thermal_network.substation_heating_systems:
+            key = 'hs_' + key
+            thermal_network.ch_value[key][t] = 0
+        for key in thermal_network.substation_cooling_systems:
+            key = 'cs_' + key
+            thermal_network.cc_value[key][t] = 0
+        thermal_demand_for_t = np.zeros(len(thermal_network.building_names))
+    thermal_demand_for_t = thermal_demand_for_t.reshape((len(thermal_network.building_names),))
+    # write consumer substation required flow rate to nodes
+    required_flow_rate_df = write_substation_values_to_nodes_df(thermal_network.all_nodes_df, mdot_all)
+    # (1 x n)
 
-        # initial guess temperature
-        T_edge_K_initial = np.array([T_substation_supply_K.values[0][0]] * thermal_network.edge_node_df.shape[1])
+    # initial guess temperature
+    T_edge_K_initial = np.array([T_substation_supply_K.values[0][0]] * thermal_network.edge_node_df.shape[1])
+    return required_flow_rate_df, thermal_demand_for_t, T_edge_K_initial
 
-        if required_flow_rate_df.abs().max(axis=1)[0] > 0:  # non 0 demand
-            # solve mass flow rates on edges
-            mass_flow_edges_for_t = calc_mass_flow_edges(thermal_network.edge_node_df.copy(), required_flow_rate_df,
-                                                         thermal_network.all_nodes_df, diameter_guess,
-                                                         thermal_network.edge_df['pipe length'], T_edge_K_initial,
-                                                         thermal_network.find_loops)
-        else:
-            mass_flow_edges_for_t = np.zeros(len(thermal_network.edge_node_df.columns))
 
-        mass_flow_nodes_for_t = required_flow_rate_df.values[0]
+def mass_flow_calculation_of_time_steps(time_steps, diameter_guess, thermal_network):
+    """
+    Calculates the edge mass flows, node mass flows and thermal demand of a block of time steps (see
+    :py:func:`hourly_mass_flow_calculation`).
 
-        iteration, \
-        min_edge_flow_flag = edge_mass_flow_iteration(thermal_network,
-                                                      mass_flow_edges_for_t, iteration, t)
-    thermal_demand_for_t = thermal_demand_for_t.reshape((len(thermal_network.building_names),))
-    return mass_flow_edges_for_t, mass_flow_nodes_for_t, thermal_demand_for_t
+    In radial networks, the edge mass flows are a linear function of the node mass flows: the edge mass flows of all
+    the time steps of the block are solved at once with the factorization of the network (see
+    :py:meth:`cea.technologies.thermal_network.network_topology.NetworkTopology.solve_radial_mass_flows`). Only the
+    time steps with too low edge mass flows continue with the minimum edge mass flow iterations of
+    :py:func:`hourly_mass_flow_calculation`. The time steps of looped networks are calculated one by one.
+
+    :param list time_steps: the time steps of the block
+    :param diameter_guess: Pipe diameter values
+    :param ThermalNetwork thermal_network: object holding all the information about the thermal network
+
+    :return: the edge mass flows, node mass flows and thermal demand of each time step of the block
+    :rtype: list[tuple]
+    """
+    topology, edge_directions = get_network_topology(thermal_network.edge_node_df)
+    if topology.loops:
+        return [hourly_mass_flow_calculation(t, diameter_guess, thermal_network) for t in time_steps]
+
+    print('calculating mass flows in edges... time steps', time_steps[0], 'to', time_steps[-1])
+    mass_flow_nodes = []
+    thermal_demand = []
+    for t in time_steps:
+        if not t in thermal_network.delta_cap_mass_flow.keys():
+            thermal_network.delta_cap_mass_flow[t] = 0
+        reset_min_mass_flow_variables(thermal_network, t)
+        required_flow_rate_df, thermal_demand_for_t, _ = calc_substation_mass_flows(t, thermal_network)
+        mass_flow_nodes.append(required_flow_rate_df.values[0])
+        thermal_demand.append(thermal_demand_for_t)
+
+    # solve the mass flow rates on the edges of all time steps (one column per time step)
+    plant_index = np.where(thermal_network.all_nodes_df['Type'] == 'PLANT')[0][0]  # index of the first plant node
+    node_mass_flows = np.nan_to_num(np.array(mass_flow_nodes, dtype=float))
+    mass_flow_edges = topology.solve_radial_mass_flows(np.delete(node_mass_flows, plant_index, axis=1).T,
+                                                       plant_index, edge_directions).T
+
+    # verify calculated solution (the residual of the node mass balances of each time step)
+    b_verification = topology.get_incidence(edge_directions).dot(mass_flow_edges.T).T
+    deviations = np.abs(np.delete(node_mass_flows - b_verification, plant_index, axis=1)).max(axis=1)
+    for t, deviation in zip(time_steps, deviations):
+        if deviation > 0.01:
+            print('Error in the defined mass flows, deviation of ', deviation, ' from node demands in time step', t)
+    mass_flow_edges = np.round(mass_flow_edges, decimals=5)
+    mass_flow_edges[~(np.abs(node_mass_flows).max(axis=1) > 0)] = 0.0  # no demand
+
+    # the time steps with too low edge mass flows (see edge_mass_flow_iteration)
+    if thermal_network.no_convergence_flag == True:
+        pipe_min_mass_flow = thermal_network.minimum_edge_mass_flow / 2
+    else:
+        pipe_min_mass_flow = thermal_network.minimum_edge_mass_flow
+    test_edge_flow = np.abs(mass_flow_edges)
+    too_low = ~np.isclose(test_edge_flow, 0) & (test_edge_flow - pipe_min_mass_flow < -pipe_min_mass_flow / 2)
+
+    mass_flows = []
+    for i, t in enumerate(time_steps):
+        mass_flows_for_t = (mass_flow_edges[i], mass_flow_nodes[i], thermal_demand[i])
+        if too_low[i].any():
+            iteration, min_edge_flow_flag = edge_mass_flow_iteration(thermal_network, mass_flow_edges[i], 0, t)
+            if not min_edge_flow_flag:
+                mass_flows_for_t = hourly_mass_flow_calculation(t, diameter_guess, thermal_network, iteration)
+        mass_flows.append(mass_flows_for_t)
+    return mass_flows
 
 
 def edge_mass_flow_iteration(thermal_network, edge_mass_flow_df, iteration_counter, t):
@@ -2104,10 +1863,7 @@ def initial_diameter_guess(thermal_network):
 
     # Identify time steps of highest 50 demands
     if thermal_network.network_type == 'DH':
-        if thermal_network.use_representative_week_per_month:
-            heating_sum = np.zeros(2016)
-        else:
-            heating_sum = np.zeros(HOURS_IN_YEAR)
+        heating_sum = np.zeros(len(thermal_network.T_ground_K))
         for building in thermal_network.buildings_demands.keys():
             for system in thermal_network.substation_systems['heating']:
                 if system == 'ww':
@@ -2117,10 +1873,7 @@ def initial_diameter_guess(thermal_network):
                         'Qhs_sys_' + system + '_kWh']
         timesteps_top_demand = np.argsort(heating_sum)[-50:]  # identifies 50 time steps with largest demand
     else:
-        if thermal_network.use_representative_week_per_month:
-            cooling_sum = np.zeros(2016)
-        else:
-            cooling_sum = np.zeros(HOURS_IN_YEAR)
+        cooling_sum = np.zeros(len(thermal_network.T_ground_K))
         for building in thermal_network.buildings_demands.keys():  # sum up cooling demands of all buildings to create (1xt) array
             for system in thermal_network.substation_systems['cooling']:
                 if system == 'data':
@@ -2230,10 +1983,10 @@ def initial_diameter_guess(thermal_network):
                 if required_flow_rate_df.abs().max(axis=1)[0] > 0:  # non 0 demand
                     # solve mass flow rates on edges
                     thermal_network_reduced.edge_mass_flow_df[:][t:t + 1] = [
-                        calc_mass_flow_edges(thermal_network_reduced.edge_node_df.copy(), required_flow_rate_df,
+                        calc_mass_flow_edges(thermal_network_reduced.edge_node_df, required_flow_rate_df,
                                              thermal_network_reduced.all_nodes_df,
                                              diameter_guess, thermal_network_reduced.edge_df['pipe length'].values,
-                                             T_edge_initial_K, thermal_network_reduced.find_loops)]
+                                             T_edge_initial_K)]
                     thermal_network_reduced.node_mass_flow_df[:][t:t + 1] = required_flow_rate_df.values
 
                 iteration, \
@@ -2348,6 +2101,88 @@ def solve_network_temperatures(thermal_network, t):
     :rtype plant_heat_requirement: list of arrays
 
     """
+    return solve_network_temperatures_of_hours(thermal_network, [t])[0]
+
+
+def solve_network_temperatures_of_hours(thermal_network, hours):
+    """
+    This function calculates the node temperatures of several time-steps (see :py:func:`solve_network_temperatures`).
+    The supply network of each time-step is solved in turn, since its iterations depend on the temperature control left
+    by the time-steps before it. The return networks of all the time-steps are then solved together, by one call to the
+    compiled kernel (see :py:func:`calc_return_temperatures_of_hours`).
+
+    :param ThermalNetwork thermal_network: A container for all the thermal network data
+    :param hours: the time-steps to solve
+    :return: the results of :py:func:`solve_network_temperatures` for each time-step
+    :rtype: list[tuple]
+    """
+    supply_networks = [solve_supply_network_temperatures(thermal_network, t) for t in hours]
+    return_networks = iter(calc_return_temperatures_of_hours(
+        [supply_network[-1] for supply_network in supply_networks if supply_network[-1] is not None],
+        thermal_network))
+
+    network_temperatures = []
+    for t_supply_nodes_2__k, plant_node, edge_mass_flow_df_2_kgs, mass_flow_substations_nodes_df_2_kgs, \
+            q_loss_edges_2_supply_kW, return_network in supply_networks:
+        if return_network is not None:
+            t_return_nodes_2__k, q_loss_edges_2_return_kW = next(return_networks)
+            # calculate plant heat requirements according to plant supply/return temperatures
+            plant_heat_requirement_kw = calc_plant_heat_requirement(plant_node, t_supply_nodes_2__k,
+                                                                    t_return_nodes_2__k,
+                                                                    mass_flow_substations_nodes_df_2_kgs)
+        else:
+            t_return_nodes_2__k = np.full(thermal_network.edge_node_df.shape[0], np.nan)
+            plant_heat_requirement_kw = np.full(sum(thermal_network.all_nodes_df['Type'] == 'PLANT'), 0)
+            q_loss_edges_2_return_kW = np.full(thermal_network.edge_node_df.shape[1], 0)
+
+        # post-processing
+        thermal_losses_system_kW = calc_thermal_loss_system(q_loss_edges_2_supply_kW, q_loss_edges_2_return_kW)
+        pipe_length = thermal_network.edge_df['pipe length'].values
+        linear_thermal_loss_supply_edges_Wperm = q_loss_edges_2_supply_kW * 1000 / pipe_length
+
+        # calculate velocity per edge
+        velocities_in_supply_edges_mpers = np.zeros(edge_mass_flow_df_2_kgs.shape)
+        for ix, mass_flow in enumerate(edge_mass_flow_df_2_kgs):
+            diameter = thermal_network.pipe_properties.loc['D_int_m'][ix]
+            A = math.pi * (diameter) ** 2 / 4
+            velocities_in_supply_edges_mpers[ix] = edge_mass_flow_df_2_kgs[ix] * (1 / P_WATER_KGPERM3) * (1 / A)
+
+        # plant supply and return temperatures
+        plant_node_index = np.where(thermal_network.all_nodes_df['Type'] == 'PLANT')[0][0]
+        T_supply_K = t_supply_nodes_2__k[plant_node_index]
+        T_return_K = t_return_nodes_2__k[plant_node_index]
+        temperatures_at_plant_K = [T_supply_K, T_return_K]
+
+        network_temperatures.append((t_supply_nodes_2__k, t_return_nodes_2__k, temperatures_at_plant_K,
+                                     plant_heat_requirement_kw, edge_mass_flow_df_2_kgs,
+                                     mass_flow_substations_nodes_df_2_kgs.values[0], velocities_in_supply_edges_mpers,
+                                     q_loss_edges_2_supply_kW, linear_thermal_loss_supply_edges_Wperm,
+                                     thermal_losses_system_kW))
+    return network_temperatures
+
+
+def solve_supply_network_temperatures(thermal_network, t):
+    """
+    This function calculates the node temperatures of the supply network and the mass flows at time-step t, iterating
+    until the substation supply temperatures and the substation mass flows are cohesive (see
+    :py:func:`solve_network_temperatures`). The return network is solved afterwards, from the return temperatures of
+    the substations at the converged supply temperatures.
+
+    :param ThermalNetwork thermal_network: A container for all the thermal network data
+    :param t: current time step
+
+    :return t_supply_nodes: supply line node temperatures (nx1)
+    :return plant_node: the indices of the plant nodes (None without flows in the network)
+    :return edge_mass_flow: mass flow of each edge (1xe)
+    :return mass_flow_substations_nodes: mass flow of the substation at each node (1xn)
+    :return q_loss_supply_edges_kW: heat losses of each supply pipe (1xe)
+    :return return_network: the arguments of :py:func:`calc_return_temperatures` to solve the return network (None
+        without flows in the network)
+    :rtype return_network: ReturnNetwork
+    """
+    print('calculating thermal hydraulic properties of', thermal_network.network_type, 'network',
+          thermal_network.network_name, '...  time step', t)
+
     # initialize
     if not t in thermal_network.delta_cap_mass_flow.keys():
         thermal_network.delta_cap_mass_flow[t] = 0
@@ -2406,14 +2241,13 @@ def solve_network_temperatures(thermal_network, t):
                                                                                      mdot_all_kgs)
 
                 # solve for the required mass flow rate on each edge/pipe
-                edge_mass_flow_df_2_kgs = calc_mass_flow_edges(edge_node_df.copy(),
+                edge_mass_flow_df_2_kgs = calc_mass_flow_edges(edge_node_df,
                                                                mass_flow_substations_nodes_df_kgs,
                                                                thermal_network.all_nodes_df,
                                                                thermal_network.pipe_properties[:][
                                                                'D_int_m':'D_int_m'].values[0],
                                                                thermal_network.edge_df['pipe length'],
-                                                               t_edge__k,
-                                                               thermal_network.find_loops)
+                                                               t_edge__k)
 
                 # make sure all mass flows are positive and edge node matrix is updated
                 edge_mass_flow_df_2_kgs, \
@@ -2459,14 +2293,13 @@ def solve_network_temperatures(thermal_network, t):
                             mass_flow_substations_nodes_df_kgs[node] = substations_nodes_df_old[
                                                                        node] * 1.1  # increase flow by 10%
                         # solve for the required mass flow rate on each edge/pipe
-                        edge_mass_flow_df_2_kgs = calc_mass_flow_edges(edge_node_df.copy(),
+                        edge_mass_flow_df_2_kgs = calc_mass_flow_edges(edge_node_df,
                                                                        mass_flow_substations_nodes_df_kgs,
                                                                        thermal_network.all_nodes_df,
                                                                        thermal_network.pipe_properties[:][
                                                                        'D_int_m':'D_int_m'].values[0],
                                                                        thermal_network.edge_df['pipe length'],
-                                                                       t_edge__k,
-                                                                       thermal_network.find_loops)
+                                                                       t_edge__k)
                         VF_iter = VF_iter + 1
                     elif dt_nodes_max >= dt_tolerance and VF_iter >= 10:
                         for node in nodes_insufficient:
@@ -2540,47 +2373,20 @@ def solve_network_temperatures(thermal_network, t):
                                                                 thermal_network.pipe_properties, t_edge__k,
                                                                 thermal_network.network_type)  # [kW/K]
 
-                t_return_nodes_2__k, \
-                q_loss_edges_2_return_kW = calc_return_temperatures(thermal_network.T_ground_K[t],
-                                                                    edge_node_df.copy(),
-                                                                    edge_mass_flow_df_2_kgs,
-                                                                    mass_flow_substations_nodes_df_2_kgs, k,
-                                                                    t_substation_return_df_2, thermal_network)
-
-        # calculate plant heat requirements according to plant supply/return temperatures
-        plant_heat_requirement_kw = calc_plant_heat_requirement(plant_node, t_supply_nodes_2__k, t_return_nodes_2__k,
-                                                                mass_flow_substations_nodes_df_2_kgs)
+                return_network = ReturnNetwork(thermal_network.T_ground_K[t], edge_node_df.copy(),
+                                               edge_mass_flow_df_2_kgs, mass_flow_substations_nodes_df_2_kgs, k,
+                                               t_substation_return_df_2)
 
     else:
         t_supply_nodes_2__k = np.full(thermal_network.edge_node_df.shape[0], np.nan)
-        t_return_nodes_2__k = np.full(thermal_network.edge_node_df.shape[0], np.nan)
-        plant_heat_requirement_kw = np.full(sum(thermal_network.all_nodes_df['Type'] == 'PLANT'), 0)
+        plant_node = None
         edge_mass_flow_df_2_kgs = thermal_network.edge_mass_flow_df.iloc[t]
         mass_flow_substations_nodes_df_2_kgs = thermal_network.node_mass_flow_df.iloc[t]
         q_loss_edges_2_supply_kW = np.full(thermal_network.edge_node_df.shape[1], 0)
-        q_loss_edges_2_return_kW = np.full(thermal_network.edge_node_df.shape[1], 0)
+        return_network = None
 
-    # post-processing
-    thermal_losses_system_kW = calc_thermal_loss_system(q_loss_edges_2_supply_kW, q_loss_edges_2_return_kW)
-    pipe_length = thermal_network.edge_df['pipe length'].values
-    linear_thermal_loss_supply_edges_Wperm = q_loss_edges_2_supply_kW * 1000 / pipe_length
-
-    # calculate velocity per edge
-    velocities_in_supply_edges_mpers = np.zeros(edge_mass_flow_df_2_kgs.shape)
-    for ix, mass_flow in enumerate(edge_mass_flow_df_2_kgs):
-        diameter = thermal_network.pipe_properties.loc['D_int_m'][ix]
-        A = math.pi * (diameter) ** 2 / 4
-        velocities_in_supply_edges_mpers[ix] = edge_mass_flow_df_2_kgs[ix] * (1 / P_WATER_KGPERM3) * (1 / A)
-
-    # plant supply and return temperatures
-    plant_node_index = np.where(thermal_network.all_nodes_df['Type'] == 'PLANT')[0][0]
-    T_supply_K = t_supply_nodes_2__k[plant_node_index]
-    T_return_K = t_return_nodes_2__k[plant_node_index]
-    temperatures_at_plant_K = [T_supply_K, T_return_K]
-
-    return t_supply_nodes_2__k, t_return_nodes_2__k, temperatures_at_plant_K, plant_heat_requirement_kw, \
-           edge_mass_flow_df_2_kgs, mass_flow_substations_nodes_df_2_kgs.values[0], velocities_in_supply_edges_mpers, \
-           q_loss_edges_2_supply_kW, linear_thermal_loss_supply_edges_Wperm, thermal_losses_system_kW
+    return t_supply_nodes_2__k, plant_node, edge_mass_flow_df_2_kgs, mass_flow_substations_nodes_df_2_kgs, \
+           q_loss_edges_2_supply_kW, return_network
 
 
 def reset_min_mass_flow_variables(thermal_network, t):
@@ -2663,7 +2469,9 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     Starting from the plant supply node, the function go through the edge-node index to search for the outlet node, and
     calculate the outlet node temperature after heat loss. And starting from the outlet node, the function calculates
     the node temperature at the corresponding pipe outlet, and the calculation goes on until all the node temperatures
-    are solved. At nodes connecting to multiple pipes, the mixing temperature is calculated.
+    are solved (see :py:func:`calc_supply_node_temperatures`). At nodes connecting to multiple pipes, the mixing
+    temperature is calculated. With variable temperature control, the plant supply temperature is iterated until the
+    node temperatures reach the target supply temperatures of the substations.
 
     :param edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
                         and indicating the direction of flow of each edge e at node n: if e points to n,
@@ -2683,22 +2491,8 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     t_ground__k = thermal_network.T_ground_K[t]  # vector with ground temperatures in K
     t_target_supply__c = thermal_network.t_target_supply_df.loc[t]
     network_type = thermal_network.network_type
-    all_nodes_df = thermal_network.all_nodes_df
     ##
 
-    z = np.asarray(edge_node_df.copy())  # (nxe) edge-node matrix
-    z_pipe_out = z.clip(min=0)  # pipe outlet matrix
-    z_pipe_in = z.clip(max=0)  # pipe inlet matrix
-
-    m_d = np.zeros((z.shape[1], z.shape[1]))  # (exe) pipe mass flow rate matrix
-    np.fill_diagonal(m_d, mass_flow_df)
-
-    # matrices to store results
-    t_e_out = z_pipe_out.copy()
-    t_e_in = z_pipe_in.copy().dot(-1)
-    t_node = np.zeros(z.shape[0])
-    z_note = z.copy()  # matrix to store information of solved nodes
-
     # start node temperature calculation
     flag = 0
     # set initial supply temperature guess to the target substation supply temperature
@@ -2710,95 +2504,8 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
     t_plant_sup = t_plant_sup_0
     iteration = 0
     while flag == 0:
-        # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
-        # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
-        not_stuck = np.array([True] * z.shape[0])
-        # count number of iterations
-        temp_iter = 0
-        # tolerance for convergence of temperature
-        temp_tolerance = 1
-        # initialize delta to some value above the tolerance
-        delta_temp_0 = 2
-        # iterate over temperatures for loop networks
-        while delta_temp_0 >= temp_tolerance:
-            t_e_out_old = np.array(t_e_out)
-
-            # reset_matrixes
-            z_note = z.copy()
-            t_e_out = z_pipe_out.copy()
-            t_e_in = z_pipe_in.copy().dot(-1)
-            t_node = np.zeros(z.shape[0])
-
-            # # calculate the pipe outlet temperature from the plant node
-            for i in range(z.shape[0]):
-                if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
-                    # write plant inlet temperature
-                    t_node[i] = t_plant_sup  # assume plant inlet temperature
-                    edge = np.where(t_e_in[i] != 0)[0]  # find edge index
-                    t_e_in[i] = t_e_in[i] * t_node[i]
-                    # calculate pipe outlet temperature
-                    calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
-            plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
-
-            # Identify all nodes with no in or outflows and delete those values from the z matrixes
-            # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
-            for i in range(z_note.shape[0]):
-                if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
-                    t_node[i] = np.nan
-                    # no in our outflows, clear in and outflows at this node
-                    # and clear node incoming flows from the corresponding edges
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == -1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_in[target_node, edge] = 0.0
-                            t_e_in[target_node, edge] = 0.0
-                    outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
-                    if outflowing_edges:
-                        for edge in outflowing_edges:  # delete values where we were supposed to flow to
-                            target_node = np.where(z_note[:, edge] == 1)[0]
-                            z_note[target_node, edge] = 0.0
-                            z_pipe_out[target_node, edge] = 0.0
-                            t_e_out[target_node, edge] = 0.0
-                    target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
-                    if target_edges:
-                        for target_edge in target_edges:
-                            z_note[i, target_edge] = 0.0
-                            z_pipe_in[i, target_edge] = 0.0
-                            z_pipe_out[i, target_edge] = 0.0
-                            t_e_in[i, target_edge] = 0.0
-                            t_e_out[i, target_edge] = 0.0
-
-            # # calculate pipe outlet temperature and node temperature for the rest
-            while np.count_nonzero(np.isclose(t_node, 0)) > 0:
-                if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
-                    z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
-                        z,
-                        z_note,
-                        m_d,
-                        t_e_out,
-                        z_pipe_out,
-                        t_node,
-                        t_e_in,
-                        t_ground__k,
-                        not_stuck,
-                        k, thermal_network)
-                else:  # stuck! this can happen with loops
-                    for i in range(np.shape(t_e_out)[1]):
-                        # check if we have a mass flow on this edge
-                        if np.any(t_e_out[:, i] == 1):
-                            z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
-                            if temp_iter < 1:  # do this in first iteration only, since there is no previous value
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
-                                    t_node.nonzero()].mean()  # assume some node temperature
-                            else:
-                                t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
-                            break
-                    not_stuck = np.array([True] * z.shape[0])
-
-            delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
-            temp_iter = temp_iter + 1
+        t_node, plant_node, q_loss_edges_kw = calc_supply_node_temperatures(t_plant_sup, edge_node_df, mass_flow_df, k,
+                                                                            t_ground__k, thermal_network)
 
         # set maximum/minimum allowable plant supply temperatures
         t_boiling_K = 100 + 273.15
@@ -2820,11 +2527,6 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                     t_plant_sup = t_plant_sup + abs(d_t.min())
                     # check if this term is positive, looping causes t_e_out to sink instead of rise.
 
-                    # reset the matrices for supply network temperature calculation
-                    z_note = z.copy()
-                    t_e_out = z_pipe_out.copy()
-                    t_e_in = z_pipe_in.copy().dot(-1)
-                    t_node = np.zeros(z.shape[0])
                     iteration += 1
 
                 elif all(d_t > -0.1) == False and iteration > 30:
@@ -2853,10 +2555,6 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                     # increase plant supply temperature and re-iterate the node supply temperature calculation
                     # increase by the maximum amount of temperature deficit at nodes
                     t_plant_sup = t_plant_sup - abs(d_t.max())
-                    z_note = z.copy()
-                    t_e_out = z_pipe_out.copy()
-                    t_e_in = z_pipe_in.copy().dot(-1)
-                    t_node = np.zeros(z.shape[0])
                     iteration += 1
                 elif all(d_t < 0.1) == False and iteration > 30:
                     # end iteration if too many iterations
@@ -2882,6 +2580,167 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
                 switch_control = True
                 print('switched control: ', thermal_network.temperature_control, ' temperature:', t_plant_sup)
 
+    return t_node.T, plant_node, q_loss_edges_kw, switch_control
+
+
+def calc_supply_node_temperatures(t_plant_sup, edge_node_df, mass_flow_df, k, t_ground__k, thermal_network):
+    """
+    This function calculates the node temperatures of the supply network for a given plant supply temperature. The
+    nodes are visited in the order of the flow by the compiled kernel
+    :py:func:`cea.technologies.thermal_network.network_temperatures.calc_supply_temperatures_of_time_steps`, using the
+    adjacency of the network topology. When the flows form a loop, the nodes are swept until the temperatures converge
+    (see :py:func:`calc_supply_node_temperatures_by_sweep`).
+
+    :param t_plant_sup: supply temperature of the plants [K]
+    :param edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
+                        and indicating the direction of flow of each edge e at node n: if e points to n,
+                        value is 1; if e leaves node n, -1; else, 0.                                     (n x e)
+    :param mass_flow_df: mass flow rate of each edge e                                                        (1 x e)
+    :param k: aggregated heat conduction coefficient of each pipe                                             (e x e)
+    :param t_ground__k: ground temperature [K]
+    :type edge_node_df: DataFrame
+    :type k: ndarray
+
+    :return t_node: node temperatures (nx1)
+    :return plant_node: the indices of the plant nodes
+    :return q_loss_edges_kw: heat losses of each pipe [kW]                                                    (1 x e)
+    :rtype t_node: ndarray
+    :rtype plant_node: ndarray
+    :rtype q_loss_edges_kw: ndarray
+    """
+    topology, edge_directions = get_network_topology(edge_node_df)
+    is_plant = (thermal_network.all_nodes_df['Type'] == 'PLANT').values
+    mass_flows = np.asarray(mass_flow_df, dtype=float).reshape(1, -1)
+    k_edges = np.diag(k).reshape(1, -1)
+    t_node, t_edge_in, t_edge_out, limited, status, error_node = calc_supply_temperatures_of_time_steps(
+        topology.incidence.indptr, topology.incidence.indices, topology.edge_start, topology.edge_end, is_plant,
+        thermal_network.network_type == 'DH', edge_directions.reshape(1, -1), mass_flows, k_edges,
+        np.array([t_ground__k], dtype=float), np.array([t_plant_sup], dtype=float))
+
+    if status[0] == NOT_ORDERED:
+        return calc_supply_node_temperatures_by_sweep(t_plant_sup, edge_node_df, mass_flow_df, k, t_ground__k,
+                                                      thermal_network)
+    if status[0] == NO_INFLOW:
+        raise ValueError('There are no flow entering/existing node', error_node[0],
+                         '. Please check if the edge_node_df make sense.')
+    record_problematic_edges(limited[0], t_edge_in[0], mass_flows[0], k_edges[0], t_ground__k, thermal_network)
+    q_loss_edges_kw = calc_edge_heat_losses(mass_flows[0], t_edge_in[0], t_edge_out[0])
+    return t_node[0], np.flatnonzero(is_plant), q_loss_edges_kw
+
+
+def calc_supply_node_temperatures_by_sweep(t_plant_sup, edge_node_df, mass_flow_df, k, t_ground__k,
+                                           thermal_network):
+    """
+    This function calculates the node temperatures of the supply network for a given plant supply temperature by
+    sweeping over the nodes (see :py:func:`calculate_outflow_temp`). Starting from the plant supply node, the function
+    go through the edge-node index to search for the outlet node, and calculate the outlet node temperature after heat
+    loss. In looped networks, the sweep starts from an assumed pipe outlet temperature and is repeated until the
+    temperatures converge.
+
+    The parameters and the return values are those of :py:func:`calc_supply_node_temperatures`.
+    """
+    all_nodes_df = thermal_network.all_nodes_df
+
+    z = np.asarray(edge_node_df.copy())  # (nxe) edge-node matrix
+    z_pipe_out = z.clip(min=0)  # pipe outlet matrix
+    z_pipe_in = z.clip(max=0)  # pipe inlet matrix
+
+    m_d = np.zeros((z.shape[1], z.shape[1]))  # (exe) pipe mass flow rate matrix
+    np.fill_diagonal(m_d, mass_flow_df)
+
+    # matrices to store results
+    t_e_out = z_pipe_out.copy()
+
+    # not_stuck variable is necessary because of looped networks. Here it is possible that we have only a closed
+    # loop remaining and no obvious place to start. In this case, iteration with an initial value is necessary
+    not_stuck = np.array([True] * z.shape[0])
+    # count number of iterations
+    temp_iter = 0
+    # tolerance for convergence of temperature
+    temp_tolerance = 1
+    # initialize delta to some value above the tolerance
+    delta_temp_0 = 2
+    # iterate over temperatures for loop networks
+    while delta_temp_0 >= temp_tolerance:
+        t_e_out_old = np.array(t_e_out)
+
+        # reset_matrixes
+        z_note = z.copy()
+        t_e_out = z_pipe_out.copy()
+        t_e_in = z_pipe_in.copy().dot(-1)
+        t_node = np.zeros(z.shape[0])
+
+        # # calculate the pipe outlet temperature from the plant node
+        for i in range(z.shape[0]):
+            if all_nodes_df.iloc[i]['Type'] == 'PLANT':  # find plant node
+                # write plant inlet temperature
+                t_node[i] = t_plant_sup  # assume plant inlet temperature
+                edge = np.where(t_e_in[i] != 0)[0]  # find edge index
+                t_e_in[i] = t_e_in[i] * t_node[i]
+                # calculate pipe outlet temperature
+                calc_t_out(i, edge, k, m_d, z, t_e_in, t_e_out, t_ground__k, z_note, thermal_network)
+        plant_node = t_node.nonzero()[0]  # the node indices of the plant nodes in the edge-node index
+
+        # Identify all nodes with no in or outflows and delete those values from the z matrixes
+        # This is necessary to avoid getting stuck in a loop network with no mass flows inside the loop
+        for i in range(z_note.shape[0]):
+            if np.isclose(sum(np.dot(m_d, z_pipe_out[i])), 0.0) and np.isclose(sum(np.dot(m_d, z_pipe_in[i])), 0.0):
+                t_node[i] = np.nan
+                # no in our outflows, clear in and outflows at this node
+                # and clear node incoming flows from the corresponding edges
+                outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, 1.0)]
+                if outflowing_edges:
+                    for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                        target_node = np.where(z_note[:, edge] == -1)[0]
+                        z_note[target_node, edge] = 0.0
+                        z_pipe_in[target_node, edge] = 0.0
+                        t_e_in[target_node, edge] = 0.0
+                outflowing_edges = [a for a, x in enumerate(z_note[i]) if np.isclose(x, -1.0)]
+                if outflowing_edges:
+                    for edge in outflowing_edges:  # delete values where we were supposed to flow to
+                        target_node = np.where(z_note[:, edge] == 1)[0]
+                        z_note[target_node, edge] = 0.0
+                        z_pipe_out[target_node, edge] = 0.0
+                        t_e_out[target_node, edge] = 0.0
+                target_edges = [a for a, x in enumerate(z_note[i]) if not np.isclose(x, 0.0)]
+                if target_edges:
+                    for target_edge in target_edges:
+                        z_note[i, target_edge] = 0.0
+                        z_pipe_in[i, target_edge] = 0.0
+                        z_pipe_out[i, target_edge] = 0.0
+                        t_e_in[i, target_edge] = 0.0
+                        t_e_out[i, target_edge] = 0.0
+
+        # # calculate pipe outlet temperature and node temperature for the rest
+        while np.count_nonzero(np.isclose(t_node, 0)) > 0:
+            if not_stuck.any():  # if there are no changes for all elements but we have not yet solved the system
+                z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground__k, not_stuck = calculate_outflow_temp(
+                    z,
+                    z_note,
+                    m_d,
+                    t_e_out,
+                    z_pipe_out,
+                    t_node,
+                    t_e_in,
+                    t_ground__k,
+                    not_stuck,
+                    k, thermal_network)
+            else:  # stuck! this can happen with loops
+                for i in range(np.shape(t_e_out)[1]):
+                    # check if we have a mass flow on this edge
+                    if np.any(t_e_out[:, i] == 1):
+                        z_note[np.where(t_e_out[:, i] == 1), i] = 0  # remove inflow value from z_note
+                        if temp_iter < 1:  # do this in first iteration only, since there is no previous value
+                            t_e_out[np.where(t_e_out[:, i] == 1), i] = t_node[
+                                t_node.nonzero()].mean()  # assume some node temperature
+                        else:
+                            t_e_out[np.where(t_e_out[:, i] == 1), i] = t_e_out_old[np.where(t_e_out[:, i] == 1), i]
+                        break
+                not_stuck = np.array([True] * z.shape[0])
+
+        delta_temp_0 = np.max(abs(t_e_out_old - t_e_out))  # exit condition
+        temp_iter = temp_iter + 1
+
     # calculate pipe heat losses
     q_loss_edges_kw = np.zeros(z_note.shape[1])
     for edge in range(z_note.shape[1]):
@@ -2889,7 +2748,7 @@ def calc_supply_temperatures(t, edge_node_df, mass_flow_df, k, thermal_network):
             dT_edge = np.nanmax(t_e_in[:, edge]) - np.nanmax(t_e_out[:, edge])
             q_loss_edges_kw[edge] = m_d[edge, edge] * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * dT_edge  # kW
 
-    return t_node.T, plant_node, q_loss_edges_kw, switch_control
+    return t_node, plant_node, q_loss_edges_kw
 
 
 def calculate_outflow_temp(z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in, t_ground_k, not_stuck, k,
@@ -2976,11 +2835,81 @@ def calculate_outflow_temp(z, z_note, m_d, t_e_out, z_pipe_out, t_node, t_e_in,
 def calc_return_temperatures(t_ground, edge_node_df, mass_flow_df, mass_flow_substation_df, k, t_return,
                              thermal_network):
     """
-    This function calculates the node temperatures considering heat losses in the return line.
-    Starting from the substations at the end branches, the function goes through the edge-node index to search for the
-    outlet node, and calculates the outlet node temperature after heat loss. Starting from that outlet node, the function
-    calculates the node temperature at the corresponding pipe outlet, and the calculation goes on until all the node
-    temperatures are solved. At nodes connecting to multiple pipes, the mixing temperature is calculated.
+    This function calculates the node temperatures considering heat losses in the return line. Starting from the
+    substations at the end branches, the nodes are visited in the order of the flow by the compiled kernel
+    :py:func:`cea.technologies.thermal_network.network_temperatures.calc_return_temperatures_of_time_steps`, using the
+    adjacency of the network topology. At nodes connecting to multiple pipes, the mixing temperature is calculated. When
+    the flows form a loop, the nodes are swept until the temperatures converge (see
+    :py:func:`calc_return_temperatures_by_sweep`).
+
+    :param t_ground: vector with ground temperatures in K
+    :param edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
+                        and indicating the direction of flow of each edge e at node n: if e points to n,
+                        value is 1; if e leaves node n, -1; else, 0. E.g. a plant will only have exiting flows,
+                        so only negative values
+    :param mass_flow_df: DataFrame containing the mass flow rate for each edge e at each t
+    :param mass_flow_substation_df: DataFrame containing the mass flow rate for each substation at each t
+    :param k: aggregated heat conduction coefficient for each pipe
+    :param t_return: return temperatures at the substations
+
+    :return t_node: list of node temperatures (nx1)
+    :return q_loss_edges_kW: heat losses of each pipe [kW] (1 x e)
+    :rtype t_node: ndarray
+    :rtype q_loss_edges_kW: ndarray
+
+    """
+    return calc_return_temperatures_of_hours([ReturnNetwork(t_ground, edge_node_df, mass_flow_df,
+                                                            mass_flow_substation_df, k, t_return)], thermal_network)[0]
+
+
+def calc_return_temperatures_of_hours(return_networks, thermal_network):
+    """
+    This function calculates the node temperatures and the heat losses of the return networks of several time-steps
+    (see :py:func:`calc_return_temperatures`). The time-steps with the same network topology are solved by one call to
+    the compiled kernel, one row per time-step, and the time-steps in which the flows form a loop by sweeping over the
+    nodes (see :py:func:`calc_return_temperatures_by_sweep`).
+
+    :param return_networks: the arguments of :py:func:`calc_return_temperatures` of each time-step
+    :type return_networks: list[ReturnNetwork]
+
+    :return: the node temperatures (nx1) and the heat losses of each pipe [kW] (1 x e) of each time-step
+    :rtype: list[tuple]
+    """
+    network_topologies = [get_network_topology(return_network.edge_node_df) for return_network in return_networks]
+    return_temperatures = [None] * len(return_networks)
+    for topology in {id(topology): topology for topology, _ in network_topologies}.values():
+        hours = [i for i, (hour_topology, _) in enumerate(network_topologies) if hour_topology is topology]
+        edge_directions = np.array([network_topologies[i][1] for i in hours])
+        mass_flows = np.array([np.asarray(return_networks[i].mass_flow_df, dtype=float).ravel() for i in hours])
+        k_edges = np.array([np.diag(return_networks[i].k) for i in hours])
+        t_ground = np.array([return_networks[i].t_ground for i in hours], dtype=float)
+        t_node, t_edge_in, t_edge_out, limited, status = calc_return_temperatures_of_time_steps(
+            topology.incidence.indptr, topology.incidence.indices, topology.edge_start, topology.edge_end,
+            thermal_network.network_type == 'DH', edge_directions, mass_flows, k_edges, t_ground,
+            np.array([np.asarray(return_networks[i].mass_flow_substation_df, dtype=float).ravel() for i in hours]),
+            np.array([np.asarray(return_networks[i].t_return, dtype=float).ravel() for i in hours]))
+
+        for row, i in enumerate(hours):
+            if status[row] == NOT_ORDERED:
+                return_temperatures[i] = calc_return_temperatures_by_sweep(*return_networks[i],
+                                                                           thermal_network=thermal_network)
+            else:
+                record_problematic_edges(limited[row], t_edge_in[row], mass_flows[row], k_edges[row], t_ground[row],
+                                         thermal_network)
+                return_temperatures[i] = t_node[row], calc_edge_heat_losses(mass_flows[row], t_edge_in[row],
+                                                                            t_edge_out[row])
+    return return_temperatures
+
+
+def calc_return_temperatures_by_sweep(t_ground, edge_node_df, mass_flow_df, mass_flow_substation_df, k, t_return,
+                                      thermal_network):
+    """
+    This function calculates the node temperatures considering heat losses in the return line by sweeping over the
+    nodes. Starting from the substations at the end branches, the function goes through the edge-node index to search
+    for the outlet node, and calculates the outlet node temperature after heat loss. Starting from that outlet node, the
+    function calculates the node temperature at the corresponding pipe outlet, and the calculation goes on until all the
+    node temperatures are solved. In looped networks, the sweep starts from an assumed pipe outlet temperature and is
+    repeated until the temperatures converge.
 
     :param t_ground: vector with ground temperatures in K
     :param edge_node_df: DataFrame consisting of n rows (number of nodes) and e columns (number of edges)
@@ -3163,6 +3092,44 @@ def calc_return_node_temperature(index, m_d, t_e_out, t_return, z_pipe_out, m_su
     return t_node
 
 
+def calc_edge_heat_losses(mass_flow, t_edge_in, t_edge_out):
+    """
+    The heat losses of each pipe with water flowing through it, from the temperatures at its inlet and outlet. Unknown
+    (nan) temperatures count as 0 K.
+
+    :param mass_flow: mass flow rate of each edge [kg/s]                                                     (1 x e)
+    :param t_edge_in: temperature at the inlet of each edge [K]                                               (1 x e)
+    :param t_edge_out: temperature at the outlet of each edge [K]                                             (1 x e)
+
+    :return q_loss_edges_kw: heat losses of each pipe [kW]                                                    (1 x e)
+    :rtype q_loss_edges_kw: ndarray
+    """
+    dT_edge = np.fmax(t_edge_in, 0.0) - np.fmax(t_edge_out, 0.0)
+    return np.where(mass_flow > 0, mass_flow * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000 * dT_edge, 0.0)  # kW
+
+
+def record_problematic_edges(limited, t_edge_in, mass_flow, k, t_ground, thermal_network):
+    """
+    Reports the pipes whose temperature loss was limited to 30 K (see :py:func:`calc_t_out`) and stores the lowest
+    mass flow of each of them in ``thermal_network.problematic_edges``.
+
+    :param limited: True for the pipes whose temperature loss was limited                                     (1 x e)
+    :param t_edge_in: temperature at the inlet of each edge [K]                                               (1 x e)
+    :param mass_flow: mass flow rate of each edge [kg/s]                                                     (1 x e)
+    :param k: aggregated heat conduction coefficient of each edge [kW/K]                                      (1 x e)
+    :param t_ground: ground temperature [K]
+    """
+    mass_flow = np.round(mass_flow, decimals=5)  # round as in calc_t_out
+    for e in np.flatnonzero(limited):
+        m = mass_flow[e]
+        dT = t_edge_in[e] - calc_temperature_out_per_pipe(t_edge_in[e], m, k[e], t_ground)
+        print('High temperature loss on edge', e, '. Loss:', abs(dT))
+        if not str(e) in thermal_network.problematic_edges.keys() or thermal_network.problematic_edges[str(e)] > m:
+            # store the smallest mass flow of the edge
+            thermal_network.problematic_edges[str(e)] = m
+        if (k[e] / 2 - m * HEAT_CAPACITY_OF_WATER_JPERKGK / 1000) > 0:
+            print('Exit temperature decreasing at entry temperature increase. Possible at low massflows. Massflow:',
+                  m, ' on edge: ', e)
 
 
 def calc_t_out(node, edge, k_old, m_d, z, t_e_in, t_e_out, t_ground, z_note, thermal_network):
@@ -3488,11 +3455,12 @@ def write_substation_values_to_nodes_df(all_nodes_df, df_value):
 
     """
 
-    nodes_df = pd.DataFrame(index=[0], columns=all_nodes_df.index)
     # it is assumed that if there is more than one plant, they all supply the same amount of heat at each time step
     # (i.e., the amount supplied by each plant is not optimized)
-    number_of_plants = sum(all_nodes_df['Type'] == 'PLANT')
-    consumer_list = all_nodes_df.loc[all_nodes_df['Type'] == 'CONSUMER', 'Building'].values
+    is_plant = (all_nodes_df['Type'] == 'PLANT').values
+    is_consumer = (all_nodes_df['Type'] == 'CONSUMER').values
+    number_of_plants = sum(is_plant)
+    consumer_list = all_nodes_df.loc[is_consumer, 'Building'].values
     plant_mass_flow = df_value[consumer_list].loc[0].sum() / number_of_plants
 
     # write all flow rates into nodes DataFrame
@@ -3515,15 +3483,13 @@ def write_substation_values_to_nodes_df(all_nodes_df, df_value):
         '''
 
     # assure only mass flow at network consumer substations are counted
-    for node, row in all_nodes_df.iterrows():
-        if row['Type'] == 'CONSUMER':
-            nodes_df[node] = df_value[row['Building']]
-            if df_value[row['Building']].any() < 0:
-                print('Error, Building trying to be a plant!')
-        elif row['Type'] == 'PLANT':
-            nodes_df[node] = - plant_mass_flow
-        else:
-            nodes_df[node] = 0
+    consumer_mass_flows = df_value[consumer_list].loc[0].values.astype(float)
+    if (consumer_mass_flows < 0).any():
+        print('Error, Building trying to be a plant!')
+    node_values = np.zeros(len(all_nodes_df.index))
+    node_values[is_consumer] = consumer_mass_flows
+    node_values[is_plant] = - plant_mass_flow
+    nodes_df = pd.DataFrame(node_values.reshape(1, -1), index=[0], columns=all_nodes_df.index)
     return nodes_df
 
 
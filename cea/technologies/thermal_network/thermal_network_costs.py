@@ -15,6 +15,7 @@ import cea.technologies.chiller_vapor_compression as VCCModel
 import cea.technologies.cooling_tower as CTModel
 from cea.optimization.constants import PUMP_ETA
 from cea.optimization.lca_calculations import LcaCalculations
+from cea.schemas import read_dataframe
 from cea.constants import HOURS_IN_YEAR
 from cea.technologies.heat_exchangers import calc_Cinv_HEX_hisaka
 from cea.utilities import epwreader
@@ -107,7 +108,8 @@ def calc_Ctot_network_pump(network_info):
     mdotA_kgpers = np.nan_to_num(mdotA_kgpers)
     mdotnMax_kgpers = np.amax(mdotA_kgpers)  # find highest mass flow of all nodes at all timesteps (should be at plant)
     # read in total pressure loss in kW
-    deltaP_kW = pd.read_csv(network_info.locator.get_network_energy_pumping_requirements_file(network_type, ''))
+    deltaP_kW = read_dataframe(
+        network_info.locator.get_network_energy_pumping_requirements_file.existing_path(network_type, ''))
     deltaP_kW = deltaP_kW['pressure_loss_total_kW'].sum()
 
     Opex_var = deltaP_kW * 1000 * network_info.prices.ELEC_PRICE # why not returned?
@@ -137,8 +139,8 @@ def calc_Ctot_cooling_plants(network_info):
     """
 
     # read in plant heat requirement
-    plant_heat_hourly_kWh = pd.read_csv(
-        network_info.locator.get_thermal_network_plant_heat_requirement_file(
+    plant_heat_hourly_kWh = read_dataframe(
+        network_info.locator.get_thermal_network_plant_heat_requirement_file.existing_path(
             network_info.network_type, network_info.network_names))
     # read in number of plants
     number_of_plants = len(plant_heat_hourly_kWh.columns)
@@ -165,8 +167,7 @@ def calc_Ctot_cooling_plants(network_info):
         # Read in building demand
         building_demand = {}
         for building in network_info.building_names:
-            building_demand[building] = pd.read_csv(
-                network_info.locator.get_demand_results_file(building))
+            building_demand[building] = network_info.locator.get_demand_results_file.read(building)
 
         Capex_a_chiller_USD = 0.0
         Opex_fixed_chiller = 0.0
@@ -257,7 +258,7 @@ def calc_Ctot_cs_building_scale_loads(network_info):
                 if building_index not in network_info.disconnected_buildings_index:
                     # if this building is disconnected it will be calculated separately
                     # Read in building demand
-                    building_demand = pd.read_csv(network_info.locator.get_demand_results_file(building))
+                    building_demand = network_info.locator.get_demand_results_file.read(building)
                     if not system_string:
                         # this means there are no disconnected loads. Shouldn't happen but is a fail-safe
                         peak_demand_kW = 0.0
@@ -391,7 +392,7 @@ def calc_Ctot_cs_building_scale_buildings(network_info):
             Opex_var_system = 0.0
             if building_index in network_info.disconnected_buildings_index:  # disconnected building
                 # Read in demand of building
-                building_demand = pd.read_csv(network_info.locator.get_demand_results_file(building))
+                building_demand = network_info.locator.get_demand_results_file.read(building)
                 # sum up demand of all loads
                 demand_hourly_kWh = building_demand['Qcs_sys_scu_kWh'].abs() + \
                                     building_demand['Qcs_sys_ahu_kWh'].abs() + \
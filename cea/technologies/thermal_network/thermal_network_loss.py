@@ -5,9 +5,12 @@ Hydraulic - thermal network
 
 
 
+from numba.extending import register_jitable
+
 from cea.constants import HEAT_CAPACITY_OF_WATER_JPERKGK
 
 
+@register_jitable
 def calc_temperature_out_per_pipe(t_in, m, k, t_ground):
     """
 
@@ -5,9 +5,9 @@ thermal storage
 
 
 
-import pandas as pd
 from math import log
 from cea.analysis.costs.equations import calc_capex_annualized, calc_opex_annualized
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
 __author__ = "Thuy-An Nguyen"
 __copyright__ = "Copyright 2015, Architecture and Building Systems - ETH Zurich"
 __credits__ = ["Thuy-An Nguyen", "Tim Vollrath", "Jimeno A. Fonseca"]
@@ -31,7 +31,7 @@ def calc_Cinv_storage(V_tank_m3, locator, config, technology_type):
 
     """
     if V_tank_m3 > 0:
-        storage_cost_data = pd.read_excel(locator.get_database_conversion_systems(), sheet_name="TES")
+        storage_cost_data = SupplySystemsDatabase(locator).TES
         storage_cost_data = storage_cost_data[storage_cost_data['code'] == technology_type]
 
         # if the Q_design is below the lowest capacity available for the technology, then it is replaced by the least
@@ -0,0 +1,60 @@
+"""
+Synthetic weather data and buildings for the tests of the demand engines (see ``test_thermal_loads_batched.py`` and
+``test_jit_kernels.py``), without a reference case.
+"""
+
+import types
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import control_heating_cooling_systems, latent_loads, thermal_loads
+
+
+def create_weather_data():
+    hours = np.arange(HOURS_IN_YEAR)
+    t_ext = 10.0 - 12.0 * np.cos(2 * np.pi * hours / HOURS_IN_YEAR) + 5.0 * np.sin(2 * np.pi * hours / 24)
+    return pd.DataFrame({'drybulb_C': t_ext, 'wetbulb_C': t_ext - 2.0,
+                         'relhum_percent': 60.0 + 20.0 * np.sin(hours / 50.0),
+                         'windspd_ms': 3.0, 'skytemp_C': t_ext - 10.0})
+
+
+def create_building(name, weather_data, class_hs, class_cs, mech_vent, win_vent, heat_rec, night_flushing,
+                    economizer, floor_area):
+    """Create a synthetic building (bpr) and its time step data up to the space heating / cooling loop"""
+    hours = np.arange(HOURS_IN_YEAR)
+    af = floor_area
+    rc_model = dict(Af=af, Aef=af * 1.1, Atot=af * 4.5, Am=af * 2.5, Awin_ag=af * 0.2, Awall_ag=af * 0.6,
+                    Aroof=af * 0.3, Aop_bg=af * 0.3, Htr_op=af * 0.5, Htr_w=af * 0.3, Cm=af * 165000.0, U_win=2.0,
+                    U_wall=0.4, U_roof=0.3, U_base=0.4)
+    hvac = {'class_hs': class_hs, 'class_cs': class_cs, 'MECH_VENT': mech_vent, 'WIN_VENT': win_vent,
+            'HEAT_REC': heat_rec, 'NIGHT_FLSH': night_flushing, 'ECONOMIZER': economizer,
+            'has-heating-season': True, 'has-cooling-season': True, 'heat_starts': '16|09', 'heat_ends': '14|05',
+            'cool_starts': '15|05', 'cool_ends': '15|09', 'convection_hs': 0.5, 'convection_cs': 0.3,
+            'Qhsmax_Wm2': 60.0, 'Qcsmax_Wm2': 40.0, 'Tc_sup_air_ahu_C': 16.0, 'Tc_sup_air_aru_C': 16.0,
+            'dT_Qhs': 1.2, 'dThs_C': 0.5, 'dT_Qcs': -1.0, 'dTcs_C': -0.5}
+    architecture = types.SimpleNamespace(e_win=0.89, e_roof=0.9, e_wall=0.9, Hs_ag=0.8, n50=3.0, win_wall=0.3)
+    solar = types.SimpleNamespace(I_sol=np.maximum(0, 40 * af * np.sin(2 * np.pi * (hours - 6) / 24)))
+    bpr = types.SimpleNamespace(name=name, rc_model=rc_model, hvac=hvac, architecture=architecture, solar=solar,
+                                comfort={'RH_max_pc': 70.0, 'Tcs_set_C': 26.0})
+
+    occupied = np.sin(2 * np.pi * hours / 24) > 0
+    tsd = thermal_loads.initialize_timestep_data(bpr, weather_data)
+    tsd['people'] = occupied * 10.0
+    tsd['ve_lps'] = occupied * af * 1.0
+    tsd['Qs'] = occupied * af * 3.0
+    tsd['El'] = occupied * af * 5.0
+    tsd['Ea'] = occupied * af * 4.0
+    tsd['Epro'] = np.zeros(HOURS_IN_YEAR)
+    tsd['Qcdata_sys'] = np.zeros(HOURS_IN_YEAR)
+    tsd['Qcre_sys'] = occupied * -2.0
+    schedules = {'X_gh': occupied * 80.0,
+                 'Ths_set_C': [21.0 if o else 'OFF' for o in occupied],
+                 'Tcs_set_C': [26.0 if o else 'OFF' for o in occupied]}
+    tsd = latent_loads.calc_Qgain_lat(tsd, schedules)
+    tsd = control_heating_cooling_systems.get_temperature_setpoints_incl_seasonality(tsd, bpr, schedules)
+    t_prev = next(thermal_loads.get_hours(bpr)) - 1
+    tsd['T_int'][t_prev] = tsd['T_ext'][t_prev]
+    tsd['x_int'][t_prev] = latent_loads.convert_rh_to_moisture_content(tsd['rh_ext'][t_prev], tsd['T_ext'][t_prev])
+    return bpr, tsd
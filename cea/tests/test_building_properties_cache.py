@@ -0,0 +1,79 @@
+"""
+Test the cache of :py:class:`cea.demand.building_properties.BuildingProperties`: The cache file is named after the
+contents of the input files and of the code that reads them, and is reused as long as they do not change.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+import cea.inputlocator
+from cea.demand import building_properties
+from cea.demand.building_properties import BuildingProperties
+
+
+class TestBuildingPropertiesCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.building_names = ['B001', 'B002']
+        zone_geometry = os.path.splitext(self.locator.get_zone_geometry())[0]
+        input_files = [zone_geometry + '.shp', zone_geometry + '.dbf',
+                       self.locator.get_building_air_conditioning(),
+                       self.locator.get_building_typology(),
+                       self.locator.get_building_architecture(),
+                       self.locator.get_building_comfort(),
+                       self.locator.get_building_internal(),
+                       self.locator.get_building_supply(),
+                       self.locator.get_database_supply_assemblies(),
+                       self.locator.get_database_air_conditioning_systems(),
+                       self.locator.get_database_envelope_systems()]
+        input_files.extend(self.locator.get_radiation_building(b) for b in self.building_names)
+        for input_file in input_files:
+            if not os.path.exists(os.path.dirname(input_file)):
+                os.makedirs(os.path.dirname(input_file))
+            with open(input_file, 'w') as f:
+                f.write(input_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_get_cache_path(self):
+        cache_path = BuildingProperties.get_cache_path(self.locator, self.building_names, 0.0)
+        self.assertEqual(os.path.dirname(cache_path), self.locator.get_building_properties_cache_folder())
+        self.assertEqual(cache_path, BuildingProperties.get_cache_path(self.locator, self.building_names, 0.0))
+        self.assertNotEqual(cache_path, BuildingProperties.get_cache_path(self.locator, self.building_names, 0.5))
+        self.assertNotEqual(cache_path, BuildingProperties.get_cache_path(self.locator, ['B001'], 0.0))
+
+        # a new version of the CEA calculates the properties with different code
+        with mock.patch('cea.__version__', '0.0.0'):
+            self.assertNotEqual(cache_path, BuildingProperties.get_cache_path(self.locator, self.building_names, 0.0))
+
+        with open(self.locator.get_radiation_building('B002'), 'a') as f:
+            f.write('changed')
+        self.assertNotEqual(cache_path, BuildingProperties.get_cache_path(self.locator, self.building_names, 0.0))
+
+    def test_read_cache(self):
+        cache_path = BuildingProperties.get_cache_path(self.locator, self.building_names, 0.0)
+        expected = BuildingProperties.__new__(BuildingProperties)
+        expected.building_names = self.building_names
+        expected._prop_RC_model = pd.DataFrame({'Af': [100.0, 200.0]}, index=self.building_names)
+        expected.write_cache(cache_path)
+
+        # the cached properties are used instead of reading the (here invalid) input files
+        result = BuildingProperties(self.locator, self.building_names, use_cache=True)
+        self.assertEqual(result.building_names, self.building_names)
+        pd.testing.assert_frame_equal(result._prop_RC_model, expected._prop_RC_model)
+
+        for i in range(building_properties.MAX_CACHED_BUILDING_PROPERTIES + 1):
+            expected.write_cache(os.path.join(os.path.dirname(cache_path), '{i}.pickle'.format(i=i)))
+        self.assertEqual(len(os.listdir(os.path.dirname(cache_path))),
+                         building_properties.MAX_CACHED_BUILDING_PROPERTIES)
+
+
+if __name__ == '__main__':
+    unittest.main()
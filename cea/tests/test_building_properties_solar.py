@@ -0,0 +1,59 @@
+"""
+Test the sensible solar gains of :py:func:`cea.demand.building_properties.get_prop_solar`, which are calculated for all
+buildings at once.
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import building_properties
+from cea.demand.building_properties import RADIATION_COLUMNS, RSE
+
+
+class TestPropSolar(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.building_names = ['B001', 'B002', 'B003']
+        rng = np.random.RandomState(42)
+        self.radiation = {}
+        for building_name in self.building_names:
+            radiation = pd.DataFrame(rng.uniform(0.0, 2.0, (HOURS_IN_YEAR, len(RADIATION_COLUMNS))),
+                                     columns=RADIATION_COLUMNS)
+            radiation.to_csv(self.locator.get_radiation_building(building_name), index=False)
+            self.radiation[building_name] = radiation
+        self.prop_envelope = pd.DataFrame({'a_wall': [0.6, 0.7, 0.8], 'a_roof': [0.5, 0.6, 0.9],
+                                           'G_win': [0.6, 0.5, 0.4], 'rf_sh': [0.08, 0.5, 1.0],
+                                           'F_F': [0.2, 0.15, 0.1]}, index=self.building_names)
+        self.prop_rc_model = pd.DataFrame({'U_wall': [0.4, 0.3, 1.2], 'U_roof': [0.3, 0.2, 0.9],
+                                           'empty_envelope_ratio': [1.0, 0.9, 0.8]}, index=self.building_names)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_get_prop_solar(self):
+        heatgain = 0.25
+        result = building_properties.get_prop_solar(self.locator, self.building_names, self.prop_rc_model,
+                                                    self.prop_envelope, heatgain).set_index('Name')
+        for building_name in self.building_names:
+            radiation = self.radiation[building_name] * 1000
+            envelope = self.prop_envelope.loc[building_name]
+            rc_model = self.prop_rc_model.loc[building_name]
+            walls = radiation[['walls_east_kW', 'walls_west_kW', 'walls_north_kW', 'walls_south_kW']].sum(axis=1)
+            windows = radiation[['windows_east_kW', 'windows_west_kW', 'windows_north_kW',
+                                 'windows_south_kW']].sum(axis=1)
+            expected = (walls * envelope.a_wall * RSE * rc_model.U_wall * rc_model.empty_envelope_ratio +
+                        radiation['roofs_top_kW'] * envelope.a_roof * RSE * rc_model.U_roof * (1 - heatgain) +
+                        windows * [envelope.G_win * envelope.rf_sh if w > 300 else envelope.G_win for w in windows] *
+                        (1 - envelope.F_F) * rc_model.empty_envelope_ratio)
+            np.testing.assert_allclose(result.loc[building_name, 'I_sol'], expected.values, rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
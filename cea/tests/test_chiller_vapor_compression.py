@@ -4,7 +4,7 @@
 import unittest
 import numpy as np
 
-from cea.technologies.chiller_vapor_compression import calc_averaged_PLF, calc_available_capacity, calc_PLF
+from cea.technologies.chiller_vapor_compression import calc_averaged_PLF, calc_available_capacity, calc_PLF, calc_VCC
 
 
 class TestLoadDistribution(unittest.TestCase):
@@ -16,23 +16,43 @@ class TestLoadDistribution(unittest.TestCase):
 
         cls.plfs = {'plf_a': 0.17149273, 'plf_b': 0.58820208, 'plf_c': 0.23737257}
 
-    def test_calc_averaged_PLF(self):
+    def dummy_VCC_chiller(self):
         # FIXME: Use python mock in python3
         class dummy_VCC_chiller(object):
             def __init__(self):
                 self.max_VCC_capacity = 14000000
                 self.min_VCC_capacity = 1758000
+                self.g_value = 0.47
                 self.scale = "DISTRICT"
 
             def configuration_values(self, _source_type, _compressor_type):
                 return dummy_configuration_values
 
         dummy_configuration_values = {'Qs': self.qs, 'PLFs': self.plfs}
-        VCC_chiller = dummy_VCC_chiller()
+        return dummy_VCC_chiller()
+
+    def test_calc_averaged_PLF(self):
+        VCC_chiller = self.dummy_VCC_chiller()
 
         result = calc_averaged_PLF(40000000, 25000000, 279.15, 301.15, VCC_chiller)
         self.assertAlmostEqual(0.9735208306617418, result)
 
+    def test_calc_VCC_array(self):
+        """The operation for each hour of the year at once is the same as hour by hour"""
+        VCC_chiller = self.dummy_VCC_chiller()
+        q_chw_load_Wh = np.array([0.0, 1.0E6, 25.0E6, 40.0E6])
+        T_chw_sup_K = np.array([279.15, 279.15, 280.15, 281.15])
+        T_chw_re_K = T_chw_sup_K + 6.0
+
+        result = calc_VCC(40000000, q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, 301.15, VCC_chiller)
+        for i in range(len(q_chw_load_Wh)):
+            hourly = calc_VCC(40000000, q_chw_load_Wh[i], T_chw_sup_K[i], T_chw_re_K[i], 301.15, VCC_chiller)
+            for key in ['wdot_W', 'q_cw_W', 'q_chw_W']:
+                self.assertAlmostEqual(result[key][i], hourly[key], places=6)
+        self.assertEqual(result['wdot_W'][0], 0.0)
+        self.assertRaises(ValueError, calc_VCC, 40000000, -q_chw_load_Wh, T_chw_sup_K, T_chw_re_K, 301.15,
+                          VCC_chiller)
+
     def test_calc_available_capacity(self):
         result = calc_available_capacity(13333333.3333333, self.qs, 279.15, 301.15)
         self.assertAlmostEqual(12793205.269333301, result)
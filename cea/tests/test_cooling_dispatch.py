@@ -0,0 +1,125 @@
+"""
+Test that the dispatch of the district cooling for the whole year
+(:py:func:`cea.optimization.slave.cooling_resource_activation.cooling_resource_dispatch`) gives the same results as
+the activation of the technologies hour by hour (:py:func:`cooling_resource_activator`), including the state of the
+daily storage.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy.interpolate import interp1d
+
+import cea.inputlocator
+from cea.optimization.constants import DT_COOL, T_TANK_FULLY_DISCHARGED_K
+from cea.optimization.slave.cooling_resource_activation import cooling_resource_activator, cooling_resource_dispatch
+from cea.optimization.slave.daily_storage.load_leveling import LoadLevelingDailyStorage
+from cea.optimization.slave_data import SlaveData
+from cea.technologies.chiller_absorption import AbsorptionChiller
+from cea.technologies.chiller_vapor_compression import VaporCompressionChiller
+
+HOURS = 96
+
+# part load curves of a CCGT (see cea.technologies.cogeneration.calc_cop_CCGT)
+Q_OUTPUT_CCGT_W = np.linspace(3.0E5, 4.5E5, 5)
+Q_INPUT_CCGT_W = 2.2 * Q_OUTPUT_CCGT_W
+CCGT_OPERATION_DATA = {'q_input_fn_q_output_W': interp1d(Q_OUTPUT_CCGT_W, Q_INPUT_CCGT_W),
+                       'q_output_min_W': Q_OUTPUT_CCGT_W[0],
+                       'q_output_max_W': Q_OUTPUT_CCGT_W[-1],
+                       'eta_el_fn_q_input': interp1d(Q_INPUT_CCGT_W, np.linspace(0.3, 0.4, 5))}
+
+
+class TestCoolingDispatch(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.scenario = tempfile.mkdtemp()
+        cls.locator = cea.inputlocator.InputLocator(cls.scenario)
+        os.makedirs(os.path.dirname(cls.locator.get_database_conversion_systems()))
+        shutil.copyfile(os.path.join(os.path.dirname(cea.inputlocator.__file__), 'databases', 'CH', 'components',
+                                     'CONVERSION.xls'), cls.locator.get_database_conversion_systems())
+        cls.VCC_chiller = VaporCompressionChiller(cls.locator, 'DISTRICT')
+        cls.absorption_chiller = AbsorptionChiller(pd.read_excel(cls.locator.get_database_conversion_systems(),
+                                                                 sheet_name="Absorption_chiller"), 'double')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scenario)
+
+    def setUp(self):
+        random = np.random.RandomState(42)
+        self.Q_thermal_req_W = random.uniform(0.0, 2.0E6, HOURS) * (random.uniform(size=HOURS) > 0.2)
+        self.T_supply_K = np.full(HOURS, 279.0)
+        self.T_return_K = random.uniform(285.0, 289.0, HOURS)
+        self.T_return_K[::13] = self.T_supply_K[::13]  # no flow in the network
+        self.Q_therm_Lake_W = random.uniform(0.0, 1.0E6, HOURS)
+        # the lake as a source of the chillers, as a bypass or too warm to be used
+        self.T_Lake_K = random.choice([275.0, 285.0, 305.0], HOURS)
+        self.T_ground_K = random.uniform(280.0, 290.0, HOURS)
+
+    def create_master_to_slave_variables(self, technologies):
+        master_to_slave_variables = SlaveData()
+        for technology, size_W in technologies.items():
+            setattr(master_to_slave_variables, technology + '_on', 1)
+            if technology == 'NG_Trigen':
+                master_to_slave_variables.NG_Trigen_ACH_size_W = size_W
+            else:
+                setattr(master_to_slave_variables, technology + '_size_W', size_W)
+        master_to_slave_variables.Storage_cooling_on = 1
+        master_to_slave_variables.Storage_cooling_size_W = 1.5E6
+        return master_to_slave_variables
+
+    def create_daily_storage(self, master_to_slave_variables):
+        return LoadLevelingDailyStorage(master_to_slave_variables.Storage_cooling_on,
+                                        master_to_slave_variables.Storage_cooling_size_W,
+                                        min(self.T_supply_K) - DT_COOL,
+                                        max(self.T_return_K) - DT_COOL,
+                                        T_TANK_FULLY_DISCHARGED_K,
+                                        np.mean(self.T_ground_K))
+
+    def assert_dispatch_equal(self, master_to_slave_variables):
+        arguments = (self.absorption_chiller, CCGT_OPERATION_DATA, self.VCC_chiller)
+
+        daily_storage = self.create_daily_storage(master_to_slave_variables)
+        expected = {}
+        for hour in range(HOURS):
+            if self.Q_thermal_req_W[hour] > 0.0:
+                daily_storage, thermal_output, electricity_output, gas_output = cooling_resource_activator(
+                    self.Q_thermal_req_W[hour], self.T_supply_K[hour], self.T_return_K[hour],
+                    self.Q_therm_Lake_W[hour], self.T_Lake_K[hour], daily_storage, self.T_ground_K[hour],
+                    master_to_slave_variables, *arguments)
+                for output in (thermal_output, electricity_output, gas_output):
+                    for key, value in output.items():
+                        expected.setdefault(key, np.zeros(HOURS))[hour] = value
+
+        dispatched_storage = self.create_daily_storage(master_to_slave_variables)
+        dispatched_storage, thermal_output, electricity_output, gas_output = cooling_resource_dispatch(
+            self.Q_thermal_req_W, self.T_supply_K, self.T_return_K, self.Q_therm_Lake_W, self.T_Lake_K,
+            dispatched_storage, self.T_ground_K, master_to_slave_variables, *arguments)
+
+        dispatched = dict(thermal_output, **electricity_output)
+        dispatched.update(gas_output)
+        self.assertEqual(set(dispatched), set(expected))
+        for key in expected:
+            np.testing.assert_allclose(dispatched[key], expected[key], rtol=1e-9, atol=1e-6, err_msg=key)
+        self.assertGreater(expected['Q_DailyStorage_gen_directload_W'].sum(), 0.0)
+        for attribute in ('Q_current_storage_empty_capacity_W', 'Q_current_storage_filled_capacity_W', 'T_tank_K'):
+            self.assertAlmostEqual(getattr(dispatched_storage, attribute), getattr(daily_storage, attribute))
+
+    def test_vapor_compression_chillers(self):
+        self.assert_dispatch_equal(self.create_master_to_slave_variables({'WS_BaseVCC': 4.0E5,
+                                                                           'WS_PeakVCC': 3.0E5,
+                                                                           'AS_BaseVCC': 5.0E5,
+                                                                           'AS_PeakVCC': 2.0E5}))
+
+    def test_trigen(self):
+        self.assert_dispatch_equal(self.create_master_to_slave_variables({'NG_Trigen': 6.0E5,
+                                                                      'WS_BaseVCC': 3.0E5,
+                                                                      'AS_PeakVCC': 4.0E5}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Test the demand writers: The demand results can be written in the binary output formats and read back transparently
+through the locator (``locator.get_demand_results_file.read``) and the yearly totals are collected in memory.
+"""
+
+import os
+import shutil
+import tempfile
+import types
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.demand import demand_writers
+from cea.demand.thermal_loads import TSD_KEYS_ENERGY_BALANCE_DASHBOARD, TSD_KEYS_SOLAR
+from cea.utilities.date import get_date_range_hours_from_year
+
+
+class TestDemandWriters(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        # the variables of all the columns of the demand results (see schemas.yml)
+        columns = self.locator.get_demand_results_file.schema['schema']['columns'].keys()
+        load_plotting_vars = TSD_KEYS_ENERGY_BALANCE_DASHBOARD + TSD_KEYS_SOLAR
+        self.loads = [c[:-len('_kWh')] for c in columns if c.endswith('_kWh')
+                      and c[:-len('_kWh')] not in load_plotting_vars]
+        self.massflows = [c[:-len('_kWperC')] for c in columns if c.endswith('_kWperC')]
+        self.temperatures = [c[:-len('_C')] for c in columns if c.endswith('_C')]
+        rng = np.random.RandomState(42)
+        self.tsd = {key: rng.uniform(0.0, 100000.0, HOURS_IN_YEAR) for key in
+                    self.loads + load_plotting_vars + self.massflows + self.temperatures + ['people', 'x_int']}
+        self.date = get_date_range_hours_from_year(2020)[:HOURS_IN_YEAR]
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def write_hourly_results(self, output_format):
+        writer = demand_writers.HourlyDemandWriter(self.loads, self.massflows, self.temperatures, output_format)
+        columns, hourly_data = writer.calc_hourly_dataframe('B001', self.date, self.tsd)
+        writer.write_to_csv('B001', columns, hourly_data, self.locator)
+
+    def test_binary_formats(self):
+        self.write_hourly_results('csv')
+        expected = self.locator.get_demand_results_file.read('B001')
+
+        for output_format in ['parquet', 'feather']:
+            self.write_hourly_results(output_format)
+            self.assertFalse(os.path.exists(self.locator.get_demand_results_file('B001', 'csv')))
+            self.assertEqual(self.locator.get_demand_results_file.existing_path('B001'),
+                             self.locator.get_demand_results_file('B001', output_format))
+
+            # the binary files have the columns of the schema
+            with warnings.catch_warnings():
+                warnings.simplefilter('error', UserWarning)
+                result = self.locator.get_demand_results_file.read('B001')
+            self.assertEqual(list(result.columns), list(expected.columns))
+            # the dates are read as the same text from all formats
+            for column in ['DATE', 'Name']:
+                self.assertEqual(list(result[column]), list(expected[column]))
+            for column in expected.columns.drop(['DATE', 'Name']):
+                # the csv files are written with 3 decimals
+                np.testing.assert_allclose(result[column], expected[column], atol=0.0005, err_msg=column)
+
+    def test_check_output_format(self):
+        demand_writers.check_output_format('csv')
+        self.assertRaises(ValueError, demand_writers.check_output_format, 'xlsx')
+
+    def test_yearly_totals(self):
+        writer = demand_writers.HourlyDemandWriter(self.loads, self.massflows, self.temperatures)
+        yearly_totals = []
+        for building_name in ['B001', 'B002']:
+            bpr = types.SimpleNamespace(rc_model={'Af': 100.0, 'Aroof': 50.0, 'GFA_m2': 120.0, 'Aocc': 90.0})
+            yearly_totals.append(writer.results_to_csv(self.tsd, bpr, self.locator, self.date, building_name))
+
+        yearly_writer = demand_writers.YearlyDemandWriter(self.loads, self.massflows, self.temperatures)
+        totals, time_series = yearly_writer.write_to_csv(yearly_totals, self.locator)
+        self.assertIsNone(time_series)
+        self.assertEqual(list(totals.Name), ['B001', 'B002'])
+        self.assertAlmostEqual(totals.QH_sys_MWhyr[0], self.tsd['QH_sys'].sum() / 1000000)
+
+        total_demand = pd.read_csv(self.locator.get_total_demand())
+        self.assertEqual(list(total_demand.columns), list(yearly_totals[0].keys()))
+        self.assertEqual(list(total_demand.columns[:6]), ['Name', 'Af_m2', 'Aroof_m2', 'GFA_m2', 'Aocc_m2', 'people0'])
+
+        totals, time_series = yearly_writer.write_to_csv(yearly_totals, self.locator, read_time_series=True)
+        self.assertEqual(len(time_series), 2)
+        self.assertEqual(len(time_series[0]), HOURS_IN_YEAR)
+
+        # without any buildings, an empty Total_demand.csv is written
+        totals, time_series = yearly_writer.write_to_csv([], self.locator, read_time_series=True)
+        self.assertEqual(len(totals), 0)
+        self.assertEqual(time_series, [])
+        self.assertEqual(list(pd.read_csv(self.locator.get_total_demand()).columns), ['Name'])
+
+
+if __name__ == '__main__':
+    unittest.main()
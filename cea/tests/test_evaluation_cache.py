@@ -0,0 +1,118 @@
+"""
+Test the cache of the individuals evaluated by the optimization (:py:mod:`cea.optimization.master.evaluation_cache`):
+Identical individuals share an entry, the result files saved for an individual are copied when it is found again and
+only the objectives are reused by a later run (with the same typical days and inputs).
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import cea.config
+import cea.inputlocator
+from cea.constants import DAYS_IN_YEAR
+from cea.optimization.master.evaluation_cache import EvaluationCache, INDIVIDUAL_RESULT_FILES, calc_inputs_hash, \
+    individual_key
+from cea.utilities.time_series_aggregation import TypicalDays
+
+COLUMN_NAMES = ['NG_Cogen', 'WS_HP', 'B1001_DH', 'B1002_DH']
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def save_results(self, individual_number, generation_number):
+        for locator_method in INDIVIDUAL_RESULT_FILES:
+            with open(getattr(self.locator, locator_method)(individual_number, generation_number), 'w') as f:
+                f.write(locator_method)
+
+    def test_individual_key(self):
+        self.assertEqual(individual_key([0.5, 0.25, 1, 0]), individual_key([0.5, 0.25, 1.0, 0.0]))
+        self.assertNotEqual(individual_key([0.5, 0.25, 1, 0]), individual_key([0.5, 0.25, 0, 1]))
+
+    def test_lookup(self):
+        evaluation_cache = EvaluationCache(self.locator, COLUMN_NAMES)
+        self.assertIsNone(evaluation_cache.lookup([0.5, 0.5, 1, 0], 0, 0, False))
+        evaluation_cache.add([0.5, 0.5, 1, 0], (100.0, 2.0))
+        self.assertEqual(evaluation_cache.lookup([0.5, 0.5, 1.0, 0.0], 3, 1, False), (100.0, 2.0))
+        # the results need to be saved, but were not
+        self.assertIsNone(evaluation_cache.lookup([0.5, 0.5, 1, 0], 3, 1, True))
+
+        self.save_results(0, 0)
+        evaluation_cache.add([0.5, 0.5, 1, 0], (100.0, 2.0), 0, 0)
+        self.assertEqual(evaluation_cache.lookup([0.5, 0.5, 1, 0], 3, 1, True), (100.0, 2.0))
+        for locator_method in INDIVIDUAL_RESULT_FILES:
+            with open(getattr(self.locator, locator_method)(3, 1)) as f:
+                self.assertEqual(f.read(), locator_method)
+        # adding the objectives again keeps the results saved earlier
+        evaluation_cache.add([0.5, 0.5, 1, 0], (100.0, 2.0))
+        self.assertEqual(evaluation_cache.lookup([0.5, 0.5, 1, 0], 4, 1, True), (100.0, 2.0))
+
+    def test_reuse(self):
+        self.save_results(0, 0)
+        evaluation_cache = EvaluationCache(self.locator, COLUMN_NAMES, inputs_hash='inputs')
+        evaluation_cache.add([0.5, 0.5, 1, 0], (100.0, 2.0), 0, 0)
+        evaluation_cache.save()
+        cache_path = self.locator.get_optimization_evaluation_cache()
+        self.assertEqual(os.listdir(os.path.dirname(cache_path)), [os.path.basename(cache_path)])
+
+        self.assertIsNone(EvaluationCache(self.locator, COLUMN_NAMES).lookup([0.5, 0.5, 1, 0], 0, 0, False))
+        self.assertIsNone(EvaluationCache(self.locator, COLUMN_NAMES[:3], reuse=True).lookup([0.5, 0.5, 1], 0, 0,
+                                                                                              False))
+        typical_days = TypicalDays(np.arange(DAYS_IN_YEAR), np.arange(DAYS_IN_YEAR))
+        self.assertIsNone(EvaluationCache(self.locator, COLUMN_NAMES, reuse=True, typical_days=typical_days).lookup(
+            [0.5, 0.5, 1, 0], 0, 0, False))
+        self.assertIsNone(EvaluationCache(self.locator, COLUMN_NAMES, reuse=True, inputs_hash='changed').lookup(
+            [0.5, 0.5, 1, 0], 0, 0, False))
+        reused = EvaluationCache(self.locator, COLUMN_NAMES, reuse=True, inputs_hash='inputs')
+        self.assertEqual(reused.lookup([0.5, 0.5, 1, 0], 0, 0, False), (100.0, 2.0))
+        # the result files belong to the earlier run
+        self.assertIsNone(reused.lookup([0.5, 0.5, 1, 0], 0, 0, True))
+
+    def test_calc_inputs_hash(self):
+        config = cea.config.Configuration(cea.config.DEFAULT_CONFIG)
+        input_files = [self.locator.get_demand_results_file('B1001'), self.locator.get_total_demand(),
+                       self.locator.get_database_conversion_systems(),
+                       self.locator.get_database_distribution_systems(),
+                       self.locator.get_database_feedstocks(), self.locator.get_weather_file()]
+        for input_file in input_files:
+            if not os.path.exists(os.path.dirname(input_file)):
+                os.makedirs(os.path.dirname(input_file))
+            with open(input_file, 'w') as f:
+                f.write(input_file)
+        inputs_hash = calc_inputs_hash(self.locator, ['B1001'], config)
+        self.assertEqual(calc_inputs_hash(self.locator, ['B1001'], config), inputs_hash)
+
+        with open(self.locator.get_demand_results_file('B1001'), 'a') as f:
+            f.write('changed')
+        demand_hash = calc_inputs_hash(self.locator, ['B1001'], config)
+        self.assertNotEqual(demand_hash, inputs_hash)
+        config.optimization.number_of_typical_days = 10
+        self.assertNotEqual(calc_inputs_hash(self.locator, ['B1001'], config), demand_hash)
+
+        # the potentials, the thermal network and the results of the decentralized buildings are inputs as well
+        network_type = config.optimization.network_type
+        for input_file in [self.locator.PV_totals(), self.locator.get_sewage_heat_potential(),
+                           self.locator.get_thermal_network_edge_list_file(network_type, ''),
+                           os.path.join(self.locator.get_input_network_folder(network_type, ''), 'edges.dbf'),
+                           self.locator.get_optimization_decentralized_folder_building_result_heating('B1001')]:
+            previous_hash = calc_inputs_hash(self.locator, ['B1001'], config)
+            with open(input_file, 'w') as f:
+                f.write(input_file)
+            changed_hash = calc_inputs_hash(self.locator, ['B1001'], config)
+            self.assertNotEqual(changed_hash, previous_hash, input_file)
+            with open(input_file, 'a') as f:
+                f.write('changed')
+            self.assertNotEqual(calc_inputs_hash(self.locator, ['B1001'], config), changed_hash, input_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
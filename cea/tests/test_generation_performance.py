@@ -0,0 +1,62 @@
+"""
+Test that the performance of the individuals of a generation is written to the files of the generation as the
+individuals are evaluated (:py:class:`cea.optimization.master.data_saver.GenerationPerformanceWriter`), in any order,
+and that the files are sorted by individual when the generation is done.
+"""
+
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import cea.inputlocator
+from cea.optimization.master.data_saver import GenerationPerformanceWriter, PERFORMANCE_FILES, read_performance
+
+
+def get_performance(value):
+    return {'building_scale': {'Capex_total_building_scale_USD': value},
+            'district_scale': {'Capex_total_district_scale_USD': 2 * value},
+            'totals': {'TAC_sys_USD': 3 * value, 'GHG_sys_tonCO2': 4 * value}}
+
+
+class TestGenerationPerformanceWriter(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_write(self):
+        writer = GenerationPerformanceWriter(self.locator, 2)
+        writer.add(1, get_performance(10.0))
+        # the rows are on disk before the generation is done
+        totals = pd.read_csv(writer.get_path('totals'))
+        self.assertEqual(list(totals['individual']), [1])
+        writer.add(0, get_performance(5.0))
+        self.assertEqual(list(pd.read_csv(writer.get_path('totals'))['individual']), [1, 0])
+
+        writer.close()
+        totals = pd.read_csv(self.locator.get_optimization_generation_total_performance(2))
+        self.assertEqual(list(totals['individual']), [0, 1])
+        self.assertEqual(list(totals['individual_name']), ['sys_2_0', 'sys_2_1'])
+        self.assertEqual(list(totals['generation']), [2, 2])
+        self.assertEqual(list(totals['TAC_sys_USD']), [15.0, 30.0])
+        district_scale = pd.read_csv(self.locator.get_optimization_generation_district_scale_performance(2))
+        self.assertEqual(list(district_scale['Capex_total_district_scale_USD']), [10.0, 20.0])
+
+        # a new writer for the same generation starts from empty files
+        GenerationPerformanceWriter(self.locator, 2).close()
+        self.assertTrue(pd.read_csv(self.locator.get_optimization_generation_total_performance(2)).empty)
+
+    def test_read_performance(self):
+        performance = get_performance(1.5)
+        for part, (individual_locator_method, _) in PERFORMANCE_FILES.items():
+            pd.DataFrame(performance[part], index=[0]).to_csv(
+                getattr(self.locator, individual_locator_method)(3, 1), index=False)
+        self.assertEqual(read_performance(self.locator, 3, 1), performance)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Test that the dispatch of the district heating for the whole year
+(:py:func:`cea.optimization.slave.heating_resource_activation.heating_source_dispatch`) gives the same results as the
+activation of the technologies hour by hour (:py:func:`heating_source_activator`), and that the back-up boiler covers
+the load left uncovered (:py:func:`backup_boiler_dispatch`).
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import HOURS_IN_YEAR
+from cea.optimization.slave.heating_resource_activation import heating_source_activator, heating_source_dispatch, \
+    backup_boiler_dispatch
+from cea.technologies.boiler import cond_boiler_op_cost
+from cea.optimization.slave_data import SlaveData
+
+OUTPUTS = ['Q_HPSew_gen_W', 'Q_HPLake_gen_W', 'Q_GHP_gen_W', 'Q_CHP_gen_W', 'Q_Furnace_dry_gen_W',
+           'Q_Furnace_wet_gen_W', 'Q_BaseBoiler_gen_W', 'Q_PeakBoiler_gen_W', 'Q_uncovered_W', 'E_HPSew_req_W',
+           'E_HPLake_req_W', 'E_BaseBoiler_req_W', 'E_PeakBoiler_req_W', 'E_GHP_req_W', 'E_CHP_gen_W',
+           'E_Furnace_dry_gen_W', 'E_Furnace_wet_gen_W', 'NG_CHP_req_W', 'NG_BaseBoiler_req_W', 'NG_PeakBoiler_req_W',
+           'WetBiomass_Furnace_req_W', 'DryBiomass_Furnace_req_W']
+
+
+class TestHeatingDispatch(unittest.TestCase):
+    def setUp(self):
+        random = np.random.RandomState(42)
+        self.Q_therm_req_W = random.uniform(0.0, 6.0E6, HOURS_IN_YEAR) * (random.uniform(size=HOURS_IN_YEAR) > 0.1)
+        # a few supply temperatures (the part load curves of the CCGT are calculated once for each of them)
+        self.tdhsup_K = random.choice([333.0, 343.0, 353.0], HOURS_IN_YEAR)
+        self.tdhret_req_K = random.uniform(313.0, 323.0, HOURS_IN_YEAR)
+        self.tdhret_req_K[::17] = self.tdhsup_K[::17]  # no flow in the network
+        self.Q_therm_Sew_W = random.uniform(0.0, 5.0E5, HOURS_IN_YEAR)
+        self.TretsewArray_K = random.uniform(285.0, 295.0, HOURS_IN_YEAR)
+        self.Q_therm_Lake_W = random.uniform(0.0, 8.0E5, HOURS_IN_YEAR)
+        self.TretLakeArray_K = random.uniform(277.0, 285.0, HOURS_IN_YEAR)
+        self.Q_therm_GHP_W = random.uniform(0.0, 4.0E5, HOURS_IN_YEAR)
+        self.TretGHPArray_K = random.uniform(280.0, 286.0, HOURS_IN_YEAR)
+
+    def create_master_to_slave_variables(self, technologies):
+        master_to_slave_variables = SlaveData()
+        for technology, (size_attribute, size_W) in technologies.items():
+            setattr(master_to_slave_variables, technology, 1)
+            if size_attribute is not None:
+                setattr(master_to_slave_variables, size_attribute, size_W)
+        return master_to_slave_variables
+
+    def assert_dispatch_equal(self, master_to_slave_variables):
+        arguments = (self.Q_therm_GHP_W, self.TretGHPArray_K, self.TretLakeArray_K, self.Q_therm_Lake_W,
+                     self.Q_therm_Sew_W, self.TretsewArray_K, self.tdhsup_K, self.tdhret_req_K)
+
+        expected = np.zeros((len(OUTPUTS), HOURS_IN_YEAR))
+        for hour in range(HOURS_IN_YEAR):
+            expected[:, hour] = heating_source_activator(self.Q_therm_req_W[hour], master_to_slave_variables,
+                                                         *[argument[hour] for argument in arguments])
+
+        dispatched = heating_source_dispatch(self.Q_therm_req_W, master_to_slave_variables, *arguments)
+        self.assertEqual(len(dispatched), len(OUTPUTS))
+        for output, dispatched_values, expected_values in zip(OUTPUTS, dispatched, expected):
+            np.testing.assert_allclose(dispatched_values, expected_values, rtol=1e-9, atol=1e-6, err_msg=output)
+        return dict(zip(OUTPUTS, expected))
+
+    def test_heat_pumps(self):
+        expected = self.assert_dispatch_equal(self.create_master_to_slave_variables({
+            'HPSew_on': (None, None),
+            'HPLake_on': (None, None),
+            'GHP_on': (None, None),
+            'Boiler_on': ('Boiler_Q_max_W', 3.0E6),
+            'BoilerPeak_on': ('BoilerPeak_Q_max_W', 2.0E6)}))
+        # each heat pump covers part of the load
+        for output in ('Q_HPSew_gen_W', 'Q_HPLake_gen_W', 'Q_GHP_gen_W', 'E_HPSew_req_W', 'E_HPLake_req_W',
+                       'E_GHP_req_W'):
+            self.assertGreater(expected[output].sum(), 0.0, output)
+
+    def test_cogeneration_and_furnaces(self):
+        expected = self.assert_dispatch_equal(self.create_master_to_slave_variables({
+            'CC_on': ('CCGT_SIZE_W', 2.0E6),
+            'Furnace_wet_on': ('WBFurnace_Q_max_W', 1.0E6),
+            'Furnace_dry_on': ('DBFurnace_Q_max_W', 5.0E5),
+            'HPSew_on': (None, None),
+            'Boiler_on': ('Boiler_Q_max_W', 1.0E6)}))
+        for output in ('Q_CHP_gen_W', 'Q_Furnace_wet_gen_W', 'Q_Furnace_dry_gen_W', 'Q_uncovered_W'):
+            self.assertGreater(expected[output].sum(), 0.0, output)
+
+    def test_backup_boiler(self):
+        # the load left uncovered by a small base boiler, with the return temperatures of the network summary (a Series)
+        master_to_slave_variables = self.create_master_to_slave_variables({'Boiler_on': ('Boiler_Q_max_W', 1.0E6)})
+        arguments = (self.Q_therm_GHP_W, self.TretGHPArray_K, self.TretLakeArray_K, self.Q_therm_Lake_W,
+                     self.Q_therm_Sew_W, self.TretsewArray_K, self.tdhsup_K, self.tdhret_req_K)
+        Q_uncovered_W = heating_source_dispatch(self.Q_therm_req_W, master_to_slave_variables, *arguments)[8]
+        self.assertGreater(Q_uncovered_W.sum(), 0.0)
+        T_district_heating_return_K = pd.Series(self.tdhret_req_K)
+
+        size_W, NG_req_W, E_req_W = backup_boiler_dispatch(Q_uncovered_W, T_district_heating_return_K)
+        self.assertEqual(size_W, Q_uncovered_W.max())
+        for hour in range(HOURS_IN_YEAR):
+            expected = cond_boiler_op_cost(Q_uncovered_W[hour], size_W, self.tdhret_req_K[hour])
+            np.testing.assert_allclose([NG_req_W[hour], E_req_W[hour]], expected, rtol=1e-9, err_msg=str(hour))
+        self.assertTrue(np.all(NG_req_W[Q_uncovered_W == 0.0] == 0.0))
+
+        size_W, NG_req_W, E_req_W = backup_boiler_dispatch(np.zeros(HOURS_IN_YEAR), T_district_heating_return_K)
+        self.assertEqual(size_W, 0.0)
+        self.assertEqual(NG_req_W.sum() + E_req_W.sum(), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
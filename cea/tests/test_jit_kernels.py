@@ -0,0 +1,63 @@
+"""
+Test that the numba compiled kernels (see ``cea.demand.constants.USE_JIT_KERNEL``) reproduce the results of the pure
+python functions.
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from cea.demand import constants, thermal_loads
+from cea.technologies import storage_tank
+from cea.tests.synthetic_buildings import create_building, create_weather_data
+
+
+class TestJitKernels(unittest.TestCase):
+    def setUp(self):
+        self.use_jit_kernel = constants.USE_JIT_KERNEL
+
+    def tearDown(self):
+        constants.USE_JIT_KERNEL = self.use_jit_kernel
+
+    def test_calc_Qhs_Qcs(self):
+        weather_data = create_weather_data()
+        buildings = [
+            create_building('B01', weather_data, 'RADIATOR', 'CEILING_COOLING', True, False, True, False, False, 200),
+            create_building('B02', weather_data, 'CENTRAL_AC', 'CENTRAL_AC', True, True, True, True, True, 500),
+        ]
+        for bpr, _ in buildings:
+            # properties of the air-based systems
+            bpr.hvac.update({'Th_sup_air_ahu_C': 36.0, 'Th_sup_air_aru_C': 36.0, 'Tscs0_ahu_C': 7.0,
+                             'Tscs0_aru_C': 7.0, 'Tshs0_ahu_C': 45.0, 'type_cs': 'T3'})
+            bpr.comfort.update({'RH_min_pc': 30.0, 'Ths_set_C': 21.0})
+
+        constants.USE_JIT_KERNEL = False
+        expected = [thermal_loads.calc_Qhs_Qcs(bpr, copy.deepcopy(tsd), False) for bpr, tsd in buildings]
+        constants.USE_JIT_KERNEL = True
+        results = [thermal_loads.calc_Qhs_Qcs(bpr, copy.deepcopy(tsd), False) for bpr, tsd in buildings]
+
+        for (bpr, _), tsd_expected, tsd in zip(buildings, expected, results):
+            for key in ['T_int', 'theta_m', 'theta_c', 'Qhs_sen_rc', 'Qcs_sen_rc', 'Qhs_sen_sys', 'Qcs_sen_sys',
+                        'Qcs_lat_sys', 'Qhs_lat_sys', 'x_int']:
+                np.testing.assert_allclose(tsd[key], tsd_expected[key], rtol=1e-9, atol=1e-9,
+                                           err_msg='{building}: {key}'.format(building=bpr.name, key=key))
+
+    def test_calc_tank_temperature(self):
+        rng = np.random.RandomState(42)
+        for _ in range(100):
+            T_start_C, q_loss_W, q_discharged_W, q_charged_W = rng.uniform([10.0, 0.0, 0.0, 0.0],
+                                                                             [70.0, 500.0, 5000.0, 5000.0])
+            V_tank_m3 = rng.choice([0.0, 0.1, 0.5, 2.0])
+            for tank_type in ['hot_water', 'cold_water']:
+                constants.USE_JIT_KERNEL = False
+                expected = storage_tank.calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W,
+                                                              V_tank_m3, tank_type)
+                constants.USE_JIT_KERNEL = True
+                result = storage_tank.calc_tank_temperature(T_start_C, q_loss_W, q_discharged_W, q_charged_W,
+                                                            V_tank_m3, tank_type)
+                self.assertAlmostEqual(expected, result, places=9)
+
+
+if __name__ == '__main__':
+    unittest.main()
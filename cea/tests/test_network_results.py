@@ -0,0 +1,108 @@
+"""
+Test that the hourly results of the thermal network are collected by
+(:py:class:`cea.technologies.thermal_network.network_results.HourlyResultsWriter`) in any order and written to csv or
+to a binary file that replaces the csv, that the pressures keep their precision and that the representative weeks are
+extended to a full year.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.schemas import read_dataframe
+from cea.technologies.thermal_network.network_results import HourlyResultsWriter, HourlyThermalResults, \
+    extrapolate_representative_weeks
+
+
+class ThermalNetworkStub(object):
+    """The fields of a ThermalNetwork used by the writer, for a network of 3 nodes and 2 edges"""
+
+    def __init__(self, locator):
+        self.locator = locator
+        self.network_type = 'DH'
+        self.network_name = ''
+        self.start_t = 10
+        self.use_representative_week_per_month = False
+        self.typical_days = None
+        self.edge_node_df = pd.DataFrame(np.array([[-1.0, 0.0], [1.0, -1.0], [0.0, 1.0]]),
+                                         index=['NODE0', 'NODE1', 'NODE2'], columns=['PIPE0', 'PIPE1'])
+        self.all_nodes_df = pd.DataFrame({'Type': ['PLANT', 'NONE', 'CONSUMER'], 'Building': ['B000', '', 'B001']},
+                                         index=['NODE0', 'NODE1', 'NODE2'])
+        self.building_names = pd.Series(['B001'])
+
+
+def get_hourly_thermal_results(value):
+    """Results of a time step with all values set to ``value``, in the types returned by hourly_thermal_calculation"""
+    return HourlyThermalResults(
+        T_supply_nodes=np.full(3, value), T_return_nodes=np.full(3, value),
+        temperatures_at_plant_K=[np.array([value]), value],
+        q_loss_supply_edges_kW=np.full(2, value), linear_thermal_loss_supply_edges_Wperm=np.full(2, value),
+        thermal_losses_system_kW=np.full(3, value), plant_heat_requirement=np.array([-value]),
+        pressure_at_supply_nodes_Pa=np.full((1, 3), value), pressure_loss_system_Pa=np.full((1, 4), value),
+        pressure_loss_system_kW=np.full((1, 4), value), pressure_loss_substations_kW=np.full((1, 1), value),
+        linear_pressure_loss_supply_Paperm=np.full((1, 2), value),
+        edge_mass_flows=pd.Series([value] * 2, index=['PIPE0', 'PIPE1']),
+        node_mass_flows=pd.Series([value] * 3, index=['NODE0', 'NODE1', 'NODE2']),
+        velocities_in_supply_edges_mpers=np.full(2, value), pressure_loss_supply_edge_kW=np.full((1, 2), value))
+
+
+class TestHourlyResultsWriter(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+        self.thermal_network = ThermalNetworkStub(self.locator)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def test_save(self):
+        writer = HourlyResultsWriter(self.thermal_network, 2)
+        writer.add(11, get_hourly_thermal_results(2.5))
+        writer.add(10, get_hourly_thermal_results(1.5))
+        np.testing.assert_array_equal(writer.get_plant_peak_heat_requirement(), [2.5])
+
+        writer.save('csv')
+        path = self.locator.get_network_temperature_supply_nodes_file('DH', '')
+        supply_temperatures = pd.read_csv(path)
+        self.assertEqual(list(supply_temperatures.columns), ['NODE0', 'NODE1', 'NODE2'])
+        np.testing.assert_array_equal(supply_temperatures['NODE1'], [1.5, 2.5])
+        plant_heat_requirement = pd.read_csv(
+            self.locator.get_thermal_network_plant_heat_requirement_file('DH', ''))
+        np.testing.assert_array_equal(plant_heat_requirement['thermal_load_kW'], [-1.5, -2.5])
+
+        # the binary file replaces the csv file and is found by the readers
+        writer.save('parquet')
+        self.assertFalse(os.path.exists(path))
+        path = self.locator.get_network_temperature_supply_nodes_file.existing_path('DH', '')
+        self.assertTrue(path.endswith('.parquet'))
+        pd.testing.assert_frame_equal(read_dataframe(path).astype(float), supply_temperatures)
+        temperatures_at_plant = read_dataframe(self.locator.get_network_temperature_plant.existing_path('DH', ''))
+        np.testing.assert_array_equal(temperatures_at_plant['temperature_return_K'], [1.5, 2.5])
+
+    def test_precision(self):
+        # the pressures keep the digits written to the csv files, the temperatures are stored as float32
+        writer = HourlyResultsWriter(self.thermal_network, 1)
+        writer.add(10, get_hourly_thermal_results(1234567.891))
+        writer.save('csv')
+        pressures = pd.read_csv(self.locator.get_network_pressure_at_nodes('DH', ''))
+        np.testing.assert_array_equal(pressures['NODE1'], [1234567.891])
+        supply_temperatures = pd.read_csv(self.locator.get_network_temperature_supply_nodes_file('DH', ''))
+        np.testing.assert_array_equal(supply_temperatures['NODE1'], [1234567.875])
+
+    def test_extrapolate_representative_weeks(self):
+        values = np.arange(2016 * 2, dtype=np.float32).reshape(2016, 2)
+        values[0, 1] = np.nan
+        year = extrapolate_representative_weeks(values)
+        self.assertEqual(year.shape, (HOURS_IN_YEAR, 2))
+        np.testing.assert_array_equal(year[2016:4032], values)
+        np.testing.assert_allclose(year[-1], [np.mean(values[:, 0]), np.nanmean(values[:, 1])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,247 @@
+"""
+Test the sparse hydraulic core of the thermal network (:py:mod:`cea.technologies.thermal_network.network_topology`)
+against the dense least squares solutions of the mass balance and the node pressures, for a radial and a looped network
+and with flipped edges, and the compiled temperature propagation
+(:py:mod:`cea.technologies.thermal_network.network_temperatures`) against the temperatures of each pipe and against the
+sweep over the nodes of random radial networks.
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from cea.technologies.thermal_network import network_topology
+from cea.technologies.thermal_network.network_temperatures import calc_supply_temperatures_of_time_steps, \
+    calc_return_temperatures_of_time_steps, SOLVED, NOT_ORDERED
+from cea.technologies.thermal_network.network_topology import get_network_topology
+from cea.technologies.thermal_network.thermal_network import ReturnNetwork, calc_supply_node_temperatures, \
+    calc_supply_node_temperatures_by_sweep, calc_return_temperatures_of_hours, calc_return_temperatures_by_sweep
+from cea.technologies.thermal_network.thermal_network_loss import calc_temperature_out_per_pipe
+
+RADIAL_EDGES = [(0, 1), (1, 2), (1, 3), (3, 4), (3, 5)]
+LOOPED_EDGES = RADIAL_EDGES + [(2, 4), (0, 5)]
+
+
+def get_edge_node_df(edges, flipped=()):
+    edge_node_matrix = np.zeros((6, len(edges)))
+    for edge, (start_node, end_node) in enumerate(edges):
+        direction = -1.0 if edge in flipped else 1.0
+        edge_node_matrix[start_node, edge] = -direction
+        edge_node_matrix[end_node, edge] = direction
+    return pd.DataFrame(edge_node_matrix, index=['NODE%i' % i for i in range(6)],
+                        columns=['PIPE%i' % i for i in range(len(edges))])
+
+
+class TestNetworkTopology(unittest.TestCase):
+    node_mass_flows = np.array([-10.0, 0.0, 2.0, 1.0, 3.0, 4.0])
+
+    def test_radial(self):
+        edge_node_df = get_edge_node_df(RADIAL_EDGES, flipped=[2])
+        topology, edge_directions = get_network_topology(edge_node_df)
+        self.assertEqual(topology.loops, [])
+        mass_flows = topology.solve_radial_mass_flows(self.node_mass_flows[1:], 0, edge_directions)
+        expected = np.linalg.solve(edge_node_df.values[1:], self.node_mass_flows[1:])
+        np.testing.assert_allclose(mass_flows, expected)
+
+        # several time steps at once, one column per time step
+        node_mass_flows = np.column_stack([self.node_mass_flows[1:], 2 * self.node_mass_flows[1:]])
+        mass_flows = topology.solve_radial_mass_flows(node_mass_flows, 0, edge_directions)
+        np.testing.assert_allclose(mass_flows, np.column_stack([expected, 2 * expected]))
+
+        # the same topology is used for all the directions of the edges
+        self.assertIs(get_network_topology(get_edge_node_df(RADIAL_EDGES))[0], topology)
+
+    def test_looped(self):
+        edge_node_df = get_edge_node_df(LOOPED_EDGES, flipped=[0, 5])
+        topology, edge_directions = get_network_topology(edge_node_df)
+        self.assertEqual(len(topology.loops), 2)
+        _, unflipped_edge_directions = get_network_topology(get_edge_node_df(LOOPED_EDGES))
+        np.testing.assert_array_equal(edge_directions * unflipped_edge_directions, [-1, 1, 1, 1, 1, -1, 1])
+
+        mass_flows = topology.solve_minimum_norm_mass_flows(self.node_mass_flows[1:], edge_directions)
+        expected = np.linalg.lstsq(edge_node_df.values[1:], self.node_mass_flows[1:], rcond=None)[0]
+        np.testing.assert_allclose(mass_flows, expected)
+
+        # the edges of each loop add up to a closed loop
+        loop_matrix = topology.get_loop_matrix(edge_directions)
+        np.testing.assert_allclose(topology.get_incidence(edge_directions) * loop_matrix.T.toarray(), 0.0)
+
+        edge_pressure_differences = np.array([100.0, 50.0, 20.0, 70.0, 30.0, 10.0, 60.0])
+        pressures = topology.solve_node_pressures(edge_pressure_differences, edge_directions)
+        expected = np.linalg.lstsq(edge_node_df.values.T, edge_pressure_differences, rcond=None)[0]
+        np.testing.assert_allclose(pressures, expected, atol=1e-9)
+
+    def test_disconnected(self):
+        # nodes 3 to 5 are not connected to the plant: the systems are singular and solved by least squares
+        edge_node_df = get_edge_node_df([(0, 1), (1, 2), (3, 4), (4, 5)], flipped=[1])
+        topology, edge_directions = get_network_topology(edge_node_df)
+        self.assertEqual(topology.loops, [])
+        node_mass_flows = np.array([-3.0, 1.0, 2.0, 0.0, 0.0, 0.0])
+        mass_flows = topology.solve_radial_mass_flows(node_mass_flows[1:], 0, edge_directions)
+        np.testing.assert_allclose(mass_flows, [3.0, -2.0, 0.0, 0.0], atol=1e-9)
+        mass_flows = topology.solve_radial_mass_flows(np.column_stack([node_mass_flows[1:], 2 * node_mass_flows[1:]]),
+                                                      0, edge_directions)
+        np.testing.assert_allclose(mass_flows[:, 1], [6.0, -4.0, 0.0, 0.0], atol=1e-9)
+
+        edge_pressure_differences = np.array([100.0, 50.0, 20.0, 70.0])
+        pressures = topology.solve_node_pressures(edge_pressure_differences, edge_directions)
+        np.testing.assert_allclose(edge_node_df.values.T.dot(pressures), edge_pressure_differences, atol=1e-6)
+
+    def test_topologies_cache(self):
+        # only the topologies used last are kept
+        with mock.patch.object(network_topology, 'NETWORK_TOPOLOGIES_CACHE_SIZE', 2):
+            network_topology._topologies.clear()
+            radial, _ = get_network_topology(get_edge_node_df(RADIAL_EDGES))
+            looped, _ = get_network_topology(get_edge_node_df(LOOPED_EDGES))
+            self.assertIs(get_network_topology(get_edge_node_df(RADIAL_EDGES))[0], radial)
+            get_network_topology(get_edge_node_df(RADIAL_EDGES[:4]))
+            self.assertEqual(len(network_topology._topologies), 2)
+            self.assertIs(get_network_topology(get_edge_node_df(RADIAL_EDGES))[0], radial)
+            self.assertIsNot(get_network_topology(get_edge_node_df(LOOPED_EDGES))[0], looped)
+
+
+class TestNetworkTemperatures(unittest.TestCase):
+    is_plant = np.array([True, False, False, False, False, False])
+    t_substation_return = np.array([[np.nan, np.nan, 310.0, 320.0, 300.0, 305.0]])
+    k = 0.01
+    t_ground = 280.0
+
+    def get_kernel_inputs(self, edges, flipped=()):
+        """The adjacency of the network and the direction of its edges relative to the topology"""
+        topology, edge_directions = get_network_topology(get_edge_node_df(edges, flipped))
+        return (topology.incidence.indptr, topology.incidence.indices, topology.edge_start, topology.edge_end,
+                edge_directions.reshape(1, -1))
+
+    def calc_temperatures(self, edges, mass_flows, substation_mass_flows, flipped=()):
+        indptr, node_edges, edge_start, edge_end, edge_directions = self.get_kernel_inputs(edges, flipped)
+        mass_flows = np.array([mass_flows])
+        k = np.full(mass_flows.shape, self.k)
+        t_ground = np.array([self.t_ground])
+        supply = calc_supply_temperatures_of_time_steps(indptr, node_edges, edge_start, edge_end, self.is_plant, True,
+                                                        edge_directions, mass_flows, k, t_ground, np.array([350.0]))
+        return_ = calc_return_temperatures_of_time_steps(indptr, node_edges, edge_start, edge_end, True,
+                                                         edge_directions, mass_flows, k, t_ground,
+                                                         np.array([substation_mass_flows]), self.t_substation_return)
+        return supply, return_
+
+    def t_out(self, t_in, mass_flow):
+        return calc_temperature_out_per_pipe(t_in, mass_flow, self.k, self.t_ground)
+
+    def test_radial(self):
+        supply, return_ = self.calc_temperatures(RADIAL_EDGES, [10.0, 2.0, 8.0, 3.0, 4.0],
+                                                 [-10.0, 0.0, 2.0, 1.0, 3.0, 4.0])
+        t_node, t_edge_in, t_edge_out, limited, status, _ = supply
+        self.assertEqual(status[0], SOLVED)
+        t_1 = self.t_out(350.0, 10.0)
+        t_3 = self.t_out(t_1, 8.0)
+        np.testing.assert_allclose(t_node[0], [350.0, t_1, self.t_out(t_1, 2.0), t_3, self.t_out(t_3, 3.0),
+                                               self.t_out(t_3, 4.0)])
+        np.testing.assert_allclose(t_edge_in[0], [350.0, t_1, t_1, t_3, t_3])
+        self.assertFalse(limited.any())
+
+        t_node, t_edge_in, t_edge_out, limited, status = return_
+        self.assertEqual(status[0], SOLVED)
+        # the substation of node 3 mixes its return flow with the flows from nodes 4 and 5
+        t_3 = (3.0 * self.t_out(300.0, 3.0) + 4.0 * self.t_out(305.0, 4.0) + 1.0 * 320.0) / 8.0
+        t_1 = (2.0 * self.t_out(310.0, 2.0) + 8.0 * self.t_out(t_3, 8.0)) / 10.0
+        np.testing.assert_allclose(t_node[0], [self.t_out(t_1, 10.0), t_1, 310.0, t_3, 300.0, 305.0])
+        np.testing.assert_allclose(t_edge_in[0], [t_1, 310.0, t_3, 300.0, 305.0])
+
+    def test_looped(self):
+        supply, return_ = self.calc_temperatures(LOOPED_EDGES, [6.0, 3.0, 3.0, 1.0, 1.0, 2.0, 4.0],
+                                                 [-10.0, 0.0, 1.0, 1.0, 3.0, 5.0])
+        t_node, _, _, _, status, _ = supply
+        self.assertEqual(status[0], SOLVED)
+        t_1 = self.t_out(350.0, 6.0)
+        t_2 = t_3 = self.t_out(t_1, 3.0)
+        # the ends of the network take the highest temperature of the flows reaching them
+        np.testing.assert_allclose(t_node[0], [350.0, t_1, t_2, t_3, max(self.t_out(t_3, 1.0), self.t_out(t_2, 2.0)),
+                                               max(self.t_out(t_3, 1.0), self.t_out(350.0, 4.0))])
+
+        t_node, _, _, _, status = return_
+        self.assertEqual(status[0], SOLVED)
+        t_2 = (2.0 * self.t_out(300.0, 2.0) + 310.0) / 3.0
+        t_3 = (self.t_out(300.0, 1.0) + self.t_out(305.0, 1.0) + 320.0) / 3.0
+        t_1 = (3.0 * self.t_out(t_2, 3.0) + 3.0 * self.t_out(t_3, 3.0)) / 6.0
+        t_0 = (6.0 * self.t_out(t_1, 6.0) + 4.0 * self.t_out(305.0, 4.0)) / 10.0
+        np.testing.assert_allclose(t_node[0], [t_0, t_1, t_2, t_3, 300.0, 305.0])
+
+        # the flows around the loop 1-3-4-2 have no order
+        supply, return_ = self.calc_temperatures(LOOPED_EDGES, np.ones(7), [-3.0, 0.0, 0.0, 0.0, 0.0, 3.0],
+                                                 flipped=[1, 5])
+        self.assertEqual(supply[4][0], NOT_ORDERED)
+        self.assertEqual(return_[4][0], NOT_ORDERED)
+
+
+class RandomRadialNetwork(object):
+    """
+    A random radial network with a plant at node 0 and the attributes of a
+    :py:class:`cea.technologies.thermal_network.thermal_network.ThermalNetwork` used to calculate its temperatures.
+    """
+
+    def __init__(self, random, number_of_nodes, network_type):
+        self.parents = [random.randint(0, node) for node in range(1, number_of_nodes)]
+        self.is_consumer = np.append(False, random.uniform(size=number_of_nodes - 1) < 0.6)
+        self.network_type = network_type
+        self.problematic_edges = {}
+        self.all_nodes_df = pd.DataFrame({'Type': np.where(self.is_consumer, 'CONSUMER', 'NONE')},
+                                         index=['NODE%i' % i for i in range(number_of_nodes)])
+        self.all_nodes_df.iloc[0, 0] = 'PLANT'
+
+    def get_time_step(self, random):
+        """The edge-node matrix (edges in the direction of the flow), the mass flows of the edges and of the nodes"""
+        node_mass_flows = np.where(self.is_consumer, random.uniform(0.0, 5.0, self.is_consumer.size), 0.0)
+        node_mass_flows[random.uniform(size=node_mass_flows.size) < 0.2] = 0.0  # substations without demand
+        node_mass_flows[0] = -node_mass_flows.sum()
+        # the flow into each node feeds the node and the nodes after it (the parent of a node comes before it)
+        mass_flows = node_mass_flows[1:].copy()
+        for node in range(len(self.parents), 1, -1):
+            if self.parents[node - 1] > 0:
+                mass_flows[self.parents[node - 1] - 1] += mass_flows[node - 1]
+        edge_node_matrix = np.zeros((self.is_consumer.size, len(self.parents)))
+        edge_node_matrix[self.parents, range(len(self.parents))] = -1.0
+        edge_node_matrix[range(1, self.is_consumer.size), range(len(self.parents))] = 1.0
+        edge_node_df = pd.DataFrame(edge_node_matrix, index=self.all_nodes_df.index,
+                                    columns=['PIPE%i' % i for i in range(len(self.parents))])
+        return edge_node_df, mass_flows, pd.DataFrame([node_mass_flows], columns=edge_node_df.index)
+
+
+class TestRandomNetworkTemperatures(unittest.TestCase):
+    """The compiled temperature propagation against the sweep over the nodes, on random radial networks"""
+
+    def test_random_radial_networks(self):
+        random = np.random.RandomState(42)
+        for network_type, t_plant, t_substation in [('DH', 350.0, (300.0, 320.0)), ('DC', 280.0, (285.0, 295.0))]:
+            for number_of_nodes in [2, 10, 40]:
+                thermal_network = RandomRadialNetwork(random, number_of_nodes, network_type)
+                return_networks = []
+                for _ in range(5):
+                    edge_node_df, mass_flows, substation_mass_flows = thermal_network.get_time_step(random)
+                    k = np.diag(random.uniform(0.001, 0.1, mass_flows.size))
+                    t_ground = random.uniform(275.0, 290.0)
+                    supply = calc_supply_node_temperatures(t_plant, edge_node_df, mass_flows, k, t_ground,
+                                                           thermal_network)
+                    expected = calc_supply_node_temperatures_by_sweep(t_plant, edge_node_df, mass_flows, k, t_ground,
+                                                                      thermal_network)
+                    for values, expected_values in zip(supply, expected):
+                        np.testing.assert_allclose(values, expected_values)
+
+                    t_return = pd.DataFrame([np.where(thermal_network.is_consumer,
+                                                      random.uniform(*t_substation, number_of_nodes), np.nan)],
+                                            columns=edge_node_df.index)
+                    return_networks.append(ReturnNetwork(t_ground, edge_node_df, mass_flows, substation_mass_flows, k,
+                                                         t_return))
+
+                # all the time steps are solved together
+                return_temperatures = calc_return_temperatures_of_hours(return_networks, thermal_network)
+                for return_network, (t_node, q_loss_edges_kw) in zip(return_networks, return_temperatures):
+                    expected_t_node, expected_q_loss_edges_kw = calc_return_temperatures_by_sweep(
+                        *return_network, thermal_network=thermal_network)
+                    np.testing.assert_allclose(t_node, expected_t_node)
+                    np.testing.assert_allclose(q_loss_edges_kw, expected_q_loss_edges_kw)
+
+
+if __name__ == '__main__':
+    unittest.main()
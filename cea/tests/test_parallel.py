@@ -0,0 +1,150 @@
+"""
+Test the ``shared`` arguments of :py:func:`cea.utilities.parallel.vectorize`: They are sent to each worker process
+only once and passed to each call of the vectorized function as keyword arguments. Inside a
+:py:func:`cea.utilities.parallel.persistent_pool` block, the worker processes are reused.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from cea.utilities import parallel
+
+
+def weighted_sum(i, weights, offset):
+    return float(np.dot(weights, np.arange(len(weights)) + i)) + offset
+
+
+def get_pid(_):
+    return os.getpid()
+
+
+def sleep_and_fail(i, delay):
+    if i == 0:
+        raise ValueError('task {i} failed'.format(i=i))
+    time.sleep(delay)
+    return i
+
+
+def batch_sum(batch):
+    return sum(batch)
+
+
+def print_and_fail(i):
+    print('task {i}'.format(i=i))
+    if i == 3:
+        raise ValueError('task {i} failed'.format(i=i))
+    return i
+
+
+class TestVectorizeShared(unittest.TestCase):
+    def test_shared(self):
+        weights = np.linspace(0.0, 1.0, 8760)
+        expected = [weighted_sum(i, weights, 5.0) for i in range(6)]
+        for processes in [1, 2]:
+            vectorized = parallel.vectorize(weighted_sum, processes, shared={'weights': weights, 'offset': 5.0})
+            self.assertEqual(vectorized(range(6)), expected)
+
+    def test_persistent_pool(self):
+        weights = np.linspace(0.0, 1.0, 8760)
+        with parallel.persistent_pool():
+            pids = set(parallel.vectorize(get_pid, 2)(range(20)))
+            for offset in [1.0, 2.0]:
+                vectorized = parallel.vectorize(weighted_sum, 2, shared={'weights': weights, 'offset': offset})
+                self.assertEqual(vectorized(range(6)), [weighted_sum(i, weights, offset) for i in range(6)])
+            pids.update(parallel.vectorize(get_pid, 2)(range(20)))
+        # all calls ran on the same two worker processes (a call may not reach both of them)
+        self.assertLessEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
+
+    def test_longest_first(self):
+        # "a" took longest in the previous run, "c" is estimated by scaling its cost to seconds (5 * 11 / 4)
+        order_longest_first = parallel.order_longest_first
+        self.assertEqual(order_longest_first([2.0, 2.0, 5.0], ['a', 'b', 'c'], {'a': 10.0, 'b': 1.0}, 3), [2, 0, 1])
+        self.assertEqual(order_longest_first([1.0, 3.0, 2.0], None, {}, 3), [1, 2, 0])
+        self.assertEqual(order_longest_first(None, None, {}, 3), [0, 1, 2])
+        # the duration of a batch is the sum of the durations of its names, "d" is estimated as the mean (2.75)
+        self.assertEqual(order_longest_first(None, [['a', 'b'], ['c'], ['d']], {'a': 1.0, 'b': 2.0, 'c': 2.5}, 3),
+                         [0, 2, 1])
+
+        timings_path = os.path.join(tempfile.mkdtemp(), 'timings.json')
+        try:
+            for processes in [1, 2]:
+                vectorized = parallel.vectorize(weighted_sum, processes, shared={'weights': np.ones(10), 'offset': 0.0},
+                                                costs=[1.0, 3.0, 2.0], timings_path=timings_path)
+                self.assertEqual(vectorized([0, 1, 2]), [45.0, 55.0, 65.0])
+                with open(timings_path) as f:
+                    self.assertEqual(sorted(json.load(f).keys()), ['0', '1', '2'])
+
+            # the durations of batches are stored by name, split in proportion to the previous durations
+            for processes in [1, 2]:
+                vectorized = parallel.vectorize(batch_sum, processes, timings_path=timings_path)
+                self.assertEqual(vectorized([[0, 1], [2, 3], [4]]), [1, 5, 4])
+                with open(timings_path) as f:
+                    self.assertEqual(sorted(json.load(f).keys()), ['0', '1', '2', '3', '4'])
+            with open(timings_path, 'w') as f:
+                json.dump({'0': 1.0, '1': 3.0}, f)
+            parallel.vectorize(batch_sum, 1, timings_path=timings_path)([[0, 1]])
+            with open(timings_path) as f:
+                timings = json.load(f)
+            self.assertAlmostEqual(timings['1'], 3.0 * timings['0'])
+
+            # the durations of the calls completed before an error are stored too
+            os.remove(timings_path)
+            self.assertRaises(ValueError, parallel.vectorize(print_and_fail, 1, timings_path=timings_path), [1, 2, 3])
+            with open(timings_path) as f:
+                self.assertEqual(sorted(json.load(f).keys()), ['1', '2'])
+        finally:
+            shutil.rmtree(os.path.dirname(timings_path))
+
+    def test_output_and_errors(self):
+        completed = []
+        with parallel.persistent_pool():
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                result = parallel.vectorize(print_and_fail, 2, on_complete=lambda i, n, args, r: completed.append(i))(
+                    [0, 1, 2])
+            self.assertEqual(result, [0, 1, 2])
+            self.assertEqual(completed, [0, 1, 2])
+            for i in range(3):
+                self.assertIn('task {i}\n'.format(i=i), output.getvalue())
+
+            self.assertRaises(ValueError, parallel.vectorize(print_and_fail, 2), range(6))
+            # the pool can still be used after an error
+            self.assertEqual(parallel.vectorize(print_and_fail, 2)([4, 5]), [4, 5])
+
+            # only the errors of the workers are shown
+            parallel.set_worker_output('errors')
+            try:
+                output = io.StringIO()
+                with contextlib.redirect_stdout(output):
+                    self.assertEqual(parallel.vectorize(print_and_fail, 2)([4, 5]), [4, 5])
+                self.assertNotIn('task', output.getvalue())
+            finally:
+                parallel.set_worker_output('all')
+        self.assertRaises(ValueError, parallel.vectorize(print_and_fail, 2), range(6))
+
+    def test_error_in_persistent_pool(self):
+        def fail_on_complete(i, n, args, result):
+            raise RuntimeError('on_complete failed')
+
+        # the remaining calls of a failed call are stopped before their shared arguments are removed, the next call
+        # starts a new pool
+        errors = io.StringIO()
+        with parallel.persistent_pool(), contextlib.redirect_stderr(errors):
+            self.assertRaises(ValueError, parallel.vectorize(sleep_and_fail, 2, shared={'delay': 0.2}), range(8))
+            self.assertRaises(RuntimeError, parallel.vectorize(sleep_and_fail, 2, on_complete=fail_on_complete,
+                                                                shared={'delay': 0.2}), range(1, 8))
+            self.assertEqual(parallel.vectorize(sleep_and_fail, 2, shared={'delay': 0.0})([1, 2]), [1, 2])
+        self.assertNotIn('FileNotFoundError', errors.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Test that the array versions of the PV physics functions (:py:mod:`cea.technologies.solar.photovoltaic` and the panel
+categorization in :py:mod:`cea.utilities.solar_equations`) return the same values as evaluating them hour by hour
+(or sensor by sensor), and that the sensor groups of several buildings can be calculated together and aggregated in
+memory (the "district" PV engine).
+"""
+
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.constants import HOURS_IN_YEAR
+from cea.technologies.solar import photovoltaic
+from cea.utilities import solar_equations
+
+PANEL_PROPERTIES_PV = {'PV_noct': 45.0, 'PV_a0': 0.935823, 'PV_a1': 0.054289, 'PV_a2': -0.008677, 'PV_a3': 0.000527,
+                       'PV_a4': -0.000011, 'PV_th': 0.002, 'PV_n': 0.16, 'PV_Bref': 0.0035, 'misc_losses': 0.1}
+
+
+class TestPhotovoltaic(unittest.TestCase):
+    def test_calc_absorbed_radiation_PV(self):
+        rng = np.random.RandomState(42)
+        hours = 500
+        g = np.radians(rng.uniform(-23.45, 23.45, hours))
+        ha = np.radians(rng.uniform(-180.0, 180.0, hours))
+        # includes zenith angles above 85 and 90 degrees and negative incidence angles
+        Sz = np.radians(rng.uniform(-10.0, 120.0, hours))
+        I_sol = rng.uniform(0.0, 900.0, hours)
+        I_diffuse = I_sol * rng.uniform(0.0, 1.0, hours)
+        I_direct = I_sol - I_diffuse
+        for tilt_deg, azimuth_deg in [(30.0, 180.0), (90.0, 90.0), (5.0, 0.0)]:
+            tilt, azimuth = np.radians(tilt_deg), np.radians(azimuth_deg)
+            teta = solar_equations.calc_angle_of_incidence(g, np.radians(47.4), ha, tilt, azimuth)
+            teta[:10] = -teta[:10]
+            teta_ed, teta_eg = photovoltaic.calc_diffuseground_comp(tilt)
+
+            absorbed_radiation_Wperm2 = photovoltaic.calc_absorbed_radiation_PV(I_sol, I_direct, I_diffuse, tilt, Sz,
+                                                                                teta, teta_ed, teta_eg,
+                                                                                PANEL_PROPERTIES_PV)
+            expected = [photovoltaic.calc_absorbed_radiation_PV(I_sol[hour], I_direct[hour], I_diffuse[hour], tilt,
+                                                                Sz[hour], teta[hour], teta_ed, teta_eg,
+                                                                PANEL_PROPERTIES_PV) for hour in range(hours)]
+            np.testing.assert_allclose(absorbed_radiation_Wperm2, expected, rtol=1e-12)
+            self.assertTrue((absorbed_radiation_Wperm2 >= 0.0).all())
+            # no direct radiation with the sun close to the horizon
+            low_sun = Sz > np.radians(85)
+            self.assertTrue(low_sun.any())
+            np.testing.assert_allclose(
+                absorbed_radiation_Wperm2[low_sun],
+                photovoltaic.calc_absorbed_radiation_PV(I_sol[low_sun], 0.0, I_diffuse[low_sun], tilt, Sz[low_sun],
+                                                        teta[low_sun], teta_ed, teta_eg, PANEL_PROPERTIES_PV),
+                rtol=1e-12)
+
+    def test_calc_surface_azimuth(self):
+        rng = np.random.RandomState(42)
+        xdir, ydir = rng.uniform(-0.5, 0.5, (2, 100))
+        B = rng.uniform(45.0, 90.0, 100)
+        surface_azimuth = solar_equations.calc_surface_azimuth(xdir, ydir, B)
+        expected = [solar_equations.calc_surface_azimuth(x, y, b) for x, y, b in zip(xdir, ydir, B)]
+        np.testing.assert_allclose(surface_azimuth, expected, rtol=1e-12)
+        self.assertTrue(((surface_azimuth >= 0.0) & (surface_azimuth <= 360.0)).all())
+
+    def test_calc_categoriesroof(self):
+        teta_z = np.array([-100.0, -50.0, 0.0, 50.0, 100.0, 180.0, 67.0, 22.5])
+        B = np.radians([3.0, 10.0, 20.0, 30.0, 50.0, 70.0, 20.0, 20.0])  # the tilt angle is converted to degrees
+        GB = np.array([50.0, 150.0, 250.0, 450.0, 650.0, 850.0, 950.0, 1000.0])
+        CATteta_z, CATB, CATGB = solar_equations.calc_categoriesroof(teta_z, B, GB, 1000.0)
+        self.assertEqual(list(CATteta_z), [1, 3, 5, 4, 2, 6, 4, 5])
+        self.assertEqual(list(CATB), [1, 2, 3, 4, 5, 6, 3, 3])
+        self.assertEqual(list(CATGB), [1, 2, 3, 5, 7, 9, 10, 10])
+
+
+class TestDistrictPV(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.RandomState(42)
+        hours = np.arange(HOURS_IN_YEAR)
+        self.solar_properties = types.SimpleNamespace(g=23.45 * np.sin(2 * np.pi * (284 + hours / 24) / 365),
+                                                      ha=(hours % 24 - 12) * 15.0,
+                                                      Sz=rng.uniform(0.0, 120.0, HOURS_IN_YEAR))
+        self.weather_data = pd.DataFrame({'ratio_diffhout': rng.uniform(0.0, 1.0, HOURS_IN_YEAR),
+                                          'drybulb_C': rng.uniform(-5.0, 30.0, HOURS_IN_YEAR)})
+        self.date_local = pd.date_range('2020-01-01', periods=HOURS_IN_YEAR, freq='H')
+        self.sensor_groups = []
+        for number_groups in [3, 5]:
+            prop_observers = pd.DataFrame({'B_deg': rng.uniform(5.0, 90.0, number_groups),
+                                           'surface_azimuth_deg': rng.uniform(0.0, 360.0, number_groups),
+                                           'area_installed_module_m2': rng.uniform(1.0, 50.0, number_groups),
+                                           'type_orientation': rng.choice(['roofs_top', 'walls_south'],
+                                                                          number_groups)}).astype(object)
+            hourly_radiation = pd.DataFrame({group: rng.uniform(0.0, 900.0, HOURS_IN_YEAR)
+                                             for group in range(number_groups)})
+            self.sensor_groups.append({'number_groups': number_groups, 'prop_observers': prop_observers,
+                                       'hourlydata_groups': hourly_radiation})
+
+    def calc_pv_generation(self, sensor_groups):
+        return photovoltaic.calc_pv_generation(sensor_groups, self.weather_data, self.date_local,
+                                               self.solar_properties, 47.4, PANEL_PROPERTIES_PV)
+
+    def test_stacked_groups(self):
+        # the groups of both buildings calculated at once give the same generation as each building on its own
+        stacked = {'prop_observers': pd.concat([groups['prop_observers'] for groups in self.sensor_groups],
+                                               ignore_index=True),
+                   'hourlydata_groups': pd.concat([groups['hourlydata_groups'] for groups in self.sensor_groups],
+                                                  axis=1, ignore_index=True)}
+        expected = sum(self.calc_pv_generation(groups) for groups in self.sensor_groups)
+        result = self.calc_pv_generation(stacked)
+        self.assertEqual(list(result.columns), list(expected.columns))
+        np.testing.assert_allclose(result.values, expected.values, rtol=1e-12)
+        self.assertTrue((result['PV_walls_north_E_kWh'] == 0.0).all())
+
+    def test_pv_totals(self):
+        scenario = tempfile.mkdtemp()
+        try:
+            locator = cea.inputlocator.InputLocator(scenario)
+            results = {'B002': self.calc_pv_generation(self.sensor_groups[1]),
+                       'B001': self.calc_pv_generation(self.sensor_groups[0])}
+            totals = photovoltaic.PVTotals(['B001', 'B002'])
+            totals.add_batch(0, 1, (['B002', 'B001'],), results)
+            totals.write(locator)
+
+            hourly_totals = pd.read_csv(locator.PV_totals(), index_col='Date')
+            np.testing.assert_allclose(hourly_totals['E_PV_gen_kWh'],
+                                       results['B001']['E_PV_gen_kWh'] + results['B002']['E_PV_gen_kWh'], atol=0.005)
+            annual_results = pd.read_csv(locator.PV_total_buildings(), index_col='Name')
+            self.assertEqual(list(annual_results.index), ['B001', 'B002'])
+            self.assertAlmostEqual(annual_results.loc['B002', 'E_PV_gen_kWh'],
+                                   results['B002']['E_PV_gen_kWh'].sum(), places=2)
+            self.assertAlmostEqual(annual_results.loc['B002', 'Area_PV_m2'],
+                                   results['B002']['Area_PV_m2'].iloc[0], places=2)
+        finally:
+            shutil.rmtree(scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
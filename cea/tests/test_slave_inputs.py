@@ -0,0 +1,72 @@
+"""
+Test that :py:class:`cea.optimization.slave_inputs.SlaveInputs` reads each input file only once per process, that only
+the locator and the id of the run are pickled, that the data of an earlier run is dropped, that the data handed out can
+be modified without changing the data kept in memory and that the summaries of the thermal networks are kept in a
+least-recently-used cache.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+import cea.inputlocator
+import cea.optimization.slave_inputs
+from cea.optimization.slave_inputs import SlaveInputs
+
+
+class TestSlaveInputs(unittest.TestCase):
+    def setUp(self):
+        self.scenario = tempfile.mkdtemp()
+        self.locator = cea.inputlocator.InputLocator(self.scenario)
+
+    def tearDown(self):
+        shutil.rmtree(self.scenario)
+
+    def write_network_summary(self, network_type, barcode):
+        path = self.locator.get_optimization_network_results_summary(network_type, barcode)
+        if not os.path.exists(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        pd.DataFrame({'Q_DHNf_W': [1.0, 2.0]}).to_csv(path, index=False)
+
+    def test_read_once(self):
+        path = os.path.join(self.scenario, 'B001_PV.csv')
+        pd.DataFrame({'E_PV_gen_kWh': [1.0, None]}).to_csv(path, index=False)
+        slave_inputs = SlaveInputs(self.locator)
+        data = slave_inputs.read(path, fill_value=0.0)
+        self.assertEqual(list(data['E_PV_gen_kWh']), [1.0, 0.0])
+
+        # the file is not read again, also not by a copy of the object sent to another process
+        os.remove(path)
+        data['E_PV_gen_kWh'] = 2.0
+        self.assertEqual(list(slave_inputs.read(path, fill_value=0.0)['E_PV_gen_kWh']), [1.0, 0.0])
+        unpickled = pickle.loads(pickle.dumps(slave_inputs))
+        self.assertEqual(list(unpickled.read(path, fill_value=0.0)['E_PV_gen_kWh']), [1.0, 0.0])
+        self.assertEqual(set(vars(unpickled)), {'locator', 'network_summaries_cache_size', 'run_id'})
+
+        # a new run reads the files again and the data of the earlier run is dropped
+        new_run = SlaveInputs(self.locator)
+        self.assertRaises(IOError, new_run.read, path, fill_value=0.0)
+        self.assertEqual(list(cea.optimization.slave_inputs._loaded), [new_run.run_id])
+
+    def test_network_summaries(self):
+        slave_inputs = SlaveInputs(self.locator, network_summaries_cache_size=2)
+        self.assertIsNone(slave_inputs.get_network_summary('DH', '0101'))
+        self.write_network_summary('DH', '0101')
+        self.assertEqual(list(slave_inputs.get_network_summary('DH', '0101')['Q_DHNf_W']), [1.0, 2.0])
+        slave_inputs.get_network_summary('DH', '0101')['Q_DHNf_W'] = 0.0
+        self.assertEqual(list(slave_inputs.get_network_summary('DH', '0101')['Q_DHNf_W']), [1.0, 2.0])
+
+        slave_inputs.add_network_summary('DH', '1100', pd.DataFrame())
+        slave_inputs.get_network_summary('DH', '0101')
+        slave_inputs.add_network_summary('DC', '0101', pd.DataFrame())
+        # "DH 1100" was used least recently and is not on disk
+        self.assertIsNone(slave_inputs.get_network_summary('DH', '1100'))
+        self.assertIsNotNone(slave_inputs.get_network_summary('DC', '0101'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Test that the compiled flow scenario kernels of the solar collector and PVT models
+(:py:func:`cea.technologies.solar.solar_collector.calc_SC_flows` and
+:py:func:`cea.technologies.solar.photovoltaic_thermal.calc_PVT_flows`) reproduce the hourly loop of the TRNSYS Type 832
+port, calculated one flow scenario at a time.
+"""
+
+import unittest
+
+import numpy as np
+
+from cea.technologies.solar import photovoltaic_thermal, solar_collector
+
+HOURS = 24 * 14
+
+
+def create_inputs():
+    rng = np.random.RandomState(42)
+    hours = np.arange(HOURS)
+    daylight = np.clip(np.sin((hours % 24 - 6) / 12 * np.pi), 0.0, None)
+    q_rad_vector = 700.0 * daylight * rng.uniform(0.2, 1.0, HOURS)
+    Tamb_vector_C = 10.0 + 8.0 * daylight
+    # zero, nominal, maximum and minimum flow rates, followed by a flow rate that is switched on and off [kg/s]
+    specific_flows_kgpers = np.array([np.zeros(HOURS), np.full(HOURS, 0.028), np.full(HOURS, 0.042),
+                                      np.full(HOURS, 0.014), np.where(daylight > 0.3, 0.028, 0.0)])
+    return specific_flows_kgpers, q_rad_vector, Tamb_vector_C
+
+
+def calc_flow(module, flow_kgpers, q_rad_vector, Tamb_vector_C, Tin_C, aperture_area_m2, c1, c2, C_eff_Jperm2K,
+              Cp_fluid_JperkgK, Nseg, eff_nom=None, Bref=None, absorbed_radiation_PV_Wperm2=None):
+    """The hourly loop of a single flow scenario, as calculated by the TRNSYS Type 832 port"""
+    is_pvt = module is photovoltaic_thermal
+    TIME0, DELT, delts = 0, 1, 3600
+    Tfl, DT, Tabs = np.zeros(3), np.zeros(3), np.zeros(3)
+    STORED, TflA, TflB, TabsB, TabsA = np.zeros(600), np.zeros(600), np.zeros(600), np.zeros(600), np.zeros(600)
+    q_gain_Seg = np.zeros(101)
+    temperature_out_C, supply_out_kW = np.zeros(HOURS), np.zeros(HOURS)
+    for time in range(HOURS):
+        Tamb_C = Tamb_vector_C[time]
+        q_rad_Wperm2 = q_rad_vector[time]
+        if is_pvt:
+            c1_time = module.calc_cl_pvt(Bref, absorbed_radiation_PV_Wperm2, c1, eff_nom, time)
+            Mfl_kgpers = module.calc_Mfl_kgpers(DELT, Nseg, STORED, TIME0, Tin_C, flow_kgpers, time,
+                                                Cp_fluid_JperkgK, C_eff_Jperm2K, aperture_area_m2)
+            Tout_C = module.calc_Tout_C(Cp_fluid_JperkgK, DT, Mfl_kgpers, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
+                                        aperture_area_m2, c1_time, q_rad_Wperm2)
+        else:
+            c1_time = c1
+            Mfl_kgpers = module.calc_Mfl_kgpers(C_eff_Jperm2K, Cp_fluid_JperkgK, DELT, Nseg, STORED, TIME0, Tin_C,
+                                                aperture_area_m2, flow_kgpers, time)
+            Tout_C = module.calc_Tout_C(Cp_fluid_JperkgK, DT, Nseg, STORED, Tabs, Tamb_C, Tfl, Tin_C,
+                                        aperture_area_m2, c1_time, q_rad_Wperm2, Mfl_kgpers)
+        q_gain_Wperm2 = solar_collector.calc_q_gain(Tfl, q_rad_Wperm2, DT, Tin_C, aperture_area_m2, c1_time, c2,
+                                                    Mfl_kgpers, delts, Cp_fluid_JperkgK, C_eff_Jperm2K, Tamb_C)
+        if is_pvt:
+            Tout_Seg_C = module.do_multi_segment_calculation(aperture_area_m2 / Nseg, C_eff_Jperm2K, Cp_fluid_JperkgK,
+                                                             DT, Mfl_kgpers, 1, Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl,
+                                                             TflA, TflB, Tin_C, Tout_C, c1_time, c2, delts, q_gain_Seg,
+                                                             q_gain_Wperm2, q_rad_Wperm2)
+        else:
+            Tout_Seg_C = module.do_multi_segment_calculation(aperture_area_m2 / Nseg, C_eff_Jperm2K, Cp_fluid_JperkgK,
+                                                             DT, Mfl_kgpers, Nseg, STORED, Tabs, TabsA, Tamb_C, Tfl,
+                                                             TflA, TflB, Tin_C, Tout_C, c1_time, c2, delts, 1,
+                                                             q_gain_Seg, q_gain_Wperm2, q_rad_Wperm2)
+        supply_out_kW[time] = Mfl_kgpers * Cp_fluid_JperkgK * (Tout_Seg_C - Tin_C) / 1000
+        temperature_out_C[time] = Tout_Seg_C
+        for Iseg in range(1, Nseg + 1):
+            STORED[200 + Iseg] = TflB[Iseg]
+            STORED[400 + Iseg] = TabsB[Iseg]
+    return temperature_out_C, supply_out_kW
+
+
+class TestSolarCollectorFlows(unittest.TestCase):
+    def test_calc_SC_flows(self):
+        specific_flows_kgpers, q_rad_vector, Tamb_vector_C = create_inputs()
+        parameters = (q_rad_vector, Tamb_vector_C, 60.0, 1.72, 3.91, 0.0118, 8000.0, 3680.0, 10)
+        temperature_out_C, supply_out_kW = solar_collector.calc_SC_flows(specific_flows_kgpers, *parameters)
+        for flow, flow_kgpers in enumerate(specific_flows_kgpers):
+            expected_temperature_out_C, expected_supply_out_kW = calc_flow(solar_collector, flow_kgpers, *parameters)
+            np.testing.assert_array_equal(temperature_out_C[flow], expected_temperature_out_C)
+            np.testing.assert_array_equal(supply_out_kW[flow], expected_supply_out_kW)
+
+    def test_calc_PVT_flows(self):
+        specific_flows_kgpers, q_rad_vector, Tamb_vector_C = create_inputs()
+        parameters = (q_rad_vector, Tamb_vector_C, 35.0, 2.2, 3.91, 0.0118, 8000.0, 3680.0, 10, 0.16, 0.0035,
+                      0.8 * q_rad_vector)
+        temperature_out_C, supply_out_kW = photovoltaic_thermal.calc_PVT_flows(specific_flows_kgpers, *parameters)
+        for flow, flow_kgpers in enumerate(specific_flows_kgpers):
+            expected_temperature_out_C, expected_supply_out_kW = calc_flow(photovoltaic_thermal, flow_kgpers,
+                                                                           *parameters)
+            np.testing.assert_array_equal(temperature_out_C[flow], expected_temperature_out_C)
+            np.testing.assert_array_equal(supply_out_kW[flow], expected_supply_out_kW)
+
+    def test_calc_optimal_mass_flow(self):
+        rng = np.random.RandomState(42)
+        q = rng.uniform(-1.0, 1.0, (4, HOURS))
+        E = rng.uniform(0.0, 0.1, (4, HOURS))
+        mass_flow_opt, dP_opt = solar_collector.calc_optimal_mass_flow(*q, *E, 0, 58.0, 87.0, 29.0, 0, 2776.0,
+                                                                       6248.0, 694.0, 2.0)
+        balances = np.array([abs(q[0]) - E[0] * 2, q[1] - E[1] * 2, q[2] - E[2] * 2, q[3] - E[3] * 2])
+        for time in range(HOURS):
+            best = list(balances[:, time]).index(balances[:, time].max())
+            self.assertEqual(mass_flow_opt[time], [0, 58.0, 87.0, 29.0][best] * 2.0 / 3600)
+            self.assertEqual(dP_opt[time], [0, 2776.0, 6248.0, 694.0][best] * 2.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
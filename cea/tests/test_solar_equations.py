@@ -0,0 +1,87 @@
+"""
+Test the vectorized sun position (:py:func:`cea.utilities.solar_equations.calc_sun_position`) against ``pyephem`` and
+the filtering of the sensor points read from the binary sensor radiation files.
+"""
+
+import os
+import shutil
+import tempfile
+import types
+import unittest
+
+import numpy as np
+import pandas as pd
+
+import cea.inputlocator
+from cea.utilities import solar_equations
+from cea.utilities.date import get_date_range_hours_from_year
+
+
+class TestSunPosition(unittest.TestCase):
+    def test_calc_sun_position(self):
+        for latitude, longitude, time_zone in [(47.37, 8.54, 'Etc/GMT-1'), (1.35, 103.82, 'Etc/GMT-7'),
+                                               (-33.87, 151.21, 'Etc/GMT-10'), (40.71, -74.01, 'Etc/GMT+5')]:
+            datetime_local = get_date_range_hours_from_year(2005).tz_localize(time_zone)
+            expected = solar_equations.pyephem(datetime_local, latitude, longitude)
+            result = solar_equations.calc_sun_position(datetime_local, latitude, longitude)
+
+            np.testing.assert_allclose(result['zenith'], expected['zenith'], atol=0.02)
+            np.testing.assert_allclose(result['elevation'], expected['elevation'], atol=0.02)
+            # the azimuth is not well defined with the sun close to the zenith
+            daytime = (expected['elevation'] > 0) & (expected['elevation'] < 80)
+            azimuth_difference = (result['azimuth'] - expected['azimuth'] + 180.0) % 360.0 - 180.0
+            self.assertLess(azimuth_difference[daytime].abs().max(), 0.05)
+
+    def test_get_sun_position(self):
+        scenario = tempfile.mkdtemp()
+        try:
+            locator = cea.inputlocator.InputLocator(scenario)
+            datetime_local = get_date_range_hours_from_year(2005).tz_localize('Etc/GMT-1')
+            expected = solar_equations.get_sun_position(datetime_local, 47.37, 8.54, locator)
+            # the second call reads the cache
+            result = solar_equations.get_sun_position(datetime_local, 47.37, 8.54, locator)
+            pd.testing.assert_frame_equal(result, expected)
+            # only the cache file is left, no temporary file
+            self.assertEqual(len(os.listdir(locator.get_sun_position_cache_folder())), 1)
+        finally:
+            shutil.rmtree(scenario)
+
+
+class TestFilterLowPotential(unittest.TestCase):
+    def test_filter_low_potential(self):
+        scenario = tempfile.mkdtemp()
+        try:
+            locator = cea.inputlocator.InputLocator(scenario)
+            os.makedirs(locator.get_solar_radiation_folder(), exist_ok=True)
+            rng = np.random.RandomState(42)
+            sensors = ['srf%i' % i for i in range(12)]
+            sensor_results = rng.uniform(0.0, 300.0, (len(sensors), 8760)) * rng.uniform(0.0, 1.0, (len(sensors), 1))
+            # written like cea.resources.radiation_daysim.daysim_main.write_sensor_results
+            np.save(locator.get_radiation_building_sensors('B001'), sensor_results.astype(np.float32))
+            pd.DataFrame({'SURFACE': sensors, 'total_rad_Whm2': sensor_results.sum(axis=1)}).to_csv(
+                locator.get_radiation_building_sensors_index('B001'), index=False)
+            metadata = pd.DataFrame({'SURFACE': sensors[::-1], 'TYPE': ['roofs', 'walls', 'windows'] * 4})
+            metadata.to_csv(locator.get_radiation_metadata('B001'), index=False)
+
+            config = types.SimpleNamespace(solar=types.SimpleNamespace(panel_on_roof=True, panel_on_wall=True,
+                                                                       annual_radiation_threshold=400))
+            max_annual_radiation, threshold, sensors_rad_clean, sensors_metadata_clean = \
+                solar_equations.filter_low_potential(locator.get_radiation_building_sensors('B001'),
+                                                     locator.get_radiation_building_sensors_index('B001'),
+                                                     locator.get_radiation_metadata('B001'), config)
+
+            self.assertEqual(threshold, 400000.0)
+            self.assertAlmostEqual(max_annual_radiation, sensor_results.sum(axis=1).max())
+            expected_sensors = [sensor for sensor, sensor_type in zip(metadata.SURFACE, metadata.TYPE)
+                                if sensor_type != 'windows' and sensor_results[sensors.index(sensor)].sum() >= 400000]
+            self.assertEqual(list(sensors_metadata_clean.index), expected_sensors)
+            self.assertEqual(list(sensors_rad_clean.columns), expected_sensors)
+            for sensor in expected_sensors:
+                expected = sensor_results[sensors.index(sensor)].astype(np.float32)
+                np.testing.assert_allclose(sensors_rad_clean[sensor], np.where(expected > 50, expected, 0.0))
+        finally:
+            shutil.rmtree(scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
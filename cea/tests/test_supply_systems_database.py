@@ -0,0 +1,59 @@
+"""
+Test that :py:class:`cea.technologies.supply_systems_database.SupplySystemsDatabase` only reads the database files
+whose worksheets are used, returns copies of the worksheets and that the absorption chiller model
+(:py:func:`cea.technologies.chiller_absorption.calc_chiller_main`) rejects loads not covered by any chiller of the
+database.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import cea.inputlocator
+from cea.technologies.chiller_absorption import AbsorptionChiller, calc_chiller_main
+from cea.technologies.supply_systems_database import SupplySystemsDatabase
+
+
+class TestSupplySystemsDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # only the conversion systems, not the distribution systems or the feedstocks
+        cls.scenario = tempfile.mkdtemp()
+        cls.locator = cea.inputlocator.InputLocator(cls.scenario)
+        os.makedirs(os.path.dirname(cls.locator.get_database_conversion_systems()))
+        shutil.copyfile(os.path.join(os.path.dirname(cea.inputlocator.__file__), 'databases', 'CH', 'components',
+                                     'CONVERSION.xls'), cls.locator.get_database_conversion_systems())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.scenario)
+
+    def test_worksheets(self):
+        supply_systems = SupplySystemsDatabase(self.locator)
+        boiler = supply_systems.Boiler
+        self.assertIn('cap_max', boiler.columns)
+        self.assertRaises(OSError, lambda: supply_systems.FEEDSTOCKS)
+
+        # the worksheets returned are copies
+        boiler['cap_max'] = 0.0
+        self.assertTrue((SupplySystemsDatabase(self.locator).Boiler['cap_max'] > 0.0).all())
+
+    def test_absorption_chiller_not_covered(self):
+        chiller_prop = SupplySystemsDatabase(self.locator).Absorption_chiller
+        T_chw_sup_K, T_chw_re_K = 280.0, 285.0
+        mdot_chw_kgpers = np.array([1.0E4, 3.0E4, 1.0E5, 2.0E6]) / (4184.0 * (T_chw_re_K - T_chw_sup_K))
+        chiller_operation = calc_chiller_main(mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, 120.0, 285.0,
+                                              AbsorptionChiller(chiller_prop, 'single'))
+        self.assertTrue((chiller_operation['q_hw_W'] > 0.0).all())
+
+        # a gap between the capacities of the chillers
+        chiller_prop.loc[chiller_prop['code'] == 'ACH1', 'cap_max'] = 2.0E4
+        self.assertRaises(ValueError, calc_chiller_main, mdot_chw_kgpers, T_chw_sup_K, T_chw_re_K, 120.0, 285.0,
+                          AbsorptionChiller(chiller_prop, 'single'))
+
+
+if __name__ == '__main__':
+    unittest.main()
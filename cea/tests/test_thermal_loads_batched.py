@@ -0,0 +1,50 @@
+"""
+Test that the batched demand engine (:py:mod:`cea.demand.thermal_loads_batched`) reproduces the results of the
+per-building procedure (:py:func:`cea.demand.thermal_loads.calc_Qhs_Qcs`).
+"""
+
+import copy
+import unittest
+
+import numpy as np
+
+from cea.demand import thermal_loads, thermal_loads_batched
+from cea.tests.synthetic_buildings import create_building, create_weather_data
+
+
+class TestThermalLoadsBatched(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        weather_data = create_weather_data()
+        cls.buildings = [
+            create_building('B01', weather_data, 'RADIATOR', 'CEILING_COOLING', True, False, True, False, False, 200),
+            create_building('B02', weather_data, 'FLOOR_HEATING', 'FLOOR_COOLING', False, True, False, True, False,
+                            350),
+            create_building('B03', weather_data, 'RADIATOR', 'NONE', True, True, True, True, True, 500),
+            create_building('B04', weather_data, 'NONE', 'CEILING_COOLING', True, False, False, True, True, 800),
+        ]
+
+    def test_can_be_batched(self):
+        bpr, _ = self.buildings[0]
+        self.assertTrue(thermal_loads_batched.can_be_batched(bpr, False))
+        self.assertFalse(thermal_loads_batched.can_be_batched(bpr, True))
+        central_ac = copy.deepcopy(bpr)
+        central_ac.hvac['class_cs'] = 'CENTRAL_AC'
+        self.assertFalse(thermal_loads_batched.can_be_batched(central_ac, False))
+
+    def test_calc_Qhs_Qcs_batched(self):
+        expected = [thermal_loads.calc_Qhs_Qcs(bpr, copy.deepcopy(tsd), False) for bpr, tsd in self.buildings]
+        tsds = [copy.deepcopy(tsd) for _, tsd in self.buildings]
+        thermal_loads_batched.calc_Qhs_Qcs_batched([bpr for bpr, _ in self.buildings], tsds)
+
+        for (bpr, _), tsd_expected, tsd in zip(self.buildings, expected, tsds):
+            for key in thermal_loads_batched.BATCHED_TSD_KEYS:
+                np.testing.assert_allclose(tsd[key], np.asarray(tsd_expected[key], dtype=float), rtol=1e-9,
+                                           atol=1e-9, err_msg='{building}: {key}'.format(building=bpr.name, key=key))
+            for key in thermal_loads_batched.BATCHED_TSD_STATUS_KEYS:
+                np.testing.assert_array_equal(np.asarray(tsd[key]), np.asarray(tsd_expected[key]),
+                                              err_msg='{building}: {key}'.format(building=bpr.name, key=key))
+
+
+if __name__ == '__main__':
+    unittest.main()
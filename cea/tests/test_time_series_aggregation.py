@@ -0,0 +1,102 @@
+"""
+Test the typical days of :py:mod:`cea.utilities.time_series_aggregation`: the clustering of the days of a year, the
+reduction of the hourly values to the typical days and their expansion back to the year, and the error metrics.
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from cea.constants import DAYS_IN_YEAR, HOURS_IN_DAY, HOURS_IN_YEAR
+from cea.utilities.time_series_aggregation import TypicalDays, calc_typical_days, calc_error_metrics
+
+
+def get_profiles(noise=0.0):
+    """A demand with a seasonal and a daily profile, lower on the weekends, and the ambient temperature"""
+    hours = np.arange(HOURS_IN_YEAR)
+    season = np.cos(2 * np.pi * hours / HOURS_IN_YEAR)
+    daily = np.sin(2 * np.pi * (hours % HOURS_IN_DAY) / HOURS_IN_DAY)
+    weekend = (hours // HOURS_IN_DAY) % 7 >= 5
+    noise = np.random.RandomState(0).normal(0.0, noise, HOURS_IN_YEAR)
+    return pd.DataFrame({'demand_kWh': 20.0 + 10.0 * season + np.where(weekend, 1.0, 5.0) * daily + noise,
+                         'T_ambient_C': 10.0 - 10.0 * season + 3.0 * daily})
+
+
+class TestTypicalDays(unittest.TestCase):
+    def test_reduce_expand(self):
+        # a year of two kinds of days: the odd days stand for the even days before them
+        days = np.arange(1, DAYS_IN_YEAR, 2)
+        day_clusters = np.minimum(np.arange(DAYS_IN_YEAR) // 2, len(days) - 1)
+        typical_days = TypicalDays(days, day_clusters)
+        self.assertEqual(typical_days.weights.sum(), DAYS_IN_YEAR)
+        self.assertEqual(len(typical_days.hours), len(days) * HOURS_IN_DAY)
+
+        values = pd.DataFrame({'value': np.arange(HOURS_IN_YEAR, dtype=float)})
+        reduced = typical_days.reduce(values)
+        np.testing.assert_array_equal(reduced['value'].values[:HOURS_IN_DAY], np.arange(24, 48))
+        expanded = typical_days.expand(reduced)
+        self.assertEqual(len(expanded), HOURS_IN_YEAR)
+        np.testing.assert_array_equal(expanded['value'].values[:2 * HOURS_IN_DAY], np.tile(np.arange(24, 48), 2))
+        # a list is reduced to an array, the hours of the typical days are the same after the expansion
+        reduced = typical_days.reduce(list(values['value']))
+        np.testing.assert_array_equal(typical_days.expand(reduced)[typical_days.hours], reduced)
+
+        saved = TypicalDays.from_frame(typical_days.to_frame())
+        np.testing.assert_array_equal(saved.days, typical_days.days)
+        np.testing.assert_array_equal(saved.day_clusters, typical_days.day_clusters)
+
+    def test_calc_typical_days(self):
+        profiles = get_profiles(noise=0.5)
+        for method in ['k-medoids', 'k-means']:
+            typical_days = calc_typical_days(profiles, 12, method, peak_profile=profiles['demand_kWh'])
+            self.assertEqual(len(typical_days), 12)
+            self.assertEqual(typical_days.weights.sum(), DAYS_IN_YEAR)
+            # each typical day stands for itself, the peak day is a typical day of its own
+            np.testing.assert_array_equal(typical_days.day_clusters[typical_days.days], np.arange(12))
+            peak_day = profiles['demand_kWh'].values.argmax() // HOURS_IN_DAY
+            self.assertIn(peak_day, typical_days.days)
+            self.assertEqual(typical_days.weights[list(typical_days.days).index(peak_day)], 1)
+
+            errors = typical_days.calc_error_metrics(profiles)
+            self.assertEqual(errors.loc['demand_kWh', 'peak_error'], 0.0)
+            self.assertLess(errors['total_error'].abs().max(), 0.02)
+            self.assertLess(errors['nrmse'].max(), 0.1)
+
+        self.assertRaises(ValueError, calc_typical_days, profiles, 0)
+        self.assertRaises(ValueError, calc_typical_days, profiles, 12, 'hierarchical')
+
+    def test_fewer_distinct_days(self):
+        # each distinct day is a typical day if there are fewer distinct days than typical days
+        hours = np.arange(HOURS_IN_YEAR)
+        weekly = pd.DataFrame({'demand_kWh': (hours // HOURS_IN_DAY) % 7 + np.sin(2 * np.pi * hours / HOURS_IN_DAY)})
+        for method in ['k-medoids', 'k-means']:
+            typical_days = calc_typical_days(np.zeros((HOURS_IN_YEAR, 2)), 3, method)
+            self.assertEqual(len(typical_days), 1)
+            self.assertEqual(typical_days.weights.sum(), DAYS_IN_YEAR)
+
+            typical_days = calc_typical_days(weekly, 10, method)
+            self.assertEqual(len(typical_days), 7)
+            np.testing.assert_array_equal(np.sort(typical_days.weights), [52, 52, 52, 52, 52, 52, 53])
+            np.testing.assert_allclose(typical_days.calc_error_metrics(weekly).values, 0.0, atol=1e-12)
+
+            typical_days = calc_typical_days(weekly, 10, method, peak_profile=weekly['demand_kWh'])
+            self.assertEqual(len(typical_days), 8)
+            self.assertEqual(typical_days.weights.sum(), DAYS_IN_YEAR)
+
+    def test_error_metrics(self):
+        # the weekdays and weekends of each half of the year are the same: 4 typical days represent the year exactly
+        days = np.arange(HOURS_IN_YEAR) // HOURS_IN_DAY
+        profiles = pd.DataFrame({'demand_kWh': np.where(days % 7 >= 5, 10.0, 20.0),
+                                 'T_ambient_C': np.where(days < DAYS_IN_YEAR // 2, 5.0, 15.0)})
+        typical_days = calc_typical_days(profiles, 4)
+        errors = typical_days.calc_error_metrics(profiles)
+        np.testing.assert_allclose(errors.values, 0.0)
+
+        expanded = profiles * 1.1
+        errors = calc_error_metrics(profiles, expanded)
+        np.testing.assert_allclose(errors[['total_error', 'peak_error']].values, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,6 +6,8 @@ import sys
 import string
 from typing import Sequence, List
 
+import numpy as np
+
 
 def remap(x, in_min, in_max, out_min, out_max):
     """
@@ -85,4 +87,45 @@ def unique(sequence):
         if not item in seen:
             result.append(item)
             seen.add(item)
-    return result
\ No newline at end of file
+    return result
+
+
+def vectorize_where(function, where, number_of_outputs, *args):
+    """
+    Evaluate a function of scalars (e.g. the operation of a technology in one hour) only where a condition is met,
+    instead of ``np.vectorize`` over all elements.
+
+    :param function: the function to evaluate
+    :param where: boolean array, True for the elements to evaluate ``function`` for
+    :param int number_of_outputs: the number of values returned by ``function``
+    :param args: the arguments of ``function``. Arrays, Series and lists (the same length as ``where``) are indexed,
+        other values are passed as they are.
+    :return: one array per output of ``function``, zero where the condition is not met
+    :rtype: list
+    """
+    args = [np.asarray(arg) if np.ndim(arg) > 0 else arg for arg in args]
+    outputs = np.zeros((number_of_outputs, len(where)))
+    for i in np.flatnonzero(where):
+        outputs[:, i] = function(*[arg[i] if isinstance(arg, np.ndarray) else arg for arg in args])
+    return list(outputs)
+
+
+def apply_where(function, where, number_of_outputs, *args):
+    """
+    Evaluate a function of arrays (e.g. the operation of a technology for each hour of the year) only where a
+    condition is met, with a single call for all these elements (see :py:func:`vectorize_where` for functions of
+    scalars).
+
+    :param function: the function to evaluate
+    :param where: boolean array, True for the elements to evaluate ``function`` for
+    :param int number_of_outputs: the number of values returned by ``function``
+    :param args: the arguments of ``function``. Arrays, Series and lists (the same length as ``where``) are indexed,
+        other values are passed as they are.
+    :return: one array per output of ``function``, zero where the condition is not met
+    :rtype: list
+    """
+    args = [np.asarray(arg) if np.ndim(arg) > 0 else arg for arg in args]
+    outputs = np.zeros((number_of_outputs, len(where)))
+    if np.any(where):
+        outputs[:, where] = function(*[arg[where] if isinstance(arg, np.ndarray) else arg for arg in args])
+    return list(outputs)
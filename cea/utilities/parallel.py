@@ -2,8 +2,11 @@
 Standardizes multiprocessing use. In the CEA, some functions are run using the standard ``multiprocessing`` library.
 They are run by ``map``ing the function to a list of arguments (see ``multiprocessing.Pool.map_async``) and waiting
 for the processes to finish, while at the same time piping STDOUT, STDERR through
-``cea.utilities.workerstream.QueueWorkerStream`` - this ensures that the dashboard interface can read the output from
-the sub-processes.
+``cea.utilities.workerstream.BufferedQueueWorkerStream`` - this ensures that the dashboard interface can read the output
+from the sub-processes. The output is sent in batches of lines through a ``multiprocessing.Queue`` (together with the
+results) and written by the parent process, which blocks on the queue until the next batch arrives. Set the
+``general:worker-output`` parameter to ``errors`` to drop the STDOUT output of the sub-processes (e.g. progress
+messages) and only show STDERR (see ``set_worker_output``).
 
 The way this was done in CEA < v2.23 included boiler plate code that needed to be repeated every time multiprocessing
 was used. Issue [#2344](https://github.com/architecture-building-systems/CityEnergyAnalyst/issues/2344) was a result of
@@ -11,13 +14,24 @@ not applying this technique to the demand script.
 
 This module exports the function `map` which is intended to replace both ``map_async`` and the builtin ``map`` function
 (which was used when ``config.multiprocessing == False``). This simplifies multiprocessing.
+
+Inside a ``with persistent_pool():`` block (e.g. a workflow), the worker processes are kept alive and reused by all calls
+to ``vectorize`` instead of being created (and importing pandas, geopandas, ``cea.*`` etc.) for each call.
 """
 
+import contextlib
+import itertools
+import json
 import multiprocessing
+import os
+import pickle
 import sys
 import logging
-from itertools import repeat
-from cea.utilities.workerstream import stream_from_queue, QueueWorkerStream
+import tempfile
+import time
+
+import numpy as np
+from cea.utilities.workerstream import BufferedQueueWorkerStream
 
 __author__ = "Daren Thomas"
 __copyright__ = "Copyright 2019, Architecture and Building Systems - ETH Zurich"
@@ -28,15 +42,34 @@ __maintainer__ = "Daren Thomas"
 __email__ = "cea@arch.ethz.ch"
 __status__ = "Production"
 
+# the ``shared`` arguments of ``vectorize``, set in each worker process by ``__initialize_worker`` or read from the file
+# ``__shared_path`` when using a persistent pool
+__shared_kwargs = {}
+__shared_path = None
+
+# the pools (and their queues) kept alive by ``persistent_pool``, by number of processes and worker output - ``None``
+# outside of a ``persistent_pool`` block
+__persistent_pools = None
+
+# the output of the worker processes to show, "all" or "errors" (see ``set_worker_output``)
+__worker_output = 'all'
+
+# the queue for the output and results of a worker process, set by ``__initialize_worker``
+__queue = None
+
+# the ids of the calls to the vectorized functions
+__call_ids = itertools.count()
+
 
-def vectorize(func, processes=1, on_complete=None):
+def vectorize(func, processes=1, on_complete=None, shared=None, costs=None, timings_path=None, keys=None):
     """
     Similar to ``numpy.vectorize``, this function wraps ``func`` so that it operates on sequences (of same length)
     of inputs and outputs a sequence of results, similar to ``map(func, *args)``.
 
     The main point of using ``vectorize`` is to unify single-processing with multi-processing - if processes > 1,
     then multiprocessing is used and the function will be run on a pool of processes. STDOUT and STDERR of these
-    processes are fed through a ``cea.workerstream.QueueWorkerStream`` so it can be shown in the dashboard job output.
+    processes are fed through a ``cea.utilities.workerstream.BufferedQueueWorkerStream`` so it can be shown in the
+    dashboard job output.
 
     The parameter ``on_complete`` is an optional callable that is called for each completed call of ``func``. It takes
     4 arguments:
@@ -46,73 +79,204 @@ def vectorize(func, processes=1, on_complete=None):
     - args: the arguments passed to this call to ``func``
     - result: the return value of this call to ``func``
 
+    ``on_complete`` is always called in the parent process.
+
     .. note: due to the way multiprocessing works, ``func`` and ``on_complete`` need to be module-level functions
 
     .. note: the if processes > 1, then the first argument to the vectorized ``func`` will be converted to a list before
         running. This should not have any side effects, but is necessary if the args are constructed with
         ``itertools.repeat``.
 
+    The parameter ``shared`` is an optional dict of (large, read-only) keyword arguments that are the same for each
+    call of ``func``, e.g. the weather data. Instead of sending them along with each call (as with
+    ``itertools.repeat``), they are sent to each worker process only once, when the worker is started, and passed to
+    ``func`` as keyword arguments.
+
+    The calls of ``func`` take very different times (e.g. large vs. small buildings). To avoid workers running
+    out of calls while a single long call is still running, the calls are dispatched one at a time and longest first,
+    as estimated with ``costs`` (e.g. the floor area of each building) and/or the durations of a previous run, read
+    from ``timings_path``. The durations of the calls are stored in ``timings_path`` for the next run, by ``keys``.
+    The key of a call of a batch (e.g. the list of the buildings of the batch) is a list of names: the duration of the
+    call is stored per name (split in proportion to their previous durations, or evenly) and estimated as the sum of
+    the durations of its names, so the durations are reused by batches of another size.
+
     :param func: The function to vectorize
     :param int processes: The number of processes to use (use ``config.get_number_of_processes()``)
     :param on_complete: An optional function to call for each completed call to ``func``.
+    :param dict shared: An optional dict of keyword arguments passed to each call to ``func``.
+    :param costs: An optional sequence of the estimated cost of each call to ``func`` (in any unit)
+    :param str timings_path: An optional path to a json file to read and store the durations of the calls.
+    :param keys: An optional sequence of names (or lists of names) of the calls to ``func`` in ``timings_path``
+        (default: the first argument of each call)
     """
+    if shared is None:
+        shared = {}
+    schedule = (costs, timings_path, keys)
     if processes > 1:
-        return __multiprocess_wrapper(func, processes, on_complete)
+        return __multiprocess_wrapper(func, processes, on_complete, shared, schedule)
     else:
-        return single_process_wrapper(func, on_complete)
+        return single_process_wrapper(func, on_complete, shared, schedule)
 
 
-def __multiprocess_wrapper(func, processes, on_complete):
-    """Create a worker pool to map the function, taking care to set up STDOUT and STDERR"""
+def set_worker_output(worker_output):
+    """
+    Set the output of the worker processes to show for the following calls to ``vectorize``: "all" or "errors" (only
+    STDERR). This is set from the ``general:worker-output`` parameter before each script is run (see ``cea.api`` and
+    ``cea.interfaces.cli.cli``).
 
-    def wrapper(*args):
-        print("Using {processes} CPU's".format(processes=processes))
-        pool = multiprocessing.Pool(processes)
-        manager = multiprocessing.Manager()
+    :param str worker_output: "all" or "errors"
+    """
+    global __worker_output
+    __worker_output = worker_output
 
-        # a queue for STDOUT and STDERR output of sub-processes (see cea.utilities.workerstream.QueueWorkerStream)
-        queue = manager.Queue()
 
-        # make sure the first arg is a list (not a generator) since we need the length of the sequence
-        args = [list(a) for a in args]
-        n = len(args[0])  # the number of iterations to map
+@contextlib.contextmanager
+def persistent_pool():
+    """
+    Keep the worker processes created by ``vectorize`` alive until the end of the ``with`` block and reuse them for
+    all calls to ``vectorize`` (with the same number of processes and worker output) inside the block. This saves
+    starting the worker processes for each call, e.g. when running the scripts of a workflow::
 
-        # set up the list of i-values for on_complete
-        i_queue = manager.Queue()
-        for i in range(n):
-            i_queue.put(i)
+        with cea.utilities.parallel.persistent_pool():
+            cea.api.demand(config=config)
+            cea.api.photovoltaic(config=config)
 
-        args = [repeat(func, n),
-                repeat(queue, n),
-                repeat(on_complete, n),
-                repeat(i_queue, n),
-                repeat(n, n)] + args
-        args = zip(*args)
+    .. note: the worker processes are started with the state of the parent process at the time of the first call to
+        ``vectorize`` - module-level state changed after that is not seen by the workers.
 
-        map_result = pool.map_async(__apply_func_with_worker_stream, args)
+    .. note: if a call to a vectorized function fails, its remaining calls are stopped together with the worker
+        processes and the next call to ``vectorize`` starts new ones.
+    """
+    global __persistent_pools
+    if __persistent_pools is not None:
+        # nested blocks share the outer pools
+        yield
+        return
+
+    __persistent_pools = {}
+    try:
+        yield
+    finally:
+        pools, __persistent_pools = __persistent_pools, None
+        for pool, _ in pools.values():
+            pool.terminate()
+            pool.join()
+
+
+def __multiprocess_wrapper(func, processes, on_complete, shared, schedule):
+    """Create a worker pool to map the function, taking care to set up STDOUT and STDERR"""
 
-        while not map_result.ready():
-            stream_from_queue(queue)
-        result = map_result.get()
+    def wrapper(*args):
+        print("Using {processes} CPU's".format(processes=processes))
+        worker_output = __worker_output
+        if __persistent_pools is None:
+            # a queue for STDOUT and STDERR output of sub-processes and their results
+            # (see cea.utilities.workerstream.BufferedQueueWorkerStream)
+            queue = multiprocessing.Queue()
+            pool = multiprocessing.Pool(processes, initializer=__initialize_worker,
+                                        initargs=(queue, worker_output, shared))
+            shared_path = None
+        else:
+            pool_key = (processes, worker_output)
+            if pool_key not in __persistent_pools:
+                queue = multiprocessing.Queue()
+                __persistent_pools[pool_key] = (multiprocessing.Pool(processes, initializer=__initialize_worker,
+                                                                     initargs=(queue, worker_output, {})), queue)
+            pool, queue = __persistent_pools[pool_key]
+            # the workers already exist, they read the shared arguments from a file once per call
+            shared_fd, shared_path = tempfile.mkstemp(prefix='cea-shared-', suffix='.pickle')
+            with os.fdopen(shared_fd, 'wb') as f:
+                pickle.dump(shared, f, protocol=pickle.HIGHEST_PROTOCOL)
 
-        pool.close()
-        pool.join()
+        # make sure the first arg is a list (not a generator) since we need the length of the sequence
+        args = [list(a) for a in args]
+        n = len(args[0])  # the number of iterations to map
+        args = list(zip(*args))
+
+        # dispatch the longest calls first
+        costs, timings_path, keys = schedule
+        keys, timings = __read_timings(timings_path, keys, args)
+        order = order_longest_first(costs, keys, timings, n)
+
+        # identifies the messages of this call in the queue of a persistent pool
+        call_id = next(__call_ids)
+        tasks = [(func, call_id, index, shared_path, args[index]) for index in order]
+
+        success = False
+        durations = None
+        try:
+            # an error in one of the calls ends the message loop below
+            map_result = pool.map_async(__apply_func_with_worker_stream, tasks, chunksize=1,
+                                        error_callback=lambda _: queue.put(None))
+            result = [None] * n
+            durations = [None] * n
+            completed = 0
+            while completed < n:
+                message = queue.get()
+                if message is None:
+                    break
+                elif message[0] == 'result':
+                    _, message_call_id, index, instance_result, duration = message
+                    if message_call_id != call_id:
+                        # left over from an earlier call that failed
+                        continue
+                    result[index] = instance_result
+                    durations[index] = duration
+                    if on_complete:
+                        on_complete(completed, n, args[index], instance_result)
+                    completed += 1
+                else:
+                    __write_stream(message)
+            # raises the exception of a failed call
+            map_result.get()
+            success = True
+        finally:
+            if not success:
+                # the remaining calls could block on a full queue that is not read anymore, and the remaining calls of
+                # a persistent pool would read the shared arguments removed below: stop them (the next call starts a
+                # new persistent pool)
+                pool.terminate()
+                pool.join()
+                if shared_path is not None:
+                    del __persistent_pools[pool_key]
+            elif shared_path is None:
+                pool.close()
+                pool.join()
+            if shared_path is not None:
+                os.remove(shared_path)
+            # the durations of the completed calls are kept for the next run, even if a call failed
+            if durations is not None:
+                __write_timings(timings_path, keys, timings, durations)
 
         # process the rest of the queue
         while not queue.empty():
-            stream_from_queue(queue)
+            message = queue.get()
+            if message is not None and message[0] != 'result':
+                __write_stream(message)
         return result
 
     return wrapper
 
 
-def __apply_func_with_worker_stream(args):
+def __write_stream(message):
+    """Write a batch of output of a sub-process to STDOUT / STDERR - to be called from parent process"""
+    stream, msg = message
+    if stream == 'stdout':
+        sys.stdout.write(msg)
+    elif stream == 'stderr':
+        sys.stderr.write(msg)
+
+
+def __initialize_worker(queue, worker_output, shared):
     """
-    Call func, using ``queue`` to redirect stdout and stderr, with a tuple of args because multiprocessing.Pool.map
-    only accepts one argument for the function.
+    Set up the worker process: STDOUT and STDERR are sent through ``queue`` (STDOUT is dropped if ``worker_output``
+    is "errors") and the ``shared`` arguments of ``vectorize`` are stored, so they are only sent once per worker.
 
     This function is called _inside_ a separate process.
     """
+    global __queue, __shared_kwargs
+    __queue = queue
+    __shared_kwargs = shared
 
     # set up logging
     logger = multiprocessing.log_to_stderr()
@@ -120,36 +284,155 @@ def __apply_func_with_worker_stream(args):
     from cea import suppress_3rd_party_debug_loggers
     suppress_3rd_party_debug_loggers()
 
-    # unpack the arguments
-    func, queue, on_complete, i_queue, n, args = args[0], args[1], args[2], args[3], args[4], args[5:]
-
     # set up printing to stderr and stdout to go through the queue
-    sys.stdout = QueueWorkerStream('stdout', queue)
-    sys.stderr = QueueWorkerStream('stderr', queue)
+    if worker_output == 'errors':
+        sys.stdout = open(os.devnull, 'w')
+    else:
+        sys.stdout = BufferedQueueWorkerStream('stdout', queue)
+    sys.stderr = BufferedQueueWorkerStream('stderr', queue)
+
+
+def __read_shared_kwargs(shared_path):
+    """
+    Read the ``shared`` arguments of ``vectorize`` from ``shared_path`` (persistent pools only), unless this worker
+    already read them for an earlier task of the same call.
+
+    This function is called _inside_ a separate process.
+    """
+    global __shared_kwargs, __shared_path
+    if shared_path != __shared_path:
+        with open(shared_path, 'rb') as f:
+            __shared_kwargs = pickle.load(f)
+        __shared_path = shared_path
+
+
+def __apply_func_with_worker_stream(task):
+    """
+    Call func with the arguments of a task (multiprocessing.Pool.map only accepts one argument for the function) and
+    send the result through the queue, after the output of the call.
+
+    This function is called _inside_ a separate process.
+    """
+    func, call_id, index, shared_path, args = task
+    if shared_path is not None:
+        __read_shared_kwargs(shared_path)
 
     # CALL
-    result = func(*args)
+    t0 = time.perf_counter()
+    try:
+        result = func(*args, **__shared_kwargs)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
 
-    if on_complete:
-        on_complete(i_queue.get(), n, args, result)
+    __queue.put(('result', call_id, index, result, time.perf_counter() - t0))
+
+
+def __read_timings(timings_path, keys, args):
+    """
+    Read the durations of the calls of a previous run from ``timings_path``.
 
-    return result
+    :return: the names of each call (see ``get_key_names``, of the first argument of each call unless ``keys`` is
+        given) and the durations by name (empty if there is no ``timings_path`` or it can't be read)
+    :rtype: (list[list[str]], dict)
+    """
+    if not timings_path:
+        return None, {}
+    if keys is None:
+        keys = [instance_args[0] for instance_args in args]
+    keys = [get_key_names(key) for key in keys]
+    try:
+        with open(timings_path, 'r') as f:
+            timings = json.load(f)
+    except (IOError, ValueError):
+        timings = {}
+    return keys, timings
+
+
+def get_key_names(key):
+    """The names of the durations of a call in the timings file: the items of a list (a batch) or the key itself"""
+    if isinstance(key, (list, tuple)):
+        return [str(name) for name in key]
+    return [str(key)]
+
+
+def order_longest_first(costs, keys, timings, n):
+    """
+    Return the indexes of the calls ordered by estimated duration, longest first. The durations of a previous run are
+    used where available (the sum of the durations of the names of a batch, if all of them are known), the others are
+    estimated by scaling ``costs`` to seconds (or as the mean of the known durations, if there are no ``costs``).
+    Without ``costs`` and durations, the calls are kept in order.
+    """
+    names = [get_key_names(key) for key in keys] if keys else [[]] * n
+    known = np.array([bool(key_names) and all(name in timings for name in key_names) for key_names in names],
+                     dtype=bool)
+    if costs is not None:
+        costs = np.array(costs, dtype=float)
+    if known.any():
+        durations = np.array([sum(timings[name] for name in key_names) if k else 0.0
+                              for key_names, k in zip(names, known)], dtype=float)
+        if costs is not None and costs[known].sum() > 0.0:
+            seconds_per_cost = durations[known].sum() / costs[known].sum()
+            estimate = np.where(known, durations, costs * seconds_per_cost)
+        else:
+            estimate = np.where(known, durations, durations[known].mean())
+    elif costs is not None:
+        estimate = costs
+    else:
+        return list(range(n))
+    return list(np.argsort(-estimate, kind='stable'))
 
 
-def single_process_wrapper(func, on_complete):
-    """The simplest form of vectorization: Just loop"""
+def __write_timings(timings_path, keys, timings, durations):
+    """
+    Store the ``durations`` of the calls by name in ``timings_path``, keeping the durations of other calls. The
+    duration of a batch is split between its names in proportion to their previous durations (evenly if they are not
+    all known). Calls that did not complete (``None``) keep their previous duration.
+    """
+    if not timings_path:
+        return
+    previous_timings, timings = timings, dict(timings)
+    for key_names, duration in zip(keys, durations):
+        if duration is None or not key_names:
+            continue
+        shares = np.ones(len(key_names))
+        if all(name in previous_timings for name in key_names):
+            previous_durations = np.array([previous_timings[name] for name in key_names], dtype=float)
+            if previous_durations.sum() > 0.0:
+                shares = previous_durations
+        timings.update(zip(key_names, (duration * shares / shares.sum()).tolist()))
+    # write to a temporary file first, so concurrent runs never read a partially written file
+    temporary_path = '{timings_path}.{pid}.tmp'.format(timings_path=timings_path, pid=os.getpid())
+    with open(temporary_path, 'w') as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+    os.replace(temporary_path, timings_path)
+
+
+def single_process_wrapper(func, on_complete, shared=None, schedule=(None, None, None)):
+    """The simplest form of vectorization: Just loop (in order, but storing the durations of the calls)"""
+    if shared is None:
+        shared = {}
+    costs, timings_path, keys = schedule
 
     def wrapper(*args):
         print("Using single process")
 
         args = [list(a) for a in args]
         n = len(args[0])
+        args = list(zip(*args))
+        task_keys, timings = __read_timings(timings_path, keys, args)
         map_result = []
-        for i, instance_args in enumerate(zip(*args)):
-            result = func(*instance_args)
-            if on_complete:
-                on_complete(i, n, instance_args, result)
-            map_result.append(result)
+        durations = [None] * n
+        try:
+            for i, instance_args in enumerate(args):
+                t0 = time.perf_counter()
+                result = func(*instance_args, **shared)
+                durations[i] = time.perf_counter() - t0
+                if on_complete:
+                    on_complete(i, n, instance_args, result)
+                map_result.append(result)
+        finally:
+            __write_timings(timings_path, task_keys, timings, durations)
         return map_result
 
     return wrapper
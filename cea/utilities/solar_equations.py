@@ -5,6 +5,8 @@ solar equations
 
 
 
+import os
+
 import numpy as np
 import pandas as pd
 import ephem
@@ -89,6 +91,86 @@ def pyephem(datetime_local, latitude, longitude, altitude=0, pressure=101325,
     return sun_coords
 
 
+def calc_sun_position(datetime_local, latitude, longitude):
+    """
+    Calculate the position of the sun for all hours at once, using the vectorized algorithm of the NOAA solar
+    calculator [NOAA]_ (based on [Meeus1998]_). The results are the geometric position, without atmospheric refraction,
+    and deviate less than 0.02 degrees in zenith from ``pyephem`` with ``pressure=0``.
+
+    :param datetime_local: the (time zone aware) hours of the year
+    :type datetime_local: pandas.DatetimeIndex
+    :param float latitude: latitude of the case study location [degrees]
+    :param float longitude: longitude of the case study location [degrees]
+    :return: the elevation, azimuth (clockwise from north) and zenith of the sun in degrees, indexed by
+        ``datetime_local``
+    :rtype: pandas.DataFrame
+
+    .. [NOAA] https://gml.noaa.gov/grad/solcalc/calcdetails.html
+    .. [Meeus1998] Meeus, Jean. Astronomical Algorithms, 2nd edition. Willmann-Bell, 1998.
+    """
+    datetime_utc = datetime_local.tz_convert('UTC').tz_localize(None)
+    julian_century = (datetime_utc.to_julian_date().values - 2451545.0) / 36525.0
+    jc = julian_century
+
+    # position of the sun on the ecliptic
+    mean_longitude = np.mod(280.46646 + jc * (36000.76983 + jc * 0.0003032), 360.0)
+    mean_anomaly = np.radians(357.52911 + jc * (35999.05029 - 0.0001537 * jc))
+    eccentricity = 0.016708634 - jc * (0.000042037 + 0.0000001267 * jc)
+    equation_of_center = (np.sin(mean_anomaly) * (1.914602 - jc * (0.004817 + 0.000014 * jc)) +
+                          np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * jc) +
+                          np.sin(3 * mean_anomaly) * 0.000289)
+    omega = np.radians(125.04 - 1934.136 * jc)
+    apparent_longitude = np.radians(mean_longitude + equation_of_center - 0.00569 - 0.00478 * np.sin(omega))
+    mean_obliquity = 23.0 + (26.0 + (21.448 - jc * (46.815 + jc * (0.00059 - jc * 0.001813))) / 60.0) / 60.0
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_longitude))
+
+    # equation of time [min]
+    y = np.tan(obliquity / 2) ** 2
+    mean_longitude = np.radians(mean_longitude)
+    equation_of_time = 4 * np.degrees(y * np.sin(2 * mean_longitude) -
+                                      2 * eccentricity * np.sin(mean_anomaly) +
+                                      4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * mean_longitude) -
+                                      0.5 * y * y * np.sin(4 * mean_longitude) -
+                                      1.25 * eccentricity * eccentricity * np.sin(2 * mean_anomaly))
+
+    # position of the sun in the sky
+    minutes_utc = datetime_utc.hour.values * 60.0 + datetime_utc.minute.values + datetime_utc.second.values / 60.0
+    true_solar_time = np.mod(minutes_utc + equation_of_time + 4 * longitude, 1440.0)
+    hour_angle = np.radians(true_solar_time / 4.0 - 180.0)
+    latitude = np.radians(latitude)
+    cos_zenith = np.sin(latitude) * np.sin(declination) + np.cos(latitude) * np.cos(declination) * np.cos(hour_angle)
+    zenith = np.degrees(np.arccos(np.clip(cos_zenith, -1.0, 1.0)))
+    azimuth = np.mod(np.degrees(np.arctan2(np.sin(hour_angle), np.cos(hour_angle) * np.sin(latitude) -
+                                           np.tan(declination) * np.cos(latitude))) + 180.0, 360.0)
+
+    return pd.DataFrame({'elevation': 90.0 - zenith, 'azimuth': azimuth, 'zenith': zenith}, index=datetime_local)
+
+
+def get_sun_position(datetime_local, latitude, longitude, locator=None):
+    """
+    Return the position of the sun (see :py:func:`calc_sun_position`), reading it from the cache in the scenario if
+    it was already calculated for the same location and year.
+
+    :param locator: An InputLocator to locate the cache (the position is not cached if ``None``)
+    :type locator: cea.inputlocator.InputLocator
+    """
+    if locator is None:
+        return calc_sun_position(datetime_local, latitude, longitude)
+
+    cache_file = '{latitude:.6f}_{longitude:.6f}_{year}.pickle'.format(latitude=latitude, longitude=longitude,
+                                                                        year=datetime_local[0].year)
+    cache_path = os.path.join(locator.get_sun_position_cache_folder(), cache_file)
+    if os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+    sun_coords = calc_sun_position(datetime_local, latitude, longitude)
+    # write to a temporary file first, so scripts running in parallel never read a partially written cache
+    temporary_path = '{cache_path}.{pid}.tmp'.format(cache_path=cache_path, pid=os.getpid())
+    sun_coords.to_pickle(temporary_path)
+    os.replace(temporary_path, cache_path)
+    return sun_coords
+
+
 # solar properties
 SunProperties = collections.namedtuple('SunProperties', ['g', 'Sz', 'Az', 'ha', 'trr_mean', 'worst_sh', 'worst_Az'])
 def calc_datetime_local_from_weather_file(weather_data, latitude, longitude):
@@ -129,17 +211,29 @@ def get_local_etc_timezone(latitude, longitude):
 
     return time_zone
 
-def calc_sun_properties(latitude, longitude, weather_data, datetime_local, config):
-    solar_window_solstice = config.solar.solar_window_solstice
-    hour_date = datetime_local.hour
-    min_date = datetime_local.minute
-    day_date = datetime_local.dayofyear
+def calc_sun_properties(latitude, longitude, weather_data, datetime_local, solar_window_solstice, locator=None):
+    """
+    Calculate the properties of the sun for all hours of the year. These only depend on the location and the weather
+    file, so they should be calculated once and used for all buildings.
+
+    :param float latitude: latitude of the case study location
+    :param float longitude: longitude of the case study location
+    :param weather_data: the weather data read from the .epw file
+    :param datetime_local: the (time zone aware) hours of the year
+    :param int solar_window_solstice: desired time of solar exposure on the solstice in hours
+        (``config.solar.solar_window_solstice``)
+    :param locator: An InputLocator to locate the cache of the sun position (optional)
+    :rtype: SunProperties
+    """
+    hour_date = datetime_local.hour.values
+    min_date = datetime_local.minute.values
+    day_date = datetime_local.dayofyear.values
     worst_hour = calc_worst_hour(latitude, weather_data, solar_window_solstice)
 
     # solar elevation, azimuth and values for the 9-3pm period of no shading on the solar solstice
-    sun_coords = pyephem(datetime_local, latitude, longitude)
-    sun_coords['declination'] = np.vectorize(declination_degree)(day_date, 365)
-    sun_coords['hour_angle'] = np.vectorize(get_hour_angle)(longitude, min_date, hour_date, day_date)
+    sun_coords = get_sun_position(datetime_local, latitude, longitude, locator)
+    sun_coords['declination'] = declination_degree(day_date, 365)
+    sun_coords['hour_angle'] = get_hour_angle(longitude, min_date, hour_date, day_date)
     worst_sh = sun_coords['elevation'].loc[datetime_local[worst_hour]]
     worst_Az = sun_coords['azimuth'].loc[datetime_local[worst_hour]]
 
@@ -175,7 +269,7 @@ def declination_degree(day_date, TY):
     .. [1] http://pysolar.org/
     """
 
-    return 23.45 * np.vectorize(sin)((2 * pi / (TY)) * (day_date - 81))
+    return 23.45 * np.sin((2 * pi / (TY)) * (day_date - 81))
 
 
 def get_hour_angle(longitude_deg, min_date, hour_date, day_date):
@@ -199,13 +293,14 @@ def get_solar_time(longitude_deg, min_date, hour_date, day_date):
 
 def get_equation_of_time(day_date):
     B = (day_date - 1) * 360 / 365
-    E = 229.2 * (0.000075 + 0.001868 * cos(B) - 0.032077 * sin(B) - 0.014615 * cos(2 * B) - 0.04089 * sin(2 * B))
+    E = 229.2 * (0.000075 + 0.001868 * np.cos(B) - 0.032077 * np.sin(B) - 0.014615 * np.cos(2 * B) -
+                 0.04089 * np.sin(2 * B))
     return E
 
 
 # filter sensor points with low solar potential
 
-def filter_low_potential(radiation_json_path, metadata_csv_path, config):
+def filter_low_potential(radiation_path, sensors_index_path, metadata_csv_path, config):
     """
     To filter the sensor points/hours with low radiation potential.
 
@@ -213,10 +308,12 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. eliminate points when hourly production < 50 W/m2
     #. augment the solar radiation due to differences between panel reflectance and original reflectances used in daysim
 
-    :param radiation_csv: solar insulation data on all surfaces of each building
-    :type radiation_csv: .csv
-    :param metadata_csv: solar insulation sensor data of each building
-    :type metadata_csv: .csv
+    :param radiation_path: hourly solar insolation of each sensor point (float32 matrix, one row per sensor point)
+    :type radiation_path: .npy
+    :param sensors_index_path: names and yearly solar insolation of the sensor points (rows of the radiation matrix)
+    :type sensors_index_path: .csv
+    :param metadata_csv_path: solar insulation sensor data of each building
+    :type metadata_csv_path: .csv
     :return max_annual_radiation: yearly horizontal radiation [Wh/m2/year]
     :rtype max_annual_radiation: float
     :return annual_radiation_threshold: minimum yearly radiation threshold for sensor selection [Wh/m2/year]
@@ -234,20 +331,16 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     #. No solar panels on windows.
     """
 
-    def f(x):
-        if x <= 50:
-            return 0
-        else:
-            return x
-
-    # read radiation file
-    sensors_rad = pd.read_json(radiation_json_path)
+    # read the sensor index (the row of each sensor in the radiation matrix and its yearly radiation)
+    sensors_index = pd.read_csv(sensors_index_path)
+    sensors_index['row'] = np.arange(len(sensors_index))
+    sensors_index.set_index('SURFACE', inplace=True)
     sensors_metadata = pd.read_csv(metadata_csv_path)
 
     # join total radiation to sensor_metadata
-    sensors_rad_sum = sensors_rad.sum(0).to_frame('total_rad_Whm2')  # add new row with yearly radiation
     sensors_metadata.set_index('SURFACE', inplace=True)
-    sensors_metadata = sensors_metadata.merge(sensors_rad_sum, left_index=True, right_index=True)  # [Wh/m2]
+    sensors_metadata = sensors_metadata.merge(sensors_index[['total_rad_Whm2']], left_index=True,
+                                              right_index=True)  # [Wh/m2]
 
     # remove window surfaces
     sensors_metadata = sensors_metadata[sensors_metadata.TYPE != 'windows']
@@ -258,15 +351,17 @@ def filter_low_potential(radiation_json_path, metadata_csv_path, config):
     if config.solar.panel_on_wall is False:
         sensors_metadata = sensors_metadata[sensors_metadata.TYPE != 'walls']
 
-
     # set min yearly radiation threshold for sensor selection
     # keep sensors above min production in sensors_rad
-    max_annual_radiation = sensors_rad_sum.max().values[0]
+    max_annual_radiation = sensors_index.total_rad_Whm2.max()
     annual_radiation_threshold_Whperm2 = float(config.solar.annual_radiation_threshold)*1000
     sensors_metadata_clean = sensors_metadata[sensors_metadata.total_rad_Whm2 >= annual_radiation_threshold_Whperm2]
-    sensors_rad_clean = sensors_rad[sensors_metadata_clean.index.tolist()]  # keep sensors above min radiation
 
-    sensors_rad_clean = sensors_rad_clean.applymap(lambda x: f(x))
+    # read only the rows of the sensors above min radiation from the memory-mapped radiation matrix
+    rows = sensors_index.loc[sensors_metadata_clean.index, 'row'].values
+    sensors_rad = np.load(radiation_path, mmap_mode='r')[rows].astype(np.float64)
+    sensors_rad[sensors_rad <= 50] = 0.0
+    sensors_rad_clean = pd.DataFrame(sensors_rad.T, columns=sensors_metadata_clean.index.tolist())
 
     return max_annual_radiation, annual_radiation_threshold_Whperm2, sensors_rad_clean, sensors_metadata_clean
 
@@ -313,8 +408,7 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
 
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     input_angle_rad = radians(panel_tilt_angle)
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir']))  # surface tilt angle
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(input_angle_rad))  # panel tilt angle in degrees
@@ -324,10 +418,9 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, input_angle_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth(sensors_metadata_clean['Xdir'],
+                                                                         sensors_metadata_clean['Ydir'],
+                                                                         sensors_metadata_clean['B_deg'])  # degrees
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -344,8 +437,8 @@ def calc_spacing_custom_angle(sensors_metadata_clean, solar_properties, max_rad_
         area_per_module_m2 * (roof_coverage * sensors_metadata_clean.AREA_m2 / module_flat_surface_area_m2))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(calc_categoriesroof)(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
-                                               sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
+    result = calc_categoriesroof(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
+                                 sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -395,9 +488,7 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     # calculate panel tilt angle (B) for flat roofs (tilt < 5 degrees), slope roofs and walls.
     optimal_angle_flat_rad = calc_optimal_angle(180, latitude,
                                                 solar_properties.trr_mean)  # assume surface azimuth = 180 (N,E), south facing
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(acos)(sensors_metadata_clean['Zdir'])  # surface tilt angle in rad
-    sensors_metadata_clean['tilt_deg'] = np.vectorize(degrees)(
-        sensors_metadata_clean['tilt_deg'])  # surface tilt angle in degrees
+    sensors_metadata_clean['tilt_deg'] = np.degrees(np.arccos(sensors_metadata_clean['Zdir']))  # surface tilt angle
     sensors_metadata_clean['B_deg'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5,
                                                sensors_metadata_clean['tilt_deg'],
                                                degrees(optimal_angle_flat_rad))  # panel tilt angle in degrees
@@ -407,10 +498,9 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
     optimal_spacing_flat_m = calc_optimal_spacing(solar_properties, optimal_angle_flat_rad, module_length_m)
     sensors_metadata_clean['array_spacing_m'] = np.where(sensors_metadata_clean['tilt_deg'] >= 5, 0,
                                                          optimal_spacing_flat_m)
-    sensors_metadata_clean['surface_azimuth_deg'] = np.vectorize(calc_surface_azimuth)(sensors_metadata_clean['Xdir'],
-                                                                                       sensors_metadata_clean['Ydir'],
-                                                                                       sensors_metadata_clean[
-                                                                                           'B_deg'])  # degrees
+    sensors_metadata_clean['surface_azimuth_deg'] = calc_surface_azimuth(sensors_metadata_clean['Xdir'],
+                                                                         sensors_metadata_clean['Ydir'],
+                                                                         sensors_metadata_clean['B_deg'])  # degrees
 
     # calculate the surface area required to install one pv panel on flat roofs with defined tilt angle and array spacing
     if panel_properties['type'] == 'PV':
@@ -429,8 +519,8 @@ def optimal_angle_and_tilt(sensors_metadata_clean, latitude, solar_properties, m
                                                                    module_flat_surface_area_m2))
 
     # categorize the sensors by surface_azimuth, B, GB
-    result = np.vectorize(calc_categoriesroof)(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
-                                               sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
+    result = calc_categoriesroof(sensors_metadata_clean.surface_azimuth_deg, sensors_metadata_clean.B_deg,
+                                 sensors_metadata_clean.total_rad_Whm2, max_rad_Whperm2yr)
     sensors_metadata_clean['CATteta_z'] = result[0]
     sensors_metadata_clean['CATB'] = result[1]
     sensors_metadata_clean['CATGB'] = result[2]
@@ -494,117 +584,44 @@ def calc_categoriesroof(teta_z, B, GB, Max_Isol):
     To categorize solar panels by the surface azimuth, tilt angle and yearly radiation.
 
     :param teta_z: surface azimuth [degree], 0 degree north (east positive, west negative)
-    :type teta_z: float
+    :type teta_z: np.array
     :param B: solar panel tile angle [degree]
-    :type B: float
+    :type B: np.array
     :param GB: yearly radiation of sensors [Wh/m2/year]
-    :type GB: float
+    :type GB: np.array
     :param Max_Isol: maximum radiation received on surfaces [Wh/m2/year]
     :type Max_Isol: float
     :return CATteta_z: category of surface azimuth
-    :rtype CATteta_z: float
-    :return CATB: category of tilt angle
-    :rtype CATB: float
-    :return CATBG: category of yearly radiation
-    :rtype CATBG: float
+    :rtype CATteta_z: np.array
+    :return CATB: category of tilt angle (0 if not in the expected range)
+    :rtype CATB: np.array
+    :return CATBG: category of yearly radiation (0 if not in the expected range)
+    :rtype CATBG: np.array
+
+    Sensors outside the expected range get category 0 instead of ``None``, so they are not dropped but form groups
+    of their own in :py:func:`calc_groups`.
     """
-    if -122.5 < teta_z <= -67:
-        CATteta_z = 1
-    elif -67 < teta_z <= -22.5:
-        CATteta_z = 3
-    elif -22.5 < teta_z <= 22.5:
-        CATteta_z = 5
-    elif 22.5 < teta_z <= 67:
-        CATteta_z = 4
-    elif 67 <= teta_z <= 122.5:
-        CATteta_z = 2
-    else:
-        CATteta_z = 6
-    B = degrees(B)
-    if 0 < B <= 5:
-        CATB = 1  # flat roof
-    elif 5 < B <= 15:
-        CATB = 2  # tilted 5-15 degrees
-    elif 15 < B <= 25:
-        CATB = 3  # tilted 15-25 degrees
-    elif 25 < B <= 40:
-        CATB = 4  # tilted 25-40 degrees
-    elif 40 < B <= 60:
-        CATB = 5  # tilted 40-60 degrees
-    elif B > 60:
-        CATB = 6  # tilted >60 degrees
-    else:
-        CATB = None
+    CATteta_z = np.select([(-122.5 < teta_z) & (teta_z <= -67),
+                           (-67 < teta_z) & (teta_z <= -22.5),
+                           (-22.5 < teta_z) & (teta_z <= 22.5),
+                           (22.5 < teta_z) & (teta_z <= 67),
+                           (67 <= teta_z) & (teta_z <= 122.5)], [1, 3, 5, 4, 2], default=6)
+    B = np.degrees(B)
+    CATB = np.select([(0 < B) & (B <= 5),  # flat roof
+                      (5 < B) & (B <= 15),  # tilted 5-15 degrees
+                      (15 < B) & (B <= 25),  # tilted 15-25 degrees
+                      (25 < B) & (B <= 40),  # tilted 25-40 degrees
+                      (40 < B) & (B <= 60),  # tilted 40-60 degrees
+                      B > 60], [1, 2, 3, 4, 5, 6], default=0)  # tilted >60 degrees
+    if np.any(CATB == 0):
         print('B not in expected range')
 
+    # categories of 10% of the maximum radiation
     GB_percent = GB / Max_Isol
-    # if 0 < GB_percent <= 0.05:
-    #     CATGB = 1
-    # elif 0.05 < GB_percent <= 0.1:
-    #     CATGB = 2
-    # elif 0.1 < GB_percent <= 0.15:
-    #     CATGB = 3
-    # elif 0.15 < GB_percent <= 0.2:
-    #     CATGB = 4
-    # elif 0.2 < GB_percent <= 0.25:
-    #     CATGB = 5
-    # elif 0.25 < GB_percent <= 0.3:
-    #     CATGB = 6
-    # elif 0.3 < GB_percent <= 0.35:
-    #     CATGB = 7
-    # elif 0.35 < GB_percent <= 0.4:
-    #     CATGB = 8
-    # elif 0.4 < GB_percent<= 0.45:
-    #     CATGB = 9
-    # elif 0.45 < GB_percent <= 0.5:
-    #     CATGB = 10
-    # elif 0.5 < GB_percent <= 0.55:
-    #     CATGB = 11
-    # elif 0.55 < GB_percent <= 0.6:
-    #     CATGB = 12
-    # elif 0.6 < GB_percent <= 0.65:
-    #     CATGB = 13
-    # elif 0.65 < GB_percent <= 0.7:
-    #     CATGB = 14
-    # elif 0.7 < GB_percent <= 0.75:
-    #     CATGB = 15
-    # elif 0.75 < GB_percent <= 0.8:
-    #     CATGB = 16
-    # elif 0.8 < GB_percent <= 0.85:
-    #     CATGB = 17
-    # elif 0.85 < GB_percent <= 0.9:
-    #     CATGB = 18
-    # elif 0.9 < GB_percent <= 0.95:
-    #     CATGB = 19
-    # elif 0.95 < GB_percent <= 1:
-    #     CATGB = 20
-    # else:
-    #     CATGB = None
-    #     print('GB not in expected range')
-
-
-    if 0 < GB_percent <= 0.1:
-        CATGB = 1
-    elif 0.1 < GB_percent <= 0.2:
-        CATGB = 2
-    elif 0.2 < GB_percent <= 0.3:
-        CATGB = 3
-    elif 0.3 < GB_percent <= 0.4:
-        CATGB = 4
-    elif 0.4 < GB_percent<= 0.5:
-        CATGB = 5
-    elif 0.5 < GB_percent <= 0.6:
-        CATGB = 6
-    elif 0.6 < GB_percent <= 0.7:
-        CATGB = 7
-    elif 0.7 < GB_percent <= 0.8:
-        CATGB = 8
-    elif 0.8 < GB_percent <= 0.9:
-        CATGB = 9
-    elif 0.90 < GB_percent <= 1:
-        CATGB = 10
-    else:
-        CATGB = None
+    CATGB = np.select([(lower < GB_percent) & (GB_percent <= upper) for lower, upper in
+                       [(0, 0.1), (0.1, 0.2), (0.2, 0.3), (0.3, 0.4), (0.4, 0.5), (0.5, 0.6), (0.6, 0.7), (0.7, 0.8),
+                        (0.8, 0.9), (0.90, 1)]], [1, 2, 3, 4, 5, 6, 7, 8, 9, 10], default=0)
+    if np.any(CATGB == 0):
         print('GB not in expected range')
 
     return CATteta_z, CATB, CATGB
@@ -618,25 +635,21 @@ def calc_surface_azimuth(xdir, ydir, B):
     :param xdir: surface normal vector x in (x,y,z) representing east-west direction
     :param ydir: surface normal vector y in (x,y,z) representing north-south direction
     :param B: surface tilt angle in degree
-    :type xdir: float
-    :type ydir: float
-    :type B: float
+    :type xdir: np.array
+    :type ydir: np.array
+    :type B: np.array
     :returns surface azimuth: the azimuth of the surface of a solar panel in degree
-    :rtype surface_azimuth: float
+    :rtype surface_azimuth: np.array
 
     """
-    B = radians(B)
-    teta_z = degrees(asin(xdir / sin(B)))
+    B = np.radians(B)
+    teta_z = np.degrees(np.arcsin(xdir / np.sin(B)))
     # set the surface azimuth with on the sing convention (E,N)=(+,+)
-    if xdir < 0:
-        if ydir < 0:
-            surface_azimuth = 180 + teta_z  # (xdir,ydir) = (-,-)
-        else:
-            surface_azimuth = 360 + teta_z  # (xdir,ydir) = (-,+)
-    elif ydir < 0:
-        surface_azimuth = 180 + teta_z  # (xdir,ydir) = (+,-)
-    else:
-        surface_azimuth = teta_z  # (xdir,ydir) = (+,+)
+    surface_azimuth = np.where(ydir < 0,
+                               180 + teta_z,  # (xdir,ydir) = (-,-) and (+,-)
+                               np.where(xdir < 0,
+                                        360 + teta_z,  # (xdir,ydir) = (-,+)
+                                        teta_z))  # (xdir,ydir) = (+,+)
     return surface_azimuth  # degree
 
 
@@ -662,27 +675,27 @@ def calc_angle_of_incidence(g, lat, ha, tilt, teta_z):
     :param tilt: panel surface tilt angle [radians]
     :param teta_z: panel surface azimuth angle [radians]
     :type lat: float
-    :type g: float
-    :type ha: float
+    :type g: np.array
+    :type ha: np.array
     :type tilt: float
     :type teta_z: float
     :return teta_B: angle of incidence [radians]
-    :rtype teta_B: float
+    :rtype teta_B: np.array
 
     .. [Sproul, A. B., 2017] Sproul, A.B. (2007). Derivation of the solar geometric relationships using vector analysis.
        Renewable Energy, 32(7), 1187-1205.
     """
     # surface normal vector
-    n_E = sin(tilt) * sin(teta_z)
-    n_N = sin(tilt) * cos(teta_z)
-    n_Z = cos(tilt)
+    n_E = np.sin(tilt) * np.sin(teta_z)
+    n_N = np.sin(tilt) * np.cos(teta_z)
+    n_Z = np.cos(tilt)
     # solar vector
-    s_E = -cos(g) * sin(ha)
-    s_N = sin(g) * cos(lat) - cos(g) * sin(lat) * cos(ha)
-    s_Z = cos(g) * cos(lat) * cos(ha) + sin(g) * sin(lat)
+    s_E = -np.cos(g) * np.sin(ha)
+    s_N = np.sin(g) * np.cos(lat) - np.cos(g) * np.sin(lat) * np.cos(ha)
+    s_Z = np.cos(g) * np.cos(lat) * np.cos(ha) + np.sin(g) * np.sin(lat)
 
     # angle of incidence
-    teta_B = acos(n_E * s_E + n_N * s_N + n_Z * s_Z)
+    teta_B = np.arccos(n_E * s_E + n_N * s_N + n_Z * s_Z)
     return teta_B
 
 
@@ -0,0 +1,320 @@
+"""
+Time series aggregation with typical days
+
+Hourly calculations over a year (e.g. the detailed thermal network or the dispatch of the supply systems of the
+optimization) spend most of their time on days that are much alike. :py:func:`calc_typical_days` clusters the 365 days
+of the year by their daily profiles (e.g. the demand of the buildings and the weather) into a few typical days. Each
+typical day is a real day of the year that stands for the days of its cluster, its weight is the number of these days.
+
+A calculation runs for the hours of the typical days only (:py:meth:`TypicalDays.reduce`) and its results are expanded
+to the 8760 hours of the year by repeating each typical day for the days it stands for (:py:meth:`TypicalDays.expand`).
+:py:func:`calc_error_metrics` compares the expanded results with those of a run over the full year.
+"""
+
+import numpy as np
+import pandas as pd
+import scipy.spatial.distance
+
+from cea.constants import DAYS_IN_YEAR, HOURS_IN_DAY, HOURS_IN_YEAR
+
+__author__ = "Jimeno A. Fonseca"
+__copyright__ = "Copyright 2020, Architecture and Building Systems - ETH Zurich"
+__credits__ = ["Jimeno A. Fonseca", "Daren Thomas"]
+__license__ = "MIT"
+__version__ = "0.1"
+__maintainer__ = "Daren Thomas"
+__email__ = "cea@arch.ethz.ch"
+__status__ = "Production"
+
+CLUSTERING_METHODS = ['k-medoids', 'k-means']
+MAXIMUM_CLUSTERING_ITERATIONS = 100
+
+
+class TypicalDays(object):
+    """
+    The typical days of a year and the days of the year each of them stands for.
+
+    :ivar ndarray days: the day of the year (0-based) of each typical day, in chronological order
+    :ivar ndarray day_clusters: for each day of the year, the typical day (position in ``days``) standing for it
+    :ivar ndarray hours: the hours of the year of the typical days, one typical day after the other
+    :ivar ndarray rows_of_year: for each hour of the year, the row of the same hour of its typical day in a time series
+                                of the typical days
+    """
+
+    def __init__(self, days, day_clusters):
+        self.days = np.asarray(days, dtype=int)
+        self.day_clusters = np.asarray(day_clusters, dtype=int)
+        hours_of_day = np.arange(HOURS_IN_DAY)
+        self.hours = (self.days.reshape(-1, 1) * HOURS_IN_DAY + hours_of_day).ravel()
+        self.rows_of_year = (self.day_clusters.reshape(-1, 1) * HOURS_IN_DAY + hours_of_day).ravel()
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def weights(self):
+        """The number of days of the year each typical day stands for"""
+        return np.bincount(self.day_clusters, minlength=len(self.days))
+
+    def reduce(self, values):
+        """
+        The values of the hours of the typical days.
+
+        :param values: the values of each hour of the year (in the rows of a DataFrame or 2D array)
+        :type values: list or ndarray or pd.Series or pd.DataFrame
+        :return: the values of the typical days, one typical day after the other, in the type of ``values`` (a list is
+                 returned as an array)
+        """
+        return _take_rows(values, self.hours)
+
+    def expand(self, values):
+        """
+        The values of each hour of the year, taken from the same hour of the typical day standing for its day.
+
+        :param values: the values of each hour of the typical days (as returned by :py:meth:`reduce`)
+        :type values: list or ndarray or pd.Series or pd.DataFrame
+        :return: the values of the 8760 hours of the year, in the type of ``values`` (a list is returned as an array)
+        """
+        return _take_rows(values, self.rows_of_year)
+
+    def calc_error_metrics(self, profiles):
+        """
+        The error of the typical days in representing the profiles of the full year: the profiles are compared to the
+        profiles expanded from the hours of their typical days (see :py:func:`calc_error_metrics`).
+
+        :param profiles: the hourly profiles of the year, one column per profile (8760 x p)
+        :type profiles: pd.DataFrame
+        :rtype: pd.DataFrame
+        """
+        return calc_error_metrics(profiles, self.expand(self.reduce(profiles)))
+
+    def to_frame(self):
+        """The typical day (as the day of the year) standing for each day of the year"""
+        return pd.DataFrame({'day': np.arange(len(self.day_clusters)),
+                             'typical_day': self.days[self.day_clusters]})
+
+    @classmethod
+    def from_frame(cls, typical_days_df):
+        """The typical days saved with :py:meth:`to_frame`"""
+        days, day_clusters = np.unique(typical_days_df['typical_day'].values, return_inverse=True)
+        return cls(days, day_clusters)
+
+
+def _take_rows(values, rows):
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.iloc[rows].reset_index(drop=True)
+    return np.asarray(values)[rows]
+
+
+def calc_typical_days(profiles, number_of_typical_days, method='k-medoids', peak_profile=None):
+    """
+    Cluster the days of the year by their daily profiles into typical days.
+
+    Each profile (e.g. the hourly demand of a building or the ambient temperature) is scaled to the range [0, 1], so all
+    profiles weigh the same, and the 24 hours of all profiles make up the features of a day. The days are clustered with
+    k-medoids (the typical day of a cluster is its medoid: the day with the smallest sum of distances to the other days
+    of the cluster) or k-means (the typical day is the day of the cluster closest to its mean). The clustering starts
+    from the day closest to the mean of all days and then the days farthest from the days chosen so far, so the typical
+    days are the same for the same profiles.
+
+    The day with the highest value of ``peak_profile`` (e.g. the total demand) is kept as a typical day of its own, so
+    the peak of the year is part of the typical days, e.g. for the sizing of the pipes of a network.
+
+    There are fewer typical days than ``number_of_typical_days`` if the year has fewer distinct days (e.g. profiles
+    repeating every week): each distinct day is then a typical day.
+
+    :param profiles: the hourly profiles of the year, one column per profile (8760 x p)
+    :type profiles: ndarray or pd.DataFrame
+    :param int number_of_typical_days: the number of typical days (including the peak day), between 1 and 365
+    :param str method: the clustering method, one of ``CLUSTERING_METHODS``
+    :param peak_profile: the hourly profile of the year whose peak day is a typical day (None to not keep a peak day)
+    :type peak_profile: ndarray or pd.Series
+    :rtype: TypicalDays
+    """
+    if not 1 <= number_of_typical_days <= DAYS_IN_YEAR:
+        raise ValueError('The number of typical days must be between 1 and %i, got %s'
+                         % (DAYS_IN_YEAR, number_of_typical_days))
+    if method not in CLUSTERING_METHODS:
+        raise ValueError('Unknown clustering method %s, expected one of %s' % (method, CLUSTERING_METHODS))
+
+    features = get_daily_features(profiles)
+    days = np.arange(DAYS_IN_YEAR)
+    if peak_profile is not None and number_of_typical_days > 1:
+        peak_day = int(np.nanargmax(np.asarray(peak_profile, dtype=float)) // HOURS_IN_DAY)
+        clustered_days = days[days != peak_day]
+        number_of_clusters = number_of_typical_days - 1
+    else:
+        peak_day = None
+        clustered_days = days
+        number_of_clusters = number_of_typical_days
+
+    if method == 'k-medoids':
+        representatives, labels = cluster_k_medoids(features[clustered_days], number_of_clusters)
+    else:
+        representatives, labels = cluster_k_means(features[clustered_days], number_of_clusters)
+
+    typical_days = clustered_days[representatives]
+    day_clusters = np.zeros(DAYS_IN_YEAR, dtype=int)
+    day_clusters[clustered_days] = labels
+    if peak_day is not None:
+        typical_days = np.append(typical_days, peak_day)
+        day_clusters[peak_day] = len(representatives)
+
+    # number the typical days in chronological order
+    order = np.argsort(typical_days)
+    position = np.empty_like(order)
+    position[order] = np.arange(len(order))
+    return TypicalDays(typical_days[order], position[day_clusters])
+
+
+def get_daily_features(profiles):
+    """
+    The features of each day for the clustering: the 24 hours of each profile, scaled to the range [0, 1].
+
+    :param profiles: the hourly profiles of the year, one column per profile (8760 x p)
+    :type profiles: ndarray or pd.DataFrame
+    :return: the features of each day (365 x 24 * p)
+    :rtype: ndarray
+    """
+    profiles = np.nan_to_num(np.asarray(profiles, dtype=float).reshape(HOURS_IN_YEAR, -1))
+    minimum = profiles.min(axis=0)
+    span = profiles.max(axis=0) - minimum
+    scaled = (profiles - minimum) / np.where(span > 0.0, span, 1.0)
+    # (365 days x 24 hours) x p profiles -> 365 days x (24 hours x p profiles)
+    return scaled.reshape(DAYS_IN_YEAR, HOURS_IN_DAY, -1).transpose(0, 2, 1).reshape(DAYS_IN_YEAR, -1)
+
+
+def get_initial_centers(distances, number_of_clusters):
+    """
+    The days to start the clustering from: the day with the smallest distance to all days, then, one at a time, the day
+    farthest from the days chosen so far. Fewer days than ``number_of_clusters`` are chosen if all the days are
+    identical (up to rounding errors) to a day chosen, so the days chosen are distinct.
+
+    :param ndarray distances: the distances between the days (d x d)
+    :param int number_of_clusters: the number of days to choose
+    :return: the days chosen (as rows of ``distances``)
+    :rtype: ndarray
+    """
+    centers = [int(np.argmin(distances.sum(axis=1)))]
+    distance_to_centers = distances[centers[0]].copy()
+    while len(centers) < number_of_clusters:
+        center = int(np.argmax(distance_to_centers))
+        if np.isclose(distance_to_centers[center], 0.0):
+            # fewer distinct days than clusters (the features are scaled to [0, 1], so the tolerance is absolute)
+            break
+        centers.append(center)
+        distance_to_centers = np.minimum(distance_to_centers, distances[center])
+    return np.array(centers)
+
+
+def cluster_k_medoids(features, number_of_clusters):
+    """
+    Cluster the days with k-medoids: each day is assigned to the closest medoid and the medoid of each cluster is
+    updated to the day with the smallest sum of distances to the other days of the cluster, until the medoids don't
+    change.
+
+    :param ndarray features: the features of each day (d x f)
+    :param int number_of_clusters: the number of clusters (at most the number of distinct days)
+    :return medoids: the medoid of each cluster (as rows of ``features``)
+    :return labels: the cluster of each day
+    :rtype: tuple(ndarray, ndarray)
+    """
+    distances = scipy.spatial.distance.cdist(features, features)
+    medoids = get_initial_centers(distances, number_of_clusters)
+    for _ in range(MAXIMUM_CLUSTERING_ITERATIONS):
+        labels = assign_days(distances[:, medoids])
+        new_medoids = medoids.copy()
+        for cluster in range(len(medoids)):
+            members = np.flatnonzero(labels == cluster)
+            new_medoids[cluster] = members[np.argmin(distances[np.ix_(members, members)].sum(axis=1))]
+        if (new_medoids == medoids).all():
+            break
+        medoids = new_medoids
+    return medoids, assign_days(distances[:, medoids])
+
+
+def cluster_k_means(features, number_of_clusters):
+    """
+    Cluster the days with k-means: each day is assigned to the closest center and the center of each cluster is updated
+    to the mean of its days, until the clusters don't change. The representative of each cluster is its day closest to
+    the center.
+
+    :param ndarray features: the features of each day (d x f)
+    :param int number_of_clusters: the number of clusters (at most the number of distinct days)
+    :return representatives: the representative day of each cluster (as rows of ``features``)
+    :return labels: the cluster of each day
+    :rtype: tuple(ndarray, ndarray)
+    """
+    centers = features[get_initial_centers(scipy.spatial.distance.cdist(features, features), number_of_clusters)]
+    labels = None
+    for _ in range(MAXIMUM_CLUSTERING_ITERATIONS):
+        new_labels = assign_days(scipy.spatial.distance.cdist(features, centers))
+        if labels is not None and (new_labels == labels).all():
+            break
+        labels = new_labels
+        centers = np.array([features[labels == cluster].mean(axis=0) for cluster in range(len(centers))])
+
+    distances_to_centers = scipy.spatial.distance.cdist(features, centers)
+    representatives = np.array([np.flatnonzero(labels == cluster)[np.argmin(
+        distances_to_centers[labels == cluster, cluster])] for cluster in range(len(centers))])
+    return representatives, labels
+
+
+def assign_days(distances_to_centers):
+    """
+    The closest center of each day. A center that is not the closest center of any day (e.g. the mean of a k-means
+    cluster) takes the day farthest from its closest center among the clusters of several days, so no cluster is empty.
+    The centers must be distinct and there must be at least as many days as centers.
+
+    :param ndarray distances_to_centers: the distance of each day to each center (d x c)
+    :return: the cluster of each day
+    :rtype: ndarray
+    """
+    labels = np.argmin(distances_to_centers, axis=1)
+    for cluster in range(distances_to_centers.shape[1]):
+        if not (labels == cluster).any():
+            cluster_sizes = np.bincount(labels, minlength=distances_to_centers.shape[1])
+            distances_to_closest = np.where(cluster_sizes[labels] > 1,
+                                            distances_to_centers[np.arange(len(labels)), labels], -np.inf)
+            labels[np.argmax(distances_to_closest)] = cluster
+    return labels
+
+
+def calc_error_metrics(full_year_values, expanded_values):
+    """
+    Compare the hourly values expanded from the typical days (see :py:meth:`TypicalDays.expand`) with the values of a
+    run over the full year:
+
+    - ``total_error``: relative error of the sum over the year
+    - ``peak_error``: relative error of the highest absolute value
+    - ``nrmse``: root mean square error, normalized by the range of the full year values
+    - ``duration_curve_nrmse``: root mean square error of the values sorted by size (the load duration curve),
+      normalized by the range of the full year values
+
+    :param full_year_values: the values of the full year run, one column per variable (8760 x p)
+    :type full_year_values: pd.DataFrame
+    :param expanded_values: the values expanded from the typical days, in the same shape
+    :type expanded_values: pd.DataFrame or ndarray
+    :return: the error metrics (columns) of each variable (rows)
+    :rtype: pd.DataFrame
+    """
+    full_year = pd.DataFrame(full_year_values).astype(float).fillna(0.0)
+    full_year_array = full_year.values
+    expanded = np.nan_to_num(np.asarray(expanded_values, dtype=float).reshape(full_year_array.shape))
+    span = full_year_array.max(axis=0) - full_year_array.min(axis=0)
+    total = full_year_array.sum(axis=0)
+    peak = np.abs(full_year_array).max(axis=0)
+    squared_error = (expanded - full_year_array) ** 2
+    squared_duration_curve_error = (np.sort(expanded, axis=0) - np.sort(full_year_array, axis=0)) ** 2
+    return pd.DataFrame({
+        'total_error': _relative(expanded.sum(axis=0) - total, total),
+        'peak_error': _relative(np.abs(expanded).max(axis=0) - peak, peak),
+        'nrmse': _relative(np.sqrt(squared_error.mean(axis=0)), span),
+        'duration_curve_nrmse': _relative(np.sqrt(squared_duration_curve_error.mean(axis=0)), span),
+    }, index=full_year.columns)
+
+
+def _relative(error, reference):
+    """The error relative to the absolute value of the reference (the error of a reference of zero is set to zero)"""
+    reference = np.abs(reference)
+    return np.divide(error, reference, out=np.zeros_like(error, dtype=float), where=reference > 0.0)
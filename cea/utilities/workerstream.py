@@ -1,8 +1,7 @@
 """
 This file implements ``WorkerStream`` for capturing stdout and stderr.
 """
-import queue
-import sys
+import time
 
 
 class WorkerStream(object):
@@ -38,36 +37,42 @@ class HttpWorkerStream(object):
     #     async requests.post("url + jobid", str)
 
 
-class QueueWorkerStream(object):
-    """File-like object for wrapping the output of the scripts with queues - to be created in child process"""
+class BufferedQueueWorkerStream(object):
+    """
+    File-like object for wrapping the output of the scripts with a ``multiprocessing.Queue`` - to be created in child
+    process. Instead of sending each call to ``write`` through the queue, the output is collected and sent in batches:
+    when a line is completed and at least ``max_delay`` seconds have passed since the last batch, when the buffer
+    exceeds ``max_size`` characters or when ``flush`` is called.
+    """
 
-    def __init__(self, name, q):
+    def __init__(self, name, q, max_delay=0.5, max_size=64 * 1024):
         self.name = name  # 'stdout' or 'stderr'
         self.q = q
+        self.max_delay = max_delay
+        self.max_size = max_size
+        self.buffer = []
+        self.size = 0
+        self.last_sent = time.time()
 
     def __repr__(self):
-        return "QueueWorkerStream({name})".format(name=self.name)
+        return "BufferedQueueWorkerStream({name})".format(name=self.name)
 
     def close(self):
-        pass
+        self.flush()
 
     def write(self, str):
-        self.q.put((self.name, str))
+        self.buffer.append(str)
+        self.size += len(str)
+        if self.size >= self.max_size or ('\n' in str and time.time() - self.last_sent >= self.max_delay):
+            self.flush()
 
     def isatty(self):
         return False
 
     def flush(self):
-        pass
+        if self.buffer:
+            self.q.put((self.name, ''.join(self.buffer)))
+            self.buffer = []
+            self.size = 0
+        self.last_sent = time.time()
 
-
-def stream_from_queue(q):
-    """Stream the contents from the queue to STDOUT / STDERR - to be called from parent process"""
-    try:
-        stream, msg = q.get(block=True, timeout=0.1)
-        if stream == 'stdout':
-            sys.stdout.write(msg)
-        elif stream == 'stderr':
-            sys.stderr.write(msg)
-    except queue.Empty:
-        pass
@@ -10,6 +10,7 @@ import cea.config
 import cea.inputlocator
 import cea.api
 import cea.scripts
+import cea.utilities.parallel
 import yaml
 import tempfile
 
@@ -73,19 +74,21 @@ def main(config):
     with open(workflow_yml, 'r') as workflow_fp:
         workflow = yaml.safe_load(workflow_fp)
 
-    for i, step in enumerate(workflow):
-        if "script" in step:
-            if resume_mode_on and i <= resume_step:
-                # skip steps already completed while resuming
-                print("Skipping workflow step {i}: script={script}".format(i=i, script=step["script"]))
-                write_resume_info(resume_yml, resume_dict, workflow_yml, i)
-                continue
-            do_script_step(config, i, step, trace_input)
-        elif "config" in step:
-            config = do_config_step(config, step)
-        else:
-            raise ValueError("Invalid step configuration: {i} - {step}".format(i=i, step=step))
-        write_resume_info(resume_yml, resume_dict, workflow_yml, i)
+    # reuse the worker processes of the scripts for all steps of the workflow
+    with cea.utilities.parallel.persistent_pool():
+        for i, step in enumerate(workflow):
+            if "script" in step:
+                if resume_mode_on and i <= resume_step:
+                    # skip steps already completed while resuming
+                    print("Skipping workflow step {i}: script={script}".format(i=i, script=step["script"]))
+                    write_resume_info(resume_yml, resume_dict, workflow_yml, i)
+                    continue
+                do_script_step(config, i, step, trace_input)
+            elif "config" in step:
+                config = do_config_step(config, step)
+            else:
+                raise ValueError("Invalid step configuration: {i} - {step}".format(i=i, step=step))
+            write_resume_info(resume_yml, resume_dict, workflow_yml, i)
 
 
 def write_resume_info(resume_yml, resume_dict, workflow_yml, i):
@@ -34,6 +34,7 @@ INSTALL_REQUIRES = ['SALib',
                     'plotly',
                     'psutil',
                     'py4design_cea',
+                    'pyarrow',
                     'pymc3',
                     'pysal',
                     'pyyaml',